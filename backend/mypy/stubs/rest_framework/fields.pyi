@@ -20,7 +20,17 @@ class Field:
     ) -> None: ...
 
 class BooleanField(Field): ...
-class CharField(Field): ...
+
+class CharField(Field):
+    def __init__(
+        self,
+        max_length: Optional[int] = None,
+        min_length: Optional[int] = None,
+        allow_blank: bool = False,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None: ...
+
 class EmailField(Field): ...
 class RegexField(Field): ...
 class SlugField(Field): ...
@@ -2,8 +2,20 @@
 #
 # SPDX-License-Identifier: AGPL-3.0-or-later
 
-class BaseParser: ...
-class JSONParser: ...
+from collections.abc import Mapping
+from typing import IO, Any, Optional
+
+class BaseParser:
+    media_type: str
+
+    def parse(
+        self,
+        stream: IO[bytes],
+        media_type: Optional[str] = None,
+        parser_context: Optional[Mapping[str, Any]] = None,
+    ) -> Any: ...
+
+class JSONParser(BaseParser): ...
 class FormParser: ...
 class MultiPartParser: ...
 class FileUploadParser: ...
@@ -0,0 +1,31 @@
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+import json
+from collections.abc import Mapping
+from typing import Any, Optional
+
+class BaseRenderer:
+    media_type: str
+    format: str
+    charset: Optional[str]
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[Mapping[str, Any]] = None,
+    ) -> bytes: ...
+
+class JSONRenderer(BaseRenderer):
+    encoder_class: type[json.JSONEncoder]
+    ensure_ascii: bool
+    compact: bool
+    strict: bool
+
+    def get_indent(
+        self,
+        accepted_media_type: Optional[str],
+        renderer_context: Mapping[str, Any],
+    ) -> Optional[int]: ...
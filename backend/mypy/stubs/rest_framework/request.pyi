@@ -4,7 +4,7 @@
 
 from typing import Any
 
-from django.http import HttpRequest
+from django.http import HttpRequest, QueryDict
 
 # Cheat and use our own user type
 from projectify.user.models import User
@@ -26,3 +26,6 @@ class Request(HttpRequest):
     # but not AbstractBaseUser, but our user inheriting from AbstractBaseUser
     user: User
     data: dict[str, Any]
+    query_params: QueryDict
+    # The request that Django handled
+    _request: HttpRequest
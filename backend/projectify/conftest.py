@@ -5,15 +5,22 @@
 
 import base64
 import random
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
 
 from django.contrib.auth.models import AbstractBaseUser
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
 from django.test import client
 
 import pytest
 from faker import Faker
 from rest_framework.test import APIClient
 
+from projectify.settings.base import Base
 from projectify.user import models as user_models
 from projectify.user.services.internal import (
     user_create,
@@ -23,6 +30,7 @@ from projectify.user.services.user_invite import (
     user_invite_create,
     user_invite_redeem,
 )
+from pytest_types import RunConcurrently
 
 
 @pytest.fixture
@@ -153,6 +161,68 @@ def uploaded_file(png_image: bytes) -> SimpleUploadedFile:
     return SimpleUploadedFile("test.png", png_image)
 
 
+@pytest.fixture
+def media_root(settings: Base, tmp_path: Path) -> Path:
+    """Store uploaded files in a temporary directory."""
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def run_concurrently() -> RunConcurrently:
+    """
+    Run two callables in two threads, each in its own transaction.
+
+    The first transaction commits only after the second one has started, so
+    that both overlap. Needs a transactional db, since both commit. Errors
+    from either thread are re-raised.
+    """
+
+    def run(first: Callable[[], Any], second: Callable[[], Any]) -> None:
+        first_ran = threading.Event()
+        second_started = threading.Event()
+        errors: list[BaseException] = []
+
+        def run_first() -> None:
+            try:
+                with transaction.atomic():
+                    first()
+                    first_ran.set()
+                    second_started.wait(timeout=5)
+                    # Give the second transaction time to block, if it does
+                    time.sleep(0.2)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                first_ran.set()
+                connection.close()
+
+        def run_second() -> None:
+            try:
+                first_ran.wait(timeout=5)
+                with transaction.atomic():
+                    second_started.set()
+                    second()
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                second_started.set()
+                connection.close()
+
+        threads = [
+            threading.Thread(target=run_first),
+            threading.Thread(target=run_second),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+
+    return run
+
+
 @pytest.fixture(scope="session", autouse=True)
 def faker_seed() -> int:
     """Return a random seed every session."""
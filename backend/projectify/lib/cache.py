@@ -0,0 +1,73 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Cache serialized responses, shared between all users and workers.
+
+Each response is cached once under its key, such as a project uuid, together
+with a version that changes whenever anything in the response changes.
+Entries therefore never have to be invalidated. Once the version has moved
+on, the entry isn't returned anymore, and the next response cached under the
+same key replaces it.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Literal, Optional
+
+from django.core.cache import caches
+
+# Alias in settings.CACHES
+RESPONSE_CACHE = "responses"
+
+
+@dataclass(frozen=True)
+class ResponseCacheStats:
+    """How often a cached response was found since counting started."""
+
+    hits: int
+    misses: int
+
+
+def _key(name: str, key: str) -> str:
+    """Return the cache key for a cached response or counter."""
+    return f"projectify.lib.cache.{name}.{key}"
+
+
+def _count(name: str, outcome: Literal["hits", "misses"]) -> None:
+    """Count a cache hit or miss."""
+    cache = caches[RESPONSE_CACHE]
+    key = _key(name, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The counter doesn't exist yet
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def response_cache_get(*, name: str, key: str, version: str) -> Optional[Any]:
+    """Return the response cached for name under key, if still at version."""
+    entry: Optional[tuple[str, Any]] = caches[RESPONSE_CACHE].get(
+        _key(name, key)
+    )
+    data = None
+    if entry is not None and entry[0] == version:
+        data = entry[1]
+    _count(name, "misses" if data is None else "hits")
+    return data
+
+
+def response_cache_set(
+    *, name: str, key: str, version: str, data: Any
+) -> None:
+    """Cache a response at version for name under key."""
+    caches[RESPONSE_CACHE].set(_key(name, key), (version, data))
+
+
+def response_cache_stats(*, name: str) -> ResponseCacheStats:
+    """Return how often a response cached for name was found."""
+    cache = caches[RESPONSE_CACHE]
+    return ResponseCacheStats(
+        hits=cache.get(_key(name, "hits"), 0),
+        misses=cache.get(_key(name, "misses"), 0),
+    )
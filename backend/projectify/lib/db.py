@@ -0,0 +1,118 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Route database reads and writes between the primary and a replica."""
+
+from collections.abc import Mapping, Sequence
+from typing import Any, Optional, Union
+
+from django.contrib.auth.models import AbstractBaseUser, AnonymousUser
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Model
+
+from projectify.lib.settings import get_settings
+
+
+class PrimaryReplicaRouter:
+    """
+    Write to the primary, read from the replica only when asked to.
+
+    Reads use the primary, unless a selector is called with using=, or the
+    related objects of an instance read from the replica are accessed.
+    """
+
+    def db_for_write(self, model: type[Model], **hints: Any) -> str:
+        """Write to the primary, even when an instance came from a replica."""
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints: Any) -> bool:
+        """Allow relations, since all databases hold the same data."""
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, **hints: Any) -> bool:
+        """Only migrate the primary. Replicas follow it."""
+        return db == DEFAULT_DB_ALIAS
+
+
+def _pin_key(user: AbstractBaseUser) -> str:
+    """Return the cache key for pinning user to the primary."""
+    return f"projectify.lib.db.pin.{user.pk}"
+
+
+def pin_to_primary(user: AbstractBaseUser) -> None:
+    """Read from the primary on behalf of user for a while after a write."""
+    settings = get_settings()
+    if settings.DATABASE_REPLICA is None:
+        return
+    cache.set(
+        _pin_key(user), True, timeout=settings.DATABASE_REPLICA_PIN_SECONDS
+    )
+
+
+def read_database_for(user: Union[AbstractBaseUser, AnonymousUser]) -> str:
+    """
+    Return the database to read from on behalf of a user.
+
+    That is the replica, unless none is configured, or the user has written
+    something recently. The replica might then not have caught up yet.
+    """
+    replica = get_settings().DATABASE_REPLICA
+    if replica is None or isinstance(user, AnonymousUser):
+        return DEFAULT_DB_ALIAS
+    if cache.get(_pin_key(user)):
+        return DEFAULT_DB_ALIAS
+    return replica
+
+
+def row_versions_sql(sources: Sequence[str]) -> str:
+    """
+    Return an SQL expression that changes whenever rows in sources change.
+
+    Each source is what follows FROM in a query, naming the rows of interest
+    x. Every INSERT, UPDATE and DELETE changes either how many rows there
+    are, or the highest id of a transaction that wrote one of them, xmin.
+    Unlike the modified column, this also covers updates made by triggers or
+    QuerySet.update().
+    """
+    versions = ", ".join(
+        f"(SELECT count(*) || ':' || coalesce(max(x.xmin::text::bigint), 0) "
+        f"FROM {source})"
+        for source in sources
+    )
+    return f"md5(concat_ws(',', {versions}))"
+
+
+def find_version(
+    sql: str, params: Mapping[str, Any], using: Optional[str] = None
+) -> Optional[str]:
+    """
+    Return the single value sql selects, such as a version, as a string.
+
+    Returns None if sql selects no rows.
+    """
+    with connections[using or DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    return str(row[0])
+
+
+def find_weak_etag(
+    sql: str, params: Mapping[str, Any], using: Optional[str] = None
+) -> Optional[str]:
+    """
+    Return a weak ETag for the single value sql selects, if any.
+
+    Returns None if sql selects no rows.
+    """
+    version = find_version(sql, params, using=using)
+    if version is None:
+        return None
+    return weak_etag(version)
+
+
+def weak_etag(version: str) -> str:
+    """Return a weak ETag for a version."""
+    return f'W/"{version}"'
@@ -0,0 +1,48 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Parse API requests with orjson.
+
+Without orjson installed, or for request bodies not encoded as UTF-8, DRF's
+JSONParser is used instead.
+"""
+
+import codecs
+from collections.abc import Mapping
+from typing import IO, Any, Optional
+
+from django.conf import settings
+
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from .renderers import ORJSONRenderer
+
+try:
+    import orjson
+except ModuleNotFoundError:
+    orjson = None  # type: ignore[assignment]
+
+
+class ORJSONParser(parsers.JSONParser):
+    """Parse JSON with orjson, and fall back to JSONParser without it."""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(
+        self,
+        stream: IO[bytes],
+        media_type: Optional[str] = None,
+        parser_context: Optional[Mapping[str, Any]] = None,
+    ) -> Any:
+        """Parse JSON from stream."""
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as e:
+            # Same message as JSONParser
+            raise ParseError(f"JSON parse error - {e}") from e
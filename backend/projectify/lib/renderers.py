@@ -0,0 +1,67 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Render API responses with orjson.
+
+orjson writes UUIDs and datetimes itself, and is several times faster than
+the json module DRF uses. Without orjson installed, or where orjson can't
+give the same output, such as indented JSON for the browsable API, DRF's
+JSONRenderer is used instead.
+
+Floats are the exception. orjson writes the same numbers in the shortest
+form, as 1e16 where JSONRenderer writes 1e+16. NaN and infinities, which
+JSONRenderer rejects, are written as null.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Optional
+
+from rest_framework import renderers
+
+try:
+    import orjson
+except ModuleNotFoundError:
+    orjson = None  # type: ignore[assignment]
+
+# Escaped the same way JSONRenderer does, to keep the output a strict
+# JavaScript subset
+LINE_SEPARATOR = "\u2028".encode()
+PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """Render JSON with orjson, and fall back to JSONRenderer without it."""
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[Mapping[str, Any]] = None,
+    ) -> bytes:
+        """Render data into JSON."""
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        # orjson can only write compact or 2 space indented UTF-8
+        if (
+            orjson is None
+            or indent is not None
+            or self.ensure_ascii
+            or not self.compact
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                # DRF's encoder handles what orjson doesn't, such as
+                # Decimals and lazily translated strings
+                default=self.encoder_class().default,
+                option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            # Integers too large for orjson, for example
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace(LINE_SEPARATOR, b"\\u2028").replace(
+            PARAGRAPH_SEPARATOR, b"\\u2029"
+        )
@@ -16,14 +16,16 @@ F = TypeVar("F", bound=Callable[..., Any])
 
 
 def extend_schema(
-    request: Any = empty, responses: Any = empty
+    request: Any = empty, responses: Any = empty, parameters: Any = None
 ) -> Callable[[F], F]:
     """Lazily load extend_schema."""
     try:
         from drf_spectacular.utils import extend_schema as _extend_schema
     except ImportError:
         return lambda x: x
-    return _extend_schema(request=request, responses=responses)
+    return _extend_schema(
+        request=request, responses=responses, parameters=parameters
+    )
 
 
 _SchemaType = Dict[str, Any]
@@ -0,0 +1,340 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Compile serializers into plain conversion functions.
+
+For every object, a DRF serializer goes through its fields, finds each
+field's source and calls a chain of generic methods to read and convert the
+value. For large nested outputs such as project details, that is where most
+of the time goes. A compiled serializer works all of that out once, from an
+instance of the serializer, and then converts objects with a list of
+prepared getters and converters.
+
+The output is the same as DRF's. Whatever can't be sped up, such as related
+fields, serializers with their own to_representation, or attributes that
+have to be called, is still handled by the DRF field or serializer itself.
+
+A compiled serializer can also leave out fields, see FieldSelection, which
+is how detail views support ?fields= and ?include=.
+"""
+
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Optional
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Model
+from django.db.models.manager import BaseManager
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import fields, serializers
+from rest_framework.fields import SkipField  # type: ignore[attr-defined]
+from rest_framework.relations import (  # type: ignore[attr-defined]
+    PKOnlyObject,
+    RelatedField,
+)
+
+# Convert an attribute or object to its representation
+Converter = Callable[[Any], Any]
+
+# DRF fields and the plain functions their to_representation comes down to.
+# Subclasses are left out, since they might convert differently.
+CONVERTERS: dict[type[fields.Field], Converter] = {
+    fields.CharField: str,
+    fields.IntegerField: int,
+    fields.FloatField: float,
+}
+
+
+# Compiled serializers kept for different selections
+COMPILED_SERIALIZER_CACHE_SIZE = 256
+
+
+def _names(paths: Optional[frozenset[str]], name: str) -> bool:
+    """Return whether paths name a field or something below it."""
+    if paths is None:
+        return False
+    return any(path == name or path.startswith(f"{name}.") for path in paths)
+
+
+def _below(
+    paths: Optional[frozenset[str]], name: str
+) -> Optional[frozenset[str]]:
+    """Return paths below a field, relative to it, or None if there are none."""
+    if paths is None:
+        return None
+    prefix = f"{name}."
+    below = frozenset(
+        path.removeprefix(prefix) for path in paths if path.startswith(prefix)
+    )
+    return below or None
+
+
+@dataclass(frozen=True)
+class FieldSelection:
+    """
+    Fields and relations to show, as picked with ?fields= and ?include=.
+
+    Both are sets of dotted paths, such as sections.tasks.title. A relation,
+    that is a nested serializer, is shown if either of them names it or
+    something below it, and any other field only if fields does. None
+    restricts nothing, and neither does naming a field or relation without
+    anything below it.
+    """
+
+    fields: Optional[frozenset[str]] = None
+    include: Optional[frozenset[str]] = None
+
+    def keeps(self, name: str, *, relation: bool) -> bool:
+        """Return whether a field at this level is shown."""
+        if not relation:
+            return self.fields is None or _names(self.fields, name)
+        if self.fields is None and self.include is None:
+            return True
+        return _names(self.fields, name) or _names(self.include, name)
+
+    def child(self, name: str) -> Optional["FieldSelection"]:
+        """Return the selection below a relation, or None for everything."""
+        fields = _below(self.fields, name)
+        include = _below(self.include, name)
+        if fields is None and include is None:
+            return None
+        return FieldSelection(fields=fields, include=include)
+
+    def selects(self, path: str) -> bool:
+        """Return whether the relation at a dotted path is shown."""
+        selection: Optional[FieldSelection] = self
+        for name in path.split("."):
+            if selection is None:
+                return True
+            if not selection.keeps(name, relation=True):
+                return False
+            selection = selection.child(name)
+        return True
+
+
+def _is_relation(field: Any) -> bool:
+    """Return whether a field is a nested serializer."""
+    return isinstance(field, serializers.BaseSerializer)
+
+
+def _check_path(serializer: Any, path: str, *, relation: bool) -> None:
+    """Check that a dotted path leads to a field, or else to a relation."""
+    field: Any = None
+    for name in path.split("."):
+        if field is not None:
+            if not _is_relation(field):
+                raise serializers.ValidationError(
+                    _("{field} has no fields").format(field=field.field_name)
+                )
+            serializer = getattr(field, "child", field)
+        field = serializer.fields.get(name)
+        if field is None or field.write_only:
+            raise serializers.ValidationError(
+                _("{path} is not a field").format(path=path)
+            )
+    if relation and not _is_relation(field):
+        raise serializers.ValidationError(
+            _("{path} is not a relation").format(path=path)
+        )
+
+
+class FieldSelectionSerializer(serializers.Serializer):
+    """
+    Accept ?fields= and ?include= for selected_serializer.
+
+    Both take comma separated dotted paths. Validated data contain the
+    selection, or None if neither was given.
+    """
+
+    selected_serializer: type[serializers.Serializer]
+
+    def get_fields(self) -> dict[str, Any]:
+        """Return fields, declared here since Serializer.fields is taken."""
+        return {
+            "fields": serializers.CharField(required=False, allow_blank=True),
+            "include": serializers.CharField(required=False, allow_blank=True),
+        }
+
+    def _paths(self, value: str, *, relation: bool) -> frozenset[str]:
+        """Split and check paths."""
+        paths = frozenset(
+            path.strip() for path in value.split(",") if path.strip()
+        )
+        serializer = self.selected_serializer()
+        for path in paths:
+            _check_path(serializer, path, relation=relation)
+        return paths
+
+    def validate_fields(self, value: str) -> frozenset[str]:
+        """Check that all fields exist."""
+        return self._paths(value, relation=False)
+
+    def validate_include(self, value: str) -> frozenset[str]:
+        """Check that all relations exist."""
+        return self._paths(value, relation=True)
+
+    def validate(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Return the selection."""
+        if "fields" not in data and "include" not in data:
+            return {"selection": None}
+        return {
+            "selection": FieldSelection(
+                fields=data.get("fields"), include=data.get("include")
+            )
+        }
+
+
+# DRF fields are typed as Any, since our stubs don't cover field internals
+def _getter(field: Any, model: Optional[type[Model]]) -> Converter:
+    """
+    Return a function reading a field's attribute from an object.
+
+    The function raises SkipField if the field should be left out.
+    """
+    if field.source == "*":
+        return lambda instance: instance
+    get_attribute: Converter = field.get_attribute
+    if isinstance(field, RelatedField):
+
+        def get_related(instance: Any) -> Any:
+            """Read a related object, which might only be a primary key."""
+            attribute = get_attribute(instance)
+            if isinstance(attribute, PKOnlyObject) and attribute.pk is None:
+                return None
+            return attribute
+
+        return get_related
+    # Only model attributes that aren't methods can be read directly. DRF
+    # calls methods, and objects of other serializers might be dicts.
+    if model is None or len(field.source_attrs) != 1:
+        return get_attribute
+    attr: str = field.source_attrs[0]
+    if callable(getattr(model, attr, None)):
+        return get_attribute
+    read = attrgetter(attr)
+
+    def get(instance: Any) -> Any:
+        """Read the attribute, and leave missing ones to the DRF field."""
+        try:
+            return read(instance)
+        except (AttributeError, KeyError, ObjectDoesNotExist):
+            return get_attribute(instance)
+
+    return get
+
+
+def _converter(
+    field: Any, selection: Optional[FieldSelection] = None
+) -> Converter:
+    """Return a function converting a field's attribute that isn't None."""
+    match field:
+        case serializers.ListSerializer() if (
+            type(field).to_representation
+            is serializers.ListSerializer.to_representation
+        ):
+            child = _compile(field.child, selection)
+
+            def convert_many(data: Any) -> list[Any]:
+                """Convert every object, like ListSerializer does."""
+                if isinstance(data, BaseManager):
+                    data = data.all()
+                return [child(item) for item in data]
+
+            return convert_many
+        case serializers.Serializer():
+            return _compile(field, selection)
+        case fields.UUIDField() if (
+            field.uuid_format == "hex_verbose"  # type: ignore[attr-defined]
+        ):
+            return str
+    method: Converter = field.to_representation
+    return CONVERTERS.get(type(field), method)
+
+
+def _compile(
+    serializer: Any, selection: Optional[FieldSelection] = None
+) -> Converter:
+    """
+    Compile a serializer instance, whose fields are bound already.
+
+    Serializers with their own to_representation show all their fields,
+    whatever is selected.
+    """
+    if type(serializer).to_representation not in (
+        serializers.Serializer.to_representation,
+        CompiledSerializerMixin.to_representation,
+    ):
+        representation: Converter = serializer.to_representation
+        return representation
+    model: Optional[type[Model]] = getattr(
+        getattr(serializer, "Meta", None), "model", None
+    )
+    plan = tuple(
+        (
+            field.field_name,
+            _getter(field, model),
+            _converter(field, selection and selection.child(field.field_name)),
+        )
+        for field in serializer._readable_fields
+        if selection is None
+        or selection.keeps(field.field_name, relation=_is_relation(field))
+    )
+
+    def to_representation(instance: Any) -> dict[str, Any]:
+        """Convert an object the same way the serializer does."""
+        ret: dict[str, Any] = {}
+        for name, get, convert in plan:
+            try:
+                attribute = get(instance)
+            except SkipField:
+                continue
+            ret[name] = None if attribute is None else convert(attribute)
+        return ret
+
+    return to_representation
+
+
+@lru_cache(maxsize=COMPILED_SERIALIZER_CACHE_SIZE)
+def compile_serializer(
+    serializer_class: type[serializers.Serializer],
+    selection: Optional[FieldSelection] = None,
+) -> Converter:
+    """
+    Return a function converting objects the way serializer_class does.
+
+    The serializer is compiled the first time this is called for it, once
+    the models it serializes are ready. Only selected fields are converted.
+    """
+    return _compile(serializer_class(), selection)
+
+
+class CompiledSerializerMixin:
+    """
+    Convert objects with the compiled version of this serializer.
+
+    Serializers given a context are not compiled, since their fields might
+    depend on it, unless they are given a selection as well.
+    """
+
+    context: Mapping[str, Any]
+
+    def __init__(
+        self,
+        *args: Any,
+        selection: Optional[FieldSelection] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Store which fields are selected."""
+        self.selection = selection
+        super().__init__(*args, **kwargs)
+
+    def to_representation(self, instance: Any) -> Any:
+        """Convert an object with the compiled serializer."""
+        if self.context and self.selection is None:
+            return super().to_representation(instance)  # type: ignore[misc]
+        serializer_class: Any = type(self)
+        return compile_serializer(serializer_class, self.selection)(instance)
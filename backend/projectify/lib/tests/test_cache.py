@@ -0,0 +1,41 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test response caching."""
+
+from django.core.cache import caches
+
+from projectify.lib.cache import (
+    RESPONSE_CACHE,
+    ResponseCacheStats,
+    response_cache_get,
+    response_cache_set,
+    response_cache_stats,
+)
+
+
+def test_response_cache() -> None:
+    """Test that responses are cached and hits and misses counted."""
+    caches[RESPONSE_CACHE].clear()
+    assert response_cache_stats(name="test") == ResponseCacheStats(0, 0)
+    assert response_cache_get(name="test", key="1", version="a") is None
+    response_cache_set(
+        name="test", key="1", version="a", data={"title": "Hello"}
+    )
+    assert response_cache_get(name="test", key="1", version="a") == {
+        "title": "Hello"
+    }
+    assert response_cache_get(name="test", key="2", version="a") is None
+    # A newer version replaces the entry
+    assert response_cache_get(name="test", key="1", version="b") is None
+    response_cache_set(
+        name="test", key="1", version="b", data={"title": "Bye"}
+    )
+    assert response_cache_get(name="test", key="1", version="a") is None
+    assert response_cache_get(name="test", key="1", version="b") == {
+        "title": "Bye"
+    }
+    assert response_cache_stats(name="test") == ResponseCacheStats(
+        hits=2, misses=4
+    )
+    assert response_cache_stats(name="other") == ResponseCacheStats(0, 0)
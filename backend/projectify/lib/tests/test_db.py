@@ -0,0 +1,83 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test database routing."""
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import router
+from django.http import HttpRequest, HttpResponse
+from django.test import RequestFactory
+
+import pytest
+
+from projectify.lib.db import pin_to_primary, read_database_for
+from projectify.middleware import replica_pinning
+from projectify.settings.base import Base
+from projectify.user.models import User
+
+
+@pytest.fixture
+def replica(settings: Base) -> None:
+    """Enable the replica and forget about earlier pins."""
+    settings.DATABASE_REPLICA = "replica"
+    cache.clear()
+
+
+def test_router() -> None:
+    """Test that we only write to and migrate the primary."""
+    user = User()
+    user._state.db = "replica"
+    assert router.db_for_read(User, instance=user) == "replica"
+    assert router.db_for_write(User, instance=user) == "default"
+    assert router.allow_migrate("default", "user")
+    assert not router.allow_migrate("replica", "user")
+
+
+@pytest.mark.django_db
+class TestReadDatabaseFor:
+    """Test read_database_for."""
+
+    def test_without_replica(self, user: User) -> None:
+        """Test that we read from the primary without a replica."""
+        pin_to_primary(user)
+        assert read_database_for(user) == "default"
+
+    def test_with_replica(self, user: User, replica: None) -> None:
+        """Test that we read from the replica until the user writes."""
+        assert read_database_for(user) == "replica"
+        pin_to_primary(user)
+        assert read_database_for(user) == "default"
+
+    def test_pin_expires(
+        self, user: User, replica: None, settings: Base
+    ) -> None:
+        """Test that a pin expires after DATABASE_REPLICA_PIN_SECONDS."""
+        settings.DATABASE_REPLICA_PIN_SECONDS = 0
+        pin_to_primary(user)
+        assert read_database_for(user) == "replica"
+
+    def test_anonymous(self, replica: None) -> None:
+        """Test that anonymous users read from the primary."""
+        assert read_database_for(AnonymousUser()) == "default"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "method,pinned",
+    [("get", False), ("head", False), ("post", True), ("delete", True)],
+)
+def test_replica_pinning(
+    user: User, replica: None, method: str, pinned: bool
+) -> None:
+    """Test that users are pinned to the primary after writing."""
+
+    def get_response(request: HttpRequest) -> HttpResponse:
+        """Authenticate like a DRF view would."""
+        setattr(request, "user", user)
+        return HttpResponse()
+
+    request = getattr(RequestFactory(), method)("/")
+    request.user = AnonymousUser()
+    replica_pinning(get_response)(request)
+    assert read_database_for(user) == ("default" if pinned else "replica")
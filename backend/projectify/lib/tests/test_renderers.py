@@ -0,0 +1,111 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test orjson renderer and parser."""
+
+import io
+import json
+import math
+import uuid
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from typing import Any
+
+from django.utils.translation import gettext_lazy as _
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from projectify.lib import parsers, renderers
+from projectify.lib.parsers import ORJSONParser
+from projectify.lib.renderers import ORJSONRenderer
+
+DATA: dict[str, Any] = {
+    "uuid": uuid.UUID("d4a8c6c2-3b2e-4a57-9d6c-6f0e8c4f4a8e"),
+    "created": datetime(2024, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc),
+    "due_date": date(2024, 1, 2),
+    "amount": Decimal("1.5"),
+    "title": _("Title"),
+    "text": "Über separated ",
+    "numbers": {1: [1.5, None, True]},
+    "nested": [{"empty": {}}],
+}
+
+
+class TestORJSONRenderer:
+    """Test ORJSONRenderer."""
+
+    def test_same_as_json_renderer(self) -> None:
+        """Test that the output is the same as JSONRenderer's."""
+        assert ORJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+
+    def test_none(self) -> None:
+        """Test that None renders as nothing."""
+        assert ORJSONRenderer().render(None) == b""
+
+    def test_indent(self) -> None:
+        """Test that indenting falls back to JSONRenderer."""
+        media_type = "application/json; indent=4"
+        assert ORJSONRenderer().render(DATA, media_type) == (
+            JSONRenderer().render(DATA, media_type)
+        )
+
+    def test_large_integer(self) -> None:
+        """Test that integers orjson can't write fall back, too."""
+        data = {"large": 2**64}
+        assert (
+            ORJSONRenderer().render(data) == b'{"large":18446744073709551616}'
+        )
+
+    def test_floats(self) -> None:
+        """Test that floats are written as the same numbers, NaN as null."""
+        data = [1e16, 1e-7, 0.1, -2.5]
+        rendered = ORJSONRenderer().render(data)
+        assert rendered == b"[1e16,1e-7,0.1,-2.5]"
+        assert json.loads(rendered) == json.loads(JSONRenderer().render(data))
+        nan_data = [math.nan, math.inf, -math.inf]
+        assert ORJSONRenderer().render(nan_data) == b"[null,null,null]"
+        with pytest.raises(ValueError):
+            JSONRenderer().render(nan_data)
+
+    def test_without_orjson(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that JSONRenderer is used without orjson."""
+        monkeypatch.setattr(renderers, "orjson", None)
+        assert ORJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+
+
+class TestORJSONParser:
+    """Test ORJSONParser."""
+
+    def parse(self, parser: JSONParser, body: bytes) -> Any:
+        """Parse body."""
+        return parser.parse(io.BytesIO(body), "application/json")
+
+    def test_same_as_json_parser(self) -> None:
+        """Test that parsing gives the same data as JSONParser."""
+        body = JSONRenderer().render(DATA)
+        assert self.parse(ORJSONParser(), body) == self.parse(
+            JSONParser(), body
+        )
+
+    def test_invalid(self) -> None:
+        """Test that invalid JSON is rejected like JSONParser does."""
+        for body in (b"{", b'{"value": NaN}'):
+            with pytest.raises(ParseError):
+                self.parse(ORJSONParser(), body)
+
+    def test_other_encoding(self) -> None:
+        """Test that bodies not in UTF-8 are parsed by JSONParser."""
+        body = '{"title": "Über"}'.encode("latin-1")
+        parsed = ORJSONParser().parse(
+            io.BytesIO(body), "application/json", {"encoding": "latin-1"}
+        )
+        assert parsed == {"title": "Über"}
+
+    def test_without_orjson(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that JSONParser is used without orjson."""
+        monkeypatch.setattr(parsers, "orjson", None)
+        assert self.parse(ORJSONParser(), b'{"a": [1]}') == {"a": [1]}
@@ -0,0 +1,504 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Advise on missing indexes.
+
+Replays a mix of typical requests as a user against the current database and
+runs EXPLAIN (ANALYZE, BUFFERS) for every query that the views make. Writes
+are rolled back. Sequential scans that read at least --min-rows rows are
+reported, together with an index that would let PostgreSQL avoid them, unless
+an index that could serve them exists already. With --write, the proposed
+indexes are written as migrations.
+
+The result depends on the data, so run this on a copy of production, or on a
+generously seeded database, e.g.
+    poetry run ./manage.py seeddb --n-tasks 2000
+    poetry run ./manage.py adviseindexes
+"""
+
+import re
+from argparse import ArgumentParser
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import user_logged_in
+from django.contrib.auth.models import update_last_login
+from django.core.management.base import BaseCommand, CommandError
+from django.db import (
+    DatabaseError,
+    connection,
+    migrations,
+    models,
+    transaction,
+)
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.operations.base import Operation
+from django.db.migrations.writer import MigrationWriter
+from django.http import HttpResponse
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from projectify.user.models import User
+from projectify.workspace.models import Project, Section, Task, Workspace
+
+EXPLAIN = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+# A column, optionally qualified with its table and quoted
+COLUMN = r'(?:"?\w+"?\.)?"?(\w+)"?'
+EQUALS = re.compile(rf"^{COLUMN} = ")
+RANGE = re.compile(rf"^{COLUMN} (?:<|>|<=|>=) ")
+IS_NULL = re.compile(rf"^{COLUMN} IS (NOT )?NULL$")
+BOOLEAN = re.compile(rf"^(NOT )?{COLUMN}$")
+LITERAL = re.compile(r"'[^']*'(::[\w\[\] ]+)?|\b\d+\b")
+
+Step = tuple[str, Callable[[], HttpResponse]]
+
+
+@dataclass
+class Scan:
+    """Sequential scans of one table, with the same filter."""
+
+    relation: str
+    filter: str
+    count: int = 0
+    max_rows: int = 0
+    total_ms: float = 0.0
+    shared_blocks: int = 0
+    queries: set[str] = field(default_factory=set)
+
+
+class Explainer:
+    """Execute wrapper that explains every query before running it."""
+
+    plans: list[tuple[str, dict[str, Any]]]
+    explaining: bool
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.plans = []
+        self.explaining = False
+
+    def __call__(
+        self,
+        execute: Callable[..., Any],
+        sql: str,
+        params: Any,
+        many: bool,
+        context: dict[str, Any],
+    ) -> Any:
+        """Explain a query, then run it."""
+        explainable = sql.lstrip().upper().startswith(EXPLAINABLE)
+        if self.explaining or many or not explainable:
+            return execute(sql, params, many, context)
+        wrapper = context["connection"]
+        self.explaining = True
+        # EXPLAIN ANALYZE runs the query, so roll back what it writes
+        savepoint = wrapper.savepoint()
+        try:
+            with wrapper.cursor() as cursor:
+                cursor.execute(EXPLAIN + sql, params)
+                row = cursor.fetchone()
+            self.plans.append((sql, row[0][0]["Plan"]))
+        except DatabaseError:
+            pass
+        finally:
+            wrapper.savepoint_rollback(savepoint)
+            self.explaining = False
+        return execute(sql, params, many, context)
+
+
+def walk(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Yield a plan node and all its descendants."""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk(child)
+
+
+def depths(expression: str) -> Iterator[tuple[int, int]]:
+    """Yield each position in expression with its parenthesis depth."""
+    depth = 0
+    for i, char in enumerate(expression):
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        yield i, depth
+
+
+def unwrap(expression: str) -> str:
+    """Remove parentheses that enclose all of expression."""
+    while expression.startswith("(") and all(
+        depth > 0 for i, depth in depths(expression[:-1])
+    ):
+        expression = expression[1:-1]
+    return expression
+
+
+def split_conjuncts(expression: str) -> Optional[list[str]]:
+    """Split a filter at top level ANDs. Return None for ORs."""
+    expression = unwrap(expression)
+    conjuncts: list[str] = []
+    start = 0
+    for i, depth in depths(expression):
+        if depth != 0:
+            continue
+        if expression.startswith(" OR ", i):
+            return None
+        if expression.startswith(" AND ", i):
+            conjuncts.append(expression[start:i])
+            start = i + len(" AND ")
+    conjuncts.append(expression[start:])
+    return [unwrap(c) for c in conjuncts]
+
+
+def classify(conjunct: str) -> tuple[str, Optional[str], Any]:
+    """
+    Classify a filter conjunct.
+
+    Return whether it compares a column for equality ("key"), by range
+    ("range"), or against a constant ("condition"), the column, and for
+    conditions, the constant.
+    """
+    if match := IS_NULL.match(conjunct):
+        return "condition", match.group(1), match.group(2) is None
+    if match := BOOLEAN.match(conjunct):
+        return "condition", match.group(2), match.group(1) is None
+    if match := EQUALS.match(conjunct):
+        return "key", match.group(1), None
+    if match := RANGE.match(conjunct):
+        return "range", match.group(1), None
+    return "other", None, None
+
+
+def propose_index(
+    model: type[models.Model], filter: str
+) -> Optional[models.Index]:
+    """
+    Propose an index that would serve a sequential scan's filter.
+
+    Columns compared for equality come first, then one column compared by
+    range. Comparisons of a column against a constant, such as NOT redeemed
+    or archived IS NULL, make the index partial.
+    """
+    conjuncts = split_conjuncts(filter)
+    if conjuncts is None:
+        return None
+    fields = {f.column: f.name for f in model._meta.concrete_fields}
+    columns: dict[str, list[str]] = {"key": [], "range": []}
+    condition = models.Q()
+    for conjunct in conjuncts:
+        kind, column, value = classify(conjunct)
+        if column not in fields:
+            continue
+        name = fields[column]
+        if kind == "condition" and IS_NULL.match(conjunct):
+            condition &= models.Q(**{f"{name}__isnull": value})
+        elif kind == "condition":
+            condition &= models.Q(**{name: value})
+        elif kind in columns:
+            columns[kind].append(name)
+    index_fields = list(dict.fromkeys(columns["key"] + columns["range"][:1]))
+    if not index_fields:
+        return None
+    # Named for real by set_name_with_model below
+    index = models.Index(
+        fields=index_fields, condition=condition or None, name="advised"
+    )
+    index.set_name_with_model(model)
+    return index
+
+
+def existing_index(
+    model: type[models.Model], index: models.Index
+) -> Optional[str]:
+    """Return the name of an index that already covers index, if any."""
+    fields = {f.name: f.column for f in model._meta.concrete_fields}
+    columns = [fields[name] for name in index.fields]
+    constraints: dict[str, dict[str, Any]]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, model._meta.db_table
+        )
+    for name, constraint in constraints.items():
+        if not (constraint["index"] or constraint["unique"]):
+            continue
+        if constraint["columns"][: len(columns)] == columns:
+            return str(name)
+    return None
+
+
+def request_mix(client: APIClient, user: User, limit: int) -> Iterator[Step]:
+    """Yield requests that resemble what users do throughout the day."""
+
+    def get(url: str) -> Step:
+        return f"GET {url}", lambda: client.get(url)
+
+    def post(url: str, data: dict[str, Any]) -> Step:
+        # Like the dashboard, which posts forms through htmx
+        return f"POST {url}", lambda: client.post(
+            url, data, HTTP_HX_REQUEST="true"
+        )
+
+    def put(url: str, data: dict[str, Any]) -> Step:
+        return f"PUT {url}", lambda: client.put(url, data, format="json")
+
+    yield get(reverse("workspace:workspaces:user-workspaces"))
+    for workspace in Workspace.objects.filter(users=user)[:limit]:
+        yield get(
+            reverse("workspace:workspaces:read-update", args=(workspace.uuid,))
+        )
+        yield get(
+            reverse(
+                "workspace:workspaces:archived-projects",
+                args=(workspace.uuid,),
+            )
+        )
+        projects = Project.objects.filter(workspace=workspace)
+        for project in projects[:limit]:
+            yield get(
+                reverse(
+                    "workspace:projects:read-update-delete",
+                    args=(project.uuid,),
+                )
+            )
+        sections = Section.objects.filter(project__workspace=workspace)
+        for section in sections[:limit]:
+            yield get(
+                reverse(
+                    "workspace:sections:read-update-delete",
+                    args=(section.uuid,),
+                )
+            )
+        tasks = Task.objects.filter(workspace=workspace).prefetch_related(
+            "labels", "subtask_set"
+        )
+        for task in tasks[:limit]:
+            url = reverse(
+                "workspace:tasks:read-update-delete", args=(task.uuid,)
+            )
+            yield get(url)
+            yield put(
+                url,
+                {
+                    "title": task.title,
+                    "description": task.description,
+                    "labels": [
+                        {"uuid": str(label.uuid)}
+                        for label in task.labels.all()
+                    ],
+                    "assignee": None,
+                    # Dropping the first sub task deletes it
+                    "sub_tasks": [
+                        {
+                            "uuid": str(sub_task.uuid),
+                            "title": sub_task.title,
+                            "done": sub_task.done,
+                        }
+                        for sub_task in task.subtask_set.all()[1:]
+                    ],
+                    "due_date": None,
+                },
+            )
+            yield post(
+                reverse("dashboard:tasks:move", args=(task.uuid,)),
+                {"up": "up"},
+            )
+
+
+class Command(BaseCommand):
+    """Command."""
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Add arguments."""
+        parser.add_argument(
+            "--email",
+            help="Active user to replay requests as. "
+            "Defaults to the one in most workspaces",
+        )
+        parser.add_argument(
+            "--host",
+            help="Host header to send. Defaults to the first allowed host",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=5,
+            help="Workspaces, projects, sections and tasks to request each",
+        )
+        parser.add_argument(
+            "--min-rows",
+            type=int,
+            default=1000,
+            help="Ignore sequential scans that read fewer rows",
+        )
+        parser.add_argument(
+            "--write",
+            action="store_true",
+            help="Write the proposed indexes as migrations",
+        )
+
+    def replay(self, user: User, host: str, limit: int) -> Explainer:
+        """Replay the request mix and explain all queries made."""
+        client = APIClient(HTTP_HOST=host)
+        # Updating last_login validates the user, which seeded users without
+        # a password fail. It would be rolled back anyway.
+        user_logged_in.disconnect(dispatch_uid="update_last_login")
+        try:
+            client.force_login(user)
+        finally:
+            user_logged_in.connect(
+                update_last_login, dispatch_uid="update_last_login"
+            )
+        explainer = Explainer()
+        with connection.execute_wrapper(explainer):
+            for label, request in request_mix(client, user, limit):
+                sid = connection.savepoint()
+                try:
+                    response = request()
+                except Exception as e:
+                    self.stderr.write(f"{label} failed: {e!r}")
+                else:
+                    if response.status_code >= 400:
+                        self.stderr.write(
+                            f"{label} returned {response.status_code}"
+                        )
+                finally:
+                    # Undo whatever the request wrote
+                    connection.savepoint_rollback(sid)
+        return explainer
+
+    def collect(
+        self, explainer: Explainer, min_rows: int
+    ) -> dict[tuple[str, str], Scan]:
+        """Collect sequential scans that read at least min_rows rows."""
+        scans: dict[tuple[str, str], Scan] = {}
+        for sql, plan in explainer.plans:
+            for node in walk(plan):
+                if node["Node Type"] != "Seq Scan":
+                    continue
+                loops = node.get("Actual Loops", 1)
+                rows = node["Actual Rows"] + node.get(
+                    "Rows Removed by Filter", 0
+                )
+                if rows < min_rows:
+                    continue
+                filter = LITERAL.sub("?", node.get("Filter", ""))
+                key = node["Relation Name"], filter
+                scan = scans.setdefault(key, Scan(*key))
+                scan.count += 1
+                scan.max_rows = max(scan.max_rows, rows)
+                scan.total_ms += node["Actual Total Time"] * loops
+                scan.shared_blocks += node.get(
+                    "Shared Hit Blocks", 0
+                ) + node.get("Shared Read Blocks", 0)
+                scan.queries.add(sql)
+        return scans
+
+    def write_migrations(
+        self, proposals: list[tuple[type[models.Model], models.Index]]
+    ) -> None:
+        """Write one migration per app, adding the proposed indexes."""
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        by_app: dict[str, list[Operation]] = {}
+        for model, index in proposals:
+            by_app.setdefault(model._meta.app_label, []).append(
+                migrations.AddIndex(
+                    model_name=model.__name__.lower(), index=index
+                )
+            )
+        for app_label, operations in by_app.items():
+            (leaf,) = loader.graph.leaf_nodes(app_label)
+            number = int(leaf[1].split("_")[0]) + 1
+            migration = migrations.Migration(
+                f"{number:04d}_advised_indexes", app_label
+            )
+            migration.dependencies = [leaf]
+            migration.operations = operations
+            writer = MigrationWriter(migration)
+            header = (
+                "# SPDX-License-Identifier: AGPL-3.0-or-later\n"
+                "#\n"
+                "# SPDX-FileCopyrightText: 2024 JWP Consulting GK\n"
+                '"""Add indexes proposed by adviseindexes."""\n'
+            )
+            path = Path(writer.path)
+            path.write_text(header + writer.as_string())
+            self.stdout.write(f"Wrote {path}")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Handle."""
+        if connection.vendor != "postgresql":
+            raise CommandError("Only PostgreSQL query plans are supported")
+        email: Optional[str] = options["email"]
+        qs = (
+            User.objects.filter(is_active=True)
+            .annotate(workspace_count=models.Count("workspace"))
+            .order_by("-workspace_count", "pk")
+        )
+        if email is not None:
+            qs = qs.filter(email=email)
+        user = qs.first()
+        if user is None:
+            raise CommandError("No active user found")
+        host: str = options["host"] or next(
+            iter(settings.ALLOWED_HOSTS), "localhost"
+        ).lstrip(".")
+
+        with transaction.atomic():
+            explainer = self.replay(user, host, options["limit"])
+            scans = self.collect(explainer, options["min_rows"])
+            transaction.set_rollback(True)
+        self.stdout.write(
+            f"Explained {len(explainer.plans)} queries made "
+            f"on behalf of {user.email}"
+        )
+        if not scans:
+            self.stdout.write(
+                f"No sequential scans on {options['min_rows']} rows or more"
+            )
+            return
+
+        tables = {m._meta.db_table: m for m in apps.get_models()}
+        proposals: list[tuple[type[models.Model], models.Index]] = []
+        for scan in sorted(scans.values(), key=lambda s: -s.total_ms):
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Seq Scan on {scan.relation} "
+                    f"({scan.count}x, up to {scan.max_rows} rows, "
+                    f"{scan.total_ms:.2f}ms, {scan.shared_blocks} blocks)"
+                )
+            )
+            self.stdout.write(f"  Filter: {scan.filter or '(none)'}")
+            model = tables.get(scan.relation)
+            index = (
+                propose_index(model, scan.filter)
+                if model is not None and scan.filter
+                else None
+            )
+            if model is None or index is None:
+                self.stdout.write("  No index can serve this scan")
+                continue
+            name = existing_index(model, index)
+            if name is not None:
+                self.stdout.write(
+                    f"  Index {name} exists, but was not used. "
+                    "Consider running ANALYZE on this table"
+                )
+                continue
+            code, _ = MigrationWriter.serialize(index)
+            self.stdout.write(
+                f"  Proposed for {model.__name__}.Meta.indexes: {code}"
+            )
+            if index.name not in {i.name for _, i in proposals}:
+                proposals.append((model, index))
+
+        if proposals and options["write"]:
+            self.write_migrations(proposals)
+            self.stdout.write(
+                "Add the indexes to the models' Meta.indexes as well, "
+                "so that makemigrations stays clean"
+            )
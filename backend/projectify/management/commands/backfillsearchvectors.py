@@ -0,0 +1,51 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Backfill task search vectors.
+
+Task.search_vector is kept up to date by triggers on Task, SubTask and
+ChatMessage. Tasks that existed before the column was added need to have it
+populated once. Run
+    poetry run ./manage.py backfillsearchvectors
+after migrating. Running it again is safe and only touches tasks without a
+search vector.
+"""
+
+from argparse import ArgumentParser
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from projectify.workspace.models import Task
+
+
+class Command(BaseCommand):
+    """Command."""
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Add arguments."""
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Update tasks in batches of this many task ids",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Handle."""
+        batch_size: int = options["batch_size"]
+        last_pk = Task.objects.order_by("-pk").values_list("pk", flat=True)
+        highest_pk = last_pk.first() or 0
+        updated = 0
+        for start in range(0, highest_pk + 1, batch_size):
+            # Setting search_vector to NULL makes the update_search_vector
+            # trigger compute it
+            with transaction.atomic():
+                updated += Task.objects.filter(
+                    pk__gte=start,
+                    pk__lt=start + batch_size,
+                    search_vector__isnull=True,
+                ).update(search_vector=None)
+        self.stdout.write(f"Updated search vectors for {updated} tasks")
@@ -0,0 +1,83 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Backfill sub task counts.
+
+Task.sub_task_count and Task.sub_task_done_count are kept up to date by
+triggers on SubTask. Tasks that existed before these columns were added need
+to have them populated once. Run
+    poetry run ./manage.py backfillsubtaskcounts
+after migrating. Running it again is safe and only touches tasks whose counts
+are off.
+"""
+
+from argparse import ArgumentParser
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+import pgtrigger
+
+from projectify.workspace.models import Task
+from projectify.workspace.models.sub_task import SubTask
+
+
+class Command(BaseCommand):
+    """Command."""
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Add arguments."""
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Update tasks in batches of this many task ids",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Handle."""
+        batch_size: int = options["batch_size"]
+        sub_tasks = (
+            SubTask.objects.filter(task=OuterRef("pk"))
+            .order_by()
+            .values("task")
+        )
+        count = Coalesce(
+            Subquery(sub_tasks.annotate(count=Count("pk")).values("count")),
+            0,
+        )
+        done_count = Coalesce(
+            Subquery(
+                sub_tasks.annotate(
+                    count=Count("pk", filter=Q(done=True))
+                ).values("count")
+            ),
+            0,
+        )
+        last_pk = Task.objects.order_by("-pk").values_list("pk", flat=True)
+        highest_pk = last_pk.first() or 0
+        updated = 0
+        for start in range(0, highest_pk + 1, batch_size):
+            # The counts are otherwise only writable by the SubTask triggers
+            with transaction.atomic(), pgtrigger.ignore(
+                "workspace.Task:protect_sub_task_counts"
+            ):
+                updated += (
+                    Task.objects.filter(
+                        pk__gte=start, pk__lt=start + batch_size
+                    )
+                    .annotate(new_count=count, new_done_count=done_count)
+                    .exclude(
+                        sub_task_count=F("new_count"),
+                        sub_task_done_count=F("new_done_count"),
+                    )
+                    .update(
+                        sub_task_count=count,
+                        sub_task_done_count=done_count,
+                    )
+                )
+        self.stdout.write(f"Updated sub task counts for {updated} tasks")
@@ -0,0 +1,198 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Benchmark request latency for different database connection strategies.
+
+Compares opening a new connection for every request, keeping persistent
+connections with CONN_MAX_AGE and checking out connections from a psycopg
+connection pool.
+
+Requests are sent from a thread pool, the same way that ASGI runs sync
+views and websocket consumers in worker threads. Like Django's request
+handler, every request is wrapped in close_old_connections(). Each variant
+runs in a forked child process with its own connections. Seed a database
+first and then run
+    poetry run ./manage.py benchdbconnections --repeat 500
+"""
+
+import multiprocessing
+import statistics
+import threading
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection
+from typing import Any, Literal, TypedDict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+from django.test import Client
+from django.urls import reverse
+
+from projectify.user.models import User
+
+Variant = Literal["close", "persistent", "pool"]
+
+
+class Result(TypedDict):
+    """Measurements taken in a child process."""
+
+    timings: list[float]
+    elapsed: float
+
+
+def configure(variant: Variant, concurrency: int) -> None:
+    """Change the default database settings to use a connection strategy."""
+    settings_dict = connections.settings[DEFAULT_DB_ALIAS]
+    options = {
+        key: value
+        for key, value in settings_dict["OPTIONS"].items()
+        if key != "pool"
+    }
+    settings_dict["CONN_HEALTH_CHECKS"] = variant != "close"
+    settings_dict["CONN_MAX_AGE"] = 600 if variant == "persistent" else 0
+    if variant == "pool":
+        options["pool"] = {"min_size": concurrency, "max_size": concurrency}
+    settings_dict["OPTIONS"] = options
+
+
+local = threading.local()
+
+
+def request(user: User, host: str, path: str) -> float:
+    """Send one request and return how long it took."""
+    if not hasattr(local, "client"):
+        local.client = Client(HTTP_HOST=host)
+        local.client.force_login(user)
+    client: Client = local.client
+    close_old_connections()
+    start = time.perf_counter()
+    response = client.get(path)
+    close_old_connections()
+    elapsed = time.perf_counter() - start
+    if response.status_code != 200:
+        raise CommandError(f"{path} returned {response.status_code}")
+    return elapsed
+
+
+def measure(
+    user_pk: int,
+    host: str,
+    path: str,
+    variant: Variant,
+    repeat: int,
+    concurrency: int,
+    pipe: Connection,
+) -> None:
+    """Measure one variant and send the results back through pipe."""
+    configure(variant, concurrency)
+    user = User.objects.get(pk=user_pk)
+    close_old_connections()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Warm up threads, connections and the pool
+        list(
+            executor.map(
+                lambda _: request(user, host, path), range(concurrency)
+            )
+        )
+        start = time.perf_counter()
+        timings = list(
+            executor.map(lambda _: request(user, host, path), range(repeat))
+        )
+        elapsed = time.perf_counter() - start
+    connections.close_all()
+    result: Result = {"timings": timings, "elapsed": elapsed}
+    pipe.send(result)
+    pipe.close()
+
+
+class Command(BaseCommand):
+    """Command."""
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Add arguments."""
+        parser.add_argument(
+            "--email",
+            help="User to send requests as. Defaults to the first user",
+        )
+        parser.add_argument(
+            "--path",
+            help="Path to request. Defaults to the current user view",
+        )
+        parser.add_argument(
+            "--host",
+            help="Host header to send. Defaults to the first allowed host",
+        )
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=4)
+
+    def run_variant(
+        self,
+        user_pk: int,
+        host: str,
+        path: str,
+        variant: Variant,
+        repeat: int,
+        concurrency: int,
+    ) -> Result:
+        """Run a variant in a forked child process."""
+        # Children must not share the parent's connection
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=measure,
+            args=(user_pk, host, path, variant, repeat, concurrency, sender),
+        )
+        process.start()
+        # Only the child may hold on to the sending end, so that receiving
+        # fails instead of blocking forever when the child crashes
+        sender.close()
+        try:
+            result: Result = receiver.recv()
+        except EOFError as e:
+            raise CommandError(f"Benchmarking {variant} failed") from e
+        finally:
+            process.join()
+        return result
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Handle."""
+        if connections[DEFAULT_DB_ALIAS].vendor != "postgresql":
+            raise CommandError("Connection pooling requires PostgreSQL")
+        # Never fork while a connection pool and its threads are open
+        configure("close", 1)
+        email: str | None = options["email"]
+        qs = User.objects.order_by("pk")
+        if email is not None:
+            qs = qs.filter(email=email)
+        user = qs.first()
+        if user is None:
+            raise CommandError("No user found")
+        path: str = options["path"] or reverse("user:users:read")
+        host: str = options["host"] or next(
+            iter(settings.ALLOWED_HOSTS), "localhost"
+        ).lstrip(".")
+        repeat: int = options["repeat"]
+        concurrency: int = options["concurrency"]
+        self.stdout.write(
+            f"GET {path} as {user.email}, {repeat} requests "
+            f"from {concurrency} threads"
+        )
+
+        variants: tuple[Variant, ...] = ("close", "persistent", "pool")
+        for variant in variants:
+            result = self.run_variant(
+                user.pk, host, path, variant, repeat, concurrency
+            )
+            timings_ms = sorted(t * 1000 for t in result["timings"])
+            p95 = timings_ms[int(len(timings_ms) * 0.95) - 1]
+            self.stdout.write(
+                f"{variant}: "
+                f"mean={statistics.mean(timings_ms):.2f}ms "
+                f"median={statistics.median(timings_ms):.2f}ms "
+                f"p95={p95:.2f}ms "
+                f"throughput={repeat / result['elapsed']:.1f}req/s"
+            )
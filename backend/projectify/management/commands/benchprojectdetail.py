@@ -0,0 +1,165 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Benchmark project detail serialization.
+
+Compares ProjectDetailSerializer, which prefetches sections and tasks and
+serializes them in Python, with ProjectDetailAggregateSerializer, which has
+PostgreSQL build the sections JSON.
+
+Each variant runs in a forked child process, so that peak RSS can be
+measured for each variant on its own. By default, the project with the most
+tasks is used. Seed a database first and then run
+    poetry run ./manage.py benchprojectdetail --repeat 50
+"""
+
+import multiprocessing
+import resource
+import statistics
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from multiprocessing.connection import Connection
+from typing import Any, Literal, TypedDict
+from uuid import UUID
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+
+from rest_framework.renderers import JSONRenderer
+
+from projectify.workspace.models import Project, Task
+from projectify.workspace.selectors.project import (
+    ProjectDetailQuerySet,
+    ProjectDetailWorkspaceQuerySet,
+)
+from projectify.workspace.selectors.quota import workspace_get_all_quotas
+from projectify.workspace.serializers.base import ProjectBaseSerializer
+from projectify.workspace.serializers.project import (
+    ProjectDetailAggregateSerializer,
+    ProjectDetailSerializer,
+)
+
+Variant = Literal["prefetch", "aggregate"]
+
+
+class Result(TypedDict):
+    """Measurements taken in a child process."""
+
+    timings: list[float]
+    tracemalloc_peak: int
+    maxrss_before: int
+    maxrss_after: int
+    size: int
+
+
+def render(project_pk: int, variant: Variant) -> bytes:
+    """Fetch, serialize and render a project like the project detail view."""
+    aggregate = variant == "aggregate"
+    qs = ProjectDetailWorkspaceQuerySet if aggregate else ProjectDetailQuerySet
+    project = qs.get(pk=project_pk)
+    project.workspace.quota = workspace_get_all_quotas(project.workspace)
+    serializer: ProjectBaseSerializer
+    if aggregate:
+        serializer = ProjectDetailAggregateSerializer(instance=project)
+    else:
+        serializer = ProjectDetailSerializer(instance=project)
+    return JSONRenderer().render(serializer.data)
+
+
+def measure(
+    project_pk: int, variant: Variant, repeat: int, pipe: Connection
+) -> None:
+    """Measure one variant and send the results back through pipe."""
+    maxrss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Warm up connection and caches
+    size = len(render(project_pk, variant))
+    timings: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(project_pk, variant)
+        timings.append(time.perf_counter() - start)
+    maxrss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    render(project_pk, variant)
+    _, tracemalloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    connections.close_all()
+    result: Result = {
+        "timings": timings,
+        "tracemalloc_peak": tracemalloc_peak,
+        "maxrss_before": maxrss_before,
+        "maxrss_after": maxrss_after,
+        "size": size,
+    }
+    pipe.send(result)
+    pipe.close()
+
+
+class Command(BaseCommand):
+    """Command."""
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Add arguments."""
+        parser.add_argument(
+            "--project-uuid",
+            type=UUID,
+            help="Project to benchmark. Defaults to the largest project",
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def run_variant(
+        self, project_pk: int, variant: Variant, repeat: int
+    ) -> Result:
+        """Run a variant in a forked child process."""
+        # Children must not share the parent's connection
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=measure, args=(project_pk, variant, repeat, sender)
+        )
+        process.start()
+        result: Result = receiver.recv()
+        process.join()
+        if process.exitcode != 0:
+            raise CommandError(f"Benchmarking {variant} failed")
+        return result
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Handle."""
+        project_uuid: UUID | None = options["project_uuid"]
+        qs = Project.objects.all()
+        if project_uuid is None:
+            qs = qs.annotate(task_count=Count("section__task")).order_by(
+                "-task_count"
+            )
+        else:
+            qs = qs.filter(uuid=project_uuid)
+        project = qs.first()
+        if project is None:
+            raise CommandError("No project found")
+        task_count = Task.objects.filter(section__project=project).count()
+        self.stdout.write(f"Project {project.uuid} with {task_count} tasks")
+        if render(project.pk, "prefetch") != render(project.pk, "aggregate"):
+            self.stdout.write(
+                self.style.WARNING("Warning: outputs are not identical")
+            )
+
+        repeat: int = options["repeat"]
+        variants: tuple[Variant, ...] = ("prefetch", "aggregate")
+        for variant in variants:
+            result = self.run_variant(project.pk, variant, repeat)
+            timings_ms = [t * 1000 for t in result["timings"]]
+            self.stdout.write(
+                f"{variant}: "
+                f"size={result['size']}B "
+                f"mean={statistics.mean(timings_ms):.2f}ms "
+                f"median={statistics.median(timings_ms):.2f}ms "
+                f"min={min(timings_ms):.2f}ms "
+                f"tracemalloc_peak={result['tracemalloc_peak'] // 1024}KiB "
+                f"maxrss={result['maxrss_after']}KiB "
+                f"(+{result['maxrss_after'] - result['maxrss_before']}KiB)"
+            )
@@ -0,0 +1,113 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Benchmark the orjson renderer and parser against DRF's.
+
+Renders and parses the project detail of the project with the most tasks
+and the detail of its workspace, see projectify/lib/renderers.py. Data are
+serialized once, so that only rendering and parsing are timed. Seed a
+database first and then run
+    poetry run ./manage.py benchrenderers --repeat 20
+"""
+
+import importlib.util
+import io
+import statistics
+import time
+from argparse import ArgumentParser
+from collections.abc import Callable
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from projectify.lib.parsers import ORJSONParser
+from projectify.lib.renderers import ORJSONRenderer
+from projectify.workspace.models import Project
+from projectify.workspace.selectors.project import ProjectDetailQuerySet
+from projectify.workspace.selectors.quota import workspace_get_all_quotas
+from projectify.workspace.selectors.workspace import WorkspaceDetailQuerySet
+from projectify.workspace.serializers.project import ProjectDetailSerializer
+from projectify.workspace.serializers.workspace import (
+    WorkspaceDetailSerializer,
+)
+
+
+def time_ms(run: Callable[[], Any], repeat: int) -> list[float]:
+    """Time run repeat times, in milliseconds."""
+    timings: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+class Command(BaseCommand):
+    """Command."""
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Add arguments."""
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def report(self, name: str, timings_ms: list[float]) -> None:
+        """Write timings."""
+        self.stdout.write(
+            f"{name}: "
+            f"mean={statistics.mean(timings_ms):.2f}ms "
+            f"median={statistics.median(timings_ms):.2f}ms "
+            f"min={min(timings_ms):.2f}ms"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Handle."""
+        if importlib.util.find_spec("orjson") is None:
+            raise CommandError("orjson is not installed")
+        project = (
+            Project.objects.annotate(task_count=Count("section__task"))
+            .order_by("-task_count")
+            .first()
+        )
+        if project is None:
+            raise CommandError("No project found")
+        project = ProjectDetailQuerySet.get(pk=project.pk)
+        project.workspace.quota = workspace_get_all_quotas(project.workspace)
+        workspace = WorkspaceDetailQuerySet.get(pk=project.workspace.pk)
+        workspace.quota = project.workspace.quota
+        payloads = {
+            "project": ProjectDetailSerializer(project).data,
+            "workspace": WorkspaceDetailSerializer(workspace).data,
+        }
+
+        repeat: int = options["repeat"]
+        for name, data in payloads.items():
+            body = JSONRenderer().render(data)
+            if ORJSONRenderer().render(data) != body:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"Warning: {name} renders are not identical"
+                    )
+                )
+            self.stdout.write(f"{name}: size={len(body)}B")
+            self.report(
+                f"{name} render json",
+                time_ms(lambda: JSONRenderer().render(data), repeat),
+            )
+            self.report(
+                f"{name} render orjson",
+                time_ms(lambda: ORJSONRenderer().render(data), repeat),
+            )
+            self.report(
+                f"{name} parse json",
+                time_ms(lambda: JSONParser().parse(io.BytesIO(body)), repeat),
+            )
+            self.report(
+                f"{name} parse orjson",
+                time_ms(
+                    lambda: ORJSONParser().parse(io.BytesIO(body)), repeat
+                ),
+            )
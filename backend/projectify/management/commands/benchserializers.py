@@ -0,0 +1,106 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Benchmark compiled serializers against DRF.
+
+Serializes the project with the most tasks, its workspace and the task with
+the most sub tasks, once with DRF and once with the compiled serializer, see
+projectify/lib/serializers.py. Objects are fetched once, so that only
+serialization is timed. Seed a database first and then run
+    poetry run ./manage.py benchserializers --repeat 10
+"""
+
+import statistics
+import time
+from argparse import ArgumentParser
+from collections.abc import Callable
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from rest_framework import serializers
+
+from projectify.workspace.models import Project, Task
+from projectify.workspace.selectors.project import ProjectDetailQuerySet
+from projectify.workspace.selectors.quota import workspace_get_all_quotas
+from projectify.workspace.selectors.task import TaskDetailQuerySet
+from projectify.workspace.selectors.workspace import WorkspaceDetailQuerySet
+from projectify.workspace.serializers.project import ProjectDetailSerializer
+from projectify.workspace.serializers.task_detail import TaskDetailSerializer
+from projectify.workspace.serializers.workspace import (
+    WorkspaceDetailSerializer,
+)
+
+
+def time_ms(serialize: Callable[[], Any], repeat: int) -> list[float]:
+    """Time serialize repeat times, in milliseconds."""
+    timings: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        serialize()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+class Command(BaseCommand):
+    """Command."""
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Add arguments."""
+        parser.add_argument("--repeat", type=int, default=10)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Handle."""
+        project = (
+            Project.objects.annotate(task_count=Count("section__task"))
+            .order_by("-task_count")
+            .first()
+        )
+        task = (
+            Task.objects.annotate(sub_task_total=Count("subtask"))
+            .order_by("-sub_task_total")
+            .first()
+        )
+        if project is None or task is None:
+            raise CommandError("No project or task found")
+        project = ProjectDetailQuerySet.get(pk=project.pk)
+        project.workspace.quota = workspace_get_all_quotas(project.workspace)
+        workspace = WorkspaceDetailQuerySet.get(pk=project.workspace.pk)
+        workspace.quota = project.workspace.quota
+        task = TaskDetailQuerySet.get(pk=task.pk)
+
+        repeat: int = options["repeat"]
+        cases: tuple[tuple[type[serializers.Serializer], Any], ...] = (
+            (ProjectDetailSerializer, project),
+            (WorkspaceDetailSerializer, workspace),
+            (TaskDetailSerializer, task),
+        )
+        for serializer_class, instance in cases:
+            name = serializer_class.__name__
+            # DRF is used when a context is given
+            drf = serializer_class(instance, context={"compiled": False})
+            compiled = serializer_class(instance)
+            if drf.to_representation(instance) != compiled.to_representation(
+                instance
+            ):
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"Warning: {name} outputs are not identical"
+                    )
+                )
+            variants: dict[str, serializers.Serializer] = {
+                "drf": drf,
+                "compiled": compiled,
+            }
+            for variant, serializer in variants.items():
+                timings_ms = time_ms(
+                    lambda: serializer.to_representation(instance), repeat
+                )
+                self.stdout.write(
+                    f"{name} {variant}: "
+                    f"mean={statistics.mean(timings_ms):.2f}ms "
+                    f"median={statistics.median(timings_ms):.2f}ms "
+                    f"min={min(timings_ms):.2f}ms"
+                )
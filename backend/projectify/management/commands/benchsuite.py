@@ -0,0 +1,362 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Benchmark hot paths on a seeded dataset, and compare against earlier runs.
+
+A test database is created and seeded with seeddb, using a fixed seed, so
+that every run sees the same data for a dataset. The database is dropped
+again afterwards. Each case runs a selector, serializer or service the way
+a view or the change consumer does:
+
+- project_detail fetches and renders the largest project's details.
+- task_update updates a task with its own title, labels and sub tasks, like
+  task PUT.
+- task_move moves a task back and forth behind another task.
+- quota counts the workspace's quota.
+- consumer_refresh refreshes the largest project for a subscribed client.
+
+Results are written as JSON to --output-dir, named after the dataset and the
+current git commit. Run
+    poetry run ./manage.py benchsuite --dataset medium
+and pass an earlier results file with --compare to see what changed.
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import time
+from argparse import ArgumentParser
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional, TypedDict
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+
+from projectify.lib.renderers import ORJSONRenderer
+from projectify.user.models import User
+from projectify.workspace.consumers import ChangeConsumer
+from projectify.workspace.models import Project, Task, TeamMember, Workspace
+from projectify.workspace.selectors.project import (
+    ProjectDetailQuerySet,
+    project_find_by_project_uuid,
+)
+from projectify.workspace.selectors.quota import workspace_get_all_quotas
+from projectify.workspace.selectors.task import (
+    TaskDetailQuerySet,
+    task_find_by_task_uuid,
+)
+from projectify.workspace.serializers.project import ProjectDetailSerializer
+from projectify.workspace.services.sub_task import ValidatedDatumWithUuid
+from projectify.workspace.services.task import (
+    task_move_after,
+    task_update_nested,
+)
+
+# seeddb arguments for each dataset
+DATASETS: dict[str, dict[str, int]] = {
+    "small": {
+        "n_users": 5,
+        "n_add_users": 5,
+        "n_workspaces": 1,
+        "n_projects": 2,
+        "n_labels": 5,
+        "n_tasks": 10,
+    },
+    "medium": {
+        "n_users": 20,
+        "n_add_users": 10,
+        "n_workspaces": 1,
+        "n_projects": 5,
+        "n_labels": 20,
+        "n_tasks": 100,
+    },
+    "large": {
+        "n_users": 40,
+        "n_add_users": 15,
+        "n_workspaces": 1,
+        "n_projects": 4,
+        "n_labels": 20,
+        "n_tasks": 1000,
+    },
+}
+
+SEED = 1337
+
+Case = Callable[[], Any]
+
+
+class CaseResult(TypedDict):
+    """Timings of a case, in milliseconds, and the queries it makes."""
+
+    rounds: int
+    min: float
+    median: float
+    mean: float
+    stdev: float
+    queries: int
+
+
+class Results(TypedDict):
+    """A benchmark run."""
+
+    dataset: str
+    seed: int
+    commit: Optional[str]
+    created: str
+    python: str
+    cases: dict[str, CaseResult]
+
+
+class BenchConsumer(ChangeConsumer):
+    """Keep what the consumer would send, instead of sending it."""
+
+    sent: Optional[str] = None
+
+    def send_json(self, content: Any, close: Optional[bool] = False) -> None:
+        """Encode content like JsonWebsocketConsumer does, and keep it."""
+        del close
+        self.sent = json.dumps(content)
+
+
+def git_commit() -> Optional[str]:
+    """Return the current git commit, if any."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(case: Case, rounds: int) -> CaseResult:
+    """Run a case once to warm up, then time it and count its queries."""
+    case()
+    timings: list[float] = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        case()
+        timings.append((time.perf_counter() - start) * 1000)
+    with CaptureQueriesContext(connection) as queries:
+        case()
+    return {
+        "rounds": rounds,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "stdev": statistics.stdev(timings) if rounds > 1 else 0.0,
+        "queries": len(queries),
+    }
+
+
+def make_cases() -> dict[str, Case]:
+    """Return the cases to run, on the largest project of the dataset."""
+    workspace = Workspace.objects.get()
+    project = (
+        Project.objects.filter(workspace=workspace)
+        .annotate(task_count=Count("section__task"))
+        .order_by("-task_count", "pk")
+        .first()
+    )
+    if project is None:
+        raise CommandError("No project found")
+    team_member = TeamMember.objects.filter(workspace=workspace).earliest("pk")
+    user: User = team_member.user
+    tasks = list(
+        Task.objects.filter(section__project=project)
+        .order_by("section___order", "_order")
+        .values_list("uuid", flat=True)
+    )
+    task_uuid = tasks[len(tasks) // 2]
+    moved = Task.objects.get(uuid=tasks[0])
+    behind = Task.objects.get(uuid=tasks[-1])
+
+    def project_detail() -> bytes:
+        """Fetch and render project details, like the project view."""
+        instance = project_find_by_project_uuid(
+            who=user, project_uuid=project.uuid, qs=ProjectDetailQuerySet
+        )
+        assert instance is not None
+        instance.workspace.quota = workspace_get_all_quotas(instance.workspace)
+        return ORJSONRenderer().render(ProjectDetailSerializer(instance).data)
+
+    def task_update() -> Task:
+        """Update a task with what it already contains, like task PUT."""
+        task = task_find_by_task_uuid(
+            who=user, task_uuid=task_uuid, qs=TaskDetailQuerySet
+        )
+        assert task is not None
+        update_sub_tasks: list[ValidatedDatumWithUuid] = [
+            {
+                "uuid": sub_task.uuid,
+                "title": sub_task.title,
+                "description": sub_task.description or "",
+                "done": sub_task.done,
+                "_order": order,
+            }
+            for order, sub_task in enumerate(task.subtask_set.all())
+        ]
+        return task_update_nested(
+            who=user,
+            task=task,
+            title=task.title,
+            description=task.description,
+            due_date=task.due_date,
+            assignee=task.assignee,
+            labels=list(task.labels.all()),
+            sub_tasks={
+                "create_sub_tasks": [],
+                "update_sub_tasks": update_sub_tasks,
+            },
+        )
+
+    def task_move() -> None:
+        """Move a task behind another one, and back."""
+        nonlocal moved, behind
+        task_move_after(who=user, task=moved, after=behind)
+        moved, behind = behind, moved
+
+    def quota() -> Any:
+        """Count the workspace's quota."""
+        return workspace_get_all_quotas(workspace)
+
+    consumer = BenchConsumer()
+    consumer.user = user
+    consumer.subscriptions = {project.uuid: project}
+
+    def consumer_refresh() -> Optional[str]:
+        """Refresh project details for a subscribed client."""
+        consumer.change(
+            {
+                "type": "change",
+                "resource": "project",
+                "uuid": str(project.uuid),
+                "kind": "changed",
+            }
+        )
+        return consumer.sent
+
+    return {
+        "project_detail": project_detail,
+        "task_update": task_update,
+        "task_move": task_move,
+        "quota": quota,
+        "consumer_refresh": consumer_refresh,
+    }
+
+
+class Command(BaseCommand):
+    """Command."""
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Add arguments."""
+        parser.add_argument(
+            "--dataset", choices=list(DATASETS), default="small"
+        )
+        parser.add_argument("--rounds", type=int, default=10)
+        parser.add_argument(
+            "--case",
+            action="append",
+            dest="cases",
+            help="Only run this case. Can be given more than once",
+        )
+        parser.add_argument(
+            "--output-dir",
+            type=Path,
+            default=Path(".benchmarks"),
+            help="Where to write results",
+        )
+        parser.add_argument(
+            "--compare",
+            type=Path,
+            help="Results of an earlier run to compare with",
+        )
+
+    def seed(self, dataset: str) -> None:
+        """Seed the test database and update its statistics."""
+        self.stdout.write(f"Seeding {dataset} dataset")
+        call_command(
+            "seeddb", seed=SEED, stdout=self.stdout, **DATASETS[dataset]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def compare(self, results: Results, path: Path) -> None:
+        """Write how medians changed since an earlier run."""
+        earlier: Results = json.loads(path.read_text())
+        if earlier["dataset"] != results["dataset"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Warning: comparing with the {earlier['dataset']} dataset"
+                )
+            )
+        self.stdout.write(f"Compared with {earlier['commit']}:")
+        for name, result in results["cases"].items():
+            before = earlier["cases"].get(name)
+            if before is None:
+                continue
+            change = (result["median"] / before["median"] - 1) * 100
+            self.stdout.write(
+                f"{name}: "
+                f"median={before['median']:.2f}ms -> {result['median']:.2f}ms "
+                f"({change:+.1f}%) "
+                f"queries={before['queries']} -> {result['queries']}"
+            )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Handle."""
+        dataset: str = options["dataset"]
+        rounds: int = options["rounds"]
+        selected: Optional[list[str]] = options["cases"]
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            self.seed(dataset)
+            cases = make_cases()
+            unknown = set(selected or ()) - set(cases)
+            if unknown:
+                raise CommandError(f"Unknown cases: {', '.join(unknown)}")
+            results: Results = {
+                "dataset": dataset,
+                "seed": SEED,
+                "commit": git_commit(),
+                "created": now().isoformat(),
+                "python": platform.python_version(),
+                "cases": {},
+            }
+            for name, case in cases.items():
+                if selected and name not in selected:
+                    continue
+                result = measure(case, rounds)
+                results["cases"][name] = result
+                self.stdout.write(
+                    f"{name}: "
+                    f"median={result['median']:.2f}ms "
+                    f"min={result['min']:.2f}ms "
+                    f"stdev={result['stdev']:.2f}ms "
+                    f"queries={result['queries']}"
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        output_dir: Path = options["output_dir"]
+        output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        path = output_dir / f"{dataset}-{stamp}-{results['commit']}.json"
+        path.write_text(json.dumps(results, indent=2))
+        self.stdout.write(f"Wrote {path}")
+        compare: Optional[Path] = options["compare"]
+        if compare is not None:
+            self.compare(results, compare)
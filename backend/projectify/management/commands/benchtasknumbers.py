@@ -0,0 +1,161 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Benchmark allocating task numbers from concurrent transactions.
+
+Every iteration runs one transaction in a thread pool and rolls it back:
+- allocate takes --block task numbers
+- create creates a task with task_create
+Both keep the transaction open for --hold milliseconds afterwards, like a
+view that does more work after creating a task. All deferred constraints and
+triggers, such as unique_task_order and the revision bumps in
+workspace/models/revision.py, are checked right before rolling back, so that
+they lock and fail like committing would. Each variant runs once on a
+single thread and once on --concurrency threads. If transactions don't wait
+for each other, throughput grows with the number of threads. Seed a
+database first and then run
+    poetry run ./manage.py benchtasknumbers --concurrency 8
+"""
+
+import statistics
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Literal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from projectify.user.models import User
+from projectify.workspace.models.const import TeamMemberRoles
+from projectify.workspace.models.section import Section
+from projectify.workspace.models.task_number import task_number_allocate
+from projectify.workspace.models.team_member import TeamMember
+from projectify.workspace.services.task import task_create
+
+Variant = Literal["allocate", "create"]
+
+
+def iteration(
+    variant: Variant,
+    user: User,
+    section: Section,
+    block: int,
+    hold: float,
+) -> float:
+    """Run one transaction and return how long it took."""
+    start = time.perf_counter()
+    with transaction.atomic():
+        match variant:
+            case "allocate":
+                task_number_allocate(
+                    workspace_pk=section.project.workspace.pk, count=block
+                )
+            case "create":
+                task_create(who=user, section=section, title="Benchmark")
+        time.sleep(hold)
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        transaction.set_rollback(True)
+    return time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    """Command."""
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Add arguments."""
+        parser.add_argument(
+            "--section",
+            help="UUID of the section to create tasks in. Defaults to the "
+            "first section",
+        )
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument(
+            "--block",
+            type=int,
+            default=1,
+            help="How many numbers allocate takes at once",
+        )
+        parser.add_argument(
+            "--hold",
+            type=float,
+            default=10,
+            help="Milliseconds to keep each transaction open",
+        )
+
+    def run_variant(
+        self,
+        variant: Variant,
+        user: User,
+        section: Section,
+        block: int,
+        hold: float,
+        repeat: int,
+        concurrency: int,
+    ) -> None:
+        """Run a variant and write out timings."""
+
+        def run(_: int) -> float:
+            return iteration(variant, user, section, block, hold)
+
+        def close(_: int) -> None:
+            connection.close()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            # Warm up threads and connections
+            list(executor.map(run, range(concurrency)))
+            start = time.perf_counter()
+            timings = list(executor.map(run, range(repeat)))
+            elapsed = time.perf_counter() - start
+            list(executor.map(close, range(concurrency)))
+        timings_ms = sorted(t * 1000 for t in timings)
+        p95 = timings_ms[int(len(timings_ms) * 0.95) - 1]
+        self.stdout.write(
+            f"{variant} x{concurrency}: "
+            f"mean={statistics.mean(timings_ms):.2f}ms "
+            f"median={statistics.median(timings_ms):.2f}ms "
+            f"p95={p95:.2f}ms "
+            f"throughput={repeat / elapsed:.1f}tx/s"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Handle."""
+        qs = Section.objects.select_related("project__workspace")
+        section_uuid: str | None = options["section"]
+        if section_uuid is not None:
+            qs = qs.filter(uuid=section_uuid)
+        section = qs.order_by("pk").first()
+        if section is None:
+            raise CommandError("No section found")
+        # Observers can't create tasks
+        team_member = (
+            TeamMember.objects.select_related("user")
+            .filter(workspace=section.project.workspace)
+            .exclude(role=TeamMemberRoles.OBSERVER)
+            .first()
+        )
+        if team_member is None:
+            raise CommandError("No team member may create tasks")
+        block: int = options["block"]
+        hold: float = options["hold"] / 1000
+        repeat: int = options["repeat"]
+        concurrency: int = options["concurrency"]
+        self.stdout.write(
+            f"Workspace {section.project.workspace.title}, {repeat} "
+            f"transactions holding for {options['hold']}ms"
+        )
+        variants: tuple[Variant, ...] = ("allocate", "create")
+        for variant in variants:
+            for threads in sorted({1, concurrency}):
+                self.run_variant(
+                    variant,
+                    team_member.user,
+                    section,
+                    block,
+                    hold,
+                    repeat,
+                    threads,
+                )
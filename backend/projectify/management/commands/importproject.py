@@ -0,0 +1,99 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Import tasks from a CSV or JSON Lines file into a project.
+
+See services/project_import.py for the columns a file can have. Tasks are
+created on behalf of a team member of the project's workspace. Run
+    poetry run ./manage.py importproject <project uuid> <file> \
+        --user <email>
+The format is guessed from the file's extension, unless given with --format.
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Any, Optional
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rest_framework.exceptions import PermissionDenied, ValidationError
+
+from projectify.user.models import User
+from projectify.workspace.exceptions import ProjectImportFileError
+from projectify.workspace.models.const import ProjectImportFormat
+from projectify.workspace.models.project import Project
+from projectify.workspace.services.project_import import (
+    PROJECT_IMPORT_BATCH_SIZE,
+    project_import_tasks,
+)
+
+EXTENSIONS = {
+    ".csv": ProjectImportFormat.CSV,
+    ".jsonl": ProjectImportFormat.JSON_LINES,
+    ".ndjson": ProjectImportFormat.JSON_LINES,
+}
+
+
+class Command(BaseCommand):
+    """Command."""
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Add arguments."""
+        parser.add_argument("project", help="UUID of the project")
+        parser.add_argument("file", type=Path)
+        parser.add_argument(
+            "--user",
+            required=True,
+            help="Email address of the team member creating the tasks",
+        )
+        parser.add_argument(
+            "--format", choices=ProjectImportFormat.values, default=None
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=PROJECT_IMPORT_BATCH_SIZE,
+            help="Create tasks in transactions of this many rows",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Handle."""
+        path: Path = options["file"]
+        format: Optional[str] = options["format"] or EXTENSIONS.get(
+            path.suffix.lower()
+        )
+        if format is None:
+            raise CommandError(f"Can't tell the format of {path}")
+        project = (
+            Project.objects.select_related("workspace")
+            .filter(uuid=options["project"])
+            .first()
+        )
+        if project is None:
+            raise CommandError("No project found")
+        user = User.objects.filter(email=options["user"]).first()
+        if user is None:
+            raise CommandError("No user found")
+
+        progress = None
+        try:
+            with path.open("rb") as file:
+                for progress in project_import_tasks(
+                    who=user,
+                    project=project,
+                    file=file,
+                    format=ProjectImportFormat(format),
+                    batch_size=options["batch_size"],
+                ):
+                    self.stdout.write(
+                        f"{progress.rows} rows read, "
+                        f"{progress.tasks} tasks created"
+                    )
+        except ProjectImportFileError as e:
+            raise CommandError(f"Line {e.line}: {e}") from e
+        except (PermissionDenied, ValidationError) as e:
+            raise CommandError(str(e.detail)) from e
+        finally:
+            for error in progress.errors if progress else []:
+                self.stderr.write(f"Line {error['line']}: {error['errors']}")
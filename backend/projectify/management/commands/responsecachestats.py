@@ -0,0 +1,42 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Show how often cached responses were found.
+
+Responses are cached in the responses cache, see projectify.lib.cache. Hits
+and misses are counted in the cache itself, so that in production, where the
+cache is shared, all workers are counted. Run
+    poetry run ./manage.py responsecachestats project_detail
+"""
+
+from argparse import ArgumentParser
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from projectify.lib.cache import response_cache_stats
+
+
+class Command(BaseCommand):
+    """Command."""
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """Add arguments."""
+        parser.add_argument(
+            "names",
+            nargs="+",
+            help="Names responses are cached under, e.g. project_detail",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Handle."""
+        names: list[str] = options["names"]
+        for name in names:
+            stats = response_cache_stats(name=name)
+            total = stats.hits + stats.misses
+            ratio = stats.hits / total if total else 0.0
+            self.stdout.write(
+                f"{name}: {stats.hits} hits, {stats.misses} misses, "
+                f"{ratio:.1%} hit ratio"
+            )
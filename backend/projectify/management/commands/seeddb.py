@@ -11,6 +11,9 @@ For workspaces that already exist, we don't touch them.
 
 For new workspaces, we add quantities of objects, as specified in the arguments
 
+Passing --seed makes the generated objects the same every time, given an
+empty database. benchsuite uses this to seed its datasets.
+
 Assuming your development database is called projectify, you can do a full test
 run by running
 dropdb projectify && \
@@ -22,8 +25,8 @@ dropdb projectify && \
 from argparse import ArgumentParser
 from datetime import timezone
 from itertools import count, groupby
-from random import choice, randint, sample
-from typing import Any, TypedDict
+from random import choice, randint, sample, seed
+from typing import Any, Optional, TypedDict
 
 from django.core.management.base import BaseCommand
 from django.db import transaction
@@ -47,7 +50,9 @@ from projectify.workspace.models import (
     Workspace,
 )
 from projectify.workspace.models.const import TeamMemberRoles
+from projectify.workspace.models.order import ORDER_GAP
 from projectify.workspace.models.sub_task import SubTask
+from projectify.workspace.models.task_number import task_number_set_highest
 from projectify.workspace.models.team_member import TeamMember
 
 Altogether = TypedDict(
@@ -127,7 +132,7 @@ class Command(BaseCommand):
             ]
         )
         self.stdout.write(f"Created {len(new_users)} new users")
-        return list(User.objects.all())
+        return list(User.objects.order_by("pk"))
 
     def create_tasks(self, altogether: list[Altogether]) -> None:
         """
@@ -156,7 +161,7 @@ class Command(BaseCommand):
                     section=section,
                     due_date=self.fake.date_time(tzinfo=timezone.utc),
                     workspace=together["workspace"],
-                    _order=_order,
+                    _order=(_order + 1) * ORDER_GAP,
                     number=next(together["number"]),
                     assignee=choice(together["team_members"])
                     # 2 out of 3 tasks have an assignee
@@ -313,7 +318,11 @@ class Command(BaseCommand):
 
         workspaces_sections = Section.objects.bulk_create(
             [
-                Section(project=project, title=title, _order=_order)
+                Section(
+                    project=project,
+                    title=title,
+                    _order=(_order + 1) * ORDER_GAP,
+                )
                 for _, projects in groupby(
                     workspaces_projects, key=lambda b: b.workspace
                 )
@@ -375,10 +384,10 @@ class Command(BaseCommand):
 
         # Now we just have to adjust each workspace's highest task number
         for together in altogether:
-            together["workspace"].highest_task_number = next(
-                together["number"]
+            task_number_set_highest(
+                workspace_pk=together["workspace"].pk,
+                number=next(together["number"]) - 1,
             )
-            together["workspace"].save()
         return workspaces
 
     def create_corporate_accounts(
@@ -435,11 +444,20 @@ class Command(BaseCommand):
             default=40,
             help="Ensure up to N tasks are in new section",
         )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            help="Seed random numbers and fake data with N",
+        )
 
     @transaction.atomic
     def handle(self, *args: object, **options: Any) -> None:
         """Handle."""
         self.fake = Faker()
+        random_seed: Optional[int] = options["seed"]
+        if random_seed is not None:
+            seed(random_seed)
+            self.fake.seed_instance(random_seed)
         self.n_users = options["n_users"]
         self.n_workspaces = options["n_workspaces"]
         self.n_projects = options["n_projects"]
@@ -16,7 +16,9 @@ from django.utils.decorators import async_only_middleware
 
 from channels.security.websocket import OriginValidator
 from rest_framework import exceptions
+from rest_framework.permissions import SAFE_METHODS
 
+from projectify.lib.db import pin_to_primary
 from projectify.lib.exception_handler import exception_handler
 from projectify.lib.settings import get_settings
 
@@ -87,6 +89,28 @@ def reverse_proxy(get_response: GetResponse) -> GetResponse:
     return process_request
 
 
+def replica_pinning(get_response: GetResponse) -> GetResponse:
+    """
+    Pin users to the primary database after they have written something.
+
+    Otherwise, a read right after a write could be served by a replica that
+    has not caught up with the write yet.
+    """
+
+    def process_request(request: HttpRequest) -> HttpResponse:
+        """Process the request."""
+        response = get_response(request)
+        if request.method in SAFE_METHODS:
+            return response
+        # DRF views authenticate the user themselves, so only now can we
+        # tell who has written something
+        if request.user.is_authenticated:
+            pin_to_primary(request.user)
+        return response
+
+    return process_request
+
+
 def CsrfTrustedOriginsOriginValidator(application: ASGIHandler) -> ASGIHandler:
     """Return an OriginValidator configured to use CSRF_TRUSTED_ORIGINS."""
     settings = get_settings()
@@ -23,11 +23,46 @@ import dj_database_url
 from configurations.base import Configuration
 
 from .monkeypatch import patch
-from .types import ChannelLayers, StoragesConfig, TemplatesConfig
+from .types import Caches, ChannelLayers, StoragesConfig, TemplatesConfig
 
 patch()
 
 
+def get_database_config(env: str = "DATABASE_URL") -> dj_database_url.DBConfig:
+    """
+    Return a database config, based on the database URL in env.
+
+    Connections are closed after every request unless DATABASE_CONN_MAX_AGE
+    is set. Under ASGI, every thread that serves a request or a websocket
+    message keeps its own persistent connection, which is why we prefer
+    the psycopg connection pool enabled by DATABASE_POOL there.
+    """
+    conn_max_age = int(os.getenv("DATABASE_CONN_MAX_AGE", "0"))
+    config = dj_database_url.config(
+        env=env,
+        conn_max_age=conn_max_age,
+        conn_health_checks="DATABASE_CONN_HEALTH_CHECKS" in os.environ,
+    )
+    if "DATABASE_POOL" not in os.environ:
+        return config
+    if config.get("ENGINE") != "django.db.backends.postgresql":
+        raise ValueError(f"DATABASE_POOL requires a PostgreSQL {env}")
+    if conn_max_age != 0:
+        raise ValueError(
+            "DATABASE_POOL can not be combined with DATABASE_CONN_MAX_AGE"
+        )
+    pool: dict[str, float] = {}
+    if "DATABASE_POOL_MIN_SIZE" in os.environ:
+        pool["min_size"] = int(os.environ["DATABASE_POOL_MIN_SIZE"])
+    if "DATABASE_POOL_MAX_SIZE" in os.environ:
+        pool["max_size"] = int(os.environ["DATABASE_POOL_MAX_SIZE"])
+    if "DATABASE_POOL_TIMEOUT" in os.environ:
+        pool["timeout"] = float(os.environ["DATABASE_POOL_TIMEOUT"])
+    # Django treats an empty dict as pooling being disabled
+    config["OPTIONS"] = {**(config.get("OPTIONS") or {}), "pool": pool or True}
+    return config
+
+
 class Base(Configuration):
     """
     Base configuration.
@@ -121,6 +156,7 @@ class Base(Configuration):
         "django.middleware.common.CommonMiddleware",
         "django.middleware.csrf.CsrfViewMiddleware",
         "django.contrib.auth.middleware.AuthenticationMiddleware",
+        "projectify.middleware.replica_pinning",
         "django.contrib.messages.middleware.MessageMiddleware",
         "django.middleware.clickjacking.XFrameOptionsMiddleware",
         "projectify.lib.htmx.HtmxMiddleware",
@@ -138,9 +174,28 @@ class Base(Configuration):
         },
     }
 
+    # Cache
+    # Local to each process. Production shares them between all workers.
+    CACHES: Caches = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+        # Serialized responses, see projectify.lib.cache
+        "responses": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "responses",
+            "TIMEOUT": 3600,
+        },
+    }
+
     # Database
     # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
     DATABASES: dict[str, dj_database_url.DBConfig]
+    DATABASE_ROUTERS = ["projectify.lib.db.PrimaryReplicaRouter"]
+    # Alias of the database that read-only views may read from
+    DATABASE_REPLICA: Optional[str] = None
+    # How long a user's reads stay on the primary after they wrote something
+    DATABASE_REPLICA_PIN_SECONDS = 10
     # There was a reason why we added this - some weird issue
     # with channels timing out. I am commenting this out temporarily.
     # DATABASES["default"]["OPTIONS"] = {
@@ -154,10 +209,16 @@ class Base(Configuration):
     @classmethod
     def setup(cls) -> None:
         """Load database config, after environment is correctly loaded."""
-        CONN_MAX_AGE = 0
-        cls.DATABASES = {
-            "default": dj_database_url.config(conn_max_age=CONN_MAX_AGE)
-        }
+        cls.DATABASES = {"default": get_database_config()}
+        if "DATABASE_REPLICA_URL" in os.environ:
+            cls.DATABASES["replica"] = get_database_config(
+                "DATABASE_REPLICA_URL"
+            )
+            cls.DATABASE_REPLICA = "replica"
+        if "DATABASE_REPLICA_PIN_SECONDS" in os.environ:
+            cls.DATABASE_REPLICA_PIN_SECONDS = int(
+                os.environ["DATABASE_REPLICA_PIN_SECONDS"]
+            )
 
     # Password validation
     # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -245,6 +306,16 @@ class Base(Configuration):
         ),
         "EXCEPTION_HANDLER": "projectify.lib.exception_handler.exception_handler",
         "NON_FIELD_ERRORS_KEY": "drf_general",
+        # Use orjson if it is installed, see projectify/lib/renderers.py
+        "DEFAULT_RENDERER_CLASSES": (
+            "projectify.lib.renderers.ORJSONRenderer",
+            "rest_framework.renderers.BrowsableAPIRenderer",
+        ),
+        "DEFAULT_PARSER_CLASSES": (
+            "projectify.lib.parsers.ORJSONParser",
+            "rest_framework.parsers.FormParser",
+            "rest_framework.parsers.MultiPartParser",
+        ),
     }
 
     # Where to store media
@@ -279,10 +350,17 @@ class Base(Configuration):
     MEDIA_CLOUDINARY_STORAGE = (
         "cloudinary_storage.storage.MediaCloudinaryStorage"
     )
+    RAW_MEDIA_CLOUDINARY_STORAGE = (
+        "cloudinary_storage.storage.RawMediaCloudinaryStorage"
+    )
     STORAGES: StoragesConfig = {
         "default": {
             "BACKEND": "django.core.files.storage.FileSystemStorage",
         },
+        # Uploaded project imports, until a worker has read them
+        "imports": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+        },
         "staticfiles": {
             "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
         },
@@ -317,6 +395,8 @@ class Base(Configuration):
 
     # Feature flags
     ENABLE_DJANGO_DASHBOARD = False
+    # Serialize project detail sections and tasks in PostgreSQL
+    ENABLE_PROJECT_DETAIL_AGGREGATION = False
 
     @classmethod
     def post_setup(cls) -> None:
@@ -64,6 +64,24 @@ def get_redis_channel_layer_hosts(redis_url: str) -> Mapping[str, Any]:
         }
 
 
+def get_redis_cache(redis_url: str) -> Mapping[str, Any]:
+    """
+    Return django cache config for redis.
+
+    If rediss:// URL is given IGNORE ssl cert requirements, same as for the
+    channels redis layer.
+    """
+    return {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": redis_url,
+        "OPTIONS": (
+            {"ssl_cert_reqs": None}
+            if redis_url.startswith("rediss://")
+            else {}
+        ),
+    }
+
+
 class Production(Base):
     """Production configuration."""
 
@@ -117,6 +135,10 @@ class Production(Base):
         "default": {
             "BACKEND": Base.MEDIA_CLOUDINARY_STORAGE,
         },
+        # Web and worker dynos don't share a file system
+        "imports": {
+            "BACKEND": Base.RAW_MEDIA_CLOUDINARY_STORAGE,
+        },
     }
 
     # Disable CSRF protection
@@ -148,3 +170,16 @@ class Production(Base):
             },
         },
     }
+
+    # Cache
+    # Shared between all workers, since we use it to pin users to the primary
+    # database right after they have written something
+    CACHES = {
+        "default": get_redis_cache(REDIS_TLS_URL),
+        # Serialized responses, see projectify.lib.cache
+        "responses": {
+            **get_redis_cache(REDIS_TLS_URL),
+            "KEY_PREFIX": "responses",
+            "TIMEOUT": 3600,
+        },
+    }
@@ -57,6 +57,21 @@ class Test(SpectacularSettings, Base):
         super().pre_setup()
         load_dotenv()
 
+    @classmethod
+    def setup(cls) -> None:
+        """
+        Add a replica mirroring the default database.
+
+        Tests that read from the replica have to enable it themselves by
+        setting DATABASE_REPLICA.
+        """
+        super().setup()
+        cls.DATABASES["replica"] = {
+            **cls.DATABASES.get("replica", cls.DATABASES["default"]),
+            "TEST": {"MIRROR": "default"},
+        }
+        cls.DATABASE_REPLICA = None
+
 
 class TestCollectstatic(Test):
     """Settings to test static file collection needed for whitenoise."""
@@ -9,6 +9,9 @@ from typing import Any, Mapping, TypedDict
 ChannelLayer = Mapping[str, Any]
 ChannelLayers = Mapping[str, ChannelLayer]
 
+Cache = Mapping[str, Any]
+Caches = Mapping[str, Cache]
+
 
 class TemplateConfig(TypedDict):
     """Configure one templating module."""
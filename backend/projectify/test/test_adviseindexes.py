@@ -0,0 +1,77 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test the adviseindexes management command."""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Q
+
+import pytest
+
+from projectify.management.commands.adviseindexes import (
+    existing_index,
+    propose_index,
+    split_conjuncts,
+)
+from projectify.user.models import User
+from projectify.workspace.models import Task, TeamMember, TeamMemberInvite
+from projectify.workspace.services.workspace import workspace_create
+
+
+def test_split_conjuncts() -> None:
+    """Test splitting filters at top level ANDs only."""
+    assert split_conjuncts("((a = 1) AND (b = ANY ('{1,2}')))") == [
+        "a = 1",
+        "b = ANY ('{1,2}')",
+    ]
+    assert split_conjuncts("(a = 1)") == ["a = 1"]
+    assert split_conjuncts("((a = 1) OR (b = 2))") is None
+
+
+def test_propose_index() -> None:
+    """Test that equality comes first and constants make indexes partial."""
+    index = propose_index(
+        TeamMemberInvite,
+        "((created > ?) AND (workspace_id = ?) AND (NOT redeemed))",
+    )
+    assert index is not None
+    assert index.fields == ["workspace", "created"]
+    assert index.condition == Q(redeemed=False)
+    assert index.name
+
+
+def test_propose_index_unusable() -> None:
+    """Test that no index is proposed for ORs or unknown columns."""
+    assert propose_index(Task, "((title = ?) OR (number = ?))") is None
+    assert propose_index(Task, "(lower(title) ~~ ?)") is None
+
+
+@pytest.mark.django_db
+def test_existing_index() -> None:
+    """Test finding indexes whose leading columns match."""
+    index = propose_index(TeamMember, "(workspace_id = ?)")
+    assert index is not None
+    assert existing_index(TeamMember, index) is not None
+    index = propose_index(TeamMember, "(role = ?)")
+    assert index is not None
+    assert existing_index(TeamMember, index) is None
+
+
+@pytest.mark.django_db
+def test_adviseindexes(user: User) -> None:
+    """Test that the request mix replays without errors."""
+    workspace_create(title="Workspace", owner=user)
+    stdout, stderr = StringIO(), StringIO()
+    call_command(
+        "adviseindexes",
+        "--email",
+        user.email,
+        "--min-rows",
+        "0",
+        stdout=stdout,
+        stderr=stderr,
+    )
+    assert stderr.getvalue() == ""
+    assert "Explained" in stdout.getvalue()
@@ -0,0 +1,30 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test the benchsuite management command."""
+
+from io import StringIO
+
+from django.core.management import call_command
+
+import pytest
+
+from projectify.management.commands.benchsuite import (
+    DATASETS,
+    SEED,
+    make_cases,
+    measure,
+)
+from projectify.workspace.models import Task
+
+
+@pytest.mark.django_db
+def test_cases() -> None:
+    """Test that every case runs on the small dataset."""
+    call_command("seeddb", seed=SEED, stdout=StringIO(), **DATASETS["small"])
+    titles = list(Task.objects.order_by("number").values_list("title"))
+    for name, case in make_cases().items():
+        result = measure(case, rounds=1)
+        assert result["queries"] > 0, name
+    # Cases leave tasks as they were
+    assert list(Task.objects.order_by("number").values_list("title")) == titles
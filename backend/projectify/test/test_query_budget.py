@@ -0,0 +1,1040 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Enforce query budgets for all API views.
+
+Every view in workspace/urls.py, user/urls.py and corporate/urls.py is
+requested twice, once against a small and once against a large data set. The
+number of queries must be the same for both sizes, and must match the count
+recorded in query_budget.json.
+
+After intentionally changing the number of queries a view performs, update
+query_budget.json by running
+    PROJECTIFY_UPDATE_QUERY_BUDGET=1 poetry run pytest \
+        projectify/test/test_query_budget.py
+"""
+
+import base64
+import fcntl
+import json
+import os
+import unittest.mock
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Union
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, reverse
+
+import pytest
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+
+from projectify.corporate.models.coupon import Coupon
+from projectify.corporate.services.coupon import coupon_create
+from projectify.corporate.services.stripe import customer_activate_subscription
+from projectify.corporate.urls import urlpatterns as corporate_urlpatterns
+from projectify.user.models import User
+from projectify.user.services.internal import (
+    user_create,
+    user_create_superuser,
+    user_make_token,
+)
+from projectify.user.urls import urlpatterns as user_urlpatterns
+from projectify.workspace.models.chat_message import ChatMessage
+from projectify.workspace.models.const import (
+    ProjectImportFormat,
+    TeamMemberRoles,
+)
+from projectify.workspace.models.label import Label
+from projectify.workspace.models.project import Project
+from projectify.workspace.models.project_import import ProjectImport
+from projectify.workspace.models.section import Section
+from projectify.workspace.models.sub_task import SubTask
+from projectify.workspace.models.task import Task
+from projectify.workspace.models.team_member import TeamMember
+from projectify.workspace.models.workspace import Workspace
+from projectify.workspace.selectors.workspace_export import (
+    workspace_export_records,
+)
+from projectify.workspace.services.label import label_create
+from projectify.workspace.services.project import (
+    project_archive,
+    project_create,
+)
+from projectify.workspace.services.section import section_create
+from projectify.workspace.services.sub_task import sub_task_create_many
+from projectify.workspace.services.task import task_assign_labels, task_create
+from projectify.workspace.services.team_member_invite import (
+    team_member_invite_create,
+)
+from projectify.workspace.services.workspace import (
+    workspace_add_user,
+    workspace_create,
+)
+from projectify.workspace.urls import urlpatterns as workspace_urlpatterns
+
+BASELINE = Path(__file__).parent / "query_budget.json"
+UPDATE_BASELINE = "PROJECTIFY_UPDATE_QUERY_BUDGET" in os.environ
+
+# Every collection a view might iterate over has this many entries. One
+# entry hides nothing, but an N+1 query shows up against ten.
+SMALL = 1
+LARGE = 10
+
+# Views that can't be exercised without talking to Stripe
+EXCLUDED = {
+    "POST corporate:customers:create-checkout-session": "Calls Stripe",
+    "POST corporate:customers:create-billing-portal-session": "Calls Stripe",
+    "POST corporate:stripe-webhook": "Needs a signed Stripe event",
+}
+
+
+@dataclass
+class World:
+    """Objects that views in this test operate on."""
+
+    user: User
+    password: str
+    unconfirmed_user: User
+    workspace: Workspace
+    unpaid_workspace: Workspace
+    coupon: Coupon
+    team_member: TeamMember
+    invite_email: str
+    label: Label
+    project: Project
+    archived_project: Project
+    project_import: ProjectImport
+    section: Section
+    other_section: Section
+    task: Task
+    other_task: Task
+    sub_tasks: list[SubTask]
+
+
+def populate(user: User, password: str, size: int) -> World:
+    """
+    Create a world in which every collection has size entries.
+
+    Views that need two sections or tasks get one more of each, in a section
+    of its own.
+    """
+    user.unconfirmed_email = "new-email@example.com"
+    user.save()
+    unconfirmed_user = user_create(email="unconfirmed@example.com")
+    workspace = workspace_create(title="Workspace", owner=user)
+    customer_activate_subscription(
+        customer=workspace.customer,
+        stripe_customer_id="stripe_",
+        # Owner, team members, invites and one more invite
+        seats=2 * size + 2,
+    )
+    for n in range(size):
+        other_workspace = workspace_create(
+            title=f"Other workspace {n}", owner=user
+        )
+        # Tasks assigned to the user in more than one workspace
+        task_create(
+            who=user,
+            section=section_create(
+                who=user,
+                project=project_create(
+                    who=user, workspace=other_workspace, title="Project"
+                ),
+                title="Section",
+            ),
+            title="Assigned task",
+            assignee=other_workspace.teammember_set.get(user=user),
+        )
+    unpaid_workspace = workspace_create(title="Unpaid workspace", owner=user)
+    superuser = user_create_superuser(email="super@example.com")
+    coupon = coupon_create(who=superuser, seats=10, prefix="budget")
+
+    team_members = [
+        workspace_add_user(
+            workspace=workspace,
+            user=user_create(email=f"member-{n}@example.com"),
+            role=TeamMemberRoles.CONTRIBUTOR,
+        )
+        for n in range(size)
+    ]
+    invite_emails = [f"invitee-{n}@example.com" for n in range(size)]
+    for email in invite_emails:
+        team_member_invite_create(
+            who=user, workspace=workspace, email_or_user=email
+        )
+    labels = [
+        label_create(who=user, workspace=workspace, name=f"Label {n}", color=n)
+        for n in range(size)
+    ]
+
+    projects = [
+        project_create(who=user, workspace=workspace, title=f"Project {n}")
+        for n in range(size)
+    ]
+    archived_projects = [
+        project_archive(
+            who=user,
+            project=project_create(
+                who=user, workspace=workspace, title=f"Archived {n}"
+            ),
+            archived=True,
+        )
+        for n in range(size)
+    ]
+    project_imports = [
+        ProjectImport.objects.create(
+            project=projects[0],
+            user=user,
+            format=ProjectImportFormat.CSV,
+            errors=[{"line": line, "errors": {}} for line in range(size)],
+        )
+        for n in range(size)
+    ]
+    sections = [
+        section_create(who=user, project=projects[0], title=f"Section {n}")
+        for n in range(size)
+    ]
+    tasks = [
+        task_create(
+            who=user,
+            section=section,
+            title=f"Task {n}",
+            assignee=team_members[n],
+        )
+        for section in sections
+        for n in range(size)
+    ]
+    sub_tasks: list[SubTask] = []
+    for task in tasks:
+        task_assign_labels(task=task, labels=labels)
+        sub_tasks += sub_task_create_many(
+            who=user,
+            task=task,
+            create_sub_tasks=[
+                {"title": f"Sub task {n}", "done": n % 2 == 0, "_order": n}
+                for n in range(size)
+            ],
+        )
+    ChatMessage.objects.bulk_create(
+        ChatMessage(task=task, text=f"Message {n}", author=team_members[n])
+        for task in tasks
+        for n in range(size)
+    )
+    other_section = section_create(
+        who=user, project=projects[0], title="Other section"
+    )
+    other_task = task_create(who=user, section=other_section, title="Other")
+
+    return World(
+        user=user,
+        password=password,
+        unconfirmed_user=unconfirmed_user,
+        workspace=workspace,
+        unpaid_workspace=unpaid_workspace,
+        coupon=coupon,
+        team_member=team_members[0],
+        invite_email=invite_emails[0],
+        label=labels[0],
+        project=projects[0],
+        archived_project=archived_projects[0],
+        project_import=project_imports[0],
+        section=sections[0],
+        other_section=other_section,
+        task=tasks[0],
+        other_task=other_task,
+        sub_tasks=[s for s in sub_tasks if s.task == tasks[0]],
+    )
+
+
+Case = Callable[[APIClient, World], Response]
+CASES: dict[str, Case] = {}
+
+
+def case(method: str, name: str) -> Callable[[Case], Case]:
+    """Register a view request for the given method and url name."""
+
+    def decorator(f: Case) -> Case:
+        CASES[f"{method} {name}"] = f
+        return f
+
+    return decorator
+
+
+def task_payload(world: World) -> dict[str, object]:
+    """Return a task payload that touches all labels and sub tasks."""
+    return {
+        "title": "Task",
+        "description": "Description",
+        "labels": [
+            {"uuid": str(label.uuid)}
+            for label in world.workspace.label_set.all()
+        ],
+        "assignee": {"uuid": str(world.team_member.uuid)},
+        "section": {"uuid": str(world.section.uuid)},
+        "sub_tasks": [
+            *(
+                {
+                    "uuid": str(sub_task.uuid),
+                    "title": "Updated",
+                    "done": not sub_task.done,
+                }
+                for sub_task in world.sub_tasks
+            ),
+            {"title": "New sub task", "done": False},
+        ],
+        "due_date": None,
+    }
+
+
+def png(name: str) -> SimpleUploadedFile:
+    """Return a small png upload."""
+    return SimpleUploadedFile(
+        name,
+        base64.b64decode(
+            "iVBORw0KGgoAAAANSUhEUgAAACAAAAAgAgAAAAAcoT2JAAAABGdBTUEAAYagMeiWX"
+            "wAAAB9JREFUeJxjYAhd9R+M8TCIUMIAU4aPATMJH2OQuQcAvUl/gYsJiakAAAAASUVORK5"
+            "CYII="
+        ),
+    )
+
+
+# Workspace
+@case("POST", "workspace:workspaces:create")
+def workspace_create_(client: APIClient, world: World) -> Response:
+    """Create a workspace."""
+    return client.post(
+        reverse("workspace:workspaces:create"),
+        {"title": "New workspace", "description": "Hello"},
+        format="json",
+    )
+
+
+@case("GET", "workspace:workspaces:read-update")
+def workspace_read(client: APIClient, world: World) -> Response:
+    """Read a workspace."""
+    return client.get(
+        reverse(
+            "workspace:workspaces:read-update", args=(world.workspace.uuid,)
+        )
+    )
+
+
+@case("PUT", "workspace:workspaces:read-update")
+def workspace_update(client: APIClient, world: World) -> Response:
+    """Update a workspace."""
+    return client.put(
+        reverse(
+            "workspace:workspaces:read-update", args=(world.workspace.uuid,)
+        ),
+        {"title": "Updated workspace", "description": "Hello"},
+        format="json",
+    )
+
+
+@case("GET", "workspace:workspaces:user-workspaces")
+def user_workspaces(client: APIClient, world: World) -> Response:
+    """List a user's workspaces."""
+    return client.get(reverse("workspace:workspaces:user-workspaces"))
+
+
+@case("POST", "workspace:workspaces:upload-picture")
+def workspace_upload_picture(client: APIClient, world: World) -> Response:
+    """Upload a workspace picture."""
+    return client.post(
+        reverse(
+            "workspace:workspaces:upload-picture",
+            args=(world.workspace.uuid,),
+        ),
+        {"file": png("workspace.png")},
+        format="multipart",
+    )
+
+
+@case("POST", "workspace:workspaces:invite-team-member")
+def workspace_invite(client: APIClient, world: World) -> Response:
+    """Invite someone to a workspace."""
+    return client.post(
+        reverse(
+            "workspace:workspaces:invite-team-member",
+            args=(world.workspace.uuid,),
+        ),
+        {"email": "new-invitee@example.com"},
+        format="json",
+    )
+
+
+@case("POST", "workspace:workspaces:uninvite-team-member")
+def workspace_uninvite(client: APIClient, world: World) -> Response:
+    """Uninvite someone from a workspace."""
+    return client.post(
+        reverse(
+            "workspace:workspaces:uninvite-team-member",
+            args=(world.workspace.uuid,),
+        ),
+        {"email": world.invite_email},
+        format="json",
+    )
+
+
+@case("GET", "workspace:workspaces:export")
+def workspace_export(client: APIClient, world: World) -> Response:
+    """Export a workspace, reading the whole file."""
+    # Every batch of rows is a query. The large world has as many sub tasks
+    # as fit in one batch, so read the whole table in one batch, too.
+    with unittest.mock.patch(
+        "projectify.workspace.views.workspace.workspace_export_records",
+        partial(workspace_export_records, batch_size=LARGE**3 + 1),
+    ):
+        response = client.get(
+            reverse(
+                "workspace:workspaces:export", args=(world.workspace.uuid,)
+            )
+        )
+        # Rows are only read while the file is streamed
+        response.getvalue()
+    return response
+
+
+@case("GET", "workspace:workspaces:archived-projects")
+def workspace_archived_projects(client: APIClient, world: World) -> Response:
+    """List archived projects."""
+    return client.get(
+        reverse(
+            "workspace:workspaces:archived-projects",
+            args=(world.workspace.uuid,),
+        )
+    )
+
+
+@case("GET", "workspace:workspaces:tasks")
+def workspace_tasks(client: APIClient, world: World) -> Response:
+    """Filter tasks."""
+    return client.get(
+        reverse("workspace:workspaces:tasks", args=(world.workspace.uuid,)),
+        {"assignee": str(world.team_member.uuid)},
+    )
+
+
+@case("GET", "workspace:workspaces:search-tasks")
+def workspace_search_tasks(client: APIClient, world: World) -> Response:
+    """Search tasks."""
+    return client.get(
+        reverse(
+            "workspace:workspaces:search-tasks",
+            args=(world.workspace.uuid,),
+        ),
+        {"q": "task"},
+    )
+
+
+# Team member
+@case("GET", "workspace:team-members:read-update-delete")
+def team_member_read(client: APIClient, world: World) -> Response:
+    """Read a team member."""
+    return client.get(
+        reverse(
+            "workspace:team-members:read-update-delete",
+            args=(world.team_member.uuid,),
+        )
+    )
+
+
+@case("PUT", "workspace:team-members:read-update-delete")
+def team_member_update(client: APIClient, world: World) -> Response:
+    """Update a team member."""
+    return client.put(
+        reverse(
+            "workspace:team-members:read-update-delete",
+            args=(world.team_member.uuid,),
+        ),
+        {"job_title": "Manager", "role": TeamMemberRoles.MAINTAINER},
+        format="json",
+    )
+
+
+@case("DELETE", "workspace:team-members:read-update-delete")
+def team_member_delete(client: APIClient, world: World) -> Response:
+    """Delete a team member."""
+    return client.delete(
+        reverse(
+            "workspace:team-members:read-update-delete",
+            args=(world.team_member.uuid,),
+        )
+    )
+
+
+# Project
+@case("POST", "workspace:projects:create")
+def project_create_(client: APIClient, world: World) -> Response:
+    """Create a project."""
+    return client.post(
+        reverse("workspace:projects:create"),
+        {"title": "New project", "workspace_uuid": str(world.workspace.uuid)},
+        format="json",
+    )
+
+
+@case("GET", "workspace:projects:read-update-delete")
+def project_read(client: APIClient, world: World) -> Response:
+    """Read a project."""
+    return client.get(
+        reverse(
+            "workspace:projects:read-update-delete",
+            args=(world.project.uuid,),
+        )
+    )
+
+
+@case("PUT", "workspace:projects:read-update-delete")
+def project_update(client: APIClient, world: World) -> Response:
+    """Update a project."""
+    return client.put(
+        reverse(
+            "workspace:projects:read-update-delete",
+            args=(world.project.uuid,),
+        ),
+        {"title": "Updated project", "description": "Hello"},
+        format="json",
+    )
+
+
+@case("DELETE", "workspace:projects:read-update-delete")
+def project_delete(client: APIClient, world: World) -> Response:
+    """Delete an archived project."""
+    return client.delete(
+        reverse(
+            "workspace:projects:read-update-delete",
+            args=(world.archived_project.uuid,),
+        )
+    )
+
+
+@case("POST", "workspace:projects:archive")
+def project_archive_(client: APIClient, world: World) -> Response:
+    """Archive a project."""
+    return client.post(
+        reverse("workspace:projects:archive", args=(world.project.uuid,)),
+        {"archived": True},
+        format="json",
+    )
+
+
+@case("POST", "workspace:projects:import")
+def project_import_create(client: APIClient, world: World) -> Response:
+    """Upload a file to be imported into a project."""
+    return client.post(
+        reverse("workspace:projects:import", args=(world.project.uuid,)),
+        {
+            "file": SimpleUploadedFile("tasks.csv", b"section,title\n"),
+            "format": "csv",
+        },
+        format="multipart",
+    )
+
+
+# Project import
+@case("GET", "workspace:project-imports:read")
+def project_import_read(client: APIClient, world: World) -> Response:
+    """Read a project import."""
+    return client.get(
+        reverse(
+            "workspace:project-imports:read",
+            args=(world.project_import.uuid,),
+        )
+    )
+
+
+# Section
+@case("POST", "workspace:sections:create")
+def section_create_(client: APIClient, world: World) -> Response:
+    """Create a section."""
+    return client.post(
+        reverse("workspace:sections:create"),
+        {"title": "New section", "project_uuid": str(world.project.uuid)},
+        format="json",
+    )
+
+
+@case("GET", "workspace:sections:read-update-delete")
+def section_read(client: APIClient, world: World) -> Response:
+    """Read a section."""
+    return client.get(
+        reverse(
+            "workspace:sections:read-update-delete",
+            args=(world.section.uuid,),
+        )
+    )
+
+
+@case("PUT", "workspace:sections:read-update-delete")
+def section_update(client: APIClient, world: World) -> Response:
+    """Update a section."""
+    return client.put(
+        reverse(
+            "workspace:sections:read-update-delete",
+            args=(world.section.uuid,),
+        ),
+        {"title": "Updated section", "description": "Hello"},
+        format="json",
+    )
+
+
+@case("DELETE", "workspace:sections:read-update-delete")
+def section_delete(client: APIClient, world: World) -> Response:
+    """Delete a section."""
+    return client.delete(
+        reverse(
+            "workspace:sections:read-update-delete",
+            args=(world.section.uuid,),
+        )
+    )
+
+
+@case("POST", "workspace:sections:move")
+def section_move(client: APIClient, world: World) -> Response:
+    """Move a section."""
+    return client.post(
+        reverse("workspace:sections:move", args=(world.section.uuid,)),
+        {"order": 1},
+        format="json",
+    )
+
+
+# Task
+@case("POST", "workspace:tasks:create")
+def task_create_(client: APIClient, world: World) -> Response:
+    """Create a task with labels and sub tasks."""
+    payload = task_payload(world)
+    payload["sub_tasks"] = [
+        {"title": "New sub task", "done": False} for _ in world.sub_tasks
+    ]
+    return client.post(
+        reverse("workspace:tasks:create"), payload, format="json"
+    )
+
+
+@case("POST", "workspace:tasks:create-many")
+def task_create_many(client: APIClient, world: World) -> Response:
+    """Create several tasks with labels and sub tasks."""
+    payload = task_payload(world)
+    del payload["section"]
+    payload["sub_tasks"] = [
+        {"title": "New sub task", "done": False} for _ in world.sub_tasks
+    ]
+    return client.post(
+        reverse("workspace:tasks:create-many"),
+        {
+            "section": {"uuid": str(world.section.uuid)},
+            "tasks": [payload for _ in range(10)],
+        },
+        format="json",
+    )
+
+
+@case("GET", "workspace:tasks:user-tasks")
+def user_tasks(client: APIClient, world: World) -> Response:
+    """List tasks assigned to the user."""
+    return client.get(reverse("workspace:tasks:user-tasks"))
+
+
+@case("GET", "workspace:tasks:read-update-delete")
+def task_read(client: APIClient, world: World) -> Response:
+    """Read a task."""
+    return client.get(
+        reverse("workspace:tasks:read-update-delete", args=(world.task.uuid,))
+    )
+
+
+@case("PUT", "workspace:tasks:read-update-delete")
+def task_update(client: APIClient, world: World) -> Response:
+    """Update a task, its labels and sub tasks."""
+    return client.put(
+        reverse("workspace:tasks:read-update-delete", args=(world.task.uuid,)),
+        task_payload(world),
+        format="json",
+    )
+
+
+@case("DELETE", "workspace:tasks:read-update-delete")
+def task_delete(client: APIClient, world: World) -> Response:
+    """Delete a task."""
+    return client.delete(
+        reverse("workspace:tasks:read-update-delete", args=(world.task.uuid,))
+    )
+
+
+@case("POST", "workspace:tasks:move-to-section")
+def task_move_to_section(client: APIClient, world: World) -> Response:
+    """Move a task to another section."""
+    return client.post(
+        reverse("workspace:tasks:move-to-section", args=(world.task.uuid,)),
+        {"section_uuid": str(world.other_section.uuid)},
+        format="json",
+    )
+
+
+@case("POST", "workspace:tasks:move-after-task")
+def task_move_after_task(client: APIClient, world: World) -> Response:
+    """Move a task after another task."""
+    return client.post(
+        reverse("workspace:tasks:move-after-task", args=(world.task.uuid,)),
+        {"task_uuid": str(world.other_task.uuid)},
+        format="json",
+    )
+
+
+@case("POST", "workspace:tasks:move-many")
+def task_move_many(client: APIClient, world: World) -> Response:
+    """Move tasks after another task."""
+    return client.post(
+        reverse("workspace:tasks:move-many"),
+        {
+            "task_uuids": [str(world.task.uuid)],
+            "section_uuid": str(world.other_section.uuid),
+            "after_task_uuid": str(world.other_task.uuid),
+        },
+        format="json",
+    )
+
+
+@case("POST", "workspace:tasks:assign-labels-many")
+def task_assign_labels_many(client: APIClient, world: World) -> Response:
+    """Add a label to many tasks."""
+    return client.post(
+        reverse("workspace:tasks:assign-labels-many"),
+        {
+            "task_uuids": [str(world.task.uuid), str(world.other_task.uuid)],
+            "add_label_uuids": [str(world.label.uuid)],
+        },
+        format="json",
+    )
+
+
+# Label
+@case("POST", "workspace:labels:create")
+def label_create_(client: APIClient, world: World) -> Response:
+    """Create a label."""
+    return client.post(
+        reverse("workspace:labels:create"),
+        {
+            "name": "New label",
+            "color": 0,
+            "workspace_uuid": str(world.workspace.uuid),
+        },
+        format="json",
+    )
+
+
+@case("PUT", "workspace:labels:update-delete")
+def label_update(client: APIClient, world: World) -> Response:
+    """Update a label."""
+    return client.put(
+        reverse("workspace:labels:update-delete", args=(world.label.uuid,)),
+        {"name": "Updated label", "color": 1},
+        format="json",
+    )
+
+
+@case("DELETE", "workspace:labels:update-delete")
+def label_delete(client: APIClient, world: World) -> Response:
+    """Delete a label."""
+    return client.delete(
+        reverse("workspace:labels:update-delete", args=(world.label.uuid,))
+    )
+
+
+# Batch
+@case("POST", "workspace:batch")
+def batch(client: APIClient, world: World) -> Response:
+    """Create a label, assign it to a task and move the task."""
+    return client.post(
+        reverse("workspace:batch"),
+        {
+            "operations": [
+                {
+                    "op": "label.create",
+                    "args": {
+                        "name": "Batched label",
+                        "color": 0,
+                        "workspace_uuid": str(world.workspace.uuid),
+                    },
+                },
+                {
+                    "op": "task.update",
+                    "args": {
+                        "task_uuid": str(world.task.uuid),
+                        "title": "Batched task",
+                        "description": None,
+                        "due_date": None,
+                        "assignee": None,
+                        "labels": [{"uuid": {"$ref": 0}}],
+                    },
+                },
+                {
+                    "op": "task.move-to-section",
+                    "args": {
+                        "task_uuid": str(world.task.uuid),
+                        "section_uuid": str(world.other_section.uuid),
+                    },
+                },
+            ]
+        },
+        format="json",
+    )
+
+
+# User
+@case("GET", "user:users:read")
+def user_read(client: APIClient, world: World) -> Response:
+    """Read the current user."""
+    return client.get(reverse("user:users:read"))
+
+
+@case("PUT", "user:users:update")
+def user_update(client: APIClient, world: World) -> Response:
+    """Update the current user."""
+    return client.put(
+        reverse("user:users:update"),
+        {"preferred_name": "Budget"},
+        format="json",
+    )
+
+
+@case("POST", "user:users:upload-profile-picture")
+def user_upload_profile_picture(client: APIClient, world: World) -> Response:
+    """Upload a profile picture."""
+    return client.post(
+        reverse("user:users:upload-profile-picture"),
+        {"file": png("profile.png")},
+        format="multipart",
+    )
+
+
+@case("POST", "user:users:change-password")
+def user_change_password(client: APIClient, world: World) -> Response:
+    """Change the current user's password."""
+    return client.post(
+        reverse("user:users:change-password"),
+        {"current_password": world.password, "new_password": "hello-123-456"},
+        format="json",
+    )
+
+
+@case("POST", "user:users:request-email-address-update")
+def user_request_email_update(client: APIClient, world: World) -> Response:
+    """Request an email address update."""
+    return client.post(
+        reverse("user:users:request-email-address-update"),
+        {"new_email": "new-email@example.com", "password": world.password},
+        format="json",
+    )
+
+
+@case("POST", "user:users:confirm-email-address-update")
+def user_confirm_email_update(client: APIClient, world: World) -> Response:
+    """Confirm an email address update."""
+    token = user_make_token(user=world.user, kind="update_email_address")
+    return client.post(
+        reverse("user:users:confirm-email-address-update"),
+        {"confirmation_token": token},
+        format="json",
+    )
+
+
+# Auth
+@case("POST", "user:auth:log-out")
+def auth_log_out(client: APIClient, world: World) -> Response:
+    """Log out."""
+    return client.post(reverse("user:auth:log-out"))
+
+
+@case("POST", "user:auth:sign-up")
+def auth_sign_up(client: APIClient, world: World) -> Response:
+    """Sign up."""
+    client.logout()
+    return client.post(
+        reverse("user:auth:sign-up"),
+        {
+            "email": "sign-up@example.com",
+            "password": "hello-123-456",
+            "tos_agreed": True,
+            "privacy_policy_agreed": True,
+        },
+        format="json",
+    )
+
+
+@case("POST", "user:auth:confirm-email")
+def auth_confirm_email(client: APIClient, world: World) -> Response:
+    """Confirm an email address after signing up."""
+    client.logout()
+    token = user_make_token(
+        user=world.unconfirmed_user, kind="confirm_email_address"
+    )
+    return client.post(
+        reverse("user:auth:confirm-email"),
+        {"email": world.unconfirmed_user.email, "token": token},
+        format="json",
+    )
+
+
+@case("POST", "user:auth:log-in")
+def auth_log_in(client: APIClient, world: World) -> Response:
+    """Log in."""
+    client.logout()
+    return client.post(
+        reverse("user:auth:log-in"),
+        {"email": world.user.email, "password": world.password},
+        format="json",
+    )
+
+
+@case("POST", "user:auth:request-password-reset")
+def auth_request_password_reset(client: APIClient, world: World) -> Response:
+    """Request a password reset."""
+    client.logout()
+    return client.post(
+        reverse("user:auth:request-password-reset"),
+        {"email": world.user.email},
+        format="json",
+    )
+
+
+@case("POST", "user:auth:confirm-password-reset")
+def auth_confirm_password_reset(client: APIClient, world: World) -> Response:
+    """Reset a password."""
+    client.logout()
+    token = user_make_token(user=world.user, kind="reset_password")
+    return client.post(
+        reverse("user:auth:confirm-password-reset"),
+        {
+            "email": world.user.email,
+            "token": token,
+            "new_password": "hello-123-456",
+        },
+        format="json",
+    )
+
+
+@case("GET", "user:auth:password-policy")
+def auth_password_policy(client: APIClient, world: World) -> Response:
+    """Read the password policy."""
+    return client.get(reverse("user:auth:password-policy"))
+
+
+# Corporate
+@case("GET", "corporate:customers:read")
+def customer_read(client: APIClient, world: World) -> Response:
+    """Read a workspace's customer."""
+    return client.get(
+        reverse("corporate:customers:read", args=(world.workspace.uuid,))
+    )
+
+
+@case("POST", "corporate:coupons:redeem-coupon")
+def coupon_redeem(client: APIClient, world: World) -> Response:
+    """Redeem a coupon."""
+    return client.post(
+        reverse(
+            "corporate:coupons:redeem-coupon",
+            args=(world.unpaid_workspace.uuid,),
+        ),
+        {"code": world.coupon.code},
+        format="json",
+    )
+
+
+def view_methods(
+    patterns: Any, namespace: str = ""
+) -> Iterator[tuple[str, str]]:
+    """Yield (method, url name) for every view in a url conf."""
+    pattern: Union[URLPattern, URLResolver]
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from view_methods(
+                pattern.url_patterns, f"{namespace}{pattern.namespace}:"
+            )
+            continue
+        name = f"{namespace}{pattern.name}"
+        view_class = getattr(pattern.callback, "view_class", None)
+        if view_class is None:
+            # Function based views, i.e., the Stripe webhook
+            yield "POST", name
+            continue
+        for method in ("get", "post", "put", "patch", "delete"):
+            if hasattr(view_class, method):
+                yield method.upper(), name
+
+
+def all_views() -> set[str]:
+    """Return all views that need a query budget."""
+    return {
+        f"{method} {name}"
+        for app, patterns in (
+            ("workspace", workspace_urlpatterns),
+            ("user", user_urlpatterns),
+            ("corporate", corporate_urlpatterns),
+        )
+        for method, name in view_methods(patterns, f"{app}:")
+    }
+
+
+def update_baseline(key: str, count: int) -> None:
+    """Record count for key in the baseline file."""
+    # Tests might be run in parallel using xdist
+    with BASELINE.open("a+") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        content = f.read()
+        baseline = json.loads(content) if content else {}
+        baseline[key] = count
+        f.seek(0)
+        f.truncate()
+        json.dump(dict(sorted(baseline.items())), f, indent=4)
+        f.write("\n")
+
+
+def test_all_views_covered() -> None:
+    """Test that every view has a budget or is excluded explicitly."""
+    views = all_views()
+    assert views - CASES.keys() - EXCLUDED.keys() == set()
+    assert CASES.keys() - views == set()
+    assert EXCLUDED.keys() - views == set()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("key", sorted(CASES))
+def test_query_budget(
+    key: str, user: User, password: str, media_root: Path
+) -> None:
+    """Test that a view's query count is constant and within budget."""
+    counts: dict[int, int] = {}
+    for size in (SMALL, LARGE):
+        with transaction.atomic():
+            # Views might change the user, so fetch it fresh every time
+            fresh_user = User.objects.get(pk=user.pk)
+            world = populate(fresh_user, password, size)
+            client = APIClient()
+            client.force_authenticate(fresh_user)
+            with CaptureQueriesContext(connection) as context:
+                response = CASES[key](client, world)
+            assert response.status_code < 300, response.content
+            counts[size] = len(context)
+            transaction.set_rollback(True)
+
+    assert counts[SMALL] == counts[LARGE], f"{key} grows with data size"
+    if UPDATE_BASELINE:
+        update_baseline(key, counts[SMALL])
+        return
+    baseline = json.loads(BASELINE.read_text())
+    assert counts[SMALL] == baseline.get(key), (
+        f"{key} performs {counts[SMALL]} queries, but its budget is "
+        f"{baseline.get(key)}. If this is intended, update query_budget.json"
+    )
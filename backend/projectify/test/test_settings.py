@@ -0,0 +1,92 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test settings helpers."""
+
+import os
+from unittest import mock
+
+import pytest
+
+from ..settings.base import get_database_config
+
+DATABASE_URL = "postgres://projectify@localhost/projectify"
+
+
+class TestGetDatabaseConfig:
+    """Test get_database_config."""
+
+    @mock.patch.dict(os.environ, {"DATABASE_URL": DATABASE_URL}, clear=True)
+    def test_defaults(self) -> None:
+        """Test that connections are closed after each request by default."""
+        config = get_database_config()
+        assert config["CONN_MAX_AGE"] == 0
+        assert config["CONN_HEALTH_CHECKS"] is False
+        assert "pool" not in (config.get("OPTIONS") or {})
+
+    @mock.patch.dict(
+        os.environ,
+        {
+            "DATABASE_URL": DATABASE_URL,
+            "DATABASE_CONN_MAX_AGE": "60",
+            "DATABASE_CONN_HEALTH_CHECKS": "",
+        },
+        clear=True,
+    )
+    def test_persistent(self) -> None:
+        """Test persistent connections with health checks."""
+        config = get_database_config()
+        assert config["CONN_MAX_AGE"] == 60
+        assert config["CONN_HEALTH_CHECKS"] is True
+
+    @mock.patch.dict(
+        os.environ,
+        {"DATABASE_URL": DATABASE_URL, "DATABASE_POOL": ""},
+        clear=True,
+    )
+    def test_pool(self) -> None:
+        """Test enabling the pool with psycopg's defaults."""
+        config = get_database_config()
+        assert config["OPTIONS"] == {"pool": True}
+
+    @mock.patch.dict(
+        os.environ,
+        {
+            "DATABASE_URL": DATABASE_URL,
+            "DATABASE_POOL": "",
+            "DATABASE_POOL_MIN_SIZE": "2",
+            "DATABASE_POOL_MAX_SIZE": "8",
+            "DATABASE_POOL_TIMEOUT": "2.5",
+        },
+        clear=True,
+    )
+    def test_pool_sizes(self) -> None:
+        """Test configuring the pool."""
+        config = get_database_config()
+        assert config["OPTIONS"] == {
+            "pool": {"min_size": 2, "max_size": 8, "timeout": 2.5}
+        }
+
+    @mock.patch.dict(
+        os.environ,
+        {
+            "DATABASE_URL": DATABASE_URL,
+            "DATABASE_POOL": "",
+            "DATABASE_CONN_MAX_AGE": "60",
+        },
+        clear=True,
+    )
+    def test_pool_with_persistent_connections(self) -> None:
+        """Test that the pool can not be combined with CONN_MAX_AGE."""
+        with pytest.raises(ValueError):
+            get_database_config()
+
+    @mock.patch.dict(
+        os.environ,
+        {"DATABASE_URL": "sqlite:///db.sqlite3", "DATABASE_POOL": ""},
+        clear=True,
+    )
+    def test_pool_with_sqlite(self) -> None:
+        """Test that the pool requires PostgreSQL."""
+        with pytest.raises(ValueError):
+            get_database_config()
@@ -12,6 +12,7 @@ from django.utils.translation import gettext_lazy as _
 from .models.chat_message import ChatMessage
 from .models.label import Label
 from .models.project import Project
+from .models.project_import import ProjectImport
 from .models.section import Section
 from .models.sub_task import SubTask
 from .models.task import Task
@@ -142,6 +143,29 @@ class ProjectAdmin(admin.ModelAdmin[Project]):
         return instance.workspace.title
 
 
+@admin.register(ProjectImport)
+class ProjectImportAdmin(admin.ModelAdmin[ProjectImport]):
+    """Project import admin."""
+
+    list_display = (
+        "project_title",
+        "format",
+        "status",
+        "rows",
+        "tasks",
+        "created",
+        "modified",
+    )
+    list_filter = ("status",)
+    list_select_related = ("project",)
+    readonly_fields = ("uuid", "user")
+
+    @admin.display(description=_("Project title"))
+    def project_title(self, instance: ProjectImport) -> str:
+        """Return the project's title."""
+        return instance.project.title
+
+
 class TaskInline(admin.TabularInline[Task]):
     """Task inline admin."""
 
@@ -22,6 +22,8 @@ from asgiref.sync import async_to_sync as _async_to_sync
 from channels.generic.websocket import JsonWebsocketConsumer
 from rest_framework import serializers, status
 
+from projectify.lib.db import read_database_for
+from projectify.lib.settings import get_settings
 from projectify.user.models import User
 
 from .models.project import Project
@@ -29,6 +31,7 @@ from .models.task import Task
 from .models.workspace import Workspace
 from .selectors.project import (
     ProjectDetailQuerySet,
+    ProjectDetailWorkspaceQuerySet,
     project_find_by_project_uuid,
 )
 from .selectors.quota import workspace_get_all_quotas
@@ -37,7 +40,10 @@ from .selectors.workspace import (
     WorkspaceDetailQuerySet,
     workspace_find_by_workspace_uuid,
 )
-from .serializers.project import ProjectDetailSerializer
+from .serializers.project import (
+    ProjectDetailAggregateSerializer,
+    ProjectDetailSerializer,
+)
 from .serializers.task_detail import TaskDetailSerializer
 from .serializers.workspace import WorkspaceDetailSerializer
 from .types import ConsumerEvent, Resource
@@ -182,16 +188,21 @@ class ChangeConsumer(JsonWebsocketConsumer):
     ) -> Literal["not_found", "subscribed", "already_subscribed"]:
         """Add a resource subscription."""
         who = self.user
+        using = read_database_for(who)
         inst: Optional[ResourceInstance]
         match resource, self.is_subscribed_to(resource, uuid):
             case "workspace", False:
                 inst = workspace_find_by_workspace_uuid(
-                    who=who, workspace_uuid=uuid
+                    who=who, workspace_uuid=uuid, using=using
                 )
             case "project", False:
-                inst = project_find_by_project_uuid(who=who, project_uuid=uuid)
+                inst = project_find_by_project_uuid(
+                    who=who, project_uuid=uuid, using=using
+                )
             case "task", False:
-                inst = task_find_by_task_uuid(who=self.user, task_uuid=uuid)
+                inst = task_find_by_task_uuid(
+                    who=self.user, task_uuid=uuid, using=using
+                )
             case _:
                 return "already_subscribed"
         if inst is None:
@@ -308,8 +319,35 @@ class ChangeConsumer(JsonWebsocketConsumer):
                 }
         self.respond(response)
 
+    def project_detail(
+        self, project_uuid: UUID
+    ) -> Union[Literal["not_found"], serializers.Serializer]:
+        """Return a serializer for a project's details."""
+        aggregate = get_settings().ENABLE_PROJECT_DETAIL_AGGREGATION
+        project = project_find_by_project_uuid(
+            who=self.user,
+            project_uuid=project_uuid,
+            qs=(
+                ProjectDetailWorkspaceQuerySet
+                if aggregate
+                else ProjectDetailQuerySet
+            ),
+        )
+        if project is None:
+            return "not_found"
+        project.workspace.quota = workspace_get_all_quotas(project.workspace)
+        if aggregate:
+            return ProjectDetailAggregateSerializer(project)
+        return ProjectDetailSerializer(project)
+
     def change(self, event: ConsumerEvent) -> None:
-        """Respond to project change event."""
+        """
+        Respond to project change event.
+
+        Change events are sent right after a write, which a replica might
+        not have caught up with yet. The client would then keep a stale copy
+        until the next change, which is why we read from the primary here.
+        """
         # Check if already subscribed
         uuid = UUID(event["uuid"])
         response: ClientResponse
@@ -333,18 +371,7 @@ class ChangeConsumer(JsonWebsocketConsumer):
                 else:
                     result = "not_found"
             case "changed", Project() as p:
-                project = project_find_by_project_uuid(
-                    who=self.user,
-                    project_uuid=p.uuid,
-                    qs=ProjectDetailQuerySet,
-                )
-                if project is not None:
-                    project.workspace.quota = workspace_get_all_quotas(
-                        project.workspace
-                    )
-                    result = ProjectDetailSerializer(project)
-                else:
-                    result = "not_found"
+                result = self.project_detail(p.uuid)
             case "changed", Task() as t:
                 task = task_find_by_task_uuid(
                     who=self.user, task_uuid=t.uuid, qs=TaskDetailQuerySet
@@ -12,6 +12,7 @@ from projectify.workspace.views.task import (
     task_create_sub_task_form,
     task_detail,
     task_move,
+    task_search_view,
     task_update_view,
 )
 from projectify.workspace.views.workspace import (
@@ -32,6 +33,11 @@ workspace_patterns = (
         workspace_view,
         name="detail",
     ),
+    path(
+        "<uuid:workspace_uuid>/search",
+        task_search_view,
+        name="search",
+    ),
 )
 project_patterns = (
     # HTML
@@ -10,3 +10,12 @@ class UserAlreadyAdded(ValueError):
 
 class UserAlreadyInvited(ValueError):
     """Tell the caller that user has already been invited to a workspace."""
+
+
+class ProjectImportFileError(ValueError):
+    """Tell the caller that a file to be imported can not be read."""
+
+    def __init__(self, message: str, line: int) -> None:
+        """Remember the line the file could not be read at."""
+        super().__init__(message)
+        self.line = line
@@ -0,0 +1,99 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Add sub task counts to Task, maintained by SubTask triggers."""
+# Generated by Django 5.1.4 on 2026-10-19 05:20
+
+from django.db import migrations, models
+
+import pgtrigger.compiler
+import pgtrigger.migrations
+
+
+class Migration(migrations.Migration):
+    """Migration."""
+
+    dependencies = [
+        ("workspace", "0065_workspace_title"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="sub_task_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, help_text="Number of sub tasks"
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="sub_task_done_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Number of sub tasks that are done",
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="subtask",
+            trigger=pgtrigger.compiler.Trigger(
+                name="increment_task_sub_task_counts",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_task\n                SET sub_task_count = sub_task_count + counts.count,\n                    sub_task_done_count =\n                        sub_task_done_count + counts.done_count\n                FROM (\n                    SELECT task_id,\n                        COUNT(*) AS count,\n                        COUNT(*) FILTER (WHERE done) AS done_count\n                    FROM new_values\n                    GROUP BY task_id\n                ) AS counts\n                WHERE workspace_task.id = counts.task_id;\n                RETURN NULL;\n              END;",
+                    hash="e4a31da61978d34a5d4a20ea73549c4b90b2c31c",
+                    level="STATEMENT",
+                    operation="INSERT",
+                    pgid="pgtrigger_increment_task_sub_task_counts_8260d",
+                    referencing="REFERENCING NEW TABLE AS new_values ",
+                    table="workspace_subtask",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="subtask",
+            trigger=pgtrigger.compiler.Trigger(
+                name="update_task_sub_task_counts",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_task\n                SET sub_task_count = sub_task_count + counts.count,\n                    sub_task_done_count =\n                        sub_task_done_count + counts.done_count\n                FROM (\n                    SELECT task_id,\n                        SUM(count) AS count,\n                        SUM(done_count) AS done_count\n                    FROM (\n                        SELECT task_id,\n                            COUNT(*) AS count,\n                            COUNT(*) FILTER (WHERE done) AS done_count\n                        FROM new_values\n                        GROUP BY task_id\n                        UNION ALL\n                        SELECT task_id,\n                            -COUNT(*) AS count,\n                            -COUNT(*) FILTER (WHERE done) AS done_count\n                        FROM old_values\n                        GROUP BY task_id\n                    ) AS changes\n                    GROUP BY task_id\n                    HAVING SUM(count) != 0 OR SUM(done_count) != 0\n                ) AS counts\n                WHERE workspace_task.id = counts.task_id;\n                RETURN NULL;\n              END;",
+                    hash="ff5db6539ebd6db2b0dc76cc78588cd960d4db64",
+                    level="STATEMENT",
+                    operation="UPDATE",
+                    pgid="pgtrigger_update_task_sub_task_counts_8232f",
+                    referencing="REFERENCING OLD TABLE AS old_values  NEW TABLE AS new_values ",
+                    table="workspace_subtask",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="subtask",
+            trigger=pgtrigger.compiler.Trigger(
+                name="decrement_task_sub_task_counts",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_task\n                SET sub_task_count = sub_task_count - counts.count,\n                    sub_task_done_count =\n                        sub_task_done_count - counts.done_count\n                FROM (\n                    SELECT task_id,\n                        COUNT(*) AS count,\n                        COUNT(*) FILTER (WHERE done) AS done_count\n                    FROM old_values\n                    GROUP BY task_id\n                ) AS counts\n                WHERE workspace_task.id = counts.task_id;\n                RETURN NULL;\n              END;",
+                    hash="e827ff7a7906025d118d4a32550d4710aef4cc5f",
+                    level="STATEMENT",
+                    operation="DELETE",
+                    pgid="pgtrigger_decrement_task_sub_task_counts_dc850",
+                    referencing="REFERENCING OLD TABLE AS old_values ",
+                    table="workspace_subtask",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="task",
+            trigger=pgtrigger.compiler.Trigger(
+                name="protect_sub_task_counts",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                IF pg_trigger_depth() < 2 THEN\n                    NEW.sub_task_count := OLD.sub_task_count;\n                    NEW.sub_task_done_count := OLD.sub_task_done_count;\n                END IF;\n                RETURN NEW;\n              END;",
+                    hash="47e28580ac396c552e7ebcd03a284fd8a21f1708",
+                    operation="UPDATE",
+                    pgid="pgtrigger_protect_sub_task_counts_08a10",
+                    table="workspace_task",
+                    when="BEFORE",
+                ),
+            ),
+        ),
+    ]
@@ -0,0 +1,148 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Add a full text search vector to Task, maintained by triggers."""
+# Generated by Django 5.1.4 on 2026-10-19 06:34
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+import pgtrigger.compiler
+import pgtrigger.migrations
+
+
+class Migration(migrations.Migration):
+    """Migration."""
+
+    dependencies = [
+        ("workspace", "0066_task_sub_task_counts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False,
+                help_text="Title, description, sub task titles and chat messages, for full text search",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="task_search_vector"
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="chatmessage",
+            trigger=pgtrigger.compiler.Trigger(
+                name="insert_task_search_vector",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_task SET search_vector = NULL\n                WHERE id IN (SELECT task_id FROM new_values);\n                RETURN NULL;\n              END;",
+                    hash="ebec2aa0ce5beb68b104a592ed8113cdd44224fd",
+                    level="STATEMENT",
+                    operation="INSERT",
+                    pgid="pgtrigger_insert_task_search_vector_cf1ac",
+                    referencing="REFERENCING NEW TABLE AS new_values ",
+                    table="workspace_chatmessage",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="chatmessage",
+            trigger=pgtrigger.compiler.Trigger(
+                name="update_task_search_vector",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_task SET search_vector = NULL\n                WHERE id IN (SELECT task_id FROM (\n                    SELECT unnest(ARRAY[new_values.task_id, old_values.task_id])\n                    FROM new_values JOIN old_values USING (id)\n                    WHERE new_values.text IS DISTINCT FROM\n                        old_values.text\n                    OR new_values.task_id != old_values.task_id\n                ) AS changed(task_id));\n                RETURN NULL;\n              END;",
+                    hash="d721f9332b3a8beb621a87b9e1731e4163c01f5a",
+                    level="STATEMENT",
+                    operation="UPDATE",
+                    pgid="pgtrigger_update_task_search_vector_d41aa",
+                    referencing="REFERENCING OLD TABLE AS old_values  NEW TABLE AS new_values ",
+                    table="workspace_chatmessage",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="chatmessage",
+            trigger=pgtrigger.compiler.Trigger(
+                name="delete_task_search_vector",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_task SET search_vector = NULL\n                WHERE id IN (SELECT task_id FROM old_values);\n                RETURN NULL;\n              END;",
+                    hash="3ca57fd23b9847405ceb88076f91c126944a7ec2",
+                    level="STATEMENT",
+                    operation="DELETE",
+                    pgid="pgtrigger_delete_task_search_vector_86c9b",
+                    referencing="REFERENCING OLD TABLE AS old_values ",
+                    table="workspace_chatmessage",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="subtask",
+            trigger=pgtrigger.compiler.Trigger(
+                name="insert_task_search_vector",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_task SET search_vector = NULL\n                WHERE id IN (SELECT task_id FROM new_values);\n                RETURN NULL;\n              END;",
+                    hash="e4735e9f3cebe4527ccea48118ddef56a33d7058",
+                    level="STATEMENT",
+                    operation="INSERT",
+                    pgid="pgtrigger_insert_task_search_vector_12056",
+                    referencing="REFERENCING NEW TABLE AS new_values ",
+                    table="workspace_subtask",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="subtask",
+            trigger=pgtrigger.compiler.Trigger(
+                name="update_task_search_vector",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_task SET search_vector = NULL\n                WHERE id IN (SELECT task_id FROM (\n                    SELECT unnest(ARRAY[new_values.task_id, old_values.task_id])\n                    FROM new_values JOIN old_values USING (id)\n                    WHERE new_values.title IS DISTINCT FROM\n                        old_values.title\n                    OR new_values.task_id != old_values.task_id\n                ) AS changed(task_id));\n                RETURN NULL;\n              END;",
+                    hash="2b191dd0e4e7871b3d164eff4e5e6c6fc84c82f0",
+                    level="STATEMENT",
+                    operation="UPDATE",
+                    pgid="pgtrigger_update_task_search_vector_8cccf",
+                    referencing="REFERENCING OLD TABLE AS old_values  NEW TABLE AS new_values ",
+                    table="workspace_subtask",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="subtask",
+            trigger=pgtrigger.compiler.Trigger(
+                name="delete_task_search_vector",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_task SET search_vector = NULL\n                WHERE id IN (SELECT task_id FROM old_values);\n                RETURN NULL;\n              END;",
+                    hash="8d3931dbd81b79e33eaab47e9da12d2592bb0f96",
+                    level="STATEMENT",
+                    operation="DELETE",
+                    pgid="pgtrigger_delete_task_search_vector_943f5",
+                    referencing="REFERENCING OLD TABLE AS old_values ",
+                    table="workspace_subtask",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="task",
+            trigger=pgtrigger.compiler.Trigger(
+                name="update_search_vector",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                IF TG_OP = 'UPDATE'\n                    AND NEW.search_vector IS NOT NULL\n                    AND NEW.title IS NOT DISTINCT FROM OLD.title\n                    AND NEW.description IS NOT DISTINCT FROM OLD.description\n                THEN\n                    NEW.search_vector := OLD.search_vector;\n                    RETURN NEW;\n                END IF;\n                NEW.search_vector :=\n                    setweight(to_tsvector('simple',\n                        coalesce(NEW.title, '')), 'A')\n                    || setweight(to_tsvector('simple',\n                        coalesce(NEW.description, '')), 'B')\n                    || setweight(to_tsvector('simple', coalesce((\n                        SELECT string_agg(title, ' ')\n                        FROM workspace_subtask WHERE task_id = NEW.id\n                    ), '')), 'C')\n                    || setweight(to_tsvector('simple', coalesce((\n                        SELECT string_agg(text, ' ')\n                        FROM workspace_chatmessage WHERE task_id = NEW.id\n                    ), '')), 'D');\n                RETURN NEW;\n              END;",
+                    hash="3c16cb6d834a18a6993b31f0f559d96441667384",
+                    operation="INSERT OR UPDATE",
+                    pgid="pgtrigger_update_search_vector_377e8",
+                    table="workspace_task",
+                    when="BEFORE",
+                ),
+            ),
+        ),
+    ]
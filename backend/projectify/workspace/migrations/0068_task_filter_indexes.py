@@ -0,0 +1,47 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Add indexes for filtering tasks across a workspace."""
+# Generated by Django 5.1.4 on 2026-10-19 06:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Migration."""
+
+    dependencies = [
+        ("workspace", "0067_task_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["workspace", "assignee", "number"],
+                name="task_workspace_assignee",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["workspace", "due_date"],
+                name="task_workspace_due_date",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tasklabel",
+            index=models.Index(fields=["label", "task"], name="label_task"),
+        ),
+        # label_task replaces the foreign key's index
+        migrations.AlterField(
+            model_name="tasklabel",
+            name="label",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="workspace.label",
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Index tasks by assignee and due date."""
+# Generated by Django 5.1.4 on 2026-10-19 06:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Migration."""
+
+    dependencies = [
+        ("workspace", "0068_task_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["assignee", "due_date"], name="task_assignee_due_date"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="task",
+            name="assignee",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                help_text="Team member this task is assigned to.",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="workspace.teammember",
+            ),
+        ),
+    ]
@@ -0,0 +1,522 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Add revision counters to workspaces, projects and tasks."""
+# Generated by Django 5.1.4 on 2026-10-19 07:34
+
+from django.db import migrations, models
+
+import pgtrigger.compiler
+import pgtrigger.migrations
+
+
+class Migration(migrations.Migration):
+    """Migration."""
+
+    dependencies = [
+        ("workspace", "0069_task_assignee_due_date_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="revision",
+            field=models.BigIntegerField(
+                default=0,
+                editable=False,
+                help_text="Increases whenever this project or anything in it changes",
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="revision",
+            field=models.BigIntegerField(
+                default=0,
+                editable=False,
+                help_text="Increases whenever this task, its sub tasks, labels or chat messages changes",
+            ),
+        ),
+        migrations.AddField(
+            model_name="workspace",
+            name="revision",
+            field=models.BigIntegerField(
+                default=0,
+                editable=False,
+                help_text="Increases whenever this workspace or anything in it changes",
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="chatmessage",
+            trigger=pgtrigger.compiler.Trigger(
+                name="insert_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_task SET revision = revision + 1\n                WHERE id IN (SELECT task_id FROM new_values);\n                RETURN NULL;\n              END;",
+                    hash="ec1c3202784dd00899f945cb0df5b8fea30f1eba",
+                    level="STATEMENT",
+                    operation="INSERT",
+                    pgid="pgtrigger_insert_bump_revision_2eeab",
+                    referencing="REFERENCING NEW TABLE AS new_values ",
+                    table="workspace_chatmessage",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="chatmessage",
+            trigger=pgtrigger.compiler.Trigger(
+                name="update_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_task SET revision = revision + 1\n                WHERE id IN (SELECT task_id FROM (\n                    SELECT * FROM old_values\n                    UNION ALL SELECT * FROM new_values\n                ) AS changes);\n                RETURN NULL;\n              END;",
+                    hash="3f53e3a954657440eb5f1ccb1210203b9155a78c",
+                    level="STATEMENT",
+                    operation="UPDATE",
+                    pgid="pgtrigger_update_bump_revision_3f206",
+                    referencing="REFERENCING OLD TABLE AS old_values  NEW TABLE AS new_values ",
+                    table="workspace_chatmessage",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="chatmessage",
+            trigger=pgtrigger.compiler.Trigger(
+                name="delete_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_task SET revision = revision + 1\n                WHERE id IN (SELECT task_id FROM old_values);\n                RETURN NULL;\n              END;",
+                    hash="a59836f7bad2d2ad5189ab096480a7f6f1208a99",
+                    level="STATEMENT",
+                    operation="DELETE",
+                    pgid="pgtrigger_delete_bump_revision_ee448",
+                    referencing="REFERENCING OLD TABLE AS old_values ",
+                    table="workspace_chatmessage",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="label",
+            trigger=pgtrigger.compiler.Trigger(
+                name="insert_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_workspace SET revision = revision + 1\n                WHERE id IN (SELECT workspace_id FROM new_values);\n                RETURN NULL;\n              END;",
+                    hash="cab25114776c44588d4f0eb6920624a1e5b2b546",
+                    level="STATEMENT",
+                    operation="INSERT",
+                    pgid="pgtrigger_insert_bump_revision_f54ed",
+                    referencing="REFERENCING NEW TABLE AS new_values ",
+                    table="workspace_label",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="label",
+            trigger=pgtrigger.compiler.Trigger(
+                name="update_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_workspace SET revision = revision + 1\n                WHERE id IN (SELECT workspace_id FROM (\n                    SELECT * FROM old_values\n                    UNION ALL SELECT * FROM new_values\n                ) AS changes);\n                RETURN NULL;\n              END;",
+                    hash="ae42beb609f6d9b18061fbba93ef15b4674eb97c",
+                    level="STATEMENT",
+                    operation="UPDATE",
+                    pgid="pgtrigger_update_bump_revision_87fc6",
+                    referencing="REFERENCING OLD TABLE AS old_values  NEW TABLE AS new_values ",
+                    table="workspace_label",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="label",
+            trigger=pgtrigger.compiler.Trigger(
+                name="delete_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_workspace SET revision = revision + 1\n                WHERE id IN (SELECT workspace_id FROM old_values);\n                RETURN NULL;\n              END;",
+                    hash="93d3bd367d25519813b00704b3403925bb69f306",
+                    level="STATEMENT",
+                    operation="DELETE",
+                    pgid="pgtrigger_delete_bump_revision_689dc",
+                    referencing="REFERENCING OLD TABLE AS old_values ",
+                    table="workspace_label",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="project",
+            trigger=pgtrigger.compiler.Trigger(
+                name="increment_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                NEW.revision := OLD.revision + 1;\n                RETURN NEW;\n              END;",
+                    hash="3abcb6d7f4c909abcdbf62078b9c019a92a8a943",
+                    operation="UPDATE",
+                    pgid="pgtrigger_increment_revision_ee874",
+                    table="workspace_project",
+                    when="BEFORE",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="project",
+            trigger=pgtrigger.compiler.Trigger(
+                name="insert_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_workspace SET revision = revision + 1\n                WHERE id IN (SELECT workspace_id FROM new_values);\n                RETURN NULL;\n              END;",
+                    hash="5d4dbfbda84feca7d0bcc2a7878df91670556c67",
+                    level="STATEMENT",
+                    operation="INSERT",
+                    pgid="pgtrigger_insert_bump_revision_787f6",
+                    referencing="REFERENCING NEW TABLE AS new_values ",
+                    table="workspace_project",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="project",
+            trigger=pgtrigger.compiler.Trigger(
+                name="update_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_workspace SET revision = revision + 1\n                WHERE id IN (SELECT workspace_id FROM (\n                    SELECT * FROM old_values\n                    UNION ALL SELECT * FROM new_values\n                ) AS changes);\n                RETURN NULL;\n              END;",
+                    hash="a9acc74f38e04f11b5b01c80ba27bc3651ee34f6",
+                    level="STATEMENT",
+                    operation="UPDATE",
+                    pgid="pgtrigger_update_bump_revision_b7e98",
+                    referencing="REFERENCING OLD TABLE AS old_values  NEW TABLE AS new_values ",
+                    table="workspace_project",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="project",
+            trigger=pgtrigger.compiler.Trigger(
+                name="delete_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_workspace SET revision = revision + 1\n                WHERE id IN (SELECT workspace_id FROM old_values);\n                RETURN NULL;\n              END;",
+                    hash="05b84e99c40446896a7031e565c215b87f84f8b1",
+                    level="STATEMENT",
+                    operation="DELETE",
+                    pgid="pgtrigger_delete_bump_revision_722dd",
+                    referencing="REFERENCING OLD TABLE AS old_values ",
+                    table="workspace_project",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="section",
+            trigger=pgtrigger.compiler.Trigger(
+                name="insert_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_project SET revision = revision + 1\n                WHERE id IN (SELECT project_id FROM new_values);\n                RETURN NULL;\n              END;",
+                    hash="23e6ee1237f541d9f34a70cea73f1693f6d5956a",
+                    level="STATEMENT",
+                    operation="INSERT",
+                    pgid="pgtrigger_insert_bump_revision_4a3c8",
+                    referencing="REFERENCING NEW TABLE AS new_values ",
+                    table="workspace_section",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="section",
+            trigger=pgtrigger.compiler.Trigger(
+                name="update_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_project SET revision = revision + 1\n                WHERE id IN (SELECT project_id FROM (\n                    SELECT * FROM old_values\n                    UNION ALL SELECT * FROM new_values\n                ) AS changes);\n                RETURN NULL;\n              END;",
+                    hash="a3e1f242d250118a2c3615e8ebff2af7653b5afd",
+                    level="STATEMENT",
+                    operation="UPDATE",
+                    pgid="pgtrigger_update_bump_revision_9c809",
+                    referencing="REFERENCING OLD TABLE AS old_values  NEW TABLE AS new_values ",
+                    table="workspace_section",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="section",
+            trigger=pgtrigger.compiler.Trigger(
+                name="delete_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_project SET revision = revision + 1\n                WHERE id IN (SELECT project_id FROM old_values);\n                RETURN NULL;\n              END;",
+                    hash="3b529cb97a47e5476764e06635321446f08599bf",
+                    level="STATEMENT",
+                    operation="DELETE",
+                    pgid="pgtrigger_delete_bump_revision_70de0",
+                    referencing="REFERENCING OLD TABLE AS old_values ",
+                    table="workspace_section",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="subtask",
+            trigger=pgtrigger.compiler.Trigger(
+                name="insert_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_task SET revision = revision + 1\n                WHERE id IN (SELECT task_id FROM new_values);\n                RETURN NULL;\n              END;",
+                    hash="f11c0e662d833d5637b7134317b248006bf12882",
+                    level="STATEMENT",
+                    operation="INSERT",
+                    pgid="pgtrigger_insert_bump_revision_22d07",
+                    referencing="REFERENCING NEW TABLE AS new_values ",
+                    table="workspace_subtask",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="subtask",
+            trigger=pgtrigger.compiler.Trigger(
+                name="update_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_task SET revision = revision + 1\n                WHERE id IN (SELECT task_id FROM (\n                    SELECT * FROM old_values\n                    UNION ALL SELECT * FROM new_values\n                ) AS changes);\n                RETURN NULL;\n              END;",
+                    hash="5f1696f155ddd98f459285f803b732e129135056",
+                    level="STATEMENT",
+                    operation="UPDATE",
+                    pgid="pgtrigger_update_bump_revision_f151f",
+                    referencing="REFERENCING OLD TABLE AS old_values  NEW TABLE AS new_values ",
+                    table="workspace_subtask",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="subtask",
+            trigger=pgtrigger.compiler.Trigger(
+                name="delete_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_task SET revision = revision + 1\n                WHERE id IN (SELECT task_id FROM old_values);\n                RETURN NULL;\n              END;",
+                    hash="9215d7c2e656a878526cdf0c54e083a74ba7dc1f",
+                    level="STATEMENT",
+                    operation="DELETE",
+                    pgid="pgtrigger_delete_bump_revision_7b9e3",
+                    referencing="REFERENCING OLD TABLE AS old_values ",
+                    table="workspace_subtask",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="task",
+            trigger=pgtrigger.compiler.Trigger(
+                name="increment_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                NEW.revision := OLD.revision + 1;\n                RETURN NEW;\n              END;",
+                    hash="5d1cb1f9bbd70ccf056a09326d4d107ffddefa55",
+                    operation="UPDATE",
+                    pgid="pgtrigger_increment_revision_29095",
+                    table="workspace_task",
+                    when="BEFORE",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="task",
+            trigger=pgtrigger.compiler.Trigger(
+                name="insert_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_project SET revision = revision + 1\n                WHERE id IN (\n                    SELECT project_id FROM workspace_section\n                    WHERE id IN (SELECT section_id FROM new_values));\n                RETURN NULL;\n              END;",
+                    hash="6b7ffb6f00eb2a52e2c67ccb1022f65bfd377ac4",
+                    level="STATEMENT",
+                    operation="INSERT",
+                    pgid="pgtrigger_insert_bump_revision_5e5c2",
+                    referencing="REFERENCING NEW TABLE AS new_values ",
+                    table="workspace_task",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="task",
+            trigger=pgtrigger.compiler.Trigger(
+                name="update_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_project SET revision = revision + 1\n                WHERE id IN (\n                    SELECT project_id FROM workspace_section\n                    WHERE id IN (SELECT section_id FROM (\n                    SELECT * FROM old_values\n                    UNION ALL SELECT * FROM new_values\n                ) AS changes));\n                RETURN NULL;\n              END;",
+                    hash="ee1f5923c497147b3f776ba69d81815eb6718a70",
+                    level="STATEMENT",
+                    operation="UPDATE",
+                    pgid="pgtrigger_update_bump_revision_814c9",
+                    referencing="REFERENCING OLD TABLE AS old_values  NEW TABLE AS new_values ",
+                    table="workspace_task",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="task",
+            trigger=pgtrigger.compiler.Trigger(
+                name="delete_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_project SET revision = revision + 1\n                WHERE id IN (\n                    SELECT project_id FROM workspace_section\n                    WHERE id IN (SELECT section_id FROM old_values));\n                RETURN NULL;\n              END;",
+                    hash="3d6fd9a080bb5bb8cdec90d6cc44e35eda19fe0f",
+                    level="STATEMENT",
+                    operation="DELETE",
+                    pgid="pgtrigger_delete_bump_revision_b8d13",
+                    referencing="REFERENCING OLD TABLE AS old_values ",
+                    table="workspace_task",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="tasklabel",
+            trigger=pgtrigger.compiler.Trigger(
+                name="insert_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_task SET revision = revision + 1\n                WHERE id IN (SELECT task_id FROM new_values);\n                RETURN NULL;\n              END;",
+                    hash="1cbe1d6cfd304c71677c3f4faa54d017582bc6b3",
+                    level="STATEMENT",
+                    operation="INSERT",
+                    pgid="pgtrigger_insert_bump_revision_0996f",
+                    referencing="REFERENCING NEW TABLE AS new_values ",
+                    table="workspace_tasklabel",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="tasklabel",
+            trigger=pgtrigger.compiler.Trigger(
+                name="update_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_task SET revision = revision + 1\n                WHERE id IN (SELECT task_id FROM (\n                    SELECT * FROM old_values\n                    UNION ALL SELECT * FROM new_values\n                ) AS changes);\n                RETURN NULL;\n              END;",
+                    hash="184296ee516e47d45a1e97ba30931c9c245fbbfa",
+                    level="STATEMENT",
+                    operation="UPDATE",
+                    pgid="pgtrigger_update_bump_revision_2a03a",
+                    referencing="REFERENCING OLD TABLE AS old_values  NEW TABLE AS new_values ",
+                    table="workspace_tasklabel",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="tasklabel",
+            trigger=pgtrigger.compiler.Trigger(
+                name="delete_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_task SET revision = revision + 1\n                WHERE id IN (SELECT task_id FROM old_values);\n                RETURN NULL;\n              END;",
+                    hash="fedd69595aef80278d16e1c16aaeb042badef8b4",
+                    level="STATEMENT",
+                    operation="DELETE",
+                    pgid="pgtrigger_delete_bump_revision_44f35",
+                    referencing="REFERENCING OLD TABLE AS old_values ",
+                    table="workspace_tasklabel",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="teammember",
+            trigger=pgtrigger.compiler.Trigger(
+                name="insert_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_workspace SET revision = revision + 1\n                WHERE id IN (SELECT workspace_id FROM new_values);\n                RETURN NULL;\n              END;",
+                    hash="aa4c252894e28faba0b60f9c9534640bbd2c05f7",
+                    level="STATEMENT",
+                    operation="INSERT",
+                    pgid="pgtrigger_insert_bump_revision_4a127",
+                    referencing="REFERENCING NEW TABLE AS new_values ",
+                    table="workspace_teammember",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="teammember",
+            trigger=pgtrigger.compiler.Trigger(
+                name="update_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_workspace SET revision = revision + 1\n                WHERE id IN (SELECT workspace_id FROM (\n                    SELECT * FROM old_values\n                    UNION ALL SELECT * FROM new_values\n                ) AS changes);\n                RETURN NULL;\n              END;",
+                    hash="3db5fe515217828f46627638f027a448df3b071a",
+                    level="STATEMENT",
+                    operation="UPDATE",
+                    pgid="pgtrigger_update_bump_revision_c7a5c",
+                    referencing="REFERENCING OLD TABLE AS old_values  NEW TABLE AS new_values ",
+                    table="workspace_teammember",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="teammember",
+            trigger=pgtrigger.compiler.Trigger(
+                name="delete_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_workspace SET revision = revision + 1\n                WHERE id IN (SELECT workspace_id FROM old_values);\n                RETURN NULL;\n              END;",
+                    hash="6bb6b1772604aaae27b96a77bc239310ae533dd7",
+                    level="STATEMENT",
+                    operation="DELETE",
+                    pgid="pgtrigger_delete_bump_revision_612a8",
+                    referencing="REFERENCING OLD TABLE AS old_values ",
+                    table="workspace_teammember",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="teammemberinvite",
+            trigger=pgtrigger.compiler.Trigger(
+                name="insert_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_workspace SET revision = revision + 1\n                WHERE id IN (SELECT workspace_id FROM new_values);\n                RETURN NULL;\n              END;",
+                    hash="f0c3a33278cc257bfd219b883d9a51149a9432a3",
+                    level="STATEMENT",
+                    operation="INSERT",
+                    pgid="pgtrigger_insert_bump_revision_225e2",
+                    referencing="REFERENCING NEW TABLE AS new_values ",
+                    table="workspace_teammemberinvite",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="teammemberinvite",
+            trigger=pgtrigger.compiler.Trigger(
+                name="update_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_workspace SET revision = revision + 1\n                WHERE id IN (SELECT workspace_id FROM (\n                    SELECT * FROM old_values\n                    UNION ALL SELECT * FROM new_values\n                ) AS changes);\n                RETURN NULL;\n              END;",
+                    hash="b3aac4b51beddf1b956c023b437bc75d8b08c404",
+                    level="STATEMENT",
+                    operation="UPDATE",
+                    pgid="pgtrigger_update_bump_revision_f6b1a",
+                    referencing="REFERENCING OLD TABLE AS old_values  NEW TABLE AS new_values ",
+                    table="workspace_teammemberinvite",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="teammemberinvite",
+            trigger=pgtrigger.compiler.Trigger(
+                name="delete_bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                UPDATE workspace_workspace SET revision = revision + 1\n                WHERE id IN (SELECT workspace_id FROM old_values);\n                RETURN NULL;\n              END;",
+                    hash="c87eddc427d5cf90e2ff083f8672bc80dfb26c5b",
+                    level="STATEMENT",
+                    operation="DELETE",
+                    pgid="pgtrigger_delete_bump_revision_b6462",
+                    referencing="REFERENCING OLD TABLE AS old_values ",
+                    table="workspace_teammemberinvite",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="workspace",
+            trigger=pgtrigger.compiler.Trigger(
+                name="increment_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                NEW.revision := OLD.revision + 1;\n                RETURN NEW;\n              END;",
+                    hash="bd5104c6faa883117759d6060a7c0e5837a06af6",
+                    operation="UPDATE",
+                    pgid="pgtrigger_increment_revision_a1a0a",
+                    table="workspace_workspace",
+                    when="BEFORE",
+                ),
+            ),
+        ),
+    ]
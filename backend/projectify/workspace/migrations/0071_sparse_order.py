@@ -0,0 +1,100 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Order tasks and sections by sparse keys.
+
+Replaces order_with_respect_to with an explicit _order field. The existing
+column is kept, widened, and its values spread out, see models/order.py.
+"""
+# Generated by Django 5.1.4 on 2026-10-19 08:01
+
+from django.db import migrations, models
+
+# Same as ORDER_GAP in models/order.py, at the time of writing
+GAP = 2**16
+
+SPREAD_SQL = """
+ALTER TABLE {table} ALTER COLUMN _order TYPE bigint;
+UPDATE {table} SET _order = (_order + 1) * {gap};
+"""
+
+COMPACT_SQL = """
+UPDATE {table} AS target
+SET _order = ranked.position - 1
+FROM (
+    SELECT
+        id,
+        row_number() OVER (PARTITION BY {parent_column} ORDER BY _order)
+            AS position
+    FROM {table}
+) AS ranked
+WHERE target.id = ranked.id;
+ALTER TABLE {table} ALTER COLUMN _order TYPE integer;
+"""
+
+
+class AlterModelOptions(migrations.AlterModelOptions):
+    """
+    Alter model options, removing order_with_respect_to as well.
+
+    AlterOrderWithRespectTo would keep order_with_respect_to=None in the
+    options, which makes the autodetector look for the field given there
+    instead of the explicit _order field.
+    """
+
+    ALTER_OPTION_KEYS = [
+        *migrations.AlterModelOptions.ALTER_OPTION_KEYS,
+        "order_with_respect_to",
+    ]
+
+
+def spread(*, table: str, parent_column: str) -> migrations.RunSQL:
+    """Return an operation spreading out the keys in table."""
+    return migrations.RunSQL(
+        SPREAD_SQL.format(table=table, gap=GAP),
+        COMPACT_SQL.format(table=table, parent_column=parent_column),
+    )
+
+
+class Migration(migrations.Migration):
+    """Migration."""
+
+    dependencies = [
+        ("workspace", "0070_revision"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                AlterModelOptions(
+                    name="section",
+                    options={"ordering": ("_order",)},
+                ),
+                AlterModelOptions(
+                    name="task",
+                    options={"ordering": ("_order",)},
+                ),
+                migrations.AddField(
+                    model_name="section",
+                    name="_order",
+                    field=models.BigIntegerField(
+                        editable=False,
+                        help_text="Position of this section within its project",
+                    ),
+                ),
+                migrations.AddField(
+                    model_name="task",
+                    name="_order",
+                    field=models.BigIntegerField(
+                        editable=False,
+                        help_text="Position of this task within its section",
+                    ),
+                ),
+            ],
+            database_operations=[
+                spread(table="workspace_section", parent_column="project_id"),
+                spread(table="workspace_task", parent_column="section_id"),
+            ],
+        ),
+    ]
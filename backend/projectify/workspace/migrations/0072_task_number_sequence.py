@@ -0,0 +1,107 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Allocate task numbers from a sequence per workspace.
+
+Replaces Workspace.highest_task_number, see models/task_number.py. Each
+existing workspace's sequence continues after its highest task number.
+"""
+# Generated by Django 5.1.4 on 2026-10-19 08:47
+
+from django.db import migrations
+
+import pgtrigger.compiler
+import pgtrigger.migrations
+
+# Same as SEQUENCE_PREFIX in models/task_number.py, at the time of writing
+SEQUENCE = "quote_ident('workspace_task_number_' || workspace.id)"
+
+CREATE_SEQUENCES_SQL = f"""
+DO $$
+DECLARE
+    workspace RECORD;
+BEGIN
+    FOR workspace IN SELECT id, highest_task_number FROM workspace_workspace
+    LOOP
+        EXECUTE 'DROP SEQUENCE IF EXISTS ' || {SEQUENCE};
+        EXECUTE 'CREATE SEQUENCE ' || {SEQUENCE}
+            || ' START WITH ' || (workspace.highest_task_number + 1);
+    END LOOP;
+END
+$$;
+"""
+
+DROP_SEQUENCES_SQL = f"""
+UPDATE workspace_workspace AS workspace
+SET highest_task_number = GREATEST(
+    (
+        SELECT last_value FROM pg_sequences
+        WHERE schemaname = current_schema()
+        AND sequencename = 'workspace_task_number_' || workspace.id
+    ),
+    (
+        SELECT MAX(number) FROM workspace_task
+        WHERE workspace_id = workspace.id
+    ),
+    0
+);
+DO $$
+DECLARE
+    workspace RECORD;
+BEGIN
+    FOR workspace IN SELECT id FROM workspace_workspace
+    LOOP
+        EXECUTE 'DROP SEQUENCE IF EXISTS ' || {SEQUENCE};
+    END LOOP;
+END
+$$;
+"""
+
+
+class Migration(migrations.Migration):
+    """Migration."""
+
+    dependencies = [
+        ("workspace", "0071_sparse_order"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SEQUENCES_SQL, DROP_SEQUENCES_SQL),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="workspace",
+            name="ensure_correct_highest_task_number",
+        ),
+        migrations.RemoveField(
+            model_name="workspace",
+            name="highest_task_number",
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="workspace",
+            trigger=pgtrigger.compiler.Trigger(
+                name="create_task_number_sequence",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                EXECUTE 'DROP SEQUENCE IF EXISTS ' || quote_ident('workspace_task_number_' || NEW.id);\n                EXECUTE 'CREATE SEQUENCE ' || quote_ident('workspace_task_number_' || NEW.id);\n                RETURN NULL;\n              END;",
+                    hash="015effae04bf3d7d3e7f955af7e0d96300856bc2",
+                    operation="INSERT",
+                    pgid="pgtrigger_create_task_number_sequence_dd34f",
+                    table="workspace_workspace",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="workspace",
+            trigger=pgtrigger.compiler.Trigger(
+                name="drop_task_number_sequence",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                EXECUTE 'DROP SEQUENCE IF EXISTS ' || quote_ident('workspace_task_number_' || OLD.id);\n                RETURN NULL;\n              END;",
+                    hash="817f21138c2d9ad3a95ef206d4b95394ceed1bfe",
+                    operation="DELETE",
+                    pgid="pgtrigger_drop_task_number_sequence_26920",
+                    table="workspace_workspace",
+                    when="AFTER",
+                ),
+            ),
+        ),
+    ]
@@ -0,0 +1,343 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Stamp revisions from a sequence, and defer bumps until commit.
+
+See models/revision.py. The sequence continues after the highest revision
+so far.
+"""
+# Generated by Django 5.1.4 on 2026-10-19 11:23
+
+from django.db import migrations, models
+
+import pgtrigger.compiler
+import pgtrigger.migrations
+
+# Same as REVISION_SEQUENCE in models/revision.py, at the time of writing
+CREATE_SEQUENCE_SQL = """
+DROP SEQUENCE IF EXISTS workspace_revision;
+CREATE SEQUENCE workspace_revision;
+SELECT setval(
+    'workspace_revision',
+    GREATEST(
+        (SELECT MAX(revision) FROM workspace_workspace),
+        (SELECT MAX(revision) FROM workspace_project),
+        (SELECT MAX(revision) FROM workspace_task),
+        1
+    )
+);
+"""
+
+DROP_SEQUENCE_SQL = "DROP SEQUENCE IF EXISTS workspace_revision;"
+
+
+class Migration(migrations.Migration):
+    """Migration."""
+
+    dependencies = [
+        ("workspace", "0073_project_import"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SEQUENCE_SQL, DROP_SEQUENCE_SQL),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="chatmessage",
+            name="insert_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="chatmessage",
+            name="update_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="chatmessage",
+            name="delete_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="label",
+            name="insert_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="label",
+            name="update_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="label",
+            name="delete_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="project",
+            name="increment_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="project",
+            name="insert_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="project",
+            name="update_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="project",
+            name="delete_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="section",
+            name="insert_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="section",
+            name="update_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="section",
+            name="delete_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="subtask",
+            name="insert_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="subtask",
+            name="update_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="subtask",
+            name="delete_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="task",
+            name="increment_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="task",
+            name="insert_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="task",
+            name="update_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="task",
+            name="delete_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="tasklabel",
+            name="insert_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="tasklabel",
+            name="update_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="tasklabel",
+            name="delete_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="teammember",
+            name="insert_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="teammember",
+            name="update_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="teammember",
+            name="delete_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="teammemberinvite",
+            name="insert_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="teammemberinvite",
+            name="update_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="teammemberinvite",
+            name="delete_bump_revision",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="workspace",
+            name="increment_revision",
+        ),
+        migrations.AlterField(
+            model_name="workspace",
+            name="revision",
+            field=models.BigIntegerField(
+                default=0,
+                editable=False,
+                help_text="Increases whenever this workspace, its labels or team members change",
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="chatmessage",
+            trigger=pgtrigger.compiler.Trigger(
+                name="bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    constraint="CONSTRAINT",
+                    func="\n              BEGIN\n                -- stamp_revision sets the new revision\n                UPDATE workspace_task SET revision = revision\n                WHERE id IN (SELECT OLD.task_id UNION SELECT NEW.task_id)\n                    AND xmin <> xid(pg_current_xact_id());\n                RETURN NULL;\n              END;",
+                    hash="2bba7337d2151dbb29fd1844490cecf611370ba8",
+                    operation="INSERT OR UPDATE OR DELETE",
+                    pgid="pgtrigger_bump_revision_bcf31",
+                    table="workspace_chatmessage",
+                    timing="DEFERRABLE INITIALLY DEFERRED",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="label",
+            trigger=pgtrigger.compiler.Trigger(
+                name="bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    constraint="CONSTRAINT",
+                    func="\n              BEGIN\n                -- stamp_revision sets the new revision\n                UPDATE workspace_workspace SET revision = revision\n                WHERE id IN (SELECT OLD.workspace_id UNION SELECT NEW.workspace_id)\n                    AND xmin <> xid(pg_current_xact_id());\n                RETURN NULL;\n              END;",
+                    hash="010b518c81432a886ac559751dbc133ab7453459",
+                    operation="INSERT OR UPDATE OR DELETE",
+                    pgid="pgtrigger_bump_revision_ea637",
+                    table="workspace_label",
+                    timing="DEFERRABLE INITIALLY DEFERRED",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="project",
+            trigger=pgtrigger.compiler.Trigger(
+                name="stamp_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                NEW.revision := nextval('workspace_revision');\n                RETURN NEW;\n              END;",
+                    hash="81aa2c1469f97092a6bc948c0afeb4f41dfbf64e",
+                    operation="INSERT OR UPDATE",
+                    pgid="pgtrigger_stamp_revision_62b3e",
+                    table="workspace_project",
+                    when="BEFORE",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="section",
+            trigger=pgtrigger.compiler.Trigger(
+                name="bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    constraint="CONSTRAINT",
+                    func="\n              BEGIN\n                -- stamp_revision sets the new revision\n                UPDATE workspace_project SET revision = revision\n                WHERE id IN (SELECT OLD.project_id UNION SELECT NEW.project_id)\n                    AND xmin <> xid(pg_current_xact_id());\n                RETURN NULL;\n              END;",
+                    hash="554b167aa8e219ae121dee1a153c1bfa59f1c68c",
+                    operation="INSERT OR UPDATE OR DELETE",
+                    pgid="pgtrigger_bump_revision_60510",
+                    table="workspace_section",
+                    timing="DEFERRABLE INITIALLY DEFERRED",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="subtask",
+            trigger=pgtrigger.compiler.Trigger(
+                name="bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    constraint="CONSTRAINT",
+                    func="\n              BEGIN\n                -- stamp_revision sets the new revision\n                UPDATE workspace_task SET revision = revision\n                WHERE id IN (SELECT OLD.task_id UNION SELECT NEW.task_id)\n                    AND xmin <> xid(pg_current_xact_id());\n                RETURN NULL;\n              END;",
+                    hash="4ee772df02a412e66cfaa3d10ed87fe71c86b0e2",
+                    operation="INSERT OR UPDATE OR DELETE",
+                    pgid="pgtrigger_bump_revision_4be24",
+                    table="workspace_subtask",
+                    timing="DEFERRABLE INITIALLY DEFERRED",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="task",
+            trigger=pgtrigger.compiler.Trigger(
+                name="stamp_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                NEW.revision := nextval('workspace_revision');\n                RETURN NEW;\n              END;",
+                    hash="c40a53c3dd65d03b2a9f1a5955a9027cd37d26c6",
+                    operation="INSERT OR UPDATE",
+                    pgid="pgtrigger_stamp_revision_313d2",
+                    table="workspace_task",
+                    when="BEFORE",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="task",
+            trigger=pgtrigger.compiler.Trigger(
+                name="bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    constraint="CONSTRAINT",
+                    func="\n              BEGIN\n                -- stamp_revision sets the new revision\n                UPDATE workspace_project SET revision = revision\n                WHERE id IN (\n                    SELECT project_id FROM workspace_section\n                    WHERE id = OLD.section_id UNION \n                    SELECT project_id FROM workspace_section\n                    WHERE id = NEW.section_id)\n                    AND xmin <> xid(pg_current_xact_id());\n                RETURN NULL;\n              END;",
+                    hash="24f2065a687c0e3549774ba77ec7d15c0a7a1fb8",
+                    operation="INSERT OR UPDATE OR DELETE",
+                    pgid="pgtrigger_bump_revision_89bdb",
+                    table="workspace_task",
+                    timing="DEFERRABLE INITIALLY DEFERRED",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="tasklabel",
+            trigger=pgtrigger.compiler.Trigger(
+                name="bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    constraint="CONSTRAINT",
+                    func="\n              BEGIN\n                -- stamp_revision sets the new revision\n                UPDATE workspace_task SET revision = revision\n                WHERE id IN (SELECT OLD.task_id UNION SELECT NEW.task_id)\n                    AND xmin <> xid(pg_current_xact_id());\n                RETURN NULL;\n              END;",
+                    hash="a42fd36d91db1f68dce210875ff14fef7016e85b",
+                    operation="INSERT OR UPDATE OR DELETE",
+                    pgid="pgtrigger_bump_revision_9e753",
+                    table="workspace_tasklabel",
+                    timing="DEFERRABLE INITIALLY DEFERRED",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="teammember",
+            trigger=pgtrigger.compiler.Trigger(
+                name="bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    constraint="CONSTRAINT",
+                    func="\n              BEGIN\n                -- stamp_revision sets the new revision\n                UPDATE workspace_workspace SET revision = revision\n                WHERE id IN (SELECT OLD.workspace_id UNION SELECT NEW.workspace_id)\n                    AND xmin <> xid(pg_current_xact_id());\n                RETURN NULL;\n              END;",
+                    hash="1b2dde8033f4c0a7b486f44b86c19f83441c62d8",
+                    operation="INSERT OR UPDATE OR DELETE",
+                    pgid="pgtrigger_bump_revision_27835",
+                    table="workspace_teammember",
+                    timing="DEFERRABLE INITIALLY DEFERRED",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="teammemberinvite",
+            trigger=pgtrigger.compiler.Trigger(
+                name="bump_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    constraint="CONSTRAINT",
+                    func="\n              BEGIN\n                -- stamp_revision sets the new revision\n                UPDATE workspace_workspace SET revision = revision\n                WHERE id IN (SELECT OLD.workspace_id UNION SELECT NEW.workspace_id)\n                    AND xmin <> xid(pg_current_xact_id());\n                RETURN NULL;\n              END;",
+                    hash="7541f23a1822ed58375f2467e28def62aeda36de",
+                    operation="INSERT OR UPDATE OR DELETE",
+                    pgid="pgtrigger_bump_revision_45aed",
+                    table="workspace_teammemberinvite",
+                    timing="DEFERRABLE INITIALLY DEFERRED",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="workspace",
+            trigger=pgtrigger.compiler.Trigger(
+                name="stamp_revision",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n              BEGIN\n                NEW.revision := nextval('workspace_revision');\n                RETURN NEW;\n              END;",
+                    hash="85b3ef647cbeff2147ed2896d307261ba9b8580b",
+                    operation="INSERT OR UPDATE",
+                    pgid="pgtrigger_stamp_revision_8cbef",
+                    table="workspace_workspace",
+                    when="BEFORE",
+                ),
+            ),
+        ),
+    ]
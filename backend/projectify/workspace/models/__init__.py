@@ -7,6 +7,7 @@ from .chat_message import ChatMessage
 from .const import TeamMemberRoles
 from .label import Label
 from .project import Project
+from .project_import import ProjectImport
 from .section import Section
 from .sub_task import SubTask
 from .task import Task
@@ -23,6 +24,7 @@ __all__ = (
     "TaskLabel",
     "Workspace",
     "Project",
+    "ProjectImport",
     "Section",
     "TeamMember",
     "TeamMemberInvite",
@@ -11,7 +11,8 @@ from django.db import models
 
 from projectify.lib.models import BaseModel
 
-from .task import Task
+from .revision import bump_revision_trigger
+from .task import Task, task_search_vector_triggers
 from .team_member import TeamMember
 from .types import Pks
 
@@ -59,3 +60,11 @@ class ChatMessage(BaseModel):
         """Meta."""
 
         ordering = ("created",)
+
+        # Keep Task.search_vector up to date
+        triggers = (
+            *task_search_vector_triggers("text"),
+            bump_revision_trigger(
+                table="workspace_task", ids="SELECT {row}.task_id"
+            ),
+        )
@@ -14,3 +14,19 @@ class TeamMemberRoles(models.TextChoices):
     CONTRIBUTOR = "CONTRIBUTOR", _("Contributor")
     MAINTAINER = "MAINTAINER", _("Maintainer")
     OWNER = "OWNER", _("Owner")
+
+
+class ProjectImportFormat(models.TextChoices):
+    """File formats a project can be imported from."""
+
+    CSV = "csv", _("CSV")
+    JSON_LINES = "jsonl", _("JSON Lines")
+
+
+class ProjectImportStatus(models.TextChoices):
+    """Where a project import is at."""
+
+    QUEUED = "QUEUED", _("Queued")
+    RUNNING = "RUNNING", _("Running")
+    DONE = "DONE", _("Done")
+    FAILED = "FAILED", _("Failed")
@@ -12,6 +12,7 @@ from django.utils.translation import gettext_lazy as _
 
 from projectify.lib.models import BaseModel
 
+from .revision import bump_revision_trigger
 from .types import Pks
 from .workspace import Workspace as Workspace
 
@@ -68,3 +69,8 @@ class Label(BaseModel):
         # TODO remove this restriction, just let users do what they want to
         unique_together = ("workspace", "name")
         ordering = ("-modified",)
+        triggers = (
+            bump_revision_trigger(
+                table="workspace_workspace", ids="SELECT {row}.workspace_id"
+            ),
+        )
@@ -0,0 +1,106 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Sparse ordering keys for tasks and sections.
+
+Tasks are ordered within their section, and sections within their project,
+by _order. Keys are spread ORDER_GAP apart. Moving a row means picking a key
+between its new neighbors, and only the moved row is updated. Once
+neighbors run out of keys between them, all rows below the same parent are
+spread out again by order_rebalance.
+"""
+
+from typing import Any, Optional
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Max, Model, QuerySet
+
+# Distance between keys of neighbors after rebalancing, or when appending
+ORDER_GAP = 2**16
+# Rebalance in the background once neighbors are this close
+ORDER_REBALANCE_GAP = 2**8
+
+ORDER_REBALANCE_SQL = """
+UPDATE {table} AS target
+SET _order = ranked.position * %(gap)s
+FROM (
+    SELECT id, row_number() OVER (ORDER BY _order) AS position
+    FROM {table}
+    WHERE {parent_column} = %(parent_id)s
+) AS ranked
+WHERE target.id = ranked.id AND target._order != ranked.position * %(gap)s
+"""
+
+
+def order_append(siblings: QuerySet[Any]) -> int:
+    """Return a key for a row placed after all siblings."""
+    highest: Optional[int] = siblings.aggregate(highest=Max("_order"))[
+        "highest"
+    ]
+    return ORDER_GAP if highest is None else highest + ORDER_GAP
+
+
+def order_spread(
+    *, lower: Optional[int], upper: Optional[int], count: int
+) -> Optional[list[int]]:
+    """
+    Return count ascending keys between lower and upper, evenly spread.
+
+    lower is None when placing rows first, upper is None when placing them
+    last. Returns None if there are not enough keys left between the two.
+    """
+    match lower, upper:
+        case None, None:
+            return [ORDER_GAP * (n + 1) for n in range(count)]
+        case None, int():
+            return [upper - ORDER_GAP * (count - n) for n in range(count)]
+        case int(), None:
+            return [lower + ORDER_GAP * (n + 1) for n in range(count)]
+        case int(), int() if (upper - lower) // (count + 1) > 0:
+            step = (upper - lower) // (count + 1)
+            return [lower + step * (n + 1) for n in range(count)]
+        case _:
+            return None
+
+
+def order_between(
+    *, lower: Optional[int], upper: Optional[int]
+) -> Optional[int]:
+    """
+    Return a key between lower and upper.
+
+    lower is None when placing a row first, upper is None when placing it
+    last. Returns None if there is no key left between the two.
+    """
+    keys = order_spread(lower=lower, upper=upper, count=1)
+    return None if keys is None else keys[0]
+
+
+def order_should_rebalance(
+    *, lower: Optional[int], upper: Optional[int], count: int = 1
+) -> bool:
+    """
+    Return True if neighbors are getting close to running out of keys.
+
+    count is the number of rows placed between them.
+    """
+    if lower is None or upper is None:
+        return False
+    return upper - lower < ORDER_REBALANCE_GAP * count
+
+
+def order_rebalance(
+    *, model: type[Model], parent_column: str, parent_id: int
+) -> None:
+    """
+    Spread out the keys of all rows below a parent, keeping their order.
+
+    parent_column is the column of model's table containing the parent's id.
+    Only rows whose key changes are updated.
+    """
+    sql = ORDER_REBALANCE_SQL.format(
+        table=model._meta.db_table, parent_column=parent_column
+    )
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute(sql, {"gap": ORDER_GAP, "parent_id": parent_id})
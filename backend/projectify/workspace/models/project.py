@@ -11,6 +11,7 @@ from django.utils.translation import gettext_lazy as _
 
 from projectify.lib.models import BaseModel, TitleDescriptionModel
 
+from .revision import stamp_revision_trigger
 from .section import Section
 from .workspace import Workspace
 
@@ -20,8 +21,6 @@ from .workspace import Workspace
 if TYPE_CHECKING:
     from django.db.models.manager import RelatedManager  # noqa: F401
 
-    from .types import GetOrder, SetOrder
-
 
 class Project(TitleDescriptionModel, BaseModel):
     """Project."""
@@ -42,14 +41,19 @@ class Project(TitleDescriptionModel, BaseModel):
         help_text=_("Due date for this workspace board"),
     )
 
+    # Maintained by triggers, see revision.py
+    revision = models.BigIntegerField(
+        default=0,
+        editable=False,
+        help_text=_(
+            "Increases whenever this project or anything in it changes"
+        ),
+    )
+
     if TYPE_CHECKING:
         # Related managers
         section_set: RelatedManager["Section"]
 
-        # For ordering
-        get_section_order: GetOrder
-        set_section_order: SetOrder
-
     def __str__(self) -> str:
         """Return title."""
         return self.title
@@ -58,3 +62,4 @@ class Project(TitleDescriptionModel, BaseModel):
         """Order by created, descending."""
 
         ordering = ("-created",)
+        triggers = (stamp_revision_trigger(),)
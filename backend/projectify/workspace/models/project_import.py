@@ -0,0 +1,107 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Project import model."""
+
+import uuid
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ClassVar,
+    Optional,
+    Self,
+    TypedDict,
+    cast,
+)
+
+from django.conf import settings
+from django.contrib.auth.models import AbstractBaseUser
+from django.core.files.storage import (  # type: ignore[attr-defined]
+    Storage,
+    storages,
+)
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from projectify.lib.models import BaseModel
+
+from .const import ProjectImportFormat, ProjectImportStatus
+from .project import Project
+
+if TYPE_CHECKING:
+    from projectify.user.models import User  # noqa: F401
+
+
+def project_import_storage() -> Storage:
+    """Return the storage that uploaded files are kept in."""
+    return cast(Storage, storages["imports"])
+
+
+class ProjectImportError(TypedDict):
+    """A row that could not be imported, or why a file could not be read."""
+
+    line: Optional[int]
+    errors: dict[str, Any]
+
+
+class ProjectImportQuerySet(models.QuerySet["ProjectImport"]):
+    """ProjectImport QuerySet."""
+
+    def filter_for_user_and_uuid(
+        self, user: AbstractBaseUser, uuid: uuid.UUID
+    ) -> Self:
+        """Return imports into projects of a user's workspaces."""
+        return self.filter(project__workspace__users=user, uuid=uuid)
+
+
+class ProjectImport(BaseModel):
+    """A file of tasks being imported into a project."""
+
+    project = models.ForeignKey[Project](Project, on_delete=models.CASCADE)
+    # Whoever uploaded the file. Tasks are created on their behalf.
+    user = models.ForeignKey["User"](
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+    uuid = models.UUIDField(unique=True, default=uuid.uuid4, editable=False)
+    file = models.FileField(
+        storage=project_import_storage,
+        upload_to="project_import/",
+        blank=True,
+        help_text=_("Uploaded file, removed once it has been imported"),
+    )
+    format = models.CharField(
+        max_length=5,
+        choices=ProjectImportFormat.choices,
+    )
+    status = models.CharField(
+        max_length=7,
+        choices=ProjectImportStatus.choices,
+        default=ProjectImportStatus.QUEUED,
+    )
+    rows = models.PositiveIntegerField(
+        default=0,
+        help_text=_("Rows read from the file so far"),
+    )
+    tasks = models.PositiveIntegerField(
+        default=0,
+        help_text=_("Tasks created so far"),
+    )
+    errors: "models.JSONField[list[ProjectImportError]]" = models.JSONField(
+        default=list,
+        blank=True,
+        help_text=_("Rows that could not be imported, and why"),
+    )
+
+    objects: ClassVar[ProjectImportQuerySet] = cast(  # type: ignore[assignment]
+        ProjectImportQuerySet, ProjectImportQuerySet.as_manager()
+    )
+
+    def __str__(self) -> str:
+        """Return file name."""
+        return self.file.name or str(self.uuid)
+
+    class Meta:
+        """Meta."""
+
+        ordering = ("created",)
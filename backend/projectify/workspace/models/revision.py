@@ -0,0 +1,75 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Triggers maintaining revision counters.
+
+Workspace, Project and Task have a revision. Whenever one of these rows is
+inserted or updated, it is stamped with a new revision taken from a single
+sequence. Child models bump their parent's revision, and since that is an
+update as well, the bump continues up to the project. A sub task changing
+therefore bumps its task and project.
+
+Bumps are deferred until the transaction commits, so that the parent row is
+only locked while committing, and not for the rest of the transaction. Until
+then, the parent keeps its revision. connection.check_constraints() runs
+deferred bumps right away.
+
+Projects don't bump their workspace, so that changes in different projects
+don't wait for each other. A workspace's version is derived from its own
+revision and those of its projects instead, see selectors/workspace.py.
+"""
+
+import pgtrigger
+
+# Every revision is taken from this sequence
+REVISION_SEQUENCE = "workspace_revision"
+
+
+def stamp_revision_trigger() -> pgtrigger.Trigger:
+    """
+    Return a trigger that stamps a new revision whenever a row is written.
+
+    The revision written by the insert or update is ignored, so that saving
+    a stale instance can't set it back.
+    """
+    return pgtrigger.Trigger(
+        name="stamp_revision",
+        when=pgtrigger.Before,
+        operation=pgtrigger.Insert | pgtrigger.Update,
+        func=f"""
+              BEGIN
+                NEW.revision := nextval('{REVISION_SEQUENCE}');
+                RETURN NEW;
+              END;""",
+    )
+
+
+def bump_revision_trigger(*, table: str, ids: str) -> pgtrigger.Trigger:
+    """
+    Return a trigger that bumps revisions in table when a row changes.
+
+    ids selects the ids of rows in table from {row}, which is the row before
+    or after the change. For updates, both are used, so that moving a row
+    bumps both its old and new parent.
+
+    Rows in table that this transaction has written already are skipped,
+    since they have been stamped with a new revision then. This way, a bulk
+    statement bumps each parent once.
+    """
+    changed = " UNION ".join(ids.format(row=row) for row in ("OLD", "NEW"))
+    return pgtrigger.Trigger(
+        name="bump_revision",
+        level=pgtrigger.Row,
+        when=pgtrigger.After,
+        operation=pgtrigger.Insert | pgtrigger.Update | pgtrigger.Delete,
+        timing=pgtrigger.Deferred,
+        func=f"""
+              BEGIN
+                -- stamp_revision sets the new revision
+                UPDATE {table} SET revision = revision
+                WHERE id IN ({changed})
+                    AND xmin <> xid(pg_current_xact_id());
+                RETURN NULL;
+              END;""",
+    )
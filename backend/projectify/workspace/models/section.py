@@ -4,15 +4,18 @@
 """Section model."""
 
 import uuid
-from typing import TYPE_CHECKING, Callable, ClassVar, Self, cast
+from typing import TYPE_CHECKING, Any, ClassVar, Optional, Self, cast
 
 from django.contrib.auth.models import AbstractBaseUser
 from django.db import models
+from django.utils.translation import gettext_lazy as _
 
 from projectify.lib.models import BaseModel, TitleDescriptionModel
 
+from .order import order_append
+from .revision import bump_revision_trigger
 from .task import Task
-from .types import GetOrder, Pks, SetOrder
+from .types import Pks
 
 if TYPE_CHECKING:
     from django.db.models.manager import RelatedManager  # noqa: F401
@@ -39,6 +42,11 @@ class Section(TitleDescriptionModel, BaseModel):
 
     project = models.ForeignKey["Project"]("Project", on_delete=models.CASCADE)
     uuid = models.UUIDField(unique=True, default=uuid.uuid4, editable=False)
+    # Sparse, see order.py
+    _order = models.BigIntegerField(
+        editable=False,
+        help_text=_("Position of this section within its project"),
+    )
     objects: ClassVar[SectionQuerySet] = cast(  # type: ignore[assignment]
         SectionQuerySet,
         SectionQuerySet.as_manager(),
@@ -48,11 +56,13 @@ class Section(TitleDescriptionModel, BaseModel):
         # Related managers
         task_set: RelatedManager["Task"]
 
-        # For ordering
-        get_task_order: GetOrder
-        set_task_order: SetOrder
-        get_next_in_order: Callable[[], "Section"]
-        _order: int
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """Override save to place new sections last."""
+        if cast(Optional[int], self._order) is None:
+            self._order = order_append(
+                Section.objects.filter(project=self.project)
+            )
+        super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         """Return title."""
@@ -61,7 +71,12 @@ class Section(TitleDescriptionModel, BaseModel):
     class Meta:
         """Meta."""
 
-        order_with_respect_to = "project"
+        ordering = ("_order",)
+        triggers = (
+            bump_revision_trigger(
+                table="workspace_project", ids="SELECT {row}.project_id"
+            ),
+        )
         constraints = [
             models.UniqueConstraint(
                 fields=["project", "_order"],
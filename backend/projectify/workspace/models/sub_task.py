@@ -10,9 +10,12 @@ from django.contrib.auth.models import AbstractBaseUser
 from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 
+import pgtrigger
+
 from projectify.lib.models import BaseModel, TitleDescriptionModel
 
-from .task import Task
+from .revision import bump_revision_trigger
+from .task import Task, task_search_vector_triggers
 from .types import Pks
 from .workspace import Workspace as Workspace
 
@@ -88,3 +91,98 @@ class SubTask(TitleDescriptionModel, BaseModel):
                 deferrable=models.Deferrable.DEFERRED,
             )
         ]
+
+        # Keep Task.sub_task_count and Task.sub_task_done_count up to date.
+        # These are statement level triggers, so that bulk operations update
+        # every task only once. Transition tables can only be used with one
+        # operation per trigger.
+        triggers = (
+            pgtrigger.Trigger(
+                name="increment_task_sub_task_counts",
+                level=pgtrigger.Statement,
+                when=pgtrigger.After,
+                operation=pgtrigger.Insert,
+                referencing=pgtrigger.Referencing(new="new_values"),
+                func="""
+              BEGIN
+                UPDATE workspace_task
+                SET sub_task_count = sub_task_count + counts.count,
+                    sub_task_done_count =
+                        sub_task_done_count + counts.done_count
+                FROM (
+                    SELECT task_id,
+                        COUNT(*) AS count,
+                        COUNT(*) FILTER (WHERE done) AS done_count
+                    FROM new_values
+                    GROUP BY task_id
+                ) AS counts
+                WHERE workspace_task.id = counts.task_id;
+                RETURN NULL;
+              END;""",
+            ),
+            pgtrigger.Trigger(
+                name="update_task_sub_task_counts",
+                level=pgtrigger.Statement,
+                when=pgtrigger.After,
+                operation=pgtrigger.Update,
+                referencing=pgtrigger.Referencing(
+                    old="old_values", new="new_values"
+                ),
+                func="""
+              BEGIN
+                UPDATE workspace_task
+                SET sub_task_count = sub_task_count + counts.count,
+                    sub_task_done_count =
+                        sub_task_done_count + counts.done_count
+                FROM (
+                    SELECT task_id,
+                        SUM(count) AS count,
+                        SUM(done_count) AS done_count
+                    FROM (
+                        SELECT task_id,
+                            COUNT(*) AS count,
+                            COUNT(*) FILTER (WHERE done) AS done_count
+                        FROM new_values
+                        GROUP BY task_id
+                        UNION ALL
+                        SELECT task_id,
+                            -COUNT(*) AS count,
+                            -COUNT(*) FILTER (WHERE done) AS done_count
+                        FROM old_values
+                        GROUP BY task_id
+                    ) AS changes
+                    GROUP BY task_id
+                    HAVING SUM(count) != 0 OR SUM(done_count) != 0
+                ) AS counts
+                WHERE workspace_task.id = counts.task_id;
+                RETURN NULL;
+              END;""",
+            ),
+            pgtrigger.Trigger(
+                name="decrement_task_sub_task_counts",
+                level=pgtrigger.Statement,
+                when=pgtrigger.After,
+                operation=pgtrigger.Delete,
+                referencing=pgtrigger.Referencing(old="old_values"),
+                func="""
+              BEGIN
+                UPDATE workspace_task
+                SET sub_task_count = sub_task_count - counts.count,
+                    sub_task_done_count =
+                        sub_task_done_count - counts.done_count
+                FROM (
+                    SELECT task_id,
+                        COUNT(*) AS count,
+                        COUNT(*) FILTER (WHERE done) AS done_count
+                    FROM old_values
+                    GROUP BY task_id
+                ) AS counts
+                WHERE workspace_task.id = counts.task_id;
+                RETURN NULL;
+              END;""",
+            ),
+            *task_search_vector_triggers("title"),
+            bump_revision_trigger(
+                table="workspace_task", ids="SELECT {row}.task_id"
+            ),
+        )
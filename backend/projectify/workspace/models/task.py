@@ -7,13 +7,18 @@ import logging
 import uuid
 from typing import TYPE_CHECKING, Any, Optional, cast
 
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 
 import pgtrigger
 
 from projectify.lib.models import BaseModel, TitleDescriptionModel
 
+from .order import order_append
+from .revision import bump_revision_trigger, stamp_revision_trigger
+from .task_number import task_number_allocate
 from .types import GetOrder, SetOrder
 
 logger = logging.getLogger(__name__)
@@ -33,6 +38,62 @@ if TYPE_CHECKING:
     )
 
 
+# Text search configuration for Task.search_vector. Tasks are written in many
+# languages, so we don't stem words.
+SEARCH_CONFIG = "simple"
+
+
+def task_search_vector_triggers(column: str) -> tuple[pgtrigger.Trigger, ...]:
+    """
+    Return triggers that refresh Task.search_vector when column changes.
+
+    The triggers set search_vector to NULL on affected tasks, and the
+    update_search_vector trigger on Task then computes it anew.
+    """
+    touch = """
+              BEGIN
+                UPDATE workspace_task SET search_vector = NULL
+                WHERE id IN (SELECT task_id FROM {changes});
+                RETURN NULL;
+              END;"""
+    return (
+        pgtrigger.Trigger(
+            name="insert_task_search_vector",
+            level=pgtrigger.Statement,
+            when=pgtrigger.After,
+            operation=pgtrigger.Insert,
+            referencing=pgtrigger.Referencing(new="new_values"),
+            func=touch.format(changes="new_values"),
+        ),
+        pgtrigger.Trigger(
+            name="update_task_search_vector",
+            level=pgtrigger.Statement,
+            when=pgtrigger.After,
+            operation=pgtrigger.Update,
+            referencing=pgtrigger.Referencing(
+                old="old_values", new="new_values"
+            ),
+            func=touch.format(
+                changes=f"""(
+                    SELECT unnest(ARRAY[new_values.task_id, old_values.task_id])
+                    FROM new_values JOIN old_values USING (id)
+                    WHERE new_values.{column} IS DISTINCT FROM
+                        old_values.{column}
+                    OR new_values.task_id != old_values.task_id
+                ) AS changed(task_id)"""
+            ),
+        ),
+        pgtrigger.Trigger(
+            name="delete_task_search_vector",
+            level=pgtrigger.Statement,
+            when=pgtrigger.After,
+            operation=pgtrigger.Delete,
+            referencing=pgtrigger.Referencing(old="old_values"),
+            func=touch.format(changes="old_values"),
+        ),
+    )
+
+
 class Task(TitleDescriptionModel, BaseModel):
     """Task, belongs to section."""
 
@@ -49,6 +110,8 @@ class Task(TitleDescriptionModel, BaseModel):
         blank=True,
         on_delete=models.SET_NULL,
         help_text=_("Team member this task is assigned to."),
+        # Covered by the task_assignee_due_date index
+        db_index=False,
     )
     due_date = models.DateTimeField(
         null=True,
@@ -62,6 +125,43 @@ class Task(TitleDescriptionModel, BaseModel):
 
     number = models.PositiveIntegerField()
 
+    # Sparse, see order.py
+    _order = models.BigIntegerField(
+        editable=False,
+        help_text=_("Position of this task within its section"),
+    )
+
+    # Maintained by triggers on SubTask
+    sub_task_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text=_("Number of sub tasks"),
+    )
+    sub_task_done_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text=_("Number of sub tasks that are done"),
+    )
+
+    # Maintained by triggers, see revision.py
+    revision = models.BigIntegerField(
+        default=0,
+        editable=False,
+        help_text=_(
+            "Increases whenever this task, its sub tasks, labels or chat messages changes"
+        ),
+    )
+
+    # Maintained by triggers on Task, SubTask and ChatMessage
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text=_(
+            "Title, description, sub task titles and chat messages, "
+            "for full text search"
+        ),
+    )
+
     if TYPE_CHECKING:
         # Related fields
         subtask_set: RelatedManager["SubTask"]
@@ -71,20 +171,36 @@ class Task(TitleDescriptionModel, BaseModel):
         # Order related
         get_subtask_order: GetOrder
         set_subtask_order: SetOrder
-        _order: int
         id: int
 
     def get_next_section(self) -> "Section":
         """Return instance of the next section."""
-        next_section: "Section" = self.section.get_next_in_order()
-        return next_section
+        section = self.section
+        return section.project.section_set.filter(
+            _order__gt=section._order
+        ).earliest("_order")
 
     # TODO we can probably do better than any here
     def save(self, *args: Any, **kwargs: Any) -> None:
-        """Override save to add task number."""
+        """Override save to add task number and place new tasks last."""
         if cast(Optional[int], self.number) is None:
-            self.number = self.workspace.increment_highest_task_number()
-        super().save(*args, **kwargs)
+            (self.number,) = task_number_allocate(
+                workspace_pk=self.workspace.pk
+            )
+        if cast(Optional[int], self._order) is not None:
+            super().save(*args, **kwargs)
+            return
+        # No savepoint needed, the save either succeeds or the whole
+        # transaction fails
+        with transaction.atomic(savepoint=False):
+            # Lock the section until the task is committed, so that
+            # concurrent creates and moves don't pick the same key
+            section = self.section
+            len(
+                type(section).objects.select_for_update().filter(pk=section.pk)
+            )
+            self._order = order_append(Task.objects.filter(section=section))
+            super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         """Return title."""
@@ -93,7 +209,24 @@ class Task(TitleDescriptionModel, BaseModel):
     class Meta:
         """Meta."""
 
-        order_with_respect_to = "section"
+        ordering = ("_order",)
+        indexes = [
+            GinIndex(fields=["search_vector"], name="task_search_vector"),
+            # Filter tasks in a workspace, in task number order
+            models.Index(
+                fields=["workspace", "assignee", "number"],
+                name="task_workspace_assignee",
+            ),
+            models.Index(
+                fields=["workspace", "due_date"],
+                name="task_workspace_due_date",
+            ),
+            # Find a user's tasks across workspaces, soonest due first
+            models.Index(
+                fields=["assignee", "due_date"],
+                name="task_assignee_due_date",
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["section", "_order"],
@@ -108,6 +241,13 @@ class Task(TitleDescriptionModel, BaseModel):
         ]
 
         triggers = (
+            stamp_revision_trigger(),
+            bump_revision_trigger(
+                table="workspace_project",
+                ids="""
+                    SELECT project_id FROM workspace_section
+                    WHERE id = {row}.section_id""",
+            ),
             pgtrigger.Trigger(
                 name="read_only_task_number",
                 when=pgtrigger.Before,
@@ -121,6 +261,55 @@ class Task(TitleDescriptionModel, BaseModel):
                 RETURN NEW;
               END;""",
             ),
+            # Sub task counts are only written by the SubTask triggers, which
+            # run one level deeper. This way, saving a stale Task instance
+            # can't overwrite them.
+            pgtrigger.Trigger(
+                name="protect_sub_task_counts",
+                when=pgtrigger.Before,
+                operation=pgtrigger.Update,
+                func="""
+              BEGIN
+                IF pg_trigger_depth() < 2 THEN
+                    NEW.sub_task_count := OLD.sub_task_count;
+                    NEW.sub_task_done_count := OLD.sub_task_done_count;
+                END IF;
+                RETURN NEW;
+              END;""",
+            ),
+            # Only recompute the search vector when the text changes, or when
+            # it was set to NULL to ask for it. A stale instance being saved
+            # can't overwrite it either.
+            pgtrigger.Trigger(
+                name="update_search_vector",
+                when=pgtrigger.Before,
+                operation=pgtrigger.Insert | pgtrigger.Update,
+                func=f"""
+              BEGIN
+                IF TG_OP = 'UPDATE'
+                    AND NEW.search_vector IS NOT NULL
+                    AND NEW.title IS NOT DISTINCT FROM OLD.title
+                    AND NEW.description IS NOT DISTINCT FROM OLD.description
+                THEN
+                    NEW.search_vector := OLD.search_vector;
+                    RETURN NEW;
+                END IF;
+                NEW.search_vector :=
+                    setweight(to_tsvector('{SEARCH_CONFIG}',
+                        coalesce(NEW.title, '')), 'A')
+                    || setweight(to_tsvector('{SEARCH_CONFIG}',
+                        coalesce(NEW.description, '')), 'B')
+                    || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce((
+                        SELECT string_agg(title, ' ')
+                        FROM workspace_subtask WHERE task_id = NEW.id
+                    ), '')), 'C')
+                    || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce((
+                        SELECT string_agg(text, ' ')
+                        FROM workspace_chatmessage WHERE task_id = NEW.id
+                    ), '')), 'D');
+                RETURN NEW;
+              END;""",
+            ),
             pgtrigger.Trigger(
                 name="ensure_correct_workspace",
                 when=pgtrigger.Before,
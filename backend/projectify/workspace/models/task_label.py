@@ -10,6 +10,7 @@ from django.db import models
 from projectify.lib.models import BaseModel
 
 from .label import Label
+from .revision import bump_revision_trigger
 from .task import Task
 from .types import Pks
 
@@ -32,6 +33,8 @@ class TaskLabel(BaseModel):
     label = models.ForeignKey["Label"](
         Label,
         on_delete=models.CASCADE,
+        # Covered by the label_task index
+        db_index=False,
     )
 
     objects: ClassVar[TaskLabelQuerySet] = cast(  # type: ignore[assignment]
@@ -42,3 +45,12 @@ class TaskLabel(BaseModel):
         """Meta."""
 
         unique_together = ("task", "label")
+        indexes = [
+            # Find tasks by label without visiting this table's rows
+            models.Index(fields=["label", "task"], name="label_task"),
+        ]
+        triggers = (
+            bump_revision_trigger(
+                table="workspace_task", ids="SELECT {row}.task_id"
+            ),
+        )
@@ -0,0 +1,85 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Task numbers, allocated from one sequence per workspace.
+
+Triggers create a workspace's sequence when the workspace is inserted, and
+drop it when the workspace is deleted. nextval() neither waits for nor locks
+out other transactions, so concurrent task creation doesn't queue up behind
+a lock on the workspace row. Numbers taken by a transaction that rolls back
+are skipped.
+"""
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+import pgtrigger
+
+# Sequence of workspace with id n is named SEQUENCE_PREFIX followed by n
+SEQUENCE_PREFIX = "workspace_task_number_"
+
+TASK_NUMBER_ALLOCATE_SQL = """
+SELECT nextval(%(sequence)s::regclass) FROM generate_series(1, %(count)s)
+"""
+
+TASK_NUMBER_SET_HIGHEST_SQL = """
+SELECT setval(%(sequence)s::regclass, GREATEST(%(number)s, 1), %(number)s > 0)
+"""
+
+
+def task_number_sequence_triggers() -> tuple[pgtrigger.Trigger, ...]:
+    """Return triggers creating and dropping a workspace's sequence."""
+    new = f"quote_ident('{SEQUENCE_PREFIX}' || NEW.id)"
+    old = f"quote_ident('{SEQUENCE_PREFIX}' || OLD.id)"
+    return (
+        pgtrigger.Trigger(
+            name="create_task_number_sequence",
+            when=pgtrigger.After,
+            operation=pgtrigger.Insert,
+            func=f"""
+              BEGIN
+                EXECUTE 'DROP SEQUENCE IF EXISTS ' || {new};
+                EXECUTE 'CREATE SEQUENCE ' || {new};
+                RETURN NULL;
+              END;""",
+        ),
+        pgtrigger.Trigger(
+            name="drop_task_number_sequence",
+            when=pgtrigger.After,
+            operation=pgtrigger.Delete,
+            func=f"""
+              BEGIN
+                EXECUTE 'DROP SEQUENCE IF EXISTS ' || {old};
+                RETURN NULL;
+              END;""",
+        ),
+    )
+
+
+def task_number_allocate(*, workspace_pk: int, count: int = 1) -> list[int]:
+    """
+    Return count new task numbers for a workspace, in ascending order.
+
+    Takes one statement, however many numbers are allocated. Numbers are
+    not necessarily consecutive, if other transactions allocate at the same
+    time.
+    """
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute(
+            TASK_NUMBER_ALLOCATE_SQL,
+            {"sequence": f"{SEQUENCE_PREFIX}{workspace_pk}", "count": count},
+        )
+        return sorted(number for (number,) in cursor.fetchall())
+
+
+def task_number_set_highest(*, workspace_pk: int, number: int) -> None:
+    """
+    Set the highest task number allocated for a workspace.
+
+    Use this after inserting tasks with explicit numbers.
+    """
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute(
+            TASK_NUMBER_SET_HIGHEST_SQL,
+            {"sequence": f"{SEQUENCE_PREFIX}{workspace_pk}", "number": number},
+        )
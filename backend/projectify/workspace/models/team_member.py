@@ -13,6 +13,7 @@ from django.db import models
 from projectify.lib.models import BaseModel
 
 from .const import TeamMemberRoles
+from .revision import bump_revision_trigger
 from .types import Pks
 from .workspace import Workspace
 
@@ -87,3 +88,8 @@ class TeamMember(BaseModel):
         """Meta."""
 
         unique_together = ("workspace", "user")
+        triggers = (
+            bump_revision_trigger(
+                table="workspace_workspace", ids="SELECT {row}.workspace_id"
+            ),
+        )
@@ -11,6 +11,8 @@ from django.utils.translation import gettext_lazy as _
 from projectify.lib.models import BaseModel
 from projectify.user.models import UserInvite
 
+from .revision import bump_revision_trigger
+
 if TYPE_CHECKING:
     from ..models import Workspace  # noqa
 
@@ -43,3 +45,8 @@ class TeamMemberInvite(BaseModel):
         """Meta."""
 
         unique_together = ("user_invite", "workspace")
+        triggers = (
+            bump_revision_trigger(
+                table="workspace_workspace", ids="SELECT {row}.workspace_id"
+            ),
+        )
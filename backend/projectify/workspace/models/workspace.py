@@ -11,11 +11,11 @@ from django.contrib.auth.models import AbstractBaseUser
 from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 
-import pgtrigger
-
 from projectify.lib.models import BaseModel, TitleDescriptionModel
 
 from ..types import WorkspaceQuota
+from .revision import stamp_revision_trigger
+from .task_number import task_number_sequence_triggers
 
 if TYPE_CHECKING:
     from django.db.models.fields.related import RelatedField  # noqa: F401
@@ -42,7 +42,15 @@ class Workspace(TitleDescriptionModel, BaseModel):
         null=True,
     )
 
-    highest_task_number = models.IntegerField(default=0)
+    # Maintained by triggers, see revision.py
+    revision = models.BigIntegerField(
+        default=0,
+        editable=False,
+        help_text=_(
+            "Increases whenever this workspace, its labels or team members "
+            "change"
+        ),
+    )
 
     # Optional annotation to show trial limits
     # Since it involves additional queries, it is None by default
@@ -72,17 +80,6 @@ class Workspace(TitleDescriptionModel, BaseModel):
         team_member.delete()
         return user
 
-    @transaction.atomic
-    def increment_highest_task_number(self) -> int:
-        """
-        Increment and return highest task number.
-
-        Atomic.
-        """
-        qs = Workspace.objects.filter(pk=self.pk).select_for_update()
-        qs.update(highest_task_number=models.F("highest_task_number") + 1)
-        return qs.get().highest_task_number
-
     def __str__(self) -> str:
         """Return title."""
         return self.title
@@ -103,22 +100,7 @@ class Workspace(TitleDescriptionModel, BaseModel):
         )
 
         triggers = (
-            pgtrigger.Trigger(
-                name="ensure_correct_highest_task_number",
-                when=pgtrigger.Before,
-                operation=pgtrigger.Update,
-                func="""
-              DECLARE
-                max_task_number   INTEGER;
-              BEGIN
-                SELECT MAX(workspace_task.number) INTO max_task_number
-                FROM workspace_task
-                WHERE workspace_task.workspace_id = NEW.id;
-                IF NEW.highest_task_number < max_task_number THEN
-                    RAISE EXCEPTION 'invalid highest_task_number:  \
-                    highest_task_number cannot be lower than a task number.';
-                END IF;
-                RETURN NEW;
-              END;""",
-            ),
+            stamp_revision_trigger(),
+            # Task numbers are allocated from a sequence, see task_number.py
+            *task_number_sequence_triggers(),
         )
@@ -120,6 +120,7 @@ rules.add_perm("workspace.create_workspace", rules.is_active)
 rules.add_perm("workspace.read_workspace", is_at_least_observer)
 rules.add_perm("workspace.update_workspace", is_at_least_owner)
 rules.add_perm("workspace.delete_workspace", is_at_least_owner)
+rules.add_perm("workspace.export_workspace", is_at_least_owner)
 
 # Team member invite
 rules.add_perm(
@@ -3,51 +3,210 @@
 # SPDX-FileCopyrightText: 2023 JWP Consulting GK
 """Project model selectors."""
 
-from typing import Optional
+import json
+from collections.abc import Mapping
+from typing import Any, Optional, Union
 from uuid import UUID
 
-from django.db.models import Count, Prefetch, Q, QuerySet
-from django.db.models.functions import NullIf
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Prefetch, QuerySet
 
+from projectify.lib.db import find_version
+from projectify.lib.serializers import FieldSelection
 from projectify.user.models import User
 from projectify.workspace.models.task import Task
 
 from ..models.project import Project
+from ..models.team_member import TeamMember
+from ..models.team_member_invite import TeamMemberInvite
+from .task import SUB_TASK_PROGRESS
+from .workspace import WORKSPACE_VERSION_SQL
 
-ProjectDetailQuerySet = Project.objects.prefetch_related(
-    "section_set",
-    Prefetch(
-        "section_set__task_set",
-        queryset=Task.objects.annotate(
-            sub_task_progress=Count(
-                "subtask",
-                filter=Q(subtask__done=True),
-            )
-            * 1.0
-            / NullIf(Count("subtask"), 0),
-        ).order_by("_order"),
+# What to prefetch for each relation ProjectDetailSerializer shows, by its
+# path in the output
+PROJECT_DETAIL_PREFETCHES: tuple[
+    tuple[str, Union[str, "Prefetch[Any]"]], ...
+] = (
+    ("workspace.labels", "workspace__label_set"),
+    (
+        "workspace.projects",
+        Prefetch(
+            "workspace__project_set",
+            queryset=Project.objects.filter(archived__isnull=True),
+        ),
+    ),
+    (
+        "workspace.team_members",
+        Prefetch(
+            "workspace__teammember_set",
+            queryset=TeamMember.objects.select_related("user"),
+        ),
+    ),
+    (
+        "workspace.team_member_invites",
+        Prefetch(
+            "workspace__teammemberinvite_set",
+            queryset=TeamMemberInvite.objects.select_related("user_invite"),
+        ),
+    ),
+    ("sections", "section_set"),
+    (
+        "sections.tasks",
+        Prefetch(
+            "section_set__task_set",
+            queryset=Task.objects.annotate(
+                sub_task_progress=SUB_TASK_PROGRESS,
+            ).order_by("_order"),
+        ),
     ),
-    "section_set__task_set__assignee",
-    "section_set__task_set__assignee__user",
-    "section_set__task_set__labels",
-    "workspace__label_set",
-    Prefetch(
-        "workspace__project_set",
-        queryset=Project.objects.filter(archived__isnull=True),
+    ("sections.tasks.assignee", "section_set__task_set__assignee"),
+    ("sections.tasks.assignee.user", "section_set__task_set__assignee__user"),
+    ("sections.tasks.labels", "section_set__task_set__labels"),
+)
+
+
+def project_detail_query_set(
+    selection: Optional[FieldSelection] = None,
+) -> QuerySet[Project]:
+    """
+    Return projects with everything ProjectDetailSerializer shows prefetched.
+
+    Relations that selection leaves out are not prefetched.
+    """
+    return Project.objects.prefetch_related(
+        *(
+            lookup
+            for path, lookup in PROJECT_DETAIL_PREFETCHES
+            if selection is None or selection.selects(path)
+        )
+    ).select_related("workspace")
+
+
+# Everything needed to serialize a project's workspace, but not its sections
+ProjectDetailWorkspaceQuerySet = project_detail_query_set(
+    FieldSelection(include=frozenset({"workspace"}))
+)
+
+ProjectDetailQuerySet = project_detail_query_set()
+
+# Build the same section and task representation that
+# ProjectDetailSectionSerializer produces, but inside PostgreSQL.
+#
+# - Keys are emitted in serializer field order.
+# - Datetimes are formatted like DRF's DateTimeField does for UTC, i.e.,
+#   isoformat() with microseconds only when non-zero and a trailing Z.
+# - sub_task_progress uses the same numeric division as the Django annotation,
+#   and is emitted with a trailing .0 when integral, so that it is decoded as
+#   a float.
+# - Assignees are serialized in Python once per team member and passed in as
+#   a JSON object mapping team member id -> assignee.
+PROJECT_SECTIONS_JSON_SQL = """
+WITH assignee AS (
+    SELECT key::bigint AS id, value
+    FROM json_each(%(assignees)s::json)
+)
+SELECT COALESCE(
+    json_agg(
+        json_build_object(
+            'uuid', section.uuid,
+            '_order', section._order,
+            'title', section.title,
+            'description', section.description,
+            'tasks', COALESCE(
+                (
+                    SELECT json_agg(
+                        json_build_object(
+                            'title', task.title,
+                            'uuid', task.uuid,
+                            'due_date',
+                            to_char(
+                                task.due_date AT TIME ZONE 'UTC',
+                                'YYYY-MM-DD"T"HH24:MI:SS'
+                            )
+                            || CASE
+                                WHEN to_char(task.due_date, 'US') = '000000'
+                                THEN ''
+                                ELSE to_char(task.due_date, '.US')
+                            END
+                            || 'Z',
+                            'number', task.number,
+                            'labels', COALESCE(
+                                (
+                                    SELECT json_agg(
+                                        json_build_object(
+                                            'name', label.name,
+                                            'color', label.color,
+                                            'uuid', label.uuid
+                                        )
+                                        ORDER BY label.modified DESC
+                                    )
+                                    FROM workspace_tasklabel AS task_label
+                                    INNER JOIN workspace_label AS label
+                                        ON label.id = task_label.label_id
+                                    WHERE task_label.task_id = task.id
+                                ),
+                                '[]'::json
+                            ),
+                            'assignee', assignee.value,
+                            'sub_task_progress', (
+                                progress::text
+                                || CASE
+                                    WHEN progress::text ~ '[.eE]' THEN ''
+                                    ELSE '.0'
+                                END
+                            )::json,
+                            'description', task.description
+                        )
+                        ORDER BY task._order
+                    )
+                    FROM workspace_task AS task
+                    CROSS JOIN LATERAL (
+                        SELECT (
+                            task.sub_task_done_count * 1.0
+                            / NULLIF(task.sub_task_count, 0)
+                        )::float8 AS progress
+                    ) AS sub_task_progress
+                    LEFT OUTER JOIN assignee
+                        ON assignee.id = task.assignee_id
+                    WHERE task.section_id = section.id
+                ),
+                '[]'::json
+            )
+        )
+        ORDER BY section._order
     ),
-    "workspace__teammember_set",
-    "workspace__teammember_set__user",
-    "workspace__teammemberinvite_set",
-).select_related(
-    "workspace",
+    '[]'::json
 )
+FROM workspace_section AS section
+WHERE section.project_id = %(project_id)s
+"""
+
+# A project's details contain its workspace's details, so anything changing
+# in the workspace changes the project's version too. Used for the ETag and
+# to cache serialized project details.
+PROJECT_VERSION_SQL = f"""
+SELECT project.revision || '-' || {WORKSPACE_VERSION_SQL}
+FROM workspace_project AS project
+INNER JOIN workspace_workspace AS workspace
+    ON workspace.id = project.workspace_id
+INNER JOIN workspace_teammember AS member
+    ON member.workspace_id = workspace.id
+WHERE project.uuid = %(project_uuid)s
+    AND project.archived IS NULL
+    AND member.user_id = %(user_id)s
+"""
 
 
 def project_find_by_workspace_uuid(
-    *, workspace_uuid: UUID, who: User, archived: Optional[bool] = None
+    *,
+    workspace_uuid: UUID,
+    who: User,
+    archived: Optional[bool] = None,
+    using: Optional[str] = None,
 ) -> QuerySet[Project]:
     """Find projects for a workspace."""
-    qs = Project.objects.filter(
+    qs = Project.objects.using(using).filter(
         workspace__users=who, workspace__uuid=workspace_uuid
     )
     if archived is not None:
@@ -61,12 +220,62 @@ def project_find_by_project_uuid(
     who: User,
     qs: Optional[QuerySet[Project]] = None,
     archived: bool = False,
+    using: Optional[str] = None,
 ) -> Optional[Project]:
     """Find a workspace by uuid for a given user."""
     qs = Project.objects.all() if qs is None else qs
+    if using is not None:
+        qs = qs.using(using)
     qs = qs.filter(archived__isnull=not archived)
     qs = qs.filter(workspace__users=who, uuid=project_uuid)
     try:
         return qs.get()
     except Project.DoesNotExist:
         return None
+
+
+def project_find_sections_as_json(
+    *, project: Project, assignees: Mapping[int, Any]
+) -> list[Any]:
+    """
+    Return a project's sections, tasks and labels, serialized by PostgreSQL.
+
+    assignees maps team member pks to their serialized representation. A task
+    assigned to a team member not contained in assignees will have its
+    assignee set to None. Reads from the database the project was read from.
+    """
+    using = project._state.db or DEFAULT_DB_ALIAS
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            PROJECT_SECTIONS_JSON_SQL,
+            {
+                "assignees": json.dumps(
+                    {str(pk): value for pk, value in assignees.items()},
+                    cls=DjangoJSONEncoder,
+                ),
+                "project_id": project.pk,
+            },
+        )
+        row = cursor.fetchone()
+    assert row is not None
+    sections: list[Any] = row[0]
+    return sections
+
+
+def project_find_version(
+    *,
+    project_uuid: UUID,
+    who: User,
+    using: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Return a version of an unarchived project's details.
+
+    The version changes whenever the project's details change. Returns None
+    if the user can't see the project.
+    """
+    return find_version(
+        PROJECT_VERSION_SQL,
+        {"project_uuid": project_uuid, "user_id": who.pk},
+        using=using,
+    )
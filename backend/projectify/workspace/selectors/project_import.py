@@ -0,0 +1,20 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Project import selectors."""
+
+from typing import Optional
+from uuid import UUID
+
+from projectify.user.models import User
+
+from ..models.project_import import ProjectImport
+
+
+def project_import_find_by_project_import_uuid(
+    *, who: User, project_import_uuid: UUID
+) -> Optional[ProjectImport]:
+    """Find a project import by uuid for a given user."""
+    return ProjectImport.objects.filter_for_user_and_uuid(
+        user=who, uuid=project_import_uuid
+    ).first()
@@ -106,27 +106,50 @@ def get_workspace_quota_for_resource(
 def get_workspace_resource_count(
     resource: Resource, workspace: Workspace
 ) -> int:
-    """Return resource count for a specific resource."""
+    """
+    Return resource count for a specific resource.
+
+    Count in the database that the workspace was read from.
+    """
+    using = workspace._state.db
     match resource:
         case "ChatMessage":
             # XXX At the moment, chat messages are not supported
-            return ChatMessage.objects.filter(
-                task__workspace=workspace
-            ).count()
+            return (
+                ChatMessage.objects.using(using)
+                .filter(task__workspace=workspace)
+                .count()
+            )
         case "Label":
-            return Label.objects.filter(workspace=workspace).count()
+            return (
+                Label.objects.using(using).filter(workspace=workspace).count()
+            )
         case "SubTask":
-            return SubTask.objects.filter(task__workspace=workspace).count()
+            return (
+                SubTask.objects.using(using)
+                .filter(task__workspace=workspace)
+                .count()
+            )
         case "Task":
-            return Task.objects.filter(
-                section__project__workspace=workspace
-            ).count()
+            return (
+                Task.objects.using(using)
+                .filter(section__project__workspace=workspace)
+                .count()
+            )
         case "TaskLabel":
-            return TaskLabel.objects.filter(label__workspace=workspace).count()
+            return (
+                TaskLabel.objects.using(using)
+                .filter(label__workspace=workspace)
+                .count()
+            )
         case "Project":
             return workspace.project_set.count()
         case "Section":
-            return Section.objects.filter(project__workspace=workspace).count()
+            return (
+                Section.objects.using(using)
+                .filter(project__workspace=workspace)
+                .count()
+            )
         case "TeamMemberAndInvite":
             user_count = workspace.users.count()
             invite_count = workspace.teammemberinvite_set.filter(
@@ -145,6 +168,16 @@ def workspace_quota_for(*, resource: Resource, workspace: Workspace) -> Quota:
     return Quota(current=current, limit=limit, can_create_more=current < limit)
 
 
+def workspace_quota_allows(
+    *, resource: Resource, workspace: Workspace, count: int
+) -> bool:
+    """Return True if count more of a resource can be created."""
+    quota = workspace_quota_for(resource=resource, workspace=workspace)
+    if quota.current is None or quota.limit is None:
+        return True
+    return quota.current + count <= quota.limit
+
+
 def workspace_get_all_quotas(workspace: Workspace) -> WorkspaceQuota:
     """Calculate all quotas for a workspace. Expensive calculation."""
     mk = partial(workspace_quota_for, workspace=workspace)
@@ -28,14 +28,17 @@ def section_find_for_user_and_uuid(
     section_uuid: UUID,
     user: User,
     qs: Optional[QuerySet[Section]] = None,
+    using: Optional[str] = None,
 ) -> Optional[Section]:
     """
     Find a section given a UUID and a user.
 
-    Allows specifying optional base queryset.
+    Allows specifying optional base queryset and database.
     """
     if qs is None:
-        qs = Section.objects
+        qs = Section.objects.all()
+    if using is not None:
+        qs = qs.using(using)
     try:
         return qs.filter(
             project__workspace__users=user,
@@ -3,16 +3,66 @@
 # SPDX-FileCopyrightText: 2023 JWP Consulting GK
 """Workspace selectors."""
 
+from collections.abc import Sequence
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from django.db.models import Count, Prefetch, Q, QuerySet
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Exists, F, OuterRef, Prefetch, Q, QuerySet
 from django.db.models.functions import NullIf
 
+from projectify.lib.db import find_weak_etag, row_versions_sql
 from projectify.user.models import User
 
 from ..models.chat_message import ChatMessage
-from ..models.task import Task
+from ..models.task import SEARCH_CONFIG, Task
+from ..models.task_label import TaskLabel
+from ..models.workspace import Workspace
+
+# Share of sub tasks that are done, None if a task has no sub tasks
+SUB_TASK_PROGRESS = (
+    F("sub_task_done_count") * 1.0 / NullIf(F("sub_task_count"), 0)
+)
+
+# Everything that TaskDetailSerializer output depends on, given a row named
+# task
+TASK_ROW_VERSIONS_SQL = row_versions_sql(
+    [
+        "workspace_task AS x WHERE x.id = task.id",
+        "workspace_section AS x WHERE x.id = task.section_id",
+        """workspace_project AS x
+        INNER JOIN workspace_section AS section ON section.project_id = x.id
+        WHERE section.id = task.section_id""",
+        "workspace_workspace AS x WHERE x.id = task.workspace_id",
+        "workspace_subtask AS x WHERE x.task_id = task.id",
+        "workspace_tasklabel AS x WHERE x.task_id = task.id",
+        """workspace_label AS x
+        INNER JOIN workspace_tasklabel AS task_label
+            ON task_label.label_id = x.id
+        WHERE task_label.task_id = task.id""",
+        "workspace_chatmessage AS x WHERE x.task_id = task.id",
+        # Assignee and chat message authors
+        """workspace_teammember AS x
+        WHERE x.id = task.assignee_id OR x.id IN (
+            SELECT author_id FROM workspace_chatmessage WHERE task_id = task.id
+        )""",
+        """user_user AS x
+        INNER JOIN workspace_teammember AS team_member
+            ON team_member.user_id = x.id
+        WHERE team_member.id = task.assignee_id OR team_member.id IN (
+            SELECT author_id FROM workspace_chatmessage WHERE task_id = task.id
+        )""",
+    ]
+)
+
+TASK_ETAG_SQL = f"""
+SELECT {TASK_ROW_VERSIONS_SQL}
+FROM workspace_task AS task
+INNER JOIN workspace_teammember AS member
+    ON member.workspace_id = task.workspace_id
+WHERE task.uuid = %(task_uuid)s AND member.user_id = %(user_id)s
+"""
 
 TaskDetailQuerySet: QuerySet[Task] = (
     Task.objects.select_related(
@@ -34,23 +84,24 @@ TaskDetailQuerySet: QuerySet[Task] = (
         ),
     )
     .annotate(
-        sub_task_progress=Count(
-            "subtask",
-            filter=Q(subtask__done=True),
-        )
-        * 1.0
-        / NullIf(Count("subtask"), 0),
+        sub_task_progress=SUB_TASK_PROGRESS,
     )
 )
 
 
 def task_find_by_task_uuid(
-    *, task_uuid: UUID, who: User, qs: Optional[QuerySet[Task]] = None
+    *,
+    task_uuid: UUID,
+    who: User,
+    qs: Optional[QuerySet[Task]] = None,
+    using: Optional[str] = None,
 ) -> Optional[Task]:
     """Find a task given a user and uuid."""
     # Special care is needed, one can't write qs or Task.objects since that
     # would cause the given qs to be prematurely evaluated
-    qs = Task.objects if qs is None else qs
+    qs = Task.objects.all() if qs is None else qs
+    if using is not None:
+        qs = qs.using(using)
     try:
         return qs.get(
             section__project__workspace__users=who,
@@ -58,3 +109,146 @@ def task_find_by_task_uuid(
         )
     except Task.DoesNotExist:
         return None
+
+
+def task_find_by_task_uuids(
+    *, task_uuids: Sequence[UUID], who: User
+) -> QuerySet[Task]:
+    """Find all tasks given a user and uuids. Unknown uuids are skipped."""
+    return Task.objects.filter(
+        section__project__workspace__users=who,
+        uuid__in=task_uuids,
+    )
+
+
+def task_find_etag(
+    *, task_uuid: UUID, who: User, using: Optional[str] = None
+) -> Optional[str]:
+    """
+    Return an ETag for a task's details.
+
+    Returns None if the user can't see the task.
+    """
+    return find_weak_etag(
+        TASK_ETAG_SQL,
+        {"task_uuid": task_uuid, "user_id": who.pk},
+        using=using,
+    )
+
+
+def task_search(
+    *,
+    who: User,
+    workspace: Workspace,
+    query: str,
+    using: Optional[str] = None,
+) -> QuerySet[Task]:
+    """
+    Search tasks in a workspace, best matches first.
+
+    Matches task titles and descriptions, sub task titles and chat messages,
+    with web search syntax, e.g., "quoted phrases", or and -excluded. Tasks in
+    archived projects are left out.
+    """
+    search_query = SearchQuery(
+        query, config=SEARCH_CONFIG, search_type="websearch"
+    )
+    qs = Task.objects.all() if using is None else Task.objects.using(using)
+    return (
+        qs.filter(
+            workspace=workspace,
+            workspace__users=who,
+            section__project__archived__isnull=True,
+            search_vector=search_query,
+        )
+        .select_related("section__project", "assignee__user")
+        .prefetch_related("labels")
+        .annotate(rank=SearchRank(F("search_vector"), search_query))
+        .order_by("-rank", "-number")
+    )
+
+
+def task_filter_for_workspace(
+    *,
+    who: User,
+    workspace: Workspace,
+    assignee_uuid: Optional[UUID] = None,
+    label_uuids: Optional[Sequence[UUID]] = None,
+    due_before: Optional[datetime] = None,
+    section_uuid: Optional[UUID] = None,
+    after_number: Optional[int] = None,
+    using: Optional[str] = None,
+) -> QuerySet[Task]:
+    """
+    Filter tasks in a workspace, in task number order.
+
+    Tasks match when they have any of the given labels. Tasks in archived
+    projects are left out. To continue after a page of tasks, pass the number
+    of the last task on it as after_number.
+    """
+    qs = Task.objects.all() if using is None else Task.objects.using(using)
+    qs = qs.filter(
+        workspace=workspace,
+        workspace__users=who,
+        section__project__archived__isnull=True,
+    )
+    if assignee_uuid is not None:
+        qs = qs.filter(assignee__uuid=assignee_uuid)
+    if label_uuids:
+        qs = qs.filter(
+            Exists(
+                TaskLabel.objects.filter(
+                    task=OuterRef("pk"), label__uuid__in=label_uuids
+                )
+            )
+        )
+    if due_before is not None:
+        qs = qs.filter(due_date__lt=due_before)
+    if section_uuid is not None:
+        qs = qs.filter(section__uuid=section_uuid)
+    if after_number is not None:
+        qs = qs.filter(number__gt=after_number)
+    return (
+        qs.select_related("section__project", "assignee__user")
+        .prefetch_related("labels")
+        .order_by("number")
+    )
+
+
+def task_find_assigned_to_user(
+    *,
+    who: User,
+    due_before: Optional[datetime] = None,
+    after: Optional[Task] = None,
+    using: Optional[str] = None,
+) -> QuerySet[Task]:
+    """
+    Find tasks assigned to a user in any workspace, soonest due first.
+
+    Tasks without due date come last. Tasks in archived projects are left
+    out. To continue after a page of tasks, pass the last task on it as after.
+    """
+    qs = Task.objects.all() if using is None else Task.objects.using(using)
+    qs = qs.filter(
+        assignee__user=who,
+        section__project__archived__isnull=True,
+    )
+    if due_before is not None:
+        qs = qs.filter(due_date__lt=due_before)
+    if after is not None and after.due_date is None:
+        qs = qs.filter(due_date__isnull=True, uuid__gt=after.uuid)
+    elif after is not None:
+        qs = qs.filter(
+            Q(due_date__gt=after.due_date)
+            | Q(due_date=after.due_date, uuid__gt=after.uuid)
+            | Q(due_date__isnull=True)
+        )
+    return (
+        qs.select_related(
+            "workspace",
+            "section__project",
+            "assignee__user",
+        )
+        .prefetch_related("labels")
+        .order_by(F("due_date").asc(nulls_last=True), "uuid")
+    )
@@ -3,6 +3,9 @@
 # SPDX-FileCopyrightText: 2023 JWP Consulting GK
 """Team member selectors."""
 
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Optional
 from uuid import UUID
 
@@ -10,24 +13,61 @@ from projectify.user.models import User
 from projectify.workspace.models.team_member import TeamMember
 from projectify.workspace.models.workspace import Workspace
 
+CacheKey = tuple[int, int, Optional[str]]
+
+# Team members found by team_member_find_for_workspace, while cached
+_cache: ContextVar[Optional[dict[CacheKey, Optional[TeamMember]]]] = (
+    ContextVar("team_member_cache", default=None)
+)
+
+
+@contextmanager
+def team_member_cache() -> Iterator[None]:
+    """
+    Remember the team members found by team_member_find_for_workspace.
+
+    Permission checks look up the user's team member, and with it their
+    role, every time. Within this block, that happens once per workspace.
+    Team members that are changed within the block are not seen anymore.
+    """
+    if _cache.get() is not None:
+        yield
+        return
+    token = _cache.set({})
+    try:
+        yield
+    finally:
+        _cache.reset(token)
+
 
 def team_member_find_for_workspace(
-    *, user: User, workspace: Workspace
+    *, user: User, workspace: Workspace, using: Optional[str] = None
 ) -> Optional[TeamMember]:
     """Find a team member."""
+    cache = _cache.get()
+    key = (user.pk, workspace.pk, using)
+    if cache is not None and key in cache:
+        return cache[key]
     try:
-        return TeamMember.objects.get(workspace=workspace, user=user)
+        team_member: Optional[TeamMember] = TeamMember.objects.using(
+            using
+        ).get(workspace=workspace, user=user)
     except TeamMember.DoesNotExist:
-        return None
+        team_member = None
+    if cache is not None:
+        cache[key] = team_member
+    return team_member
 
 
 def team_member_find_by_team_member_uuid(
-    *, who: User, team_member_uuid: UUID
+    *, who: User, team_member_uuid: UUID, using: Optional[str] = None
 ) -> Optional[TeamMember]:
     """Find team member by UUID according to user access permissions."""
     try:
-        return TeamMember.objects.select_related("user").get(
-            workspace__users=who, uuid=team_member_uuid
+        return (
+            TeamMember.objects.using(using)
+            .select_related("user")
+            .get(workspace__users=who, uuid=team_member_uuid)
         )
     except TeamMember.DoesNotExist:
         return None
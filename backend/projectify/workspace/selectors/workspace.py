@@ -4,11 +4,13 @@
 """Workspace model selectors."""
 
 import logging
-from typing import Optional
+from typing import Any, Optional, Union
 from uuid import UUID
 
 from django.db.models import Prefetch, QuerySet
 
+from projectify.lib.db import find_weak_etag, row_versions_sql
+from projectify.lib.serializers import FieldSelection
 from projectify.user.models import User
 
 from ..models.project import Project
@@ -18,38 +20,111 @@ from ..models.workspace import Workspace
 
 logger = logging.getLogger(__name__)
 
-WorkspaceDetailQuerySet = Workspace.objects.prefetch_related(
-    "label_set",
-).prefetch_related(
-    Prefetch(
-        "project_set",
-        queryset=Project.objects.filter(archived__isnull=True),
+# Everything that WorkspaceDetailSerializer and ProjectDetailSerializer
+# output depends on, given a row named workspace. Quotas count tasks, sub
+# tasks and so on in the whole workspace, which the revisions of its projects
+# cover. Projects don't bump the workspace's revision, see
+# models/revision.py. A project's revision only ever grows, so the sum of
+# them grows whenever one changes. Their maximum would not, if a transaction
+# that took a lower revision commits last. Customers, users and user invites
+# don't bump revisions.
+WORKSPACE_VERSION_SQL = (
+    "workspace.revision || '-' || "
+    "(SELECT count(*) || ':' || coalesce(sum(project.revision), 0) "
+    "FROM workspace_project AS project "
+    "WHERE project.workspace_id = workspace.id) || '-' || "
+) + row_versions_sql(
+    [
+        "corporate_customer AS x WHERE x.workspace_id = workspace.id",
+        """user_user AS x
+        INNER JOIN workspace_teammember AS team_member
+            ON team_member.user_id = x.id
+        WHERE team_member.workspace_id = workspace.id""",
+        """user_userinvite AS x
+        INNER JOIN workspace_teammemberinvite AS invite
+            ON invite.user_invite_id = x.id
+        WHERE invite.workspace_id = workspace.id""",
+    ]
+)
+
+WORKSPACE_ETAG_SQL = f"""
+SELECT {WORKSPACE_VERSION_SQL}
+FROM workspace_workspace AS workspace
+INNER JOIN workspace_teammember AS member
+    ON member.workspace_id = workspace.id
+WHERE workspace.uuid = %(workspace_uuid)s AND member.user_id = %(user_id)s
+"""
+
+# What to prefetch for each relation WorkspaceDetailSerializer shows, by its
+# path in the output
+WORKSPACE_DETAIL_PREFETCHES: tuple[
+    tuple[str, Union[str, "Prefetch[Any]"]], ...
+] = (
+    ("labels", "label_set"),
+    (
+        "projects",
+        Prefetch(
+            "project_set",
+            queryset=Project.objects.filter(archived__isnull=True),
+        ),
     ),
-    Prefetch(
-        "teammember_set",
-        queryset=TeamMember.objects.select_related("user"),
+    (
+        "team_members",
+        Prefetch(
+            "teammember_set",
+            queryset=TeamMember.objects.select_related("user"),
+        ),
     ),
-    Prefetch(
-        "teammemberinvite_set",
-        # Is there a privacy impact in having a workspace be able to resolve
-        # ws -> ws user invite -> user invite?
-        # Is there a way one can smuggle a resolution like
-        # ws -> ws user invite -> user invite -> other ws's user invite ->
-        # other ws and so on?
-        # Perhaps only if RCE exists, but then we have different problems...
-        queryset=TeamMemberInvite.objects.select_related("user_invite").filter(
-            redeemed=False
+    (
+        "team_member_invites",
+        Prefetch(
+            "teammemberinvite_set",
+            # Is there a privacy impact in having a workspace be able to
+            # resolve ws -> ws user invite -> user invite?
+            # Is there a way one can smuggle a resolution like
+            # ws -> ws user invite -> user invite -> other ws's user invite ->
+            # other ws and so on?
+            # Perhaps only if RCE exists, but then we have different
+            # problems...
+            queryset=TeamMemberInvite.objects.select_related(
+                "user_invite"
+            ).filter(redeemed=False),
         ),
     ),
 )
 
 
+def workspace_detail_query_set(
+    selection: Optional[FieldSelection] = None,
+) -> QuerySet[Workspace]:
+    """
+    Return workspaces with what WorkspaceDetailSerializer shows prefetched.
+
+    Relations that selection leaves out are not prefetched.
+    """
+    return Workspace.objects.prefetch_related(
+        *(
+            lookup
+            for path, lookup in WORKSPACE_DETAIL_PREFETCHES
+            if selection is None or selection.selects(path)
+        )
+    )
+
+
+WorkspaceDetailQuerySet = workspace_detail_query_set()
+
+
 def workspace_find_for_user(
-    *, who: User, qs: Optional[QuerySet[Workspace]] = None
+    *,
+    who: User,
+    qs: Optional[QuerySet[Workspace]] = None,
+    using: Optional[str] = None,
 ) -> QuerySet[Workspace]:
-    """Filter by user."""
+    """Filter by user. Read from the database given by using, if any."""
     if qs is None:
         qs = Workspace.objects.all()
+    if using is not None:
+        qs = qs.using(using)
     return qs.filter(users=who)
 
 
@@ -58,12 +133,31 @@ def workspace_find_by_workspace_uuid(
     workspace_uuid: UUID,
     who: User,
     qs: Optional[QuerySet[Workspace]] = None,
+    using: Optional[str] = None,
 ) -> Optional[Workspace]:
     """Find a workspace by uuid for a given user."""
-    qs = workspace_find_for_user(who=who, qs=qs)
+    qs = workspace_find_for_user(who=who, qs=qs, using=using)
     qs = qs.filter(uuid=workspace_uuid)
     try:
         return qs.get()
     except Workspace.DoesNotExist:
         logger.warning("No workspace found for uuid %s", workspace_uuid)
         return None
+
+
+def workspace_find_etag(
+    *,
+    workspace_uuid: UUID,
+    who: User,
+    using: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Return an ETag for a workspace's details, as a given user sees them.
+
+    Returns None if the user can't see the workspace.
+    """
+    return find_weak_etag(
+        WORKSPACE_ETAG_SQL,
+        {"workspace_uuid": workspace_uuid, "user_id": who.pk},
+        using=using,
+    )
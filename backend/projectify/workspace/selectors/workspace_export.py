@@ -0,0 +1,288 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Workspace export selectors.
+
+Rows are read in batches, walking each table by primary key, so that no
+more than one batch is held in memory, however large the workspace. Sub
+tasks and chat messages are read for one batch of tasks at a time.
+
+All batches are read in one REPEATABLE READ transaction, so that an export
+is a snapshot of the workspace at the time its first batch is read. Rows
+written while the export runs are left out, and records still only refer to
+records that are exported.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Optional, TypeAlias
+
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import F, OuterRef
+
+from projectify.lib.auth import validate_perm
+from projectify.user.models import User
+
+from ..models.chat_message import ChatMessage
+from ..models.label import Label
+from ..models.project import Project
+from ..models.section import Section
+from ..models.sub_task import SubTask
+from ..models.task import Task
+from ..models.task_label import TaskLabel
+from ..models.team_member import TeamMember
+from ..models.workspace import Workspace
+
+if TYPE_CHECKING:
+    from django.db.models.query import ValuesQuerySet
+
+# Rows read per query
+WORKSPACE_EXPORT_BATCH_SIZE = 1000
+
+# Columns of task rows, in order
+WORKSPACE_EXPORT_TASK_COLUMNS = (
+    "project",
+    "section",
+    "number",
+    "title",
+    "description",
+    "labels",
+    "assignee",
+    "due_date",
+    "sub_tasks",
+)
+
+Record = dict[str, Any]
+Records: TypeAlias = "ValuesQuerySet[Any, Record]"
+
+
+@contextmanager
+def _snapshot(using: Optional[str]) -> Iterator[None]:
+    """
+    Read everything inside from one snapshot of the database.
+
+    Opens a read only REPEATABLE READ transaction. Inside a transaction
+    already, that transaction is used as is.
+    """
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    if connection.in_atomic_block:
+        yield
+        return
+    with transaction.atomic(using=using):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY"
+            )
+        yield
+
+
+def _keyset(qs: Records, *, batch_size: int) -> Iterator[list[Record]]:
+    """
+    Yield the rows of a values() query set in batches, ordered by id.
+
+    qs must include id in its values.
+    """
+    last = 0
+    while True:
+        batch = list(
+            qs.filter(id__gt=last)
+            .order_by("id")[:batch_size]
+            .iterator(chunk_size=batch_size)
+        )
+        if not batch:
+            return
+        # Read before the caller gets to change the rows
+        last = batch[-1]["id"]
+        yield batch
+        if len(batch) < batch_size:
+            return
+
+
+def _records(kind: str, batch: list[Record]) -> list[Record]:
+    """Tag rows with their kind, dropping their database ids."""
+    for row in batch:
+        del row["id"]
+    return [{"type": kind, **row} for row in batch]
+
+
+def _workspace_export_records(
+    *, workspace: Workspace, using: Optional[str], batch_size: int
+) -> Iterator[list[Record]]:
+    """Yield batches of records, see workspace_export_records."""
+    with _snapshot(using):
+        yield [
+            {
+                "type": "workspace",
+                "uuid": workspace.uuid,
+                "title": workspace.title,
+                "description": workspace.description,
+                "created": workspace.created,
+            }
+        ]
+        queries: dict[str, Records] = {
+            "label": Label.objects.filter(workspace=workspace).values(
+                "id", "uuid", "name", "color"
+            ),
+            "team_member": TeamMember.objects.filter(
+                workspace=workspace
+            ).values(
+                "id", "uuid", "role", "job_title", email=F("user__email")
+            ),
+            "project": Project.objects.filter(workspace=workspace).values(
+                "id", "uuid", "title", "description", "due_date", "archived"
+            ),
+            "section": Section.objects.filter(
+                project__workspace=workspace
+            ).values(
+                "id",
+                "uuid",
+                "title",
+                "description",
+                project_uuid=F("project__uuid"),
+                order=F("_order"),
+            ),
+        }
+        for kind, qs in queries.items():
+            for batch in _keyset(qs.using(using), batch_size=batch_size):
+                yield _records(kind, batch)
+
+        tasks = Task.objects.using(using).filter(workspace=workspace)
+        labels = TaskLabel.objects.filter(task=OuterRef("id")).values(
+            "label__uuid"
+        )
+        for batch in _keyset(
+            tasks.values(
+                "id",
+                "uuid",
+                "number",
+                "title",
+                "description",
+                "due_date",
+                "created",
+                "modified",
+                section_uuid=F("section__uuid"),
+                order=F("_order"),
+                assignee_email=F("assignee__user__email"),
+                label_uuids=ArraySubquery(labels),
+            ),
+            batch_size=batch_size,
+        ):
+            task_ids = [task["id"] for task in batch]
+            yield _records("task", batch)
+            related: dict[str, Records] = {
+                "sub_task": SubTask.objects.filter(task__in=task_ids).values(
+                    "id",
+                    "uuid",
+                    "title",
+                    "description",
+                    "done",
+                    task_uuid=F("task__uuid"),
+                    order=F("_order"),
+                ),
+                "chat_message": ChatMessage.objects.filter(
+                    task__in=task_ids
+                ).values(
+                    "id",
+                    "uuid",
+                    "text",
+                    "created",
+                    task_uuid=F("task__uuid"),
+                    author_email=F("author__user__email"),
+                ),
+            }
+            for kind, qs in related.items():
+                for related_batch in _keyset(
+                    qs.using(using), batch_size=batch_size
+                ):
+                    yield _records(kind, related_batch)
+
+
+def workspace_export_records(
+    *,
+    who: User,
+    workspace: Workspace,
+    using: Optional[str] = None,
+    batch_size: int = WORKSPACE_EXPORT_BATCH_SIZE,
+) -> Iterator[list[Record]]:
+    """
+    Return an iterator over everything in a workspace, in batches.
+
+    Each record has a type: workspace, label, team_member, project, section,
+    task, sub_task or chat_message. Records refer to each other by uuid, as
+    in section_uuid, and come after the records they refer to.
+    """
+    validate_perm("workspace.export_workspace", who, workspace)
+    return _workspace_export_records(
+        workspace=workspace, using=using, batch_size=batch_size
+    )
+
+
+def _workspace_export_task_rows(
+    *, workspace: Workspace, using: Optional[str], batch_size: int
+) -> Iterator[list[Record]]:
+    """Yield batches of task rows, see workspace_export_task_rows."""
+    labels = (
+        TaskLabel.objects.filter(task=OuterRef("id"))
+        .order_by("label__name")
+        .values("label__name")
+    )
+    sub_tasks = (
+        SubTask.objects.filter(task=OuterRef("id"))
+        .order_by("_order")
+        .values("title")
+    )
+    qs = (
+        Task.objects.using(using)
+        .filter(workspace=workspace)
+        .values(
+            "id",
+            "number",
+            "title",
+            "description",
+            "due_date",
+            project_title=F("section__project__title"),
+            section_title=F("section__title"),
+            assignee_email=F("assignee__user__email"),
+            label_names=ArraySubquery(labels),
+            sub_task_titles=ArraySubquery(sub_tasks),
+        )
+    )
+    with _snapshot(using):
+        for batch in _keyset(qs, batch_size=batch_size):
+            yield [
+                {
+                    "project": row["project_title"],
+                    "section": row["section_title"],
+                    "number": row["number"],
+                    "title": row["title"],
+                    "description": row["description"],
+                    "labels": ", ".join(row["label_names"]),
+                    "assignee": row["assignee_email"],
+                    "due_date": row["due_date"]
+                    and row["due_date"].isoformat(),
+                    "sub_tasks": "\n".join(row["sub_task_titles"]),
+                }
+                for row in batch
+            ]
+
+
+def workspace_export_task_rows(
+    *,
+    who: User,
+    workspace: Workspace,
+    using: Optional[str] = None,
+    batch_size: int = WORKSPACE_EXPORT_BATCH_SIZE,
+) -> Iterator[list[Record]]:
+    """
+    Return an iterator over a workspace's tasks as flat rows, in batches.
+
+    Rows have the columns a project import reads, see
+    services/project_import.py, plus the project and task number. Labels
+    are separated by commas, and sub task titles by line breaks.
+    """
+    validate_perm("workspace.export_workspace", who, workspace)
+    return _workspace_export_task_rows(
+        workspace=workspace, using=using, batch_size=batch_size
+    )
@@ -3,14 +3,18 @@
 # SPDX-FileCopyrightText: 2023-2024 JWP Consulting GK
 """Project serializers."""
 
+from typing import Any
+
 from rest_framework import serializers
 
+from projectify.lib.serializers import CompiledSerializerMixin
 from projectify.user.serializers import UserSerializer
 
 from ..models.project import Project
 from ..models.section import Section
 from ..models.task import Task
 from ..models.team_member import TeamMember
+from ..selectors.project import project_find_sections_as_json
 from ..serializers.base import LabelBaseSerializer, ProjectBaseSerializer
 from ..serializers.workspace import WorkspaceDetailSerializer
 
@@ -90,7 +94,7 @@ class ProjectDetailSectionSerializer(serializers.ModelSerializer[Section]):
         )
 
 
-class ProjectDetailSerializer(ProjectBaseSerializer):
+class ProjectDetailSerializer(CompiledSerializerMixin, ProjectBaseSerializer):
     """
     Project serializer.
 
@@ -116,3 +120,34 @@ class ProjectDetailSerializer(ProjectBaseSerializer):
             "sections",
             "workspace",
         )
+
+
+class ProjectDetailAggregateSerializer(ProjectBaseSerializer):
+    """
+    Project serializer that has PostgreSQL aggregate sections and tasks.
+
+    Produces the same output as ProjectDetailSerializer, but instead of
+    prefetching sections, tasks, labels and assignees and serializing them
+    one by one, they are fetched as a single JSON document. Use with
+    ProjectDetailWorkspaceQuerySet.
+    """
+
+    sections = serializers.SerializerMethodField()
+
+    workspace = WorkspaceDetailSerializer(read_only=True)
+
+    def get_sections(self, obj: Project) -> list[Any]:
+        """Return sections aggregated by the database."""
+        assignees = {
+            team_member.pk: ProjectTaskAssigneeSerializer(
+                instance=team_member
+            ).data
+            for team_member in obj.workspace.teammember_set.all()
+        }
+        return project_find_sections_as_json(project=obj, assignees=assignees)
+
+    class Meta(ProjectBaseSerializer.Meta):
+        """Meta."""
+
+        model = Project
+        fields = ProjectDetailSerializer.Meta.fields
@@ -0,0 +1,54 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Project import serializers."""
+
+from rest_framework import serializers
+
+from ..models.project_import import ProjectImport
+
+
+class ProjectImportSubTaskSerializer(serializers.Serializer):
+    """Validate a sub task of an imported task."""
+
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField(
+        required=False, allow_blank=True, allow_null=True
+    )
+    done = serializers.BooleanField(default=False)
+
+
+class ProjectImportRowSerializer(serializers.Serializer):
+    """Validate one row of an imported file, i.e. a single task."""
+
+    section = serializers.CharField(max_length=255)
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField(
+        required=False, allow_blank=True, allow_null=True
+    )
+    labels = serializers.ListField(
+        child=serializers.CharField(max_length=255), default=list
+    )
+    assignee = serializers.EmailField(required=False, allow_null=True)
+    due_date = serializers.DateTimeField(required=False, allow_null=True)
+    sub_tasks = ProjectImportSubTaskSerializer(many=True, default=list)
+
+
+class ProjectImportSerializer(serializers.ModelSerializer[ProjectImport]):
+    """Serialize a project import and how far it has come."""
+
+    class Meta:
+        """Meta."""
+
+        model = ProjectImport
+        fields = (
+            "uuid",
+            "format",
+            "status",
+            "rows",
+            "tasks",
+            "errors",
+            "created",
+            "modified",
+        )
+        read_only_fields = fields
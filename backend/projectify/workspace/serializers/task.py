@@ -6,6 +6,8 @@
 from rest_framework import serializers
 
 from projectify.user.serializers import UserSerializer
+from projectify.workspace.models.project import Project
+from projectify.workspace.models.section import Section
 from projectify.workspace.models.team_member import TeamMember
 
 from . import base
@@ -48,3 +50,100 @@ class TaskWithSubTaskSerializer(base.TaskBaseSerializer):
             "labels",
             "assignee",
         )
+
+
+class TaskListSectionSerializer(serializers.ModelSerializer[Section]):
+    """Serialize where a task is, for lists spanning several projects."""
+
+    class TaskListProjectSerializer(serializers.ModelSerializer[Project]):
+        """Serialize a project's title and uuid."""
+
+        class Meta:
+            """Meta."""
+
+            model = Project
+            fields = (
+                "title",
+                "uuid",
+            )
+
+    project = TaskListProjectSerializer(read_only=True)
+
+    class Meta:
+        """Meta."""
+
+        model = Section
+        fields = (
+            "title",
+            "uuid",
+            "project",
+        )
+
+
+class TaskListSerializer(base.TaskBaseSerializer):
+    """Serialize a task in lists spanning several sections or projects."""
+
+    labels = base.LabelBaseSerializer(many=True, read_only=True)
+    assignee = AssigneeSerializer(read_only=True, allow_null=True)
+    section = TaskListSectionSerializer(read_only=True)
+
+    class Meta(base.TaskBaseSerializer.Meta):
+        """Meta."""
+
+        fields = (
+            *base.TaskBaseSerializer.Meta.fields,
+            "labels",
+            "assignee",
+            "section",
+        )
+
+
+class TaskListPageSerializer(serializers.Serializer):
+    """Serialize a page of tasks."""
+
+    tasks = TaskListSerializer(many=True, read_only=True)
+    next_cursor = serializers.IntegerField(allow_null=True, read_only=True)
+
+
+class UserTasksProjectSerializer(serializers.Serializer):
+    """Serialize a project together with a user's tasks in it."""
+
+    title = serializers.CharField(read_only=True)
+    uuid = serializers.UUIDField(read_only=True)
+    tasks = TaskListSerializer(many=True, read_only=True)
+
+
+class UserTasksWorkspaceSerializer(serializers.Serializer):
+    """Serialize a workspace together with projects containing user tasks."""
+
+    title = serializers.CharField(read_only=True)
+    uuid = serializers.UUIDField(read_only=True)
+    projects = UserTasksProjectSerializer(many=True, read_only=True)
+
+
+class UserTasksPageSerializer(serializers.Serializer):
+    """Serialize a page of a user's tasks, grouped by workspace and project."""
+
+    workspaces = UserTasksWorkspaceSerializer(many=True, read_only=True)
+    next_cursor = serializers.UUIDField(allow_null=True, read_only=True)
+
+
+class TaskSearchResultSerializer(TaskListSerializer):
+    """Serialize a task found by searching, with its rank."""
+
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(TaskListSerializer.Meta):
+        """Meta."""
+
+        fields = (
+            *TaskListSerializer.Meta.fields,
+            "rank",
+        )
+
+
+class TaskSearchPageSerializer(serializers.Serializer):
+    """Serialize a page of search results."""
+
+    tasks = TaskSearchResultSerializer(many=True, read_only=True)
+    next_page = serializers.IntegerField(allow_null=True, read_only=True)
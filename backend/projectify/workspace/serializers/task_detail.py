@@ -18,6 +18,7 @@ from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 from rest_framework.request import Request
 
+from projectify.lib.serializers import CompiledSerializerMixin
 from projectify.user.models.user import User
 from projectify.workspace.models.project import Project
 from projectify.workspace.models.sub_task import SubTask
@@ -101,7 +102,7 @@ class TaskDetailSectionSerializer(serializers.ModelSerializer[Section]):
         }
 
 
-class TaskDetailSerializer(TaskWithSubTaskSerializer):
+class TaskDetailSerializer(CompiledSerializerMixin, TaskWithSubTaskSerializer):
     """
     Serialize all task details.
 
@@ -396,6 +397,96 @@ class TaskCreateSerializer(TaskCreateUpdateSerializer):
         )
 
 
+class TaskCreateManyItemSerializer(TaskCreateUpdateSerializer):
+    """
+    Serialize one task in TaskCreateManySerializer.
+
+    Labels and assignees are left as uuids here, and looked up for all tasks
+    at once by TaskCreateManySerializer.
+    """
+
+
+class TaskCreateManySerializer(serializers.Serializer):
+    """Serializer for creating many tasks in a section at once."""
+
+    section = UuidObjectSerializer()
+    tasks = TaskCreateManyItemSerializer(
+        many=True, min_length=1, max_length=500
+    )
+
+    def validate(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Look up the section, and the labels and assignees of all tasks."""
+        request: Request = self.context["request"]
+        user: User = request.user
+        section = section_find_for_user_and_uuid(
+            user=user,
+            section_uuid=data["section"]["uuid"],
+        )
+        if section is None:
+            raise serializers.ValidationError(
+                {"section": _("Section does not exist")}
+            )
+        workspace = section.project.workspace
+        tasks: list[dict[str, Any]] = data["tasks"]
+
+        label_uuids = {
+            label["uuid"] for task in tasks for label in task["labels"]
+        }
+        labels = {
+            label.uuid: label
+            for label in workspace.label_set.filter(uuid__in=label_uuids)
+        }
+        assignee_uuids = {
+            task["assignee"]["uuid"] for task in tasks if task["assignee"]
+        }
+        assignees = {
+            team_member.uuid: team_member
+            for team_member in workspace.teammember_set.filter(
+                uuid__in=assignee_uuids
+            )
+        }
+
+        errors: list[dict[str, Any]] = []
+        for task in tasks:
+            error: dict[str, Any] = {}
+            missing = [label["uuid"] not in labels for label in task["labels"]]
+            if any(missing):
+                error["labels"] = [
+                    {"uuid": _("This label could not be found")}
+                    if is_missing
+                    else {}
+                    for is_missing in missing
+                ]
+            if task["assignee"] and task["assignee"]["uuid"] not in assignees:
+                error["assignee"] = _("The assignee could not be found")
+            errors.append(error)
+        if any(errors):
+            raise serializers.ValidationError({"tasks": errors})
+
+        return {
+            "section": section,
+            "tasks": [
+                {
+                    **task,
+                    "labels": [
+                        labels[label["uuid"]] for label in task["labels"]
+                    ],
+                    "assignee": (
+                        assignees[task["assignee"]["uuid"]]
+                        if task["assignee"]
+                        else None
+                    ),
+                    "sub_tasks": (
+                        task["sub_tasks"]["create_sub_tasks"]
+                        if "sub_tasks" in task
+                        else []
+                    ),
+                }
+                for task in tasks
+            ],
+        }
+
+
 class TaskUpdateSerializer(TaskCreateUpdateSerializer):
     """Serializer for updating tasks."""
 
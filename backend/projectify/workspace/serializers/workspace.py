@@ -5,6 +5,7 @@
 
 from rest_framework import serializers
 
+from projectify.lib.serializers import CompiledSerializerMixin
 from projectify.user.serializers import UserSerializer
 from projectify.workspace.models.project import Project
 from projectify.workspace.models.team_member import TeamMember
@@ -80,7 +81,9 @@ class WorkspaceProjectSerializer(serializers.ModelSerializer[Project]):
         )
 
 
-class WorkspaceDetailSerializer(base.WorkspaceBaseSerializer):
+class WorkspaceDetailSerializer(
+    CompiledSerializerMixin, base.WorkspaceBaseSerializer
+):
     """
     Workspace detail serializer.
 
@@ -0,0 +1,406 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Project import services.
+
+Files are read row by row, and only one batch of rows is held in memory at a
+time. Each batch is written in a transaction of its own, with sections,
+labels, tasks and sub tasks created by one bulk insert each. A batch that
+fails is rolled back, while batches before it stay imported.
+"""
+
+import csv
+import io
+import json
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import islice
+from typing import IO, Any, Optional
+
+from django.core.files import File
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import PermissionDenied, ValidationError
+
+from projectify.lib.auth import validate_perm
+from projectify.user.models import User
+
+from ..exceptions import ProjectImportFileError
+from ..models.const import ProjectImportFormat, ProjectImportStatus
+from ..models.label import Label
+from ..models.order import ORDER_GAP, order_append
+from ..models.project import Project
+from ..models.project_import import ProjectImport, ProjectImportError
+from ..models.section import Section
+from ..models.team_member import TeamMember
+from ..selectors.quota import workspace_quota_allows
+from ..serializers.project_import import ProjectImportRowSerializer
+from ..services.signals import send_change_signal
+from ..services.sub_task import ValidatedDatum
+from ..services.task import TaskCreateDatum, task_create_many
+from ..tasks import import_project
+
+# Rows written per transaction
+PROJECT_IMPORT_BATCH_SIZE = 500
+# Rows that could not be imported are listed up to this many
+PROJECT_IMPORT_MAX_ERRORS = 100
+# Colors the frontend has for labels, see frontend/src/lib/utils/colors.ts
+LABEL_COLOR_COUNT = 7
+
+
+@dataclass
+class ProjectImportProgress:
+    """How far an import has come."""
+
+    rows: int = 0
+    tasks: int = 0
+    errors: list[ProjectImportError] = field(default_factory=list)
+
+    def add_error(self, line: Optional[int], errors: dict[str, Any]) -> None:
+        """Record why a row could not be imported."""
+        if len(self.errors) < PROJECT_IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line, "errors": errors})
+
+
+@dataclass
+class _ProjectImportContext:
+    """Sections, labels and team members, looked up once per import."""
+
+    who: User
+    project: Project
+    # By title, the first section wins if several share one
+    sections: dict[str, Section]
+    # By name
+    labels: dict[str, Label]
+    # By lower case email address
+    team_members: dict[str, TeamMember]
+
+
+# Read
+def _split(value: Optional[str], separator: str) -> list[str]:
+    """Split a CSV cell into its non-empty, stripped parts."""
+    parts = (part.strip() for part in (value or "").split(separator))
+    return [part for part in parts if part]
+
+
+def project_import_read_csv(
+    file: IO[bytes],
+) -> Iterator[tuple[int, dict[str, Any]]]:
+    """
+    Read tasks from a CSV file, yielding the line of each with its row.
+
+    The first row names the columns: section, title, description, labels,
+    assignee, due_date and sub_tasks. Labels are separated by commas and sub
+    tasks by line breaks. Only section and title are required.
+    """
+    reader = csv.DictReader(
+        io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    )
+    try:
+        for row in reader:
+            yield (
+                reader.line_num,
+                {
+                    "section": row.get("section"),
+                    "title": row.get("title"),
+                    "description": row.get("description") or None,
+                    "labels": _split(row.get("labels"), ","),
+                    "assignee": row.get("assignee") or None,
+                    "due_date": row.get("due_date") or None,
+                    "sub_tasks": [
+                        {"title": title}
+                        for title in _split(row.get("sub_tasks"), "\n")
+                    ],
+                },
+            )
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ProjectImportFileError(str(e), line=reader.line_num + 1) from e
+
+
+def project_import_read_json_lines(
+    file: IO[bytes],
+) -> Iterator[tuple[int, dict[str, Any]]]:
+    """
+    Read tasks from a JSON Lines file, yielding the line of each with its row.
+
+    Every line holds one object, with the same keys as the columns of a CSV
+    file. labels is a list of names. sub_tasks is a list of titles, or of
+    objects with title, description and done.
+    """
+    line = 0
+    try:
+        for line, text in enumerate(
+            io.TextIOWrapper(file, encoding="utf-8-sig"), start=1
+        ):
+            if not text.strip():
+                continue
+            row = json.loads(text)
+            if isinstance(row, dict) and isinstance(
+                row.get("sub_tasks"), list
+            ):
+                row["sub_tasks"] = [
+                    {"title": sub_task}
+                    if isinstance(sub_task, str)
+                    else sub_task
+                    for sub_task in row["sub_tasks"]
+                ]
+            yield line, row
+    except UnicodeDecodeError as e:
+        raise ProjectImportFileError(str(e), line=line + 1) from e
+    except json.JSONDecodeError as e:
+        raise ProjectImportFileError(str(e), line=line) from e
+
+
+def project_import_read(
+    *, file: IO[bytes], format: ProjectImportFormat
+) -> Iterator[tuple[int, dict[str, Any]]]:
+    """Read tasks from a file in the given format."""
+    match format:
+        case ProjectImportFormat.CSV:
+            return project_import_read_csv(file)
+        case ProjectImportFormat.JSON_LINES:
+            return project_import_read_json_lines(file)
+
+
+# Create
+def project_import_create(
+    *, who: User, project: Project, file: File, format: ProjectImportFormat
+) -> ProjectImport:
+    """Store an uploaded file and import it in the background."""
+    validate_perm("workspace.create_task", who, project.workspace)
+    project_import = ProjectImport(
+        project=project, user=who, file=file, format=format
+    )
+    project_import.save()
+    transaction.on_commit(partial(import_project.delay, project_import.pk))
+    return project_import
+
+
+def _project_import_sections(
+    *, context: _ProjectImportContext, titles: Iterable[str]
+) -> None:
+    """Create sections for titles no section has yet, at the bottom."""
+    titles = [title for title in titles if title not in context.sections]
+    if not titles:
+        return
+    project = context.project
+    validate_perm("workspace.create_section", context.who, project.workspace)
+    if not workspace_quota_allows(
+        resource="Section", workspace=project.workspace, count=len(titles)
+    ):
+        raise ValidationError(
+            {"section": _("Creating these sections would exceed the quota")}
+        )
+    # Lock the project, so that concurrent creates and moves don't pick the
+    # same keys
+    len(Project.objects.select_for_update().filter(pk=project.pk))
+    first_order = order_append(Section.objects.filter(project=project))
+    sections = Section.objects.bulk_create(
+        Section(
+            project=project, title=title, _order=first_order + n * ORDER_GAP
+        )
+        for n, title in enumerate(titles)
+    )
+    context.sections.update((section.title, section) for section in sections)
+
+
+def _project_import_labels(
+    *, context: _ProjectImportContext, names: Iterable[str]
+) -> None:
+    """Create labels for names no label has yet, cycling through colors."""
+    names = [name for name in names if name not in context.labels]
+    if not names:
+        return
+    workspace = context.project.workspace
+    validate_perm("workspace.create_label", context.who, workspace)
+    if not workspace_quota_allows(
+        resource="Label", workspace=workspace, count=len(names)
+    ):
+        raise ValidationError(
+            {"labels": _("Creating these labels would exceed the quota")}
+        )
+    labels = Label.objects.bulk_create(
+        Label(
+            workspace=workspace,
+            name=name,
+            color=(len(context.labels) + n) % LABEL_COLOR_COUNT,
+        )
+        for n, name in enumerate(names)
+    )
+    context.labels.update((label.name, label) for label in labels)
+    send_change_signal("changed", workspace)
+
+
+def _project_import_sub_tasks(row: dict[str, Any]) -> list[ValidatedDatum]:
+    """Return the sub tasks of a validated row, in the order given."""
+    sub_tasks: list[ValidatedDatum] = []
+    for order, sub_task in enumerate(row["sub_tasks"]):
+        datum: ValidatedDatum = {
+            "title": sub_task["title"],
+            "done": sub_task["done"],
+            "_order": order,
+        }
+        if description := sub_task.get("description"):
+            datum["description"] = description
+        sub_tasks.append(datum)
+    return sub_tasks
+
+
+def _project_import_batch(
+    *,
+    context: _ProjectImportContext,
+    progress: ProjectImportProgress,
+    batch: Sequence[tuple[int, dict[str, Any]]],
+) -> None:
+    """Validate a batch of rows and import the valid ones."""
+    rows: list[tuple[dict[str, Any], Optional[TeamMember]]] = []
+    for line, data in batch:
+        serializer = ProjectImportRowSerializer(data=data)
+        if not serializer.is_valid():
+            progress.add_error(line, serializer.errors)
+            continue
+        row = serializer.validated_data
+        assignee = None
+        if (email := row.get("assignee")) is not None:
+            assignee = context.team_members.get(email.lower())
+            if assignee is None:
+                progress.add_error(
+                    line,
+                    {"assignee": [_("No team member has this email address")]},
+                )
+                continue
+        rows.append((row, assignee))
+
+    with transaction.atomic():
+        _project_import_sections(
+            context=context,
+            titles=dict.fromkeys(row["section"] for row, _assignee in rows),
+        )
+        _project_import_labels(
+            context=context,
+            names=dict.fromkeys(
+                name for row, _assignee in rows for name in row["labels"]
+            ),
+        )
+        tasks: dict[str, list[TaskCreateDatum]] = {}
+        for row, assignee in rows:
+            tasks.setdefault(row["section"], []).append(
+                {
+                    "title": row["title"],
+                    "description": row.get("description"),
+                    "due_date": row.get("due_date"),
+                    "assignee": assignee,
+                    "labels": [context.labels[name] for name in row["labels"]],
+                    "sub_tasks": _project_import_sub_tasks(row),
+                }
+            )
+        for title, section_tasks in tasks.items():
+            task_create_many(
+                who=context.who,
+                section=context.sections[title],
+                tasks=section_tasks,
+            )
+    progress.rows += len(batch)
+    progress.tasks += len(rows)
+
+
+def project_import_tasks(
+    *,
+    who: User,
+    project: Project,
+    file: IO[bytes],
+    format: ProjectImportFormat,
+    batch_size: int = PROJECT_IMPORT_BATCH_SIZE,
+) -> Iterator[ProjectImportProgress]:
+    """
+    Import tasks from a file into a project, one batch at a time.
+
+    Yields the progress after every batch. Tasks are placed into sections by
+    section title, and sections and labels that don't exist yet are created.
+    Rows that are not valid are skipped and listed in the progress.
+    """
+    workspace = project.workspace
+    validate_perm("workspace.create_task", who, workspace)
+    context = _ProjectImportContext(
+        who=who,
+        project=project,
+        sections={
+            section.title: section
+            for section in reversed(project.section_set.all())
+        },
+        labels={label.name: label for label in workspace.label_set.all()},
+        team_members={
+            team_member.user.email.lower(): team_member
+            for team_member in workspace.teammember_set.select_related("user")
+        },
+    )
+    progress = ProjectImportProgress()
+    rows = project_import_read(file=file, format=format)
+    while batch := list(islice(rows, batch_size)):
+        _project_import_batch(context=context, progress=progress, batch=batch)
+        yield progress
+
+
+# RPC
+def project_import_run(*, project_import: ProjectImport) -> ProjectImport:
+    """
+    Import an uploaded file, saving the progress after every batch.
+
+    The file is removed afterwards, whether the import succeeded or not. An
+    import that raises anything else than the errors expected here is marked
+    as failed too, and the exception is raised again.
+    """
+    project_import.status = ProjectImportStatus.RUNNING
+    project_import.save(update_fields=["status", "modified"])
+    try:
+        with project_import.file.open("rb") as file:
+            for progress in project_import_tasks(
+                who=project_import.user,
+                project=project_import.project,
+                file=file,
+                format=ProjectImportFormat(project_import.format),
+            ):
+                project_import.rows = progress.rows
+                project_import.tasks = progress.tasks
+                project_import.errors = progress.errors
+                project_import.save(
+                    update_fields=["rows", "tasks", "errors", "modified"]
+                )
+    except ProjectImportFileError as e:
+        project_import.status = ProjectImportStatus.FAILED
+        project_import.errors = [
+            *project_import.errors,
+            {"line": e.line, "errors": {"file": [str(e)]}},
+        ]
+    except PermissionDenied as e:
+        project_import.status = ProjectImportStatus.FAILED
+        project_import.errors = [
+            *project_import.errors,
+            {"line": None, "errors": {"file": [str(e.detail)]}},
+        ]
+    except ValidationError as e:
+        project_import.status = ProjectImportStatus.FAILED
+        project_import.errors = [
+            *project_import.errors,
+            {
+                "line": None,
+                "errors": (
+                    e.detail
+                    if isinstance(e.detail, dict)
+                    else {"file": e.detail}
+                ),
+            },
+        ]
+    else:
+        project_import.status = ProjectImportStatus.DONE
+    finally:
+        if project_import.status == ProjectImportStatus.RUNNING:
+            project_import.status = ProjectImportStatus.FAILED
+        project_import.file.delete(save=False)
+        project_import.save(
+            update_fields=["status", "errors", "file", "modified"]
+        )
+    return project_import
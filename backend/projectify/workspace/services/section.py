@@ -3,6 +3,7 @@
 # SPDX-FileCopyrightText: 2023 JWP Consulting GK
 """Section services."""
 
+from functools import partial
 from typing import Optional
 
 from django.db import transaction
@@ -10,11 +11,17 @@ from django.db import transaction
 from projectify.lib.auth import validate_perm
 from projectify.user.models import User
 from projectify.workspace.models import Project, Section
+from projectify.workspace.models.order import (
+    order_between,
+    order_rebalance,
+    order_should_rebalance,
+)
 from projectify.workspace.services.signals import send_change_signal
+from projectify.workspace.tasks import rebalance_section_order
 
 
 # Create
-# TODO make atomic
+@transaction.atomic
 def section_create(
     *,
     who: User,
@@ -28,6 +35,9 @@ def section_create(
         who,
         project.workspace,
     )
+    # Lock the project, so that concurrent creates and moves don't pick the
+    # same key
+    len(Project.objects.select_for_update().filter(pk=project.pk))
     section = Section(title=title, description=description, project=project)
     section.save()
     send_change_signal("changed", project)
@@ -74,6 +84,21 @@ def section_delete(
 
 
 # RPC
+def _section_move_neighbors(
+    *, section: Section, order: int
+) -> tuple[Optional[int], Optional[int]]:
+    """Return the keys section is placed between when moved to order n."""
+    keys = list(
+        section.project.section_set.exclude(pk=section.pk).values_list(
+            "_order", flat=True
+        )
+    )
+    order = min(max(order, 0), len(keys))
+    lower = keys[order - 1] if order > 0 else None
+    upper = keys[order] if order < len(keys) else None
+    return lower, upper
+
+
 @transaction.atomic
 def section_move(
     *,
@@ -84,7 +109,8 @@ def section_move(
     """
     Move to specified order n within project.
 
-    No save required.
+    No save required. Only the moved section is updated, by giving it a key
+    between its new neighbors.
     """
     validate_perm(
         "workspace.update_section",
@@ -92,17 +118,22 @@ def section_move(
         section.project.workspace,
     )
     project = section.project
-    neighbor_sections = project.section_set.select_for_update()
-    # Force queryset to be evaluated to lock them for the time of
-    # this transaction
-    len(neighbor_sections)
-    # Django docs wrong, need to cast to list
-    order_list = list(project.get_section_order())
-    # The list is ordered by pk, which is not uuid for us
-    current_object_index = order_list.index(section.pk)
-    # Mutate to perform move operation
-    order_list.insert(order, order_list.pop(current_object_index))
-    # Set new order
-    project.set_section_order(order_list)
-    project.save()
+    # Lock the project, so that concurrent moves don't pick the same key
+    len(Project.objects.select_for_update().filter(pk=project.pk))
+    lower, upper = _section_move_neighbors(section=section, order=order)
+    key = order_between(lower=lower, upper=upper)
+    if key is None:
+        # No key left between the neighbors
+        order_rebalance(
+            model=Section, parent_column="project_id", parent_id=project.pk
+        )
+        lower, upper = _section_move_neighbors(section=section, order=order)
+        key = order_between(lower=lower, upper=upper)
+        assert key is not None
+    elif order_should_rebalance(lower=lower, upper=upper):
+        transaction.on_commit(
+            partial(rebalance_section_order.delay, project.pk)
+        )
+    section._order = key
+    section.save(update_fields=["_order"])
     send_change_signal("changed", section.project)
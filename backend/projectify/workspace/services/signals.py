@@ -3,7 +3,10 @@
 # SPDX-FileCopyrightText: 2024 JWP Consulting GK
 """Functions to handle signals."""
 
-from typing import Any, Literal, Union, cast
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Literal, Optional, Union, cast
 
 from asgiref.sync import async_to_sync as _async_to_sync
 from channels.layers import get_channel_layer
@@ -18,6 +21,41 @@ from ..types import ConsumerEvent, Resource
 # renewed in a while Justus 2023-05-19
 async_to_sync = cast(Any, _async_to_sync)
 
+# Signals held back by coalesce_change_signals, by group and kind
+_pending: ContextVar[Optional[dict[tuple[str, str], ConsumerEvent]]] = (
+    ContextVar("pending_change_signals", default=None)
+)
+
+
+def _group_send(group: str, event: ConsumerEvent) -> None:
+    """Send an event to a channels layer group."""
+    channel_layer = get_channel_layer()
+    if not channel_layer:
+        raise Exception("Did not get channel layer")
+    async_to_sync(channel_layer.group_send)(group, event)
+
+
+@contextmanager
+def coalesce_change_signals() -> Iterator[None]:
+    """
+    Hold back change signals until the end of the block.
+
+    Each object is then signaled once per kind, however often it changed.
+    If the block raises, nothing is sent. Blocks can be nested, in which
+    case the outermost block sends.
+    """
+    if _pending.get() is not None:
+        yield
+        return
+    pending: dict[tuple[str, str], ConsumerEvent] = {}
+    token = _pending.set(pending)
+    try:
+        yield
+    finally:
+        _pending.reset(token)
+    for (group, _kind), event in pending.items():
+        _group_send(group, event)
+
 
 def send_change_signal(
     kind: Literal["changed", "gone"], object: Union[Workspace, Project, Task]
@@ -40,7 +78,8 @@ def send_change_signal(
         "uuid": str(object.uuid),
         "kind": kind,
     }
-    channel_layer = get_channel_layer()
-    if not channel_layer:
-        raise Exception("Did not get channel layer")
-    async_to_sync(channel_layer.group_send)(group, event)
+    pending = _pending.get()
+    if pending is not None:
+        pending[group, kind] = event
+        return
+    _group_send(group, event)
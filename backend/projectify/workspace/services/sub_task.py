@@ -105,7 +105,7 @@ def sub_task_update_many(
     sub_tasks_to_delete = existing_sub_task_uuids - update_sub_tasks_uuids
 
     deleted, _ = SubTask.objects.filter(
-        # XXX check if uuid is indexed
+        # uuid is unique, and therefore indexed
         uuid__in=sub_tasks_to_delete
     ).delete()
 
@@ -113,26 +113,47 @@ def sub_task_update_many(
     if not deleted == len(sub_tasks_to_delete):
         raise Exception("Not all sub tasks were deleted")
 
-    # 2) update sub tasks and append to results list
+    # 2) fix order
+    # Number the remaining sub tasks 0, 1, 2, ... in the submitted order, so
+    # that gaps or ties in _order don't reach the database. On ties, updated
+    # sub tasks go in front of created ones.
+    submitted: list[ValidatedDatum] = [*update_sub_tasks, *create_sub_tasks]
+    ranked = sorted(
+        range(len(submitted)), key=lambda n: submitted[n]["_order"]
+    )
+    orders = {n: order for order, n in enumerate(ranked)}
+
+    # 3) update changed sub tasks and append all to results list
     if update_sub_tasks:
         sub_task_mapping: dict[UUID, SubTask] = {
             sub_task.uuid: sub_task for sub_task in sub_tasks
         }
         update_instances: list[SubTask] = []
-        for sub_task in update_sub_tasks:
+        changed_fields: set[str] = set()
+        for n, sub_task in enumerate(update_sub_tasks):
             current_instance = sub_task_mapping[sub_task["uuid"]]
-            current_instance.title = sub_task["title"]
-            current_instance.description = sub_task.get("description")
-            current_instance.done = sub_task["done"]
-            # pyright doesn't like this one here:
-            current_instance._order = sub_task["_order"]
-            update_instances.append(current_instance)
-        SubTask.objects.bulk_update(
-            update_instances,
-            ("title", "description", "done", "_order"),
-        )
-        result += update_instances
-    # 3) create sub tasks and append to results list
+            values = {
+                "title": sub_task["title"],
+                "description": sub_task.get("description"),
+                "done": sub_task["done"],
+                "_order": orders[n],
+            }
+            changed = {
+                field
+                for field, value in values.items()
+                if getattr(current_instance, field) != value
+            }
+            for field in changed:
+                setattr(current_instance, field, values[field])
+            if changed:
+                update_instances.append(current_instance)
+                changed_fields |= changed
+            result.append(current_instance)
+        if update_instances:
+            SubTask.objects.bulk_update(
+                update_instances, sorted(changed_fields)
+            )
+    # 4) create sub tasks and append to results list
     if create_sub_tasks:
         create_instances: list[SubTask] = [
             SubTask(
@@ -140,13 +161,11 @@ def sub_task_update_many(
                 title=create_sub_task["title"],
                 description=create_sub_task.get("description"),
                 done=create_sub_task["done"],
-                _order=create_sub_task["_order"],
+                _order=orders[len(update_sub_tasks) + n],
             )
-            for create_sub_task in create_sub_tasks
+            for n, create_sub_task in enumerate(create_sub_tasks)
         ]
         SubTask.objects.bulk_create(create_instances)
         result += create_instances
-    # 4) fix order
-    # XXX ? is fix order missing?
     _sub_task_changed(task)
     return result
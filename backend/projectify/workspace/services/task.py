@@ -5,9 +5,11 @@
 
 import logging
 from datetime import datetime
-from typing import Literal, Optional, Sequence, Union
+from functools import partial
+from typing import Literal, NotRequired, Optional, Sequence, TypedDict, Union
 
 from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
 from django.utils.translation import gettext_lazy as _
 
 from rest_framework import serializers
@@ -17,36 +19,82 @@ from projectify.lib.auth import validate_perm
 from projectify.user.models import User
 
 from ..models.label import Label
+from ..models.order import (
+    ORDER_GAP,
+    order_append,
+    order_between,
+    order_rebalance,
+    order_should_rebalance,
+    order_spread,
+)
+from ..models.project import Project
 from ..models.section import Section
+from ..models.sub_task import SubTask
 from ..models.task import Task
+from ..models.task_label import TaskLabel
+from ..models.task_number import task_number_allocate
 from ..models.team_member import TeamMember
+from ..selectors.quota import workspace_quota_allows
 from ..services.signals import send_change_signal
 from ..services.sub_task import (
     ValidatedData,
+    ValidatedDatum,
     sub_task_create_many,
     sub_task_update_many,
 )
+from ..tasks import rebalance_task_order
 
 logger = logging.getLogger(__name__)
 
 
+class TaskCreateDatum(TypedDict):
+    """A validated task, to be created by task_create_many."""
+
+    title: str
+    description: NotRequired[Optional[str]]
+    due_date: NotRequired[Optional[datetime]]
+    assignee: NotRequired[Optional[TeamMember]]
+    labels: NotRequired[Sequence[Label]]
+    sub_tasks: NotRequired[Sequence[ValidatedDatum]]
+
+
 # TODO hide this
 def task_assign_labels(*, task: Task, labels: Sequence[Label]) -> None:
-    """Assign label uuids to the given task."""
+    """
+    Assign label uuids to the given task.
+
+    Only label assignments that change are written.
+    """
     workspace = task.workspace
-    ws_labels = workspace.label_set
+    requested = {label.pk: label for label in labels}
+    assigned = TaskLabel.objects.filter(task=task, label=OuterRef("pk"))
     # We filter for labels as part of this workspace, to make sure we
-    # don't assign labels from another workspace
-    intersection_qs = ws_labels.filter(id__in=[label.id for label in labels])
+    # don't assign labels from another workspace. The same query finds the
+    # labels currently assigned.
+    found: dict[int, bool] = dict(
+        workspace.label_set.filter(Q(pk__in=requested) | Q(Exists(assigned)))
+        .annotate(assigned=Exists(assigned))
+        .values_list("pk", "assigned")
+    )
+    valid = requested.keys() & found.keys()
+    if not len(valid) == len(labels):
+        logger.warning(
+            "Some of the labels specified in %s are "
+            "not part of this workspace",
+            ", ".join(str(label.uuid) for label in labels),
+        )
+    current = {pk for pk, is_assigned in found.items() if is_assigned}
+    remove = current - valid
+    add = valid - current
+    if not remove and not add:
+        return
     with transaction.atomic():
-        intersection = list(intersection_qs)
-        if not len(intersection) == len(labels):
-            logger.warning(
-                "Some of the labels specified in %s are "
-                "not part of this workspace",
-                ", ".join(str(label.uuid) for label in labels),
+        if remove:
+            TaskLabel.objects.filter(task=task, label__pk__in=remove).delete()
+        if add:
+            TaskLabel.objects.bulk_create(
+                TaskLabel(task=task, label=requested[pk]) for pk in add
             )
-        task.labels.set(intersection)
 
     # TODO maybe it makes more sense to fire signals from serializers,
     # not manually patch things like the following...
@@ -54,6 +102,74 @@ def task_assign_labels(*, task: Task, labels: Sequence[Label]) -> None:
     # services, this should be handled in a service
 
 
+@transaction.atomic
+def task_assign_labels_many(
+    *,
+    who: User,
+    tasks: Sequence[Task],
+    add: Sequence[Label] = (),
+    remove: Sequence[Label] = (),
+) -> None:
+    """
+    Add labels to and remove labels from many tasks at once.
+
+    Labels already assigned are skipped, and so are labels that aren't.
+    Assignments are written with one bulk insert and one delete. Each
+    affected project is signaled once.
+    """
+    if not tasks:
+        return
+    workspace = tasks[0].workspace
+    validate_perm("workspace.update_task", who, workspace)
+    task_pks = [task.pk for task in tasks]
+    if (
+        Task.objects.filter(pk__in=task_pks)
+        .exclude(workspace=workspace)
+        .exists()
+    ):
+        raise serializers.ValidationError(
+            {"task_uuids": _("All tasks must be in the same workspace")}
+        )
+    # Labels are checked as the caller read them, instead of reading them again
+    errors = {
+        field: _("Some labels belong to a different workspace")
+        for field, labels in (
+            ("add_label_uuids", add),
+            ("remove_label_uuids", remove),
+        )
+        if any(label.workspace != workspace for label in labels)
+    }
+    if errors:
+        raise serializers.ValidationError(errors)
+    remove_pks = {label.pk for label in remove}
+    if any(label.pk in remove_pks for label in add):
+        raise serializers.ValidationError(
+            {
+                "remove_label_uuids": _(
+                    "Labels can't be added and removed at once"
+                )
+            }
+        )
+
+    if remove:
+        TaskLabel.objects.filter(
+            task__pk__in=task_pks, label__pk__in=remove_pks
+        ).delete()
+    if add:
+        TaskLabel.objects.bulk_create(
+            (
+                TaskLabel(task=task, label=label)
+                for task in tasks
+                for label in dict.fromkeys(add)
+            ),
+            ignore_conflicts=True,
+        )
+    for project in Project.objects.filter(
+        section__task__pk__in=task_pks
+    ).distinct():
+        send_change_signal("changed", project)
+
+
 # Create
 def task_create(
     *,
@@ -125,6 +241,103 @@ def task_create_nested(
     return task
 
 
+@transaction.atomic
+def task_create_many(
+    *, who: User, section: Section, tasks: Sequence[TaskCreateDatum]
+) -> list[Task]:
+    """
+    Create several tasks at the bottom of a section, in the order given.
+
+    Task numbers are allocated in one block. Tasks, label assignments and
+    sub tasks are written with one bulk insert each, and the project is
+    signaled once.
+    """
+    workspace = section.project.workspace
+    validate_perm("workspace.create_task", who, workspace)
+    if not workspace_quota_allows(
+        resource="Task", workspace=workspace, count=len(tasks)
+    ):
+        raise serializers.ValidationError(
+            {"tasks": _("Creating these tasks would exceed the task quota")}
+        )
+    sub_task_count = sum(len(task.get("sub_tasks", [])) for task in tasks)
+    if sub_task_count:
+        validate_perm("workspace.create_sub_task", who, workspace)
+        if not workspace_quota_allows(
+            resource="SubTask", workspace=workspace, count=sub_task_count
+        ):
+            raise serializers.ValidationError(
+                {
+                    "tasks": _(
+                        "Creating these sub tasks would exceed the sub task quota"
+                    )
+                }
+            )
+    assignee_pks = {
+        assignee.pk
+        for task in tasks
+        if (assignee := task.get("assignee")) is not None
+    }
+    if assignee_pks and not len(assignee_pks) == (
+        workspace.teammember_set.filter(pk__in=assignee_pks).count()
+    ):
+        raise serializers.ValidationError(
+            {
+                "assignee": _(
+                    "The team member to be assigned belongs to a different workspace"
+                )
+            }
+        )
+    label_pks = {
+        label.pk for task in tasks for label in task.get("labels", [])
+    }
+    if label_pks and not len(label_pks) == (
+        workspace.label_set.filter(pk__in=label_pks).count()
+    ):
+        raise serializers.ValidationError(
+            {"labels": _("Some labels belong to a different workspace")}
+        )
+
+    numbers = task_number_allocate(workspace_pk=workspace.pk, count=len(tasks))
+    # Lock the section, so that concurrent creates and moves don't pick the
+    # same keys
+    len(Section.objects.select_for_update().filter(pk=section.pk))
+    first_order = order_append(Task.objects.filter(section=section))
+    instances = Task.objects.bulk_create(
+        Task(
+            section=section,
+            workspace=workspace,
+            number=number,
+            _order=first_order + n * ORDER_GAP,
+            title=task["title"],
+            description=task.get("description"),
+            due_date=task.get("due_date"),
+            assignee=task.get("assignee"),
+        )
+        for n, (number, task) in enumerate(zip(numbers, tasks))
+    )
+    TaskLabel.objects.bulk_create(
+        TaskLabel(task=instance, label=label)
+        for instance, task in zip(instances, tasks)
+        for label in dict.fromkeys(task.get("labels", []))
+    )
+    SubTask.objects.bulk_create(
+        SubTask(
+            task=instance,
+            title=sub_task["title"],
+            description=sub_task.get("description"),
+            done=sub_task["done"],
+            _order=order,
+        )
+        for instance, task in zip(instances, tasks)
+        for order, sub_task in enumerate(
+            sorted(task.get("sub_tasks", []), key=lambda s: s["_order"])
+        )
+    )
+    send_change_signal("changed", section.project)
+    return instances
+
+
 # Update
 def task_update(
     *,
@@ -208,28 +421,60 @@ def task_move_in_direction(
     neighbor: Union[Task, Section]
     match direction:
         case "up":
-            maybe_neighbor = tasks.filter(_order=task._order - 1)
-            if maybe_neighbor.exists():
-                neighbor = maybe_neighbor.get()
+            maybe_neighbor = tasks.filter(_order__lt=task._order).last()
+            if maybe_neighbor is not None:
+                neighbor = maybe_neighbor
             else:
                 neighbor = section
 
         case "down":
-            maybe_neighbor = tasks.filter(_order=task._order + 1)
+            maybe_neighbor = tasks.filter(_order__gt=task._order).first()
             # TODO, maybe we just want to move it to the next section
-            if not maybe_neighbor.exists():
+            if maybe_neighbor is None:
                 raise ValidationError(
                     _("Can't move task down, there is no next task")
                 )
-            neighbor = maybe_neighbor.get()
+            neighbor = maybe_neighbor
 
         case "bottom":
-            neighbor = tasks[-1]
+            neighbor = tasks.last() or task
         case "top":
             neighbor = section
     return task_move_after(who=who, task=task, after=neighbor)
 
 
+def _task_move_neighbors(
+    *, task: Task, after: Union[Task, Section], section: Section
+) -> tuple[Optional[int], Optional[int]]:
+    """
+    Return the keys task is placed between when moved after after.
+
+    Reads current keys from the database, in case instances are stale.
+    """
+    siblings = (
+        Task.objects.filter(section=section)
+        .exclude(pk=task.pk)
+        .values_list("_order", flat=True)
+    )
+    if isinstance(after, Section):
+        return None, siblings.order_by("_order").first()
+    current = {
+        pk: (section_pk, order)
+        for pk, section_pk, order in Task.objects.filter(
+            pk__in=(task.pk, after.pk)
+        ).values_list("pk", "section", "_order")
+    }
+    task_section_pk, task_order = current[task.pk]
+    order = current[after.pk][1]
+    # Moving down within a section, the task ends up after the task it
+    # takes the place of, otherwise in front of it
+    if task_section_pk == section.pk and task_order < order:
+        upper = siblings.filter(_order__gt=order).order_by("_order").first()
+        return order, upper
+    lower = siblings.filter(_order__lt=order).order_by("-_order").first()
+    return lower, order
+
+
 @transaction.atomic
 def task_move_after(
     *,
@@ -237,38 +482,141 @@ def task_move_after(
     task: Task,
     after: Union[Task, Section],
 ) -> Task:
-    """Move a task after a task or in front of a section."""
+    """
+    Move a task after a task or in front of a section.
+
+    The task takes the place of the task it is moved after. Only the moved
+    task is updated, by giving it a key between its new neighbors.
+    """
     validate_perm("workspace.update_task", who, task.workspace)
     match after:
         case Task():
             section = after.section
-            order = after._order
         case Section():
             section = after
-            order = 0
-
-    # Lock tasks in own section
-    neighbor_tasks = section.task_set.select_for_update()
-    len(neighbor_tasks)
-
-    # Depending on whether we move within the same section, we
-    # might have to lock only this section, or the destination
-    # as well.
-    if task.section != section:
-        other_tasks = section.task_set.select_for_update()
-        len(other_tasks)
-        # And assign task's section
-        task.section = section
-        task.save()
 
-    # Change order
-    order_list = list(section.get_task_order())
-    current_object_index = order_list.index(task.pk)
-    order_list.insert(order, order_list.pop(current_object_index))
+    if after != task:
+        # Lock the section moved to, so that concurrent moves don't pick the
+        # same key. The tasks in it stay unlocked.
+        len(Section.objects.select_for_update().filter(pk=section.pk))
+        lower, upper = _task_move_neighbors(
+            task=task, after=after, section=section
+        )
+        order = order_between(lower=lower, upper=upper)
+        if order is None:
+            # No key left between the neighbors
+            order_rebalance(
+                model=Task, parent_column="section_id", parent_id=section.pk
+            )
+            lower, upper = _task_move_neighbors(
+                task=task, after=after, section=section
+            )
+            order = order_between(lower=lower, upper=upper)
+            assert order is not None
+        elif order_should_rebalance(lower=lower, upper=upper):
+            transaction.on_commit(
+                partial(rebalance_task_order.delay, section.pk)
+            )
+        task.section = section
+        task._order = order
+        task.save(update_fields=["section", "_order"])
 
-    # Set the order
-    section.set_task_order(order_list)
-    section.save()
     send_change_signal("changed", task.section.project)
     send_change_signal("changed", task)
     return task
+
+
+def _task_move_many_neighbors(
+    *, tasks: Sequence[Task], section: Section, after: Optional[Task]
+) -> tuple[Optional[int], Optional[int]]:
+    """
+    Return the keys tasks are placed between when moved after after.
+
+    Reads current keys from the database, in case instances are stale.
+    """
+    siblings = (
+        Task.objects.filter(section=section)
+        .exclude(pk__in=[task.pk for task in tasks])
+        .values_list("_order", flat=True)
+    )
+    if after is None:
+        return None, siblings.order_by("_order").first()
+    order = (
+        Task.objects.filter(pk=after.pk, section=section)
+        .values_list("_order", flat=True)
+        .first()
+    )
+    if order is None:
+        raise serializers.ValidationError(
+            {"after_task_uuid": _("This task is not in the given section")}
+        )
+    upper = siblings.filter(_order__gt=order).order_by("_order").first()
+    return order, upper
+
+
+@transaction.atomic
+def task_move_many(
+    *,
+    who: User,
+    tasks: Sequence[Task],
+    section: Section,
+    after: Optional[Task] = None,
+) -> None:
+    """
+    Move tasks to a section, right after a task or to its top.
+
+    The tasks end up next to each other, in the order given. All sections
+    involved are locked at once, and the moved tasks are written in a single
+    update. Each affected project is signaled once.
+    """
+    workspace = section.project.workspace
+    validate_perm("workspace.update_task", who, workspace)
+    task_pks = [task.pk for task in tasks]
+    if after is not None and after.pk in task_pks:
+        raise serializers.ValidationError(
+            {"after_task_uuid": _("Can't move tasks after one of themselves")}
+        )
+    if (
+        Task.objects.filter(pk__in=task_pks)
+        .exclude(workspace=workspace)
+        .exists()
+    ):
+        raise serializers.ValidationError(
+            {"task_uuids": _("All tasks must be in the section's workspace")}
+        )
+
+    # Lock the section moved to and the sections moved from, in a stable
+    # order so that concurrent moves can't deadlock
+    sections = list(
+        Section.objects.select_for_update(of=("self",))
+        .select_related("project")
+        .filter(
+            Q(pk=section.pk)
+            | Q(pk__in=Task.objects.filter(pk__in=task_pks).values("section"))
+        )
+        .order_by("pk")
+    )
+    lower, upper = _task_move_many_neighbors(
+        tasks=tasks, section=section, after=after
+    )
+    orders = order_spread(lower=lower, upper=upper, count=len(tasks))
+    if orders is None:
+        # Not enough keys left between the neighbors
+        order_rebalance(
+            model=Task, parent_column="section_id", parent_id=section.pk
+        )
+        lower, upper = _task_move_many_neighbors(
+            tasks=tasks, section=section, after=after
+        )
+        orders = order_spread(lower=lower, upper=upper, count=len(tasks))
+        assert orders is not None
+    elif order_should_rebalance(lower=lower, upper=upper, count=len(tasks)):
+        transaction.on_commit(partial(rebalance_task_order.delay, section.pk))
+    for task, order in zip(tasks, orders):
+        task.section = section
+        task._order = order
+    Task.objects.bulk_update(tasks, ["section", "_order"])
+
+    projects = {s.project.pk: s.project for s in sections}
+    for project in projects.values():
+        send_change_signal("changed", project)
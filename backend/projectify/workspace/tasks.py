@@ -0,0 +1,53 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Workspace tasks."""
+
+from django.db import transaction
+
+from projectify.celery import app
+
+from .models.const import ProjectImportStatus
+from .models.order import order_rebalance
+from .models.project import Project
+from .models.project_import import ProjectImport
+from .models.section import Section
+from .models.task import Task
+
+
+@app.task()
+def rebalance_task_order(section_pk: int) -> None:
+    """Spread out the ordering keys of all tasks in a section."""
+    with transaction.atomic():
+        # Task moves lock the section as well
+        if Section.objects.select_for_update().filter(pk=section_pk).first():
+            order_rebalance(
+                model=Task, parent_column="section_id", parent_id=section_pk
+            )
+
+
+@app.task()
+def rebalance_section_order(project_pk: int) -> None:
+    """Spread out the ordering keys of all sections in a project."""
+    with transaction.atomic():
+        # Section moves lock the project as well
+        if Project.objects.select_for_update().filter(pk=project_pk).first():
+            order_rebalance(
+                model=Section, parent_column="project_id", parent_id=project_pk
+            )
+
+
+@app.task()
+def import_project(project_import_pk: int) -> None:
+    """Import an uploaded file into a project."""
+    # Services queue this task, so they can only be imported here
+    from .services.project_import import project_import_run
+
+    project_import = (
+        ProjectImport.objects.select_related("project__workspace", "user")
+        .filter(pk=project_import_pk, status=ProjectImportStatus.QUEUED)
+        .first()
+    )
+    # Already imported, if the task is delivered more than once
+    if project_import is not None:
+        project_import_run(project_import=project_import)
@@ -0,0 +1,49 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test ordering keys."""
+
+import pytest
+
+from ...models.order import ORDER_GAP, order_between, order_spread
+from ...models.section import Section
+from ...models.task import Task
+from ...tasks import rebalance_task_order
+
+
+def test_order_between() -> None:
+    """Test picking keys between neighbors."""
+    assert order_between(lower=None, upper=None) == ORDER_GAP
+    assert order_between(lower=None, upper=ORDER_GAP) == 0
+    assert order_between(lower=ORDER_GAP, upper=None) == 2 * ORDER_GAP
+    assert order_between(lower=0, upper=ORDER_GAP) == ORDER_GAP // 2
+    assert order_between(lower=1, upper=3) == 2
+    assert order_between(lower=1, upper=2) is None
+
+
+def test_order_spread() -> None:
+    """Test picking several keys between neighbors."""
+    assert order_spread(lower=None, upper=None, count=2) == [
+        ORDER_GAP,
+        2 * ORDER_GAP,
+    ]
+    assert order_spread(lower=None, upper=0, count=2) == [
+        -2 * ORDER_GAP,
+        -ORDER_GAP,
+    ]
+    assert order_spread(lower=0, upper=6, count=2) == [2, 4]
+    assert order_spread(lower=0, upper=3, count=3) is None
+
+
+@pytest.mark.django_db
+def test_rebalance_task_order(
+    section: Section, task: Task, other_task: Task
+) -> None:
+    """Test that rebalancing spreads out keys, keeping the order."""
+    Task.objects.filter(pk=task.pk).update(_order=-5)
+    Task.objects.filter(pk=other_task.pk).update(_order=-4)
+    rebalance_task_order(section.pk)
+    assert list(section.task_set.values_list("pk", "_order")) == [
+        (task.pk, ORDER_GAP),
+        (other_task.pk, 2 * ORDER_GAP),
+    ]
@@ -3,6 +3,8 @@
 # SPDX-FileCopyrightText: 2023 JWP Consulting GK
 """Project model tests."""
 
+from django.db import transaction
+
 import pytest
 
 from ...models.project import Project
@@ -11,6 +13,16 @@ from ...models.workspace import Workspace
 from ...services.section import section_create
 
 
+def revisions(project: Project) -> tuple[int, int]:
+    """Return the revisions of project and its workspace."""
+    revisions: tuple[int, int] = (
+        Project.objects.values_list("revision", "workspace__revision")
+        .filter(pk=project.pk)
+        .get()
+    )
+    return revisions
+
+
 @pytest.mark.django_db
 class TestProject:
     """Test Project."""
@@ -48,3 +60,36 @@ class TestProject:
             section,
             section2,
         ]
+
+    # Revisions are bumped when transactions commit
+    @pytest.mark.django_db(transaction=True)
+    def test_revision(
+        self,
+        project: Project,
+        team_member: TeamMember,
+    ) -> None:
+        """Test that sections and the project itself bump its revision."""
+        history = [revisions(project)]
+
+        def bumped() -> bool:
+            history.append(revisions(project))
+            project_before, workspace_before = history[-2]
+            project_after, workspace_after = history[-1]
+            # Projects leave their workspace alone
+            return (
+                project_after > project_before
+                and workspace_after == workspace_before
+            )
+
+        with transaction.atomic():
+            section = section_create(
+                who=team_member.user, project=project, title="hello"
+            )
+            # Bumps are deferred until commit
+            assert revisions(project) == history[-1]
+        assert bumped()
+        section.delete()
+        assert bumped()
+        project.title = "New title"
+        project.save()
+        assert bumped()
@@ -4,10 +4,31 @@
 """Test task model and manager."""
 
 from django import db
+from django.contrib.postgres.search import SearchQuery
 
 import pytest
 
 from ... import models
+from ...models.task import SEARCH_CONFIG
+
+
+def revisions(task: models.Task) -> tuple[int, int]:
+    """Return the revisions of task and its project."""
+    revisions: tuple[int, int] = (
+        models.Task.objects.values_list(
+            "revision", "section__project__revision"
+        )
+        .filter(pk=task.pk)
+        .get()
+    )
+    return revisions
+
+
+def matches(task: models.Task, query: str) -> bool:
+    """Return whether task's search vector matches query."""
+    return models.Task.objects.filter(
+        pk=task.pk, search_vector=SearchQuery(query, config=SEARCH_CONFIG)
+    ).exists()
 
 
 @pytest.mark.django_db
@@ -42,8 +63,6 @@ class TestTask:
         other_task.refresh_from_db()
         task.refresh_from_db()
         assert other_task.number == task.number + 1
-        task.workspace.refresh_from_db()
-        assert task.workspace.highest_task_number == other_task.number
 
     def test_save(self, task: models.Task) -> None:
         """Test saving and assert number does not change."""
@@ -77,3 +96,138 @@ class TestTask:
         with pytest.raises(db.ProgrammingError):
             task.workspace = unrelated_workspace
             task.save()
+
+    def test_sub_task_counts(
+        self, task: models.Task, other_task: models.Task
+    ) -> None:
+        """Test that sub task counts follow sub task changes."""
+        sub_tasks = models.SubTask.objects.bulk_create(
+            models.SubTask(task=task, title="Sub", done=done, _order=_order)
+            for _order, done in enumerate((True, False, False))
+        )
+        task.refresh_from_db()
+        assert task.sub_task_count == 3
+        assert task.sub_task_done_count == 1
+
+        models.SubTask.objects.filter(task=task).update(done=True)
+        task.refresh_from_db()
+        assert task.sub_task_done_count == 3
+
+        sub_task = sub_tasks[0]
+        sub_task.task = other_task
+        sub_task._order = 0
+        sub_task.save()
+        task.refresh_from_db()
+        other_task.refresh_from_db()
+        assert task.sub_task_count == 2
+        assert task.sub_task_done_count == 2
+        assert other_task.sub_task_count == 1
+        assert other_task.sub_task_done_count == 1
+
+        models.SubTask.objects.filter(task=task).delete()
+        task.refresh_from_db()
+        assert task.sub_task_count == 0
+        assert task.sub_task_done_count == 0
+
+    def test_sub_task_counts_stale_save(
+        self, task: models.Task, sub_task: models.SubTask
+    ) -> None:
+        """Test that saving a stale task keeps its sub task counts."""
+        del sub_task
+        assert task.sub_task_count == 0
+        task.title = "Stale"
+        task.save()
+        task.refresh_from_db()
+        assert task.title == "Stale"
+        assert task.sub_task_count == 1
+
+    def test_search_vector(
+        self, task: models.Task, other_task: models.Task
+    ) -> None:
+        """Test that the search vector follows all searchable text."""
+        task.title = "Paint the fence"
+        task.save()
+        assert matches(task, "fence")
+
+        sub_task = models.SubTask.objects.create(
+            task=task, title="Buy brushes", _order=0
+        )
+        assert matches(task, "brushes")
+        sub_task.title = "Buy rollers"
+        sub_task.save()
+        assert not matches(task, "brushes")
+        assert matches(task, "rollers")
+        sub_task.task = other_task
+        sub_task.save()
+        assert not matches(task, "rollers")
+        assert matches(other_task, "rollers")
+        sub_task.delete()
+        assert not matches(other_task, "rollers")
+
+        chat_message = models.ChatMessage.objects.create(
+            task=task, text="Which color?"
+        )
+        assert matches(task, "color")
+        chat_message.delete()
+        assert not matches(task, "color")
+
+    def test_search_vector_stale_save(
+        self, task: models.Task, sub_task: models.SubTask
+    ) -> None:
+        """Test that saving a stale task keeps its search vector."""
+        task.refresh_from_db()
+        assert task.search_vector is not None
+        sub_task.title = "Unusual"
+        sub_task.save()
+        task.due_date = None
+        task.save()
+        assert matches(task, "unusual")
+
+    # Revisions are bumped when transactions commit
+    @pytest.mark.django_db(transaction=True)
+    def test_revision(
+        self,
+        task: models.Task,
+        other_task: models.Task,
+        label: models.Label,
+        sub_task: models.SubTask,
+    ) -> None:
+        """Test that changes below a task bump revisions up to project."""
+        history = [revisions(task)]
+
+        def bumped() -> bool:
+            history.append(revisions(task))
+            return all(a > b for a, b in zip(history[-1], history[-2]))
+
+        sub_task.done = not sub_task.done
+        sub_task.save()
+        assert bumped()
+        models.TaskLabel.objects.create(task=task, label=label)
+        assert bumped()
+        chat_message = models.ChatMessage.objects.create(
+            task=task, text="Hello"
+        )
+        assert bumped()
+        chat_message.delete()
+        assert bumped()
+        # Moving a sub task bumps both tasks
+        other_before = revisions(other_task)[0]
+        sub_task.task = other_task
+        sub_task.save()
+        assert bumped()
+        assert revisions(other_task)[0] > other_before
+        # Other tasks are left alone
+        other_before = revisions(other_task)[0]
+        task.title = "New title"
+        task.save()
+        assert bumped()
+        assert revisions(other_task)[0] == other_before
+
+    def test_revision_stale_save(self, task: models.Task) -> None:
+        """Test that saving a stale task can't set its revision back."""
+        stale = models.Task.objects.get(pk=task.pk)
+        task.save()
+        task.save()
+        revision = revisions(task)[0]
+        stale.save()
+        assert revisions(task)[0] > revision
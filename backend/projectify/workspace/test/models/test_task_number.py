@@ -0,0 +1,58 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test task number allocation."""
+
+from django.db import connection
+
+import pytest
+
+from ...models.task import Task
+from ...models.task_number import (
+    SEQUENCE_PREFIX,
+    task_number_allocate,
+    task_number_set_highest,
+)
+from ...models.workspace import Workspace
+
+pytestmark = pytest.mark.django_db
+
+
+def test_task_number_allocate(
+    workspace: Workspace, task: Task, other_task: Task
+) -> None:
+    """Test allocating several numbers at once."""
+    assert other_task.number == task.number + 1
+    assert task_number_allocate(workspace_pk=workspace.pk, count=3) == [
+        other_task.number + 1,
+        other_task.number + 2,
+        other_task.number + 3,
+    ]
+
+
+def test_task_number_set_highest(workspace: Workspace) -> None:
+    """Test continuing after explicitly numbered tasks."""
+    task_number_set_highest(workspace_pk=workspace.pk, number=10)
+    assert task_number_allocate(workspace_pk=workspace.pk) == [11]
+    task_number_set_highest(workspace_pk=workspace.pk, number=0)
+    assert task_number_allocate(workspace_pk=workspace.pk) == [1]
+
+
+def test_sequence_dropped() -> None:
+    """Test that deleting a workspace drops its sequence."""
+    workspace = Workspace.objects.create(title="Empty")
+
+    def exists() -> bool:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT to_regclass(%s) IS NOT NULL",
+                [f"{SEQUENCE_PREFIX}{workspace.pk}"],
+            )
+            row = cursor.fetchone()
+        assert row is not None
+        result: bool = row[0]
+        return result
+
+    assert exists()
+    workspace.delete()
+    assert not exists()
@@ -6,7 +6,6 @@
 from django import db
 from django.core.exceptions import ValidationError
 
-import psycopg.errors
 import pytest
 
 from projectify.user.models import User
@@ -15,6 +14,7 @@ from projectify.workspace.models.const import TeamMemberRoles
 from ...models.task import Task
 from ...models.team_member import TeamMember
 from ...models.workspace import Workspace
+from ...services.label import label_create
 from ...services.project import project_create
 from ...services.workspace import workspace_add_user
 
@@ -152,21 +152,24 @@ class TestWorkspace:
         task.refresh_from_db()
         assert task.assignee is None
 
-    def test_increment_highest_task_number(self, workspace: Workspace) -> None:
-        """Test set_highest_task_number."""
-        num = workspace.highest_task_number
-        new = workspace.increment_highest_task_number()
-        assert new == num + 1
-        workspace.refresh_from_db()
-        assert workspace.highest_task_number == new
-
-    def test_wrong_highest_task_number(
-        self, workspace: Workspace, task: Task
+    # Revisions are bumped when transactions commit
+    @pytest.mark.django_db(transaction=True)
+    def test_revision(
+        self, workspace: Workspace, team_member: TeamMember, other_user: User
     ) -> None:
-        """Test db trigger when highest_task_number < highest child task."""
-        # Changed from db.InternalError
-        with pytest.raises(db.ProgrammingError) as e:
-            task.save()
-            workspace.highest_task_number = 0
-            workspace.save()
-        assert isinstance(e.value.__cause__, psycopg.errors.RaiseException)
+        """Test that labels and team members bump the revision."""
+        workspace.refresh_from_db()
+        revision = workspace.revision
+        label_create(
+            who=team_member.user, workspace=workspace, name="Label", color=0
+        )
+        workspace.refresh_from_db()
+        assert workspace.revision > revision
+        revision = workspace.revision
+        workspace_add_user(
+            workspace=workspace,
+            user=other_user,
+            role=TeamMemberRoles.CONTRIBUTOR,
+        )
+        workspace.refresh_from_db()
+        assert workspace.revision > revision
@@ -3,12 +3,26 @@
 # SPDX-FileCopyrightText: 2023 JWP Consulting GK
 """Test task selectors."""
 
+from datetime import datetime, timedelta
+
 import pytest
 
 from projectify.user.models import User
+from projectify.workspace.models.label import Label
+from projectify.workspace.models.project import Project
+from projectify.workspace.models.section import Section
 from projectify.workspace.models.task import Task
+from projectify.workspace.models.team_member import TeamMember
 from projectify.workspace.models.workspace import Workspace
-from projectify.workspace.selectors.task import task_find_by_task_uuid
+from projectify.workspace.selectors.task import (
+    task_filter_for_workspace,
+    task_find_assigned_to_user,
+    task_find_by_task_uuid,
+    task_search,
+)
+from projectify.workspace.services.chat_message import chat_message_create
+from projectify.workspace.services.section import section_create
+from projectify.workspace.services.task import task_assign_labels, task_create
 from pytest_types import DjangoAssertNumQueries
 
 
@@ -32,3 +46,159 @@ def test_task_find_by_task_uuid(
             task_find_by_task_uuid(who=meddling_user, task_uuid=task.uuid)
             is None
         )
+
+
+@pytest.mark.django_db
+def test_task_search(
+    workspace: Workspace,
+    task: Task,
+    other_task: Task,
+    archived_project: Project,
+    team_member: TeamMember,
+    user: User,
+    meddling_user: User,
+) -> None:
+    """Test that tasks are ranked and scoped to the user's workspace."""
+    task.title = "Inventory"
+    task.description = "Count the apples"
+    task.save()
+    other_task.title = "Apples"
+    other_task.save()
+    chat_message_create(who=user, task=other_task, text="Bananas too")
+    archived_section: Section = section_create(
+        who=user, project=archived_project, title="Archived"
+    )
+    task_create(who=user, section=archived_section, title="Apples")
+
+    assert list(
+        task_search(who=user, workspace=workspace, query="apples")
+    ) == [
+        other_task,
+        task,
+    ]
+    assert list(
+        task_search(who=user, workspace=workspace, query="apples -bananas")
+    ) == [task]
+    assert not task_search(
+        who=meddling_user, workspace=workspace, query="apples"
+    )
+
+
+@pytest.mark.django_db
+def test_task_filter_for_workspace(
+    workspace: Workspace,
+    section: Section,
+    other_section: Section,
+    archived_project: Project,
+    team_member: TeamMember,
+    label: Label,
+    user: User,
+    meddling_user: User,
+    now: datetime,
+) -> None:
+    """Test filtering tasks by assignee, label, due date and section."""
+    assigned = task_create(
+        who=user, section=section, title="Assigned", assignee=team_member
+    )
+    labeled = task_create(who=user, section=section, title="Labeled")
+    task_assign_labels(task=labeled, labels=[label])
+    due = task_create(
+        who=user, section=other_section, title="Due", due_date=now
+    )
+    archived_section = section_create(
+        who=user, project=archived_project, title="Archived"
+    )
+    task_create(
+        who=user,
+        section=archived_section,
+        title="Archived",
+        assignee=team_member,
+    )
+
+    def find(**kwargs: object) -> list[Task]:
+        return list(
+            task_filter_for_workspace(
+                who=user,
+                workspace=workspace,
+                **kwargs,  # type: ignore[arg-type]
+            )
+        )
+
+    assert find() == [assigned, labeled, due]
+    assert find(assignee_uuid=team_member.uuid) == [assigned]
+    assert find(label_uuids=[label.uuid]) == [labeled]
+    assert find(due_before=now + timedelta(days=1)) == [due]
+    assert find(due_before=now) == []
+    assert find(section_uuid=other_section.uuid) == [due]
+    assert find(after_number=assigned.number) == [labeled, due]
+    assert not task_filter_for_workspace(
+        who=meddling_user, workspace=workspace
+    )
+
+
+@pytest.mark.django_db
+def test_task_find_assigned_to_user(
+    section: Section,
+    archived_project: Project,
+    unrelated_section: Section,
+    team_member: TeamMember,
+    unrelated_team_member: TeamMember,
+    user: User,
+    unrelated_user: User,
+    now: datetime,
+) -> None:
+    """Test that tasks are ordered by due date across workspaces."""
+    later = task_create(
+        who=user,
+        section=section,
+        title="Later",
+        assignee=team_member,
+        due_date=now + timedelta(days=1),
+    )
+    undated = task_create(
+        who=user, section=section, title="Undated", assignee=team_member
+    )
+    other_undated = task_create(
+        who=user, section=section, title="Undated", assignee=team_member
+    )
+    overdue = task_create(
+        who=user,
+        section=section,
+        title="Overdue",
+        assignee=team_member,
+        due_date=now - timedelta(days=1),
+    )
+    task_create(who=user, section=section, title="Unassigned")
+    archived_section = section_create(
+        who=user, project=archived_project, title="Archived"
+    )
+    task_create(
+        who=user,
+        section=archived_section,
+        title="Archived",
+        assignee=team_member,
+    )
+    unrelated = task_create(
+        who=unrelated_user,
+        section=unrelated_section,
+        title="Unrelated",
+        assignee=unrelated_team_member,
+    )
+    undated, other_undated = sorted(
+        [undated, other_undated], key=lambda task: task.uuid
+    )
+
+    def find(**kwargs: object) -> list[Task]:
+        return list(
+            task_find_assigned_to_user(
+                who=user,
+                **kwargs,  # type: ignore[arg-type]
+            )
+        )
+
+    assert find() == [overdue, later, undated, other_undated]
+    assert find(due_before=now) == [overdue]
+    assert find(after=overdue) == [later, undated, other_undated]
+    assert find(after=later) == [undated, other_undated]
+    assert find(after=undated) == [other_undated]
+    assert list(task_find_assigned_to_user(who=unrelated_user)) == [unrelated]
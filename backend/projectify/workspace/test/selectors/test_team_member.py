@@ -9,8 +9,10 @@ from projectify.user.models import User
 from projectify.workspace.models.team_member import TeamMember
 from projectify.workspace.models.workspace import Workspace
 from projectify.workspace.selectors.team_member import (
+    team_member_cache,
     team_member_find_for_workspace,
 )
+from pytest_types import DjangoAssertNumQueries
 
 
 @pytest.mark.django_db
@@ -27,3 +29,21 @@ def test_team_member_find_for_workspace(
         )
         == team_member
     )
+
+
+@pytest.mark.django_db
+def test_team_member_cache(
+    workspace: Workspace,
+    user: User,
+    team_member: TeamMember,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    """Test that team members are looked up once while cached."""
+    with team_member_cache(), django_assert_num_queries(1):
+        for _ in range(3):
+            assert (
+                team_member_find_for_workspace(workspace=workspace, user=user)
+                == team_member
+            )
+    with django_assert_num_queries(1):
+        team_member_find_for_workspace(workspace=workspace, user=user)
@@ -0,0 +1,120 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test workspace export selectors."""
+
+import threading
+
+from django.db import connection
+
+import pytest
+from rest_framework.exceptions import PermissionDenied
+
+from ...models.chat_message import ChatMessage
+from ...models.const import TeamMemberRoles
+from ...models.sub_task import SubTask
+from ...models.task import Task
+from ...models.task_label import TaskLabel
+from ...models.team_member import TeamMember
+from ...selectors.workspace_export import (
+    workspace_export_records,
+    workspace_export_task_rows,
+)
+from ...services.task import task_create
+
+pytestmark = pytest.mark.django_db
+
+
+def test_workspace_export_records(
+    team_member: TeamMember,
+    task: Task,
+    other_task: Task,
+    task_label: TaskLabel,
+    sub_task: SubTask,
+    chat_message: ChatMessage,
+) -> None:
+    """Test that batches of one record cover the whole workspace."""
+    batches = list(
+        workspace_export_records(
+            who=team_member.user, workspace=team_member.workspace, batch_size=1
+        )
+    )
+    assert all(len(batch) == 1 for batch in batches)
+    records = [record for batch in batches for record in batch]
+    assert [record["type"] for record in records] == [
+        "workspace",
+        "label",
+        "team_member",
+        "team_member",
+        "project",
+        "section",
+        "task",
+        "sub_task",
+        "chat_message",
+        "task",
+    ]
+    task_record = records[6]
+    assert task_record["uuid"] == task.uuid
+    assert task_record["section_uuid"] == task.section.uuid
+    assert task_record["label_uuids"] == [task_label.label.uuid]
+    assert records[7]["task_uuid"] == task.uuid
+    assert records[8]["author_email"] == team_member.user.email
+    assert "id" not in task_record
+
+
+@pytest.mark.django_db(transaction=True)
+def test_workspace_export_records_snapshot(
+    team_member: TeamMember, task: Task
+) -> None:
+    """Test that tasks created during an export are left out."""
+    batches = workspace_export_records(
+        who=team_member.user, workspace=team_member.workspace, batch_size=1
+    )
+    # The workspace, and then the first record read from the snapshot
+    next(batches)
+    next(batches)
+
+    def create() -> None:
+        try:
+            task_create(
+                who=team_member.user, section=task.section, title="New"
+            )
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=create)
+    thread.start()
+    thread.join()
+    tasks = [
+        record["uuid"]
+        for batch in batches
+        for record in batch
+        if record["type"] == "task"
+    ]
+    assert tasks == [task.uuid]
+    assert Task.objects.filter(title="New").exists()
+
+
+def test_workspace_export_task_rows(
+    team_member: TeamMember,
+    task: Task,
+    task_label: TaskLabel,
+    sub_task: SubTask,
+) -> None:
+    """Test exporting tasks as flat rows."""
+    ((row,),) = workspace_export_task_rows(
+        who=team_member.user, workspace=team_member.workspace
+    )
+    assert row["project"] == task.section.project.title
+    assert row["number"] == task.number
+    assert row["labels"] == task_label.label.name
+    assert row["sub_tasks"] == sub_task.title
+
+
+def test_workspace_export_needs_owner(team_member: TeamMember) -> None:
+    """Test that only owners may export a workspace."""
+    team_member.assign_role(TeamMemberRoles.MAINTAINER)
+    with pytest.raises(PermissionDenied):
+        workspace_export_records(
+            who=team_member.user, workspace=team_member.workspace
+        )
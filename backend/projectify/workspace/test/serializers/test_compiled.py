@@ -0,0 +1,77 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test that compiled serializers return the same as DRF."""
+
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from typing import Any
+
+import pytest
+from rest_framework import serializers
+
+from ...models.chat_message import ChatMessage
+from ...models.label import Label
+from ...models.project import Project
+from ...models.section import Section
+from ...models.sub_task import SubTask
+from ...models.task import Task
+from ...models.team_member import TeamMember
+from ...models.workspace import Workspace
+from ...selectors.project import ProjectDetailQuerySet
+from ...selectors.quota import workspace_get_all_quotas
+from ...selectors.task import TaskDetailQuerySet
+from ...selectors.workspace import WorkspaceDetailQuerySet
+from ...serializers.project import ProjectDetailSerializer
+from ...serializers.task_detail import TaskDetailSerializer
+from ...serializers.workspace import WorkspaceDetailSerializer
+from ...services.task import task_assign_labels
+
+pytestmark = pytest.mark.django_db
+
+
+def assert_same(
+    serializer_class: type[serializers.Serializer], instance: Any
+) -> None:
+    """Assert that compiled and DRF serialization give the same data."""
+    # A context makes the serializer fall back to DRF
+    drf = serializer_class(instance, context={"compiled": False}).data
+    assert serializer_class(instance).data == drf
+
+
+@pytest.fixture
+def populated(
+    task: Task,
+    other_task: Task,
+    other_section: Section,
+    labels: list[Label],
+    other_team_member: TeamMember,
+    sub_task: SubTask,
+    chat_message: ChatMessage,
+) -> Task:
+    """Give a task everything a detail serializer shows."""
+    del other_task, other_section, sub_task, chat_message
+    task.due_date = datetime(2024, 1, 2, 3, 4, 5, 120, tzinfo=dt_timezone.utc)
+    task.assignee = other_team_member
+    task.save()
+    task_assign_labels(task=task, labels=labels)
+    return task
+
+
+def test_project_detail(populated: Task, project: Project) -> None:
+    """Test ProjectDetailSerializer."""
+    instance = ProjectDetailQuerySet.get(pk=project.pk)
+    instance.workspace.quota = workspace_get_all_quotas(instance.workspace)
+    assert_same(ProjectDetailSerializer, instance)
+
+
+def test_workspace_detail(populated: Task, workspace: Workspace) -> None:
+    """Test WorkspaceDetailSerializer."""
+    instance = WorkspaceDetailQuerySet.get(pk=workspace.pk)
+    instance.quota = workspace_get_all_quotas(instance)
+    assert_same(WorkspaceDetailSerializer, instance)
+
+
+def test_task_detail(populated: Task) -> None:
+    """Test TaskDetailSerializer."""
+    assert_same(TaskDetailSerializer, TaskDetailQuerySet.get(pk=populated.pk))
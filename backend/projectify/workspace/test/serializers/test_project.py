@@ -0,0 +1,101 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test project serializers."""
+
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from pytest_types import DjangoAssertNumQueries
+
+from ...models.label import Label
+from ...models.project import Project
+from ...models.section import Section
+from ...models.task import Task
+from ...models.team_member import TeamMember
+from ...selectors.project import (
+    ProjectDetailQuerySet,
+    ProjectDetailWorkspaceQuerySet,
+)
+from ...selectors.quota import workspace_get_all_quotas
+from ...serializers.project import (
+    ProjectDetailAggregateSerializer,
+    ProjectDetailSerializer,
+)
+from ...services.sub_task import sub_task_create
+from ...services.task import task_assign_labels, task_create
+
+pytestmark = pytest.mark.django_db
+
+
+class TestProjectDetailAggregateSerializer:
+    """Test ProjectDetailAggregateSerializer."""
+
+    def render(self, project: Project, aggregate: bool) -> bytes:
+        """Render a project the same way ProjectReadUpdateDelete does."""
+        qs = (
+            ProjectDetailWorkspaceQuerySet
+            if aggregate
+            else ProjectDetailQuerySet
+        )
+        instance = qs.get(pk=project.pk)
+        instance.workspace.quota = workspace_get_all_quotas(instance.workspace)
+        serializer = (
+            ProjectDetailAggregateSerializer(instance=instance)
+            if aggregate
+            else ProjectDetailSerializer(instance=instance)
+        )
+        return JSONRenderer().render(serializer.data)
+
+    def test_empty(self, project: Project) -> None:
+        """Test a project without sections."""
+        assert self.render(project, True) == self.render(project, False)
+
+    def test_same_output(
+        self,
+        project: Project,
+        section: Section,
+        other_section: Section,
+        task: Task,
+        other_task: Task,
+        labels: list[Label],
+        team_member: TeamMember,
+        other_team_member: TeamMember,
+    ) -> None:
+        """Test that both serializers produce the same bytes."""
+        del other_section
+        user = team_member.user
+        task.due_date = datetime(2024, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc)
+        task.assignee = other_team_member
+        task.save()
+        task_assign_labels(task=task, labels=labels)
+        for done in (True, False, False):
+            sub_task_create(who=user, task=task, title="Sub", done=done)
+        sub_task_create(who=user, task=other_task, title="Sub", done=True)
+        third_task = task_create(
+            who=user,
+            section=section,
+            title="Third task",
+            due_date=datetime(
+                2024, 1, 2, 3, 4, 5, 120, tzinfo=dt_timezone.utc
+            ),
+            assignee=team_member,
+        )
+        task_assign_labels(task=third_task, labels=labels[:1])
+        sub_task_create(who=user, task=third_task, title="Sub", done=False)
+        assert self.render(project, True) == self.render(project, False)
+
+    def test_query_count(
+        self,
+        project: Project,
+        task: Task,
+        labels: list[Label],
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test that sections, tasks and labels take only one query."""
+        task_assign_labels(task=task, labels=labels)
+        with django_assert_num_queries(9):
+            self.render(project, True)
@@ -0,0 +1,209 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test project import services."""
+
+import io
+import json
+from pathlib import Path
+
+from django.core.files.base import ContentFile
+from django.db import IntegrityError
+
+import pytest
+from rest_framework.exceptions import ValidationError
+
+from projectify.corporate.services.stripe import customer_cancel_subscription
+
+from ...models.const import ProjectImportFormat, ProjectImportStatus
+from ...models.label import Label
+from ...models.project import Project
+from ...models.project_import import ProjectImport
+from ...models.section import Section
+from ...models.task import Task
+from ...models.team_member import TeamMember
+from ...models.workspace import Workspace
+from ...selectors.quota import trial_conditions
+from ...services import project_import as project_import_services
+from ...services.project_import import project_import_run, project_import_tasks
+
+pytestmark = pytest.mark.django_db
+
+CSV = """section,title,description,labels,assignee,due_date,sub_tasks
+{section},Existing section,,"{label}, new",{email},2024-01-02T03:04:05Z,
+New section,With sub tasks,Some text,,,,"first
+second"
+New section,,No title,,,,
+"""
+
+
+def test_project_import_csv(
+    project: Project,
+    section: Section,
+    task: Task,
+    label: Label,
+    team_member: TeamMember,
+) -> None:
+    """Test importing a CSV file in batches."""
+    data = CSV.format(
+        section=section.title, label=label.name, email=team_member.user.email
+    )
+    progress = list(
+        project_import_tasks(
+            who=team_member.user,
+            project=project,
+            file=io.BytesIO(data.encode()),
+            format=ProjectImportFormat.CSV,
+            batch_size=2,
+        )
+    )
+    assert len(progress) == 2
+    assert (progress[-1].rows, progress[-1].tasks) == (3, 2)
+    assert progress[-1].errors == [
+        {"line": 5, "errors": {"title": ["This field may not be blank."]}}
+    ]
+
+    a = section.task_set.get(title="Existing section")
+    assert a.number == task.number + 1
+    assert a.assignee == team_member
+    assert a.due_date is not None and a.due_date.day == 2
+    assert sorted(a.labels.values_list("name", flat=True)) == sorted(
+        [label.name, "new"]
+    )
+    new_section = project.section_set.get(title="New section")
+    assert list(project.section_set.all()) == [section, new_section]
+    b = new_section.task_set.get()
+    assert b.description == "Some text"
+    assert list(b.subtask_set.values_list("title", flat=True)) == [
+        "first",
+        "second",
+    ]
+
+
+def test_project_import_json_lines(
+    project: Project,
+    section: Section,
+    team_member: TeamMember,
+) -> None:
+    """Test importing JSON Lines and skipping invalid rows."""
+    rows = [
+        {
+            "section": section.title,
+            "title": "a",
+            "sub_tasks": ["first", {"title": "second", "done": True}],
+        },
+        {"section": section.title, "title": "b", "assignee": "x@example.com"},
+        ["not", "an", "object"],
+    ]
+    data = "\n".join(map(json.dumps, rows))
+    (progress,) = project_import_tasks(
+        who=team_member.user,
+        project=project,
+        file=io.BytesIO(data.encode()),
+        format=ProjectImportFormat.JSON_LINES,
+    )
+    assert (progress.rows, progress.tasks) == (3, 1)
+    assert [error["line"] for error in progress.errors] == [2, 3]
+    task = section.task_set.get()
+    assert list(task.subtask_set.values_list("title", "done")) == [
+        ("first", False),
+        ("second", True),
+    ]
+
+
+@pytest.mark.parametrize(
+    "resource,rows",
+    [
+        (
+            "Section",
+            [{"section": "a", "title": "a"}, {"section": "b", "title": "b"}],
+        ),
+        ("Label", [{"title": "a", "labels": ["a", "b"]}]),
+    ],
+)
+def test_project_import_quota(
+    project: Project,
+    workspace: Workspace,
+    section: Section,
+    label: Label,
+    team_member: TeamMember,
+    monkeypatch: pytest.MonkeyPatch,
+    resource: str,
+    rows: list[dict[str, object]],
+) -> None:
+    """Test that sections and labels are only created within the quota."""
+    # One more can be created, but not two
+    monkeypatch.setitem(trial_conditions, resource, 2)
+    customer_cancel_subscription(customer=workspace.customer)
+    data = "\n".join(
+        json.dumps({"section": section.title, **row}) for row in rows
+    )
+    with pytest.raises(ValidationError) as e:
+        list(
+            project_import_tasks(
+                who=team_member.user,
+                project=project,
+                file=io.BytesIO(data.encode()),
+                format=ProjectImportFormat.JSON_LINES,
+            )
+        )
+    assert e.match("would exceed the quota")
+    assert not section.task_set.exists()
+
+
+def test_project_import_run(
+    project: Project,
+    section: Section,
+    team_member: TeamMember,
+    media_root: Path,
+) -> None:
+    """Test running an uploaded import, and failing on a broken line."""
+    rows = [
+        json.dumps({"section": section.title, "title": "a"}),
+        "{",
+    ]
+    project_import = ProjectImport(
+        project=project,
+        user=team_member.user,
+        format=ProjectImportFormat.JSON_LINES,
+        file=ContentFile("\n".join(rows).encode(), name="import.jsonl"),
+    )
+    project_import.save()
+    name = project_import.file.name
+    project_import_run(project_import=project_import)
+    project_import.refresh_from_db()
+    assert project_import.status == ProjectImportStatus.FAILED
+    assert [error["line"] for error in project_import.errors] == [2]
+    assert project_import.rows == 0
+    assert not project_import.file
+    assert not project_import.file.storage.exists(name)
+
+
+def test_project_import_run_unexpected_error(
+    project: Project,
+    team_member: TeamMember,
+    media_root: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that an import raising something unexpected is failed."""
+
+    def task_create_many(**kwargs: object) -> None:
+        raise IntegrityError("duplicate key")
+
+    monkeypatch.setattr(
+        project_import_services, "task_create_many", task_create_many
+    )
+    project_import = ProjectImport(
+        project=project,
+        user=team_member.user,
+        format=ProjectImportFormat.CSV,
+        file=ContentFile(b"section,title\nSection,a\n", name="import.csv"),
+    )
+    project_import.save()
+    name = project_import.file.name
+    with pytest.raises(IntegrityError):
+        project_import_run(project_import=project_import)
+    project_import.refresh_from_db()
+    assert project_import.status == ProjectImportStatus.FAILED
+    assert not project_import.file
+    assert not project_import.file.storage.exists(name)
@@ -6,10 +6,34 @@
 import pytest
 
 from projectify.workspace.models import Project
+from projectify.workspace.models.order import ORDER_GAP
 from projectify.workspace.models.section import Section
 from projectify.workspace.models.task import Task
 from projectify.workspace.models.team_member import TeamMember
-from projectify.workspace.services.section import section_delete, section_move
+from projectify.workspace.services.section import (
+    section_create,
+    section_delete,
+    section_move,
+)
+from pytest_types import RunConcurrently
+
+
+@pytest.mark.django_db(transaction=True)
+def test_create_section_concurrently(
+    team_member: TeamMember,
+    project: Project,
+    run_concurrently: RunConcurrently,
+) -> None:
+    """Test that concurrent creates in one project don't pick the same key."""
+
+    def create(title: str) -> None:
+        section_create(who=team_member.user, title=title, project=project)
+
+    run_concurrently(lambda: create("a"), lambda: create("b"))
+    assert list(project.section_set.values_list("title", flat=True)) == [
+        "a",
+        "b",
+    ]
 
 
 @pytest.mark.django_db
@@ -94,4 +118,4 @@ def test_moving_empty_section(
     assert list(project.section_set.all()) == [
         section,
     ]
-    assert section._order == 0
+    assert section._order == ORDER_GAP
@@ -6,6 +6,9 @@
 from typing import Sequence
 from uuid import UUID
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 import pytest
 
 from ...models import SubTask, Task
@@ -322,3 +325,39 @@ def test_create_and_change_order(
     )
     assert new_order[1] == b.uuid, new_order
     assert new_order[3] == a.uuid, new_order
+
+
+def test_update_only_changed(
+    task: Task, team_member: TeamMember, sub_tasks: list[SubTask]
+) -> None:
+    """Test that only changed sub tasks are written, with a fixed order."""
+    _a, _b, c, _d, _e = sub_tasks
+    with CaptureQueriesContext(connection) as context:
+        sub_task_update_many(
+            create_sub_tasks=[],
+            update_sub_tasks=[
+                {
+                    "uuid": sub_task.uuid,
+                    "title": sub_task.title,
+                    "done": sub_task == c,
+                    # Gaps are closed
+                    "_order": 10 * n,
+                }
+                for n, sub_task in enumerate(sub_tasks)
+            ],
+            sub_tasks=sub_tasks,
+            who=team_member.user,
+            task=task,
+        )
+    updates = [
+        query["sql"]
+        for query in context.captured_queries
+        if query["sql"].startswith('UPDATE "workspace_subtask"')
+    ]
+    assert len(updates) == 1, updates
+    assert '"done"' in updates[0]
+    assert '"title"' not in updates[0]
+    assert list(task.subtask_set.values_list("uuid", "_order", "done")) == [
+        (sub_task.uuid, n, sub_task == c)
+        for n, sub_task in enumerate(sub_tasks)
+    ]
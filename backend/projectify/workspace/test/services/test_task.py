@@ -8,20 +8,28 @@ from datetime import datetime
 import pytest
 from rest_framework import exceptions
 
+from projectify.corporate.services.stripe import customer_cancel_subscription
+from projectify.workspace.selectors.quota import trial_conditions
 from projectify.workspace.services.label import label_create
+from pytest_types import DjangoAssertNumQueries, RunConcurrently
 
 from ...models import Project
 from ...models.label import Label
+from ...models.order import ORDER_GAP
 from ...models.section import Section
 from ...models.sub_task import SubTask
 from ...models.task import Task
 from ...models.team_member import TeamMember
 from ...models.workspace import Workspace
+from ...services.sub_task import ValidatedDatum
 from ...services.task import (
     task_assign_labels,
+    task_assign_labels_many,
     task_create,
+    task_create_many,
     task_create_nested,
     task_move_after,
+    task_move_many,
     task_update_nested,
 )
 
@@ -33,6 +41,7 @@ def test_set_labels(
     labels: list[Label],
     unrelated_workspace: Workspace,
     unrelated_team_member: TeamMember,
+    django_assert_num_queries: DjangoAssertNumQueries,
 ) -> None:
     """Test setting labels."""
     assert task.labels.count() == 0
@@ -45,6 +54,12 @@ def test_set_labels(
     # questionable how useful this code is to the application
     # TODO refactor
     assert list(task.labels.values_list("id", flat=True)) == [b.id, a.id]
+    # One read, then a delete and an insert within a savepoint
+    with django_assert_num_queries(5):
+        task_assign_labels(task=task, labels=[b, c, d, e])
+    assert task.labels.count() == 4
+    with django_assert_num_queries(1):
+        task_assign_labels(task=task, labels=[c, d, e, b])
     task_assign_labels(task=task, labels=[c, d, e])
     assert task.labels.count() == 3
     assert list(task.labels.values_list("id", flat=True)) == [
@@ -68,6 +83,52 @@ def test_set_labels(
 
 
 # Create
+def test_assign_labels_many(
+    task: Task,
+    other_task: Task,
+    labels: list[Label],
+    unrelated_task: Task,
+    unrelated_workspace: Workspace,
+    team_member: TeamMember,
+    unrelated_team_member: TeamMember,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    """Test adding labels to and removing labels from many tasks."""
+    user = team_member.user
+    a, b, c, *_ = labels
+    task_assign_labels(task=task, labels=[a])
+    # Permission check, checking tasks, the insert and finding the project
+    # to signal
+    with django_assert_num_queries(6):
+        task_assign_labels_many(
+            who=user, tasks=[task, other_task], add=[a, b, c]
+        )
+    assert task.labels.count() == 3
+    assert other_task.labels.count() == 3
+    task_assign_labels_many(who=user, tasks=[task, other_task], remove=[a, c])
+    assert list(task.labels.all()) == [b]
+    assert list(other_task.labels.all()) == [b]
+
+    with pytest.raises(exceptions.ValidationError) as e:
+        task_assign_labels_many(who=user, tasks=[task], add=[a], remove=[a])
+    assert e.value.detail == {
+        "remove_label_uuids": "Labels can't be added and removed at once"
+    }
+    with pytest.raises(exceptions.ValidationError):
+        task_assign_labels_many(
+            who=user, tasks=[task, unrelated_task], add=[a]
+        )
+    unrelated = label_create(
+        workspace=unrelated_workspace,
+        who=unrelated_team_member.user,
+        color=0,
+        name="don't care",
+    )
+    with pytest.raises(exceptions.ValidationError) as e:
+        task_assign_labels_many(who=user, tasks=[task], remove=[unrelated])
+    assert list(e.value.detail) == ["remove_label_uuids"]
+
+
 def test_create_task(
     section: Section,
     team_member: TeamMember,
@@ -129,6 +190,118 @@ def test_task_create_nested(
     assert task.assignee == team_member
 
 
+def test_task_create_many(
+    label: Label,
+    team_member: TeamMember,
+    unrelated_team_member: TeamMember,
+    section: Section,
+    task: Task,
+) -> None:
+    """Test creating several tasks after the existing ones."""
+    a, b = task_create_many(
+        who=team_member.user,
+        section=section,
+        tasks=[
+            {
+                "title": "a",
+                "labels": [label],
+                "sub_tasks": [
+                    {"title": "second", "done": False, "_order": 1},
+                    {"title": "first", "done": True, "_order": 0},
+                ],
+            },
+            {"title": "b", "assignee": team_member},
+        ],
+    )
+    assert list(section.task_set.all()) == [task, a, b]
+    assert (a.number, b.number) == (task.number + 1, task.number + 2)
+    assert list(a.labels.all()) == [label]
+    assert list(a.subtask_set.values_list("title", flat=True)) == [
+        "first",
+        "second",
+    ]
+    b.refresh_from_db()
+    assert b.assignee == team_member
+
+    with pytest.raises(exceptions.ValidationError) as e:
+        task_create_many(
+            who=team_member.user,
+            section=section,
+            tasks=[{"title": "c", "assignee": unrelated_team_member}],
+        )
+    assert e.match("belongs to a different workspace")
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("many", [False, True])
+def test_task_create_concurrently(
+    section: Section,
+    team_member: TeamMember,
+    run_concurrently: RunConcurrently,
+    many: bool,
+) -> None:
+    """Test that concurrent creates in one section don't pick the same key."""
+
+    def create(title: str) -> None:
+        if many:
+            task_create_many(
+                who=team_member.user, section=section, tasks=[{"title": title}]
+            )
+        else:
+            task_create(who=team_member.user, section=section, title=title)
+
+    run_concurrently(lambda: create("a"), lambda: create("b"))
+    assert list(section.task_set.values_list("title", flat=True)) == [
+        "a",
+        "b",
+    ]
+
+
+def test_task_create_many_quota(
+    team_member: TeamMember,
+    workspace: Workspace,
+    section: Section,
+    task: Task,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that all tasks and sub tasks created count towards the quota."""
+    monkeypatch.setitem(trial_conditions, "Task", 3)
+    monkeypatch.setitem(trial_conditions, "SubTask", 2)
+    customer_cancel_subscription(customer=workspace.customer)
+    with pytest.raises(exceptions.ValidationError) as e:
+        task_create_many(
+            who=team_member.user,
+            section=section,
+            tasks=[{"title": "a"}, {"title": "b"}, {"title": "c"}],
+        )
+    assert e.match("exceed the task quota")
+    sub_task: ValidatedDatum = {
+        "title": "sub task",
+        "done": False,
+        "_order": 0,
+    }
+    with pytest.raises(exceptions.ValidationError) as e:
+        task_create_many(
+            who=team_member.user,
+            section=section,
+            tasks=[
+                {"title": "a", "sub_tasks": [sub_task]},
+                {"title": "b", "sub_tasks": [sub_task, sub_task]},
+            ],
+        )
+    assert e.match("exceed the sub task quota")
+    assert list(section.task_set.all()) == [task]
+    task_create_many(
+        who=team_member.user,
+        section=section,
+        tasks=[
+            {"title": "a", "sub_tasks": [sub_task]},
+            {"title": "b", "sub_tasks": [sub_task]},
+        ],
+    )
+    assert section.task_set.count() == 3
+
+
 def test_add_task_due_date(
     section: Section,
     team_member: TeamMember,
@@ -294,6 +467,64 @@ def test_moving_task_to_other_section(
     ]
 
 
+def test_moving_task_into_same_spot(
+    section: Section,
+    task: Task,
+    team_member: TeamMember,
+) -> None:
+    """Test that the order is kept once neighbors run out of keys."""
+    last = task_create(who=team_member.user, title="last", section=section)
+    moved = []
+    # Every move halves the gap in front of last
+    for n in range(20):
+        new_task = task_create(
+            who=team_member.user, title=f"{n}", section=section
+        )
+        task_move_after(who=team_member.user, task=new_task, after=last)
+        moved.append(new_task)
+    assert list(section.task_set.all()) == [task, *moved, last]
+
+
+def test_moving_many_tasks(
+    section: Section,
+    other_section: Section,
+    task: Task,
+    other_task: Task,
+    unrelated_task: Task,
+    team_member: TeamMember,
+) -> None:
+    """Test moving many tasks into a section at once."""
+    user = team_member.user
+    other_section_task = task_create(
+        who=user, title="don't care", section=other_section
+    )
+    last = task_create(who=user, title="last", section=section)
+    task_move_many(
+        who=user,
+        tasks=[last, other_section_task],
+        section=section,
+        after=task,
+    )
+    assert list(section.task_set.all()) == [
+        task,
+        last,
+        other_section_task,
+        other_task,
+    ]
+    task_move_many(who=user, tasks=[other_task, task], section=other_section)
+    assert list(other_section.task_set.all()) == [other_task, task]
+    assert list(section.task_set.all()) == [last, other_section_task]
+
+    with pytest.raises(exceptions.ValidationError):
+        task_move_many(
+            who=user, tasks=[task], section=other_section, after=last
+        )
+    with pytest.raises(exceptions.ValidationError):
+        task_move_many(who=user, tasks=[task], section=section, after=task)
+    with pytest.raises(exceptions.ValidationError):
+        task_move_many(who=user, tasks=[unrelated_task], section=section)
+
+
 def test_moving_task_to_empty_section(
     # TODO the following two fixtures might not be needed
     project: Project,
@@ -316,4 +547,4 @@ def test_moving_task_to_empty_section(
         task,
     ]
     task.refresh_from_db()
-    assert task._order == 0
+    assert task._order == ORDER_GAP
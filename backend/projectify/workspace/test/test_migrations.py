@@ -28,9 +28,11 @@ class Test0043:
         Task = old_state.apps.get_model("workspace", "Task")
         WorkspaceUser = old_state.apps.get_model("workspace", "WorkspaceUser")
         User = old_state.apps.get_model(settings.AUTH_USER_MODEL)
+        # Later migrations check task numbers against this
         workspace = Workspace.objects.create(
             title="",
             description="",
+            highest_task_number=2,
         )
         workspace_board = WorkspaceBoard.objects.create(
             title="",
@@ -107,9 +109,11 @@ class Test0047PopulateChatMessageAuthorWorkspaceUser:
         WorkspaceUser = old_state.apps.get_model("workspace", "WorkspaceUser")
         User = old_state.apps.get_model(settings.AUTH_USER_MODEL)
         ChatMessage = old_state.apps.get_model("workspace", "ChatMessage")
+        # Later migrations check task numbers against this
         workspace = Workspace.objects.create(
             title="",
             description="",
+            highest_task_number=2,
         )
         workspace_board = WorkspaceBoard.objects.create(
             title="",
@@ -0,0 +1,180 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test batch views."""
+
+import unittest.mock
+
+from django.urls import reverse
+
+import pytest
+from rest_framework.test import APIClient
+
+from projectify.workspace.models.label import Label
+from projectify.workspace.models.section import Section
+from projectify.workspace.models.task import Task
+from projectify.workspace.models.team_member import TeamMember
+from projectify.workspace.models.workspace import Workspace
+
+
+@pytest.mark.django_db
+class TestBatch:
+    """Test running several operations at once."""
+
+    @pytest.fixture
+    def resource_url(self) -> str:
+        """Return URL to this view."""
+        return reverse("workspace:batch")
+
+    def test_create_assign_move(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        workspace: Workspace,
+        task: Task,
+        other_task: Task,
+        other_section: Section,
+        team_member: TeamMember,
+    ) -> None:
+        """Test creating a label, assigning it and moving tasks."""
+        update = {
+            "title": "Updated",
+            "description": None,
+            "due_date": None,
+            "assignee": None,
+            "labels": [{"uuid": {"$ref": 0}}],
+        }
+        operations = [
+            {
+                "op": "label.create",
+                "args": {
+                    "workspace_uuid": str(workspace.uuid),
+                    "name": "Batched",
+                    "color": 1,
+                },
+            },
+            {
+                "op": "task.update",
+                "args": {"task_uuid": str(task.uuid), **update},
+            },
+            {
+                "op": "task.update",
+                "args": {"task_uuid": str(other_task.uuid), **update},
+            },
+            {
+                "op": "task.move-to-section",
+                "args": {
+                    "task_uuid": str(task.uuid),
+                    "section_uuid": str(other_section.uuid),
+                },
+            },
+        ]
+        with unittest.mock.patch(
+            "projectify.workspace.services.signals._group_send"
+        ) as group_send:
+            response = rest_user_client.post(
+                resource_url, {"operations": operations}, format="json"
+            )
+            assert response.status_code == 200, response.data
+        label, updated, _, moved = response.data["results"]
+        assert label["name"] == "Batched"
+        assert updated["title"] == "Updated"
+        assert moved is None
+        task.refresh_from_db()
+        assert task.section == other_section
+        assert list(task.labels.values_list("uuid", flat=True)) == [
+            Label.objects.get(name="Batched").uuid
+        ]
+        # Workspace, two tasks and the two projects they were in, which is
+        # the same project
+        groups = [call.args[0] for call in group_send.call_args_list]
+        assert sorted(groups) == sorted(
+            [
+                f"workspace-{workspace.uuid}",
+                f"task-{task.uuid}",
+                f"task-{other_task.uuid}",
+                f"project-{task.section.project.uuid}",
+            ]
+        )
+
+    def test_rolled_back(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        workspace: Workspace,
+        task: Task,
+        team_member: TeamMember,
+    ) -> None:
+        """Test that no operation takes effect when one fails."""
+        operations = [
+            {
+                "op": "label.create",
+                "args": {
+                    "workspace_uuid": str(workspace.uuid),
+                    "name": "Rolled back",
+                    "color": 1,
+                },
+            },
+            {"op": "task.delete", "args": {"task_uuid": str(task.uuid)}},
+            {"op": "label.delete", "args": {"label_uuid": {"$ref": 1}}},
+        ]
+        with unittest.mock.patch(
+            "projectify.workspace.services.signals._group_send"
+        ) as group_send:
+            response = rest_user_client.post(
+                resource_url, {"operations": operations}, format="json"
+            )
+            assert response.status_code == 400, response.data
+        assert response.data["details"]["operations"] == [
+            {},
+            {},
+            {"args": "The operation referred to has no uuid"},
+        ]
+        assert not Label.objects.filter(name="Rolled back").exists()
+        assert Task.objects.filter(pk=task.pk).exists()
+        group_send.assert_not_called()
+
+    @pytest.mark.parametrize("index", [False, -1, 1, "0"])
+    def test_invalid_ref(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        workspace: Workspace,
+        team_member: TeamMember,
+        index: object,
+    ) -> None:
+        """Test that only earlier operations can be referred to."""
+        operations = [
+            {
+                "op": "label.create",
+                "args": {
+                    "workspace_uuid": str(workspace.uuid),
+                    "name": "Referred to",
+                    "color": 1,
+                },
+            },
+            {"op": "label.delete", "args": {"label_uuid": {"$ref": index}}},
+        ]
+        response = rest_user_client.post(
+            resource_url, {"operations": operations}, format="json"
+        )
+        assert response.status_code == 400, response.data
+        assert response.data["details"]["operations"] == [
+            {},
+            {"args": "Only earlier operations can be referred to"},
+        ]
+        assert not Label.objects.filter(name="Referred to").exists()
+
+    def test_unknown_operation(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: TeamMember,
+    ) -> None:
+        """Test that unknown operations are rejected."""
+        response = rest_user_client.post(
+            resource_url,
+            {"operations": [{"op": "workspace.delete", "args": {}}]},
+            format="json",
+        )
+        assert response.status_code == 400, response.data
@@ -5,6 +5,9 @@
 
 from unittest.mock import ANY
 
+from django.core.cache import caches
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.timezone import now
 
@@ -12,7 +15,14 @@ import pytest
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from projectify.lib.cache import (
+    RESPONSE_CACHE,
+    ResponseCacheStats,
+    response_cache_stats,
+)
+from projectify.settings.base import Base
 from projectify.workspace.models import TaskLabel
+from projectify.workspace.models.order import ORDER_GAP
 from projectify.workspace.models.project import Project
 from projectify.workspace.models.section import Section
 from projectify.workspace.models.sub_task import SubTask
@@ -24,6 +34,7 @@ from projectify.workspace.selectors.project import (
 )
 from projectify.workspace.services.project import project_archive
 from projectify.workspace.services.sub_task import sub_task_create
+from projectify.workspace.services.task import task_move_after
 from pytest_types import DjangoAssertNumQueries
 
 
@@ -103,6 +114,10 @@ class TestProjectReadUpdateDelete:
         task.save()
         # Gone up from 7 -> 12 since we prefetch workspace details too
         # Gone up from 11 -> 14, since we fetch workspace quota
+        # Down to 13, team members and their users are fetched together
+        # Up to 14, since we check the ETag first
+        # Up to 15, since we look for cached project details
+        # Down to 14, since the ETag and the cache share the version
         with django_assert_num_queries(14):
             response = rest_user_client.get(resource_url)
             assert response.status_code == 200, response.data
@@ -114,7 +129,7 @@ class TestProjectReadUpdateDelete:
             "sections": [
                 {
                     "uuid": ANY,
-                    "_order": 0,
+                    "_order": ORDER_GAP,
                     "title": section.title,
                     "description": section.description,
                     "tasks": [
@@ -164,6 +179,184 @@ class TestProjectReadUpdateDelete:
             response = rest_user_client.get(resource_url)
             assert response.status_code == 404, response.content
 
+    def test_getting_aggregated(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        settings: Base,
+        team_member: TeamMember,
+        task: Task,
+        other_task: Task,
+        sub_task: SubTask,
+        task_label: TaskLabel,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Assert that aggregating in PostgreSQL gives the same response."""
+        del other_task, sub_task, task_label
+        task.assignee = team_member
+        task.save()
+        response = rest_user_client.get(resource_url)
+        assert response.status_code == 200, response.data
+        settings.ENABLE_PROJECT_DETAIL_AGGREGATION = True
+        caches[RESPONSE_CACHE].clear()
+        # Sections, tasks, labels and assignees are fetched in one query
+        with django_assert_num_queries(10):
+            aggregated = rest_user_client.get(resource_url)
+            assert aggregated.status_code == 200, aggregated.data
+        assert aggregated.content == response.content
+
+    def test_getting_selected(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        project: Project,
+        team_member: TeamMember,
+        task: Task,
+        task_label: TaskLabel,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Assert that only fields and relations picked are fetched."""
+        del task_label
+        # Version, project with its workspace, labels, sections and tasks
+        with django_assert_num_queries(5):
+            response = rest_user_client.get(
+                resource_url,
+                {
+                    "fields": "title,sections.tasks.title",
+                    "include": "workspace.labels",
+                },
+            )
+            assert response.status_code == 200, response.data
+        assert response.data == {
+            "title": project.title,
+            "sections": [{"tasks": [{"title": task.title}]}],
+            # No fields are picked for the workspace, so all are shown
+            "workspace": {
+                "uuid": str(project.workspace.uuid),
+                "title": project.workspace.title,
+                "description": project.workspace.description,
+                "picture": None,
+                "labels": [ANY],
+            },
+        }
+        response = rest_user_client.get(resource_url, {"include": ""})
+        assert response.status_code == 200, response.data
+        assert response.data == {
+            "title": project.title,
+            "description": project.description,
+            "uuid": str(project.uuid),
+            "archived": None,
+        }
+
+    def test_getting_selected_unknown(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: TeamMember,
+    ) -> None:
+        """Assert that unknown fields and relations are rejected."""
+        for query in (
+            {"fields": "sections.tasks.color"},
+            {"fields": "title.length"},
+            {"include": "title"},
+        ):
+            response = rest_user_client.get(resource_url, query)
+            assert response.status_code == 400, response.data
+
+    # Revisions are bumped when transactions commit
+    @pytest.mark.django_db(transaction=True)
+    def test_not_modified(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: TeamMember,
+        task: Task,
+        other_task: Task,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Assert that an unchanged project is not serialized again."""
+        etag = rest_user_client.get(resource_url)["ETag"]
+        with django_assert_num_queries(1):
+            response = rest_user_client.get(
+                resource_url, HTTP_IF_NONE_MATCH=etag
+            )
+            assert response.status_code == 304, response.content
+        # The query is validated before the ETag is compared
+        response = rest_user_client.get(
+            resource_url, {"include": "title"}, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 400, response.content
+        # Reordering tasks leaves their modified column as is
+        task_move_after(who=team_member.user, task=task, after=other_task)
+        response = rest_user_client.get(resource_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, response.data
+        assert response["ETag"] != etag
+
+    # Revisions are bumped when transactions commit
+    @pytest.mark.django_db(transaction=True)
+    def test_cached(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: TeamMember,
+        task: Task,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Assert that project details are only serialized once."""
+        caches[RESPONSE_CACHE].clear()
+        response = rest_user_client.get(resource_url)
+        assert response.status_code == 200, response.data
+        # Version, workspace and the quota's resource counts
+        with django_assert_num_queries(4):
+            cached = rest_user_client.get(resource_url)
+            assert cached.status_code == 200, cached.data
+        assert cached.content == response.content
+        assert response_cache_stats(name="project_detail") == (
+            ResponseCacheStats(hits=1, misses=1)
+        )
+        # Changing a task changes the project's revision
+        task.title = "Updated task"
+        task.save()
+        response = rest_user_client.get(resource_url)
+        assert response.status_code == 200, response.data
+        assert response.data["sections"][0]["tasks"][0]["title"] == (
+            "Updated task"
+        )
+        assert response_cache_stats(name="project_detail") == (
+            ResponseCacheStats(hits=1, misses=2)
+        )
+
+    @pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+    def test_getting_from_replica(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        settings: Base,
+        team_member: TeamMember,
+        task: Task,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Assert that the project is read from the replica, unless pinned."""
+        task.assignee = team_member
+        task.save()
+        settings.DATABASE_REPLICA = "replica"
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            with django_assert_num_queries(0):
+                response = rest_user_client.get(resource_url)
+                assert response.status_code == 200, response.data
+        assert len(replica) == 14
+        response = rest_user_client.put(
+            resource_url,
+            data={"title": "Project 1337", "description": ""},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_200_OK, response.data
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            response = rest_user_client.get(resource_url)
+            assert response.status_code == 200, response.data
+        assert len(replica) == 0
+        assert response.data["title"] == "Project 1337"
+
     def test_updating(
         self,
         rest_user_client: APIClient,
@@ -204,7 +397,8 @@ class TestProjectReadUpdateDelete:
             archived=True,
         )
 
-        with django_assert_num_queries(5):
+        # Project imports are collected for deletion as well
+        with django_assert_num_queries(6):
             response = rest_user_client.delete(resource_url)
             assert (
                 response.status_code == status.HTTP_204_NO_CONTENT
@@ -0,0 +1,86 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Test project import views."""
+
+from pathlib import Path
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+import pytest
+from rest_framework.test import APIClient
+
+from projectify.workspace.models.const import ProjectImportStatus
+from projectify.workspace.models.project import Project
+from projectify.workspace.models.project_import import ProjectImport
+from projectify.workspace.models.section import Section
+from projectify.workspace.models.team_member import TeamMember
+from projectify.workspace.tasks import import_project
+from pytest_types import DjangoAssertNumQueries, DjangoCaptureOnCommitCallbacks
+
+
+# Create
+@pytest.mark.django_db
+class TestProjectImportCreate:
+    """Test uploading a file to be imported."""
+
+    @pytest.fixture
+    def resource_url(self, project: Project) -> str:
+        """Return URL to this view."""
+        return reverse("workspace:projects:import", args=(project.uuid,))
+
+    def test_upload_and_import(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        section: Section,
+        team_member: TeamMember,
+        media_root: Path,
+        django_assert_num_queries: DjangoAssertNumQueries,
+        django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+    ) -> None:
+        """Test uploading a file and importing it in the background."""
+        data = f"section,title\n{section.title},Imported\n"
+        with (
+            django_assert_num_queries(5),
+            django_capture_on_commit_callbacks() as callbacks,
+        ):
+            response = rest_user_client.post(
+                resource_url,
+                {
+                    "file": SimpleUploadedFile("tasks.csv", data.encode()),
+                    "format": "csv",
+                },
+                format="multipart",
+            )
+            assert response.status_code == 202, response.data
+        assert len(callbacks) == 1
+        assert response.data["status"] == ProjectImportStatus.QUEUED
+
+        # Run by a worker
+        project_import = ProjectImport.objects.get(uuid=response.data["uuid"])
+        import_project(project_import.pk)
+        assert section.task_set.get().title == "Imported"
+
+        response = rest_user_client.get(
+            reverse(
+                "workspace:project-imports:read",
+                args=(project_import.uuid,),
+            )
+        )
+        assert response.status_code == 200, response.data
+        assert response.data["status"] == ProjectImportStatus.DONE
+        assert (response.data["rows"], response.data["tasks"]) == (1, 1)
+
+    def test_no_file(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: TeamMember,
+    ) -> None:
+        """Test that a file has to be given."""
+        response = rest_user_client.post(
+            resource_url, {"format": "csv"}, format="multipart"
+        )
+        assert response.status_code == 400, response.data
@@ -3,6 +3,8 @@
 # SPDX-FileCopyrightText: 2023-2024 JWP Consulting GK
 """Test task CRUD views."""
 
+from datetime import datetime, timedelta
+from typing import Any
 from uuid import uuid4
 
 from django.urls import reverse
@@ -12,8 +14,14 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.test import APIClient
 
+from projectify.user.models import User
+from projectify.workspace.models.label import Label
+from projectify.workspace.models.order import ORDER_GAP
 from projectify.workspace.models.section import Section
 from projectify.workspace.models.task import Task
+from projectify.workspace.models.team_member import TeamMember
+from projectify.workspace.services.chat_message import chat_message_create
+from projectify.workspace.services.task import task_create
 from pytest_types import DjangoAssertNumQueries
 
 from ... import models
@@ -110,7 +118,10 @@ class TestTaskCreate(UnauthenticatedTestMixin):
         # 26 now
         # 24 now
         # 21 now Justus 2024-05-23
-        with django_assert_num_queries(25):
+        # 23 now, since unchanged labels aren't written
+        # 20 now, since task numbers come from a sequence
+        # 21 now, since the section is locked
+        with django_assert_num_queries(21):
             response = rest_user_client.post(
                 resource_url,
                 {**payload, "assignee": {"uuid": str(team_member.uuid)}},
@@ -154,7 +165,343 @@ class TestTaskCreate(UnauthenticatedTestMixin):
         }
 
 
+@pytest.mark.django_db
+class TestTaskCreateMany(UnauthenticatedTestMixin):
+    """Test creating many tasks at once."""
+
+    @pytest.fixture
+    def resource_url(self) -> str:
+        """Return URL to resource."""
+        return reverse("workspace:tasks:create-many")
+
+    def payload(
+        self,
+        section: models.Section,
+        label: models.Label,
+        team_member: models.TeamMember,
+        count: int,
+    ) -> dict[str, Any]:
+        """Return a payload for count tasks."""
+        return {
+            "section": {"uuid": str(section.uuid)},
+            "tasks": [
+                {
+                    "title": f"Task {n}",
+                    "description": None,
+                    "labels": [{"uuid": str(label.uuid)}],
+                    "assignee": {"uuid": str(team_member.uuid)},
+                    "sub_tasks": [
+                        {"title": "I am a sub task", "done": False},
+                        {"title": "I am another sub task", "done": True},
+                    ],
+                    "due_date": None,
+                }
+                for n in range(count)
+            ],
+        }
+
+    def test_authenticated(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        section: models.Section,
+        label: models.Label,
+        team_member: models.TeamMember,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test that the number of queries doesn't grow with the tasks."""
+        for count in (1, 20):
+            with django_assert_num_queries(18):
+                response = rest_user_client.post(
+                    resource_url,
+                    self.payload(section, label, team_member, count),
+                    format="json",
+                )
+                assert response.status_code == 201, response.data
+            assert [task["title"] for task in response.data] == [
+                f"Task {n}" for n in range(count)
+            ]
+        tasks = list(section.task_set.all())
+        assert len(tasks) == 21
+        assert [task.number for task in tasks] == list(range(1, 22))
+        assert tasks[-1].labels.get() == label
+        assert tasks[-1].assignee == team_member
+        assert list(tasks[-1].subtask_set.values_list("done", flat=True)) == [
+            False,
+            True,
+        ]
+        assert models.SubTask.objects.count() == 42
+
+    def test_unknown_label(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        section: models.Section,
+        label: models.Label,
+        team_member: models.TeamMember,
+    ) -> None:
+        """Test that nothing is created if a task can't be validated."""
+        payload = self.payload(section, label, team_member, 2)
+        payload["tasks"][1]["labels"] = [{"uuid": str(uuid4())}]
+        response = rest_user_client.post(resource_url, payload, format="json")
+        assert response.status_code == 400, response.data
+        assert response.data["details"]["tasks"][0] == {}
+        assert Task.objects.count() == 0
+
+
 # Read
+@pytest.mark.django_db
+class TestTaskList(UnauthenticatedTestMixin):
+    """Test listing and filtering tasks."""
+
+    @pytest.fixture
+    def resource_url(self, workspace: models.Workspace) -> str:
+        """Return URL to resource."""
+        return reverse("workspace:workspaces:tasks", args=(workspace.uuid,))
+
+    def test_unauthorized(
+        self, rest_meddling_client: APIClient, resource_url: str
+    ) -> None:
+        """Test listing someone else's tasks."""
+        response = rest_meddling_client.get(resource_url)
+        assert response.status_code == 404, response.data
+
+    def test_authenticated(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: models.TeamMember,
+        task: Task,
+        other_task: Task,
+        task_label: models.TaskLabel,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test filtering by label when authenticated."""
+        label_uuid = str(task_label.label.uuid)
+        with django_assert_num_queries(3):
+            response = rest_user_client.get(
+                resource_url, {"label": [label_uuid]}
+            )
+            assert response.status_code == 200, response.data
+        assert [t["uuid"] for t in response.data["tasks"]] == [str(task.uuid)]
+        assert response.data["tasks"][0]["labels"][0]["uuid"] == label_uuid
+        assert response.data["next_cursor"] is None
+
+    def test_cursor(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: models.TeamMember,
+        section: Section,
+    ) -> None:
+        """Test that tasks are paginated with a cursor."""
+        Task.objects.bulk_create(
+            Task(
+                workspace=section.project.workspace,
+                section=section,
+                title="Task",
+                number=number,
+                _order=number,
+            )
+            for number in range(1, 103)
+        )
+        response = rest_user_client.get(resource_url)
+        assert len(response.data["tasks"]) == 100
+        assert response.data["next_cursor"] == 100
+        response = rest_user_client.get(resource_url, {"cursor": 100})
+        assert [t["number"] for t in response.data["tasks"]] == [101, 102]
+        assert response.data["next_cursor"] is None
+
+    def test_invalid_filter(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: models.TeamMember,
+    ) -> None:
+        """Test that filters are validated."""
+        response = rest_user_client.get(resource_url, {"assignee": "me"})
+        assert response.status_code == 400, response.data
+        assert "assignee" in response.data["details"]
+
+
+@pytest.mark.django_db
+class TestUserTasks(UnauthenticatedTestMixin):
+    """Test listing tasks assigned to a user."""
+
+    @pytest.fixture
+    def resource_url(self) -> str:
+        """Return URL to resource."""
+        return reverse("workspace:tasks:user-tasks")
+
+    def test_authenticated(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: models.TeamMember,
+        task: Task,
+        other_task: Task,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test tasks being grouped by workspace and project."""
+        task.assignee = team_member
+        task.save()
+        with django_assert_num_queries(2):
+            response = rest_user_client.get(resource_url)
+            assert response.status_code == 200, response.data
+        (workspace,) = response.data["workspaces"]
+        assert workspace["uuid"] == str(task.workspace.uuid)
+        (project,) = workspace["projects"]
+        assert project["uuid"] == str(task.section.project.uuid)
+        assert [t["uuid"] for t in project["tasks"]] == [str(task.uuid)]
+        assert response.data["next_cursor"] is None
+
+    def test_overdue(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: models.TeamMember,
+        task: Task,
+        other_task: Task,
+        now: datetime,
+    ) -> None:
+        """Test only listing overdue tasks."""
+        task.assignee = team_member
+        task.due_date = now - timedelta(days=1)
+        task.save()
+        other_task.assignee = team_member
+        other_task.due_date = now + timedelta(days=1)
+        other_task.save()
+        response = rest_user_client.get(resource_url, {"overdue": "true"})
+        (workspace,) = response.data["workspaces"]
+        (project,) = workspace["projects"]
+        assert [t["uuid"] for t in project["tasks"]] == [str(task.uuid)]
+
+    def test_cursor(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: models.TeamMember,
+        section: Section,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test that tasks are paginated with a cursor."""
+        Task.objects.bulk_create(
+            Task(
+                workspace=section.project.workspace,
+                section=section,
+                title="Task",
+                number=number,
+                _order=number,
+                assignee=team_member,
+            )
+            for number in range(1, 103)
+        )
+        response = rest_user_client.get(resource_url)
+        (workspace,) = response.data["workspaces"]
+        (project,) = workspace["projects"]
+        assert len(project["tasks"]) == 100
+        cursor = response.data["next_cursor"]
+        assert cursor == project["tasks"][-1]["uuid"]
+        with django_assert_num_queries(3):
+            response = rest_user_client.get(resource_url, {"cursor": cursor})
+        (workspace,) = response.data["workspaces"]
+        (project,) = workspace["projects"]
+        assert len(project["tasks"]) == 2
+        assert response.data["next_cursor"] is None
+
+    def test_invalid_cursor(
+        self,
+        rest_meddling_client: APIClient,
+        resource_url: str,
+        task: Task,
+    ) -> None:
+        """Test that a cursor for someone else's task is rejected."""
+        response = rest_meddling_client.get(
+            resource_url, {"cursor": str(task.uuid)}
+        )
+        assert response.status_code == 400, response.data
+        assert "cursor" in response.data["details"]
+
+
+@pytest.mark.django_db
+class TestTaskSearch(UnauthenticatedTestMixin):
+    """Test searching tasks."""
+
+    @pytest.fixture
+    def resource_url(self, workspace: models.Workspace) -> str:
+        """Return URL to resource."""
+        return reverse(
+            "workspace:workspaces:search-tasks", args=(workspace.uuid,)
+        )
+
+    def test_unauthorized(
+        self, rest_meddling_client: APIClient, resource_url: str
+    ) -> None:
+        """Test searching in someone else's workspace."""
+        response = rest_meddling_client.get(resource_url, {"q": "task"})
+        assert response.status_code == 404, response.data
+
+    def test_authenticated(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: models.TeamMember,
+        task: Task,
+        other_task: Task,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test searching when authenticated."""
+        with django_assert_num_queries(3):
+            response = rest_user_client.get(resource_url, {"q": "other task"})
+            assert response.status_code == 200, response.data
+        assert [t["uuid"] for t in response.data["tasks"]] == [
+            str(other_task.uuid)
+        ]
+        assert response.data["tasks"][0]["section"]["project"]["uuid"] == str(
+            task.section.project.uuid
+        )
+        assert response.data["next_page"] is None
+
+    def test_pages(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: models.TeamMember,
+        section: Section,
+    ) -> None:
+        """Test that results are paginated."""
+        Task.objects.bulk_create(
+            Task(
+                workspace=section.project.workspace,
+                section=section,
+                title="Needle",
+                number=number,
+                _order=number,
+            )
+            for number in range(1, 53)
+        )
+        response = rest_user_client.get(resource_url, {"q": "needle"})
+        assert len(response.data["tasks"]) == 50
+        assert response.data["next_page"] == 2
+        response = rest_user_client.get(
+            resource_url, {"q": "needle", "page": 2}
+        )
+        # Equally ranked tasks are ordered newest first
+        assert [t["number"] for t in response.data["tasks"]] == [2, 1]
+        assert response.data["next_page"] is None
+
+    def test_no_query(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: models.TeamMember,
+    ) -> None:
+        """Test that a query is required."""
+        response = rest_user_client.get(resource_url)
+        assert response.status_code == 400, response.data
+        assert "q" in response.data["details"]
+
+
 @pytest.mark.django_db
 class TestTaskRetrieveUpdateDestroy(UnauthenticatedTestMixin):
     """Test Task read, update and delete."""
@@ -183,7 +530,7 @@ class TestTaskRetrieveUpdateDestroy(UnauthenticatedTestMixin):
         django_assert_num_queries: DjangoAssertNumQueries,
     ) -> None:
         """Test retrieving when logged in, but not authorized."""
-        with django_assert_num_queries(1):
+        with django_assert_num_queries(2):
             response = rest_meddling_client.get(resource_url)
             assert response.status_code == 404, response.data
 
@@ -196,12 +543,33 @@ class TestTaskRetrieveUpdateDestroy(UnauthenticatedTestMixin):
         django_assert_num_queries: DjangoAssertNumQueries,
     ) -> None:
         """Test retrieving when authenticated."""
-        with django_assert_num_queries(4):
+        with django_assert_num_queries(5):
             response = rest_user_client.get(resource_url)
             assert response.status_code == 200, response.data
 
         assert response.data["uuid"] == str(task.uuid)
 
+    def test_not_modified(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: models.TeamMember,
+        task: Task,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test that unchanged tasks are not serialized again."""
+        etag = rest_user_client.get(resource_url)["ETag"]
+        assert etag.startswith('W/"')
+        with django_assert_num_queries(1):
+            response = rest_user_client.get(
+                resource_url, HTTP_IF_NONE_MATCH=etag
+            )
+            assert response.status_code == 304, response.content
+        chat_message_create(who=team_member.user, task=task, text="Hello")
+        response = rest_user_client.get(resource_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, response.data
+        assert response["ETag"] != etag
+
     def test_update(
         self,
         rest_user_client: APIClient,
@@ -217,7 +585,8 @@ class TestTaskRetrieveUpdateDestroy(UnauthenticatedTestMixin):
         # 31 now
         # 28 now
         # 22 now
-        with django_assert_num_queries(22):
+        # 20 now, since unchanged labels aren't written
+        with django_assert_num_queries(20):
             response = rest_user_client.put(
                 resource_url,
                 {**payload, "assignee": {"uuid": str(team_member.uuid)}},
@@ -270,7 +639,7 @@ class TestTaskRetrieveUpdateDestroy(UnauthenticatedTestMixin):
             response = rest_user_client.delete(resource_url)
             assert response.status_code == 204, response.content
         # Ensure that the task is gone for good
-        with django_assert_num_queries(1):
+        with django_assert_num_queries(2):
             response = rest_user_client.get(resource_url)
             assert response.status_code == 404, response.content
 
@@ -299,7 +668,8 @@ class TestMoveTaskToSection:
     ) -> None:
         """Test moving a task."""
         assert task.section == section
-        with django_assert_num_queries(18):
+        # Down from 18, since tasks aren't locked and renumbered anymore
+        with django_assert_num_queries(14):
             response = rest_user_client.post(
                 resource_url,
                 data={"section_uuid": str(other_section.uuid)},
@@ -308,7 +678,7 @@ class TestMoveTaskToSection:
 
         task.refresh_from_db()
         assert task.section == other_section
-        assert task._order == 0
+        assert task._order == ORDER_GAP
 
 
 @pytest.mark.django_db
@@ -331,9 +701,167 @@ class TestTaskMoveAfterTask:
         other_task: Task,
     ) -> None:
         """Test as an authenticated user."""
-        with django_assert_num_queries(17):
+        with django_assert_num_queries(16):
             response = rest_user_client.post(
                 resource_url,
                 data={"task_uuid": str(other_task.uuid)},
             )
             assert response.status_code == status.HTTP_200_OK, response.data
+
+
+@pytest.mark.django_db
+class TestTaskAssignLabelsMany:
+    """Test adding labels to and removing labels from many tasks."""
+
+    @pytest.fixture
+    def resource_url(self) -> str:
+        """Return URL to this view."""
+        return reverse("workspace:tasks:assign-labels-many")
+
+    def test_simple(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        django_assert_num_queries: DjangoAssertNumQueries,
+        section: Section,
+        labels: list[Label],
+        user: User,
+        team_member: TeamMember,
+    ) -> None:
+        """Test that the number of queries doesn't grow with the tasks."""
+        tasks = [
+            task_create(who=user, section=section, title=f"{n}")
+            for n in range(10)
+        ]
+        a, b, *_ = labels
+        with django_assert_num_queries(8):
+            response = rest_user_client.post(
+                resource_url,
+                data={
+                    "task_uuids": [str(t.uuid) for t in tasks],
+                    "add_label_uuids": [str(a.uuid), str(b.uuid)],
+                },
+                format="json",
+            )
+            assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert all(t.labels.count() == 2 for t in tasks)
+
+        response = rest_user_client.post(
+            resource_url,
+            data={
+                "task_uuids": [str(t.uuid) for t in tasks],
+                "remove_label_uuids": [str(a.uuid)],
+            },
+            format="json",
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert all(list(t.labels.all()) == [b] for t in tasks)
+
+    def test_label_not_found(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        task: Task,
+        team_member: TeamMember,
+    ) -> None:
+        """Test that labels have to be in the tasks' workspace."""
+        response = rest_user_client.post(
+            resource_url,
+            data={
+                "task_uuids": [str(task.uuid)],
+                "add_label_uuids": [str(uuid4())],
+            },
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["details"] == {
+            "add_label_uuids": "No label was found for some of the uuids"
+        }
+
+    def test_add_and_remove(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        task: Task,
+        label: Label,
+        team_member: TeamMember,
+    ) -> None:
+        """Test that a label can't be added and removed at once."""
+        response = rest_user_client.post(
+            resource_url,
+            data={
+                "task_uuids": [str(task.uuid)],
+                "add_label_uuids": [str(label.uuid)],
+                "remove_label_uuids": [str(label.uuid)],
+            },
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["details"] == {
+            "remove_label_uuids": "Labels can't be added and removed at once"
+        }
+
+
+@pytest.mark.django_db
+class TestTaskMoveMany:
+    """Test moving many tasks at once."""
+
+    @pytest.fixture
+    def resource_url(self) -> str:
+        """Return URL to this view."""
+        return reverse("workspace:tasks:move-many")
+
+    def test_simple(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        django_assert_num_queries: DjangoAssertNumQueries,
+        section: Section,
+        other_section: Section,
+        task: Task,
+        other_task: Task,
+        user: User,
+    ) -> None:
+        """Test that the number of queries doesn't grow with the tasks."""
+        tasks = [
+            task_create(who=user, section=other_section, title=f"{n}")
+            for n in range(10)
+        ]
+        with django_assert_num_queries(13):
+            response = rest_user_client.post(
+                resource_url,
+                data={
+                    "task_uuids": [
+                        str(t.uuid) for t in [*reversed(tasks), other_task]
+                    ],
+                    "section_uuid": str(section.uuid),
+                    "after_task_uuid": str(task.uuid),
+                },
+                format="json",
+            )
+            assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        assert list(section.task_set.all()) == [
+            task,
+            *reversed(tasks),
+            other_task,
+        ]
+
+    def test_not_found(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        section: Section,
+        task: Task,
+    ) -> None:
+        """Test that nothing moves if a task can't be found."""
+        response = rest_user_client.post(
+            resource_url,
+            data={
+                "task_uuids": [str(task.uuid), str(uuid4())],
+                "section_uuid": str(section.uuid),
+            },
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "task_uuids" in response.data["details"]
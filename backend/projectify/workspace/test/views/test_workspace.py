@@ -3,18 +3,27 @@
 # SPDX-FileCopyrightText: 2023, 2024 JWP Consulting GK
 """Test workspace CRUD views."""
 
+import csv
+import io
+import json
 import unittest.mock
+from collections.abc import AsyncIterable
 
 from django.contrib.auth.models import AbstractBaseUser, AbstractUser
 from django.core.files import File
+from django.db import connections
+from django.http import StreamingHttpResponse
+from django.test.client import AsyncClient
 from django.urls import reverse
 
 import pytest
+from asgiref.sync import sync_to_async
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from projectify.corporate.services.stripe import customer_cancel_subscription
 from projectify.user.models.user import User
+from projectify.workspace.services.label import label_create
 from projectify.workspace.services.team_member_invite import (
     team_member_invite_create,
 )
@@ -22,6 +31,7 @@ from pytest_types import DjangoAssertNumQueries, Headers
 
 from ...models.const import TeamMemberRoles
 from ...models.project import Project
+from ...models.task import Task
 from ...models.team_member import TeamMember
 from ...models.workspace import Workspace
 
@@ -130,7 +140,8 @@ class TestWorkspaceReadUpdate:
         # Went up from 5 to 7, since we now return the quota for remaining
         # seats
         # One more for user invites
-        with django_assert_num_queries(8):
+        # One more for the ETag
+        with django_assert_num_queries(9):
             response = rest_user_client.get(resource_url)
             assert response.status_code == 200, response.data
         assert response.data == {
@@ -167,6 +178,27 @@ class TestWorkspaceReadUpdate:
             },
         }
 
+    def test_get_selected(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        workspace: Workspace,
+        team_member: TeamMember,
+        project: Project,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Assert that only fields and relations picked are fetched."""
+        # ETag, workspace and its projects
+        with django_assert_num_queries(3):
+            response = rest_user_client.get(
+                resource_url, {"fields": "title,projects.uuid"}
+            )
+            assert response.status_code == 200, response.data
+        assert response.data == {
+            "title": workspace.title,
+            "projects": [{"uuid": str(project.uuid)}],
+        }
+
     def test_get_trial(
         self,
         rest_user_client: APIClient,
@@ -177,7 +209,7 @@ class TestWorkspaceReadUpdate:
     ) -> None:
         """Assert that trial limits are annotated correctly."""
         customer_cancel_subscription(customer=workspace.customer)
-        with django_assert_num_queries(13):
+        with django_assert_num_queries(14):
             response = rest_user_client.get(resource_url)
         assert response.status_code == 200, response.data
         assert response.data == {
@@ -241,6 +273,42 @@ class TestWorkspaceReadUpdate:
             },
         }
 
+    # Revisions are bumped when transactions commit
+    @pytest.mark.django_db(transaction=True)
+    def test_not_modified(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        workspace: Workspace,
+        team_member: TeamMember,
+        task: Task,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Assert that an unchanged workspace is not serialized again."""
+        etag = rest_user_client.get(resource_url)["ETag"]
+        with django_assert_num_queries(1):
+            response = rest_user_client.get(
+                resource_url, HTTP_IF_NONE_MATCH=etag
+            )
+            assert response.status_code == 304, response.content
+        # The query is validated before the ETag is compared
+        response = rest_user_client.get(
+            resource_url, {"include": "title"}, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 400, response.content
+        label_create(
+            who=team_member.user, workspace=workspace, name="Label", color=0
+        )
+        response = rest_user_client.get(resource_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, response.data
+        assert response["ETag"] != etag
+        # Tasks count towards the quota
+        etag = response["ETag"]
+        task.delete()
+        response = rest_user_client.get(resource_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, response.data
+        assert response["ETag"] != etag
+
     def test_updating(
         self,
         rest_user_client: APIClient,
@@ -476,3 +544,86 @@ class TestInviteUserToWorkspace:
             "details": {"email": "User with this email was never invited"},
             "general": None,
         }
+
+
+@pytest.mark.django_db
+class TestWorkspaceExport:
+    """Test exporting a workspace."""
+
+    @pytest.fixture
+    def resource_url(self, workspace: Workspace) -> str:
+        """Return URL to this view."""
+        return reverse("workspace:workspaces:export", args=(workspace.uuid,))
+
+    def test_json_lines(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        task: Task,
+        team_member: TeamMember,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test exporting everything as JSON Lines."""
+        with django_assert_num_queries(9):
+            response = rest_user_client.get(resource_url)
+            assert response.status_code == 200
+            content = response.getvalue()
+        assert response["Content-Type"] == "application/jsonl"
+        records = [json.loads(line) for line in content.splitlines()]
+        assert records[0]["uuid"] == str(task.workspace.uuid)
+        (task_record,) = (r for r in records if r["type"] == "task")
+        assert task_record["uuid"] == str(task.uuid)
+        assert task_record["section_uuid"] == str(task.section.uuid)
+
+    def test_csv(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        task: Task,
+        team_member: TeamMember,
+    ) -> None:
+        """Test exporting tasks as CSV."""
+        response = rest_user_client.get(resource_url, {"file_format": "csv"})
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/csv"
+        content = response.getvalue().decode()
+        (row,) = csv.DictReader(io.StringIO(content))
+        assert row["title"] == task.title
+        assert row["section"] == task.section.title
+
+    # Rows are read in another thread, which only sees committed data
+    @pytest.mark.django_db(transaction=True)
+    async def test_asgi(
+        self,
+        async_client: AsyncClient,
+        resource_url: str,
+        user: User,
+        task: Task,
+        team_member: TeamMember,
+    ) -> None:
+        """Test that ASGI streams the export one batch at a time."""
+        await sync_to_async(async_client.force_login)(user)
+        response = await async_client.get(resource_url)
+        assert response.status_code == 200
+        assert isinstance(response, StreamingHttpResponse)
+        content = response.streaming_content
+        assert isinstance(content, AsyncIterable)
+        chunks = [chunk async for chunk in content]
+        assert len(chunks) > 1
+        records = [json.loads(line) for line in b"".join(chunks).splitlines()]
+        (task_record,) = (r for r in records if r["type"] == "task")
+        assert task_record["uuid"] == str(task.uuid)
+        # The test client keeps the connection the view used open
+        await sync_to_async(connections.close_all)()
+
+    def test_not_owner(
+        self,
+        rest_user_client: APIClient,
+        resource_url: str,
+        team_member: TeamMember,
+    ) -> None:
+        """Test that only owners can export a workspace."""
+        team_member.role = TeamMemberRoles.MAINTAINER
+        team_member.save()
+        response = rest_user_client.get(resource_url)
+        assert response.status_code == 403
@@ -5,6 +5,7 @@
 
 from django.urls import include, path
 
+from projectify.workspace.views.batch import Batch
 from projectify.workspace.views.label import LabelCreate, LabelUpdateDelete
 from projectify.workspace.views.project import (
     ProjectArchive,
@@ -12,6 +13,10 @@ from projectify.workspace.views.project import (
     ProjectCreate,
     ProjectReadUpdateDelete,
 )
+from projectify.workspace.views.project_import import (
+    ProjectImportCreate,
+    ProjectImportRead,
+)
 from projectify.workspace.views.section import (
     SectionCreate,
     SectionMove,
@@ -19,10 +24,16 @@ from projectify.workspace.views.section import (
 )
 
 from .views.task import (
+    TaskAssignLabelsMany,
     TaskCreate,
+    TaskCreateMany,
+    TaskList,
     TaskMoveAfterTask,
+    TaskMoveMany,
     TaskMoveToSection,
     TaskRetrieveUpdateDelete,
+    TaskSearch,
+    UserTasks,
 )
 from .views.team_member import TeamMemberReadUpdateDelete
 from .views.workspace import (
@@ -30,6 +41,7 @@ from .views.workspace import (
     UninviteUserFromWorkspace,
     UserWorkspaces,
     WorkspaceCreate,
+    WorkspaceExport,
     WorkspacePictureUploadView,
     WorkspaceReadUpdate,
 )
@@ -73,6 +85,11 @@ workspace_patterns = (
         UninviteUserFromWorkspace.as_view(),
         name="uninvite-team-member",
     ),
+    path(
+        "<uuid:workspace_uuid>/export",
+        WorkspaceExport.as_view(),
+        name="export",
+    ),
     # Related
     # Archived projects
     path(
@@ -80,6 +97,17 @@ workspace_patterns = (
         ProjectArchivedList.as_view(),
         name="archived-projects",
     ),
+    # Tasks
+    path(
+        "<uuid:workspace_uuid>/tasks",
+        TaskList.as_view(),
+        name="tasks",
+    ),
+    path(
+        "<uuid:workspace_uuid>/search-tasks",
+        TaskSearch.as_view(),
+        name="search-tasks",
+    ),
 )
 
 team_member_patterns = (
@@ -110,6 +138,20 @@ project_patterns = (
         ProjectArchive.as_view(),
         name="archive",
     ),
+    path(
+        "<uuid:project_uuid>/import",
+        ProjectImportCreate.as_view(),
+        name="import",
+    ),
+)
+
+project_import_patterns = (
+    # Read
+    path(
+        "<uuid:project_import_uuid>",
+        ProjectImportRead.as_view(),
+        name="read",
+    ),
 )
 
 section_patterns = (
@@ -140,6 +182,17 @@ task_patterns = (
         TaskCreate.as_view(),
         name="create",
     ),
+    path(
+        "create-many",
+        TaskCreateMany.as_view(),
+        name="create-many",
+    ),
+    # Read
+    path(
+        "user-tasks/",
+        UserTasks.as_view(),
+        name="user-tasks",
+    ),
     # Read, Update, Delete
     path(
         "<uuid:task_uuid>",
@@ -158,6 +211,16 @@ task_patterns = (
         TaskMoveAfterTask.as_view(),
         name="move-after-task",
     ),
+    path(
+        "move-many",
+        TaskMoveMany.as_view(),
+        name="move-many",
+    ),
+    path(
+        "assign-labels-many",
+        TaskAssignLabelsMany.as_view(),
+        name="assign-labels-many",
+    ),
 )
 
 label_patterns = (
@@ -193,6 +256,11 @@ urlpatterns = (
         "project/",
         include((project_patterns, "projects")),
     ),
+    # ProjectImport
+    path(
+        "project-import/",
+        include((project_import_patterns, "project-imports")),
+    ),
     # Section
     path(
         "section/",
@@ -205,4 +273,6 @@ urlpatterns = (
     ),
     # Label
     path("label/", include((label_patterns, "labels"))),
+    # Batch
+    path("batch", Batch.as_view(), name="batch"),
 )
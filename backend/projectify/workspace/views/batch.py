@@ -0,0 +1,341 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""
+Batch views.
+
+A batch runs several operations, such as creating a label and then
+assigning it to tasks, in one request and one transaction. Each operation
+has a name and arguments, which are the same as for the single view it
+stands in for, together with the uuid the single view takes in its url.
+Where an operation needs the uuid of something created earlier in the same
+batch, an argument can be given as {"$ref": <index of the operation>}.
+"""
+
+from collections.abc import Callable
+from typing import Any, Optional
+from uuid import UUID
+
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import serializers, status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from projectify.lib.error_schema import DeriveSchema
+from projectify.lib.schema import extend_schema
+
+from ..models.label import Label
+from ..models.task import Task
+from ..selectors.section import section_find_for_user_and_uuid
+from ..selectors.task import task_find_by_task_uuid
+from ..selectors.team_member import team_member_cache
+from ..selectors.workspace import workspace_find_by_workspace_uuid
+from ..serializers.base import LabelBaseSerializer, TaskBaseSerializer
+from ..serializers.task_detail import (
+    TaskCreateSerializer,
+    TaskUpdateSerializer,
+)
+from ..services.label import label_create, label_delete, label_update
+from ..services.signals import coalesce_change_signals
+from ..services.sub_task import ValidatedData
+from ..services.task import (
+    task_create_nested,
+    task_delete,
+    task_move_after,
+    task_update_nested,
+)
+from .label import LabelCreate, LabelUpdateDelete
+
+# Run an operation with its arguments and return its result
+Operation = Callable[[Request, dict[str, Any]], Any]
+
+EMPTY_SUB_TASKS: ValidatedData = {
+    "create_sub_tasks": [],
+    "update_sub_tasks": [],
+}
+
+
+class LabelUuidSerializer(serializers.Serializer):
+    """Accept the uuid of a label to change."""
+
+    label_uuid = serializers.UUIDField()
+
+
+class TaskUuidSerializer(serializers.Serializer):
+    """Accept the uuid of a task to change."""
+
+    task_uuid = serializers.UUIDField()
+
+
+class TaskMoveToSectionSerializer(TaskUuidSerializer):
+    """Accept a task and the section to move it to."""
+
+    section_uuid = serializers.UUIDField()
+
+
+class TaskMoveAfterTaskSerializer(TaskUuidSerializer):
+    """Accept a task and the task to move it behind."""
+
+    after_task_uuid = serializers.UUIDField()
+
+
+def _validate(serializer: serializers.Serializer) -> dict[str, Any]:
+    """Validate arguments, and return them."""
+    serializer.is_valid(raise_exception=True)
+    data: dict[str, Any] = serializer.validated_data
+    return data
+
+
+def _find_label(request: Request, label_uuid: UUID) -> Label:
+    """Find a label, or fail validation."""
+    label = (
+        Label.objects.filter_for_user_and_uuid(
+            user=request.user, uuid=label_uuid
+        )
+        .select_related("workspace")
+        .first()
+    )
+    if label is None:
+        raise serializers.ValidationError(
+            {"label_uuid": _("No label was found for the given uuid")}
+        )
+    return label
+
+
+def _find_task(request: Request, task_uuid: UUID, field: str) -> Task:
+    """Find a task, or fail validation for field."""
+    task = task_find_by_task_uuid(
+        who=request.user,
+        task_uuid=task_uuid,
+        qs=Task.objects.select_related("workspace", "section__project"),
+    )
+    if task is None:
+        raise serializers.ValidationError(
+            {field: _("No task was found for the given uuid")}
+        )
+    return task
+
+
+# Label
+def _label_create(request: Request, args: dict[str, Any]) -> Any:
+    """Create a label, see LabelCreate."""
+    data = _validate(LabelCreate.LabelCreateSerializer(data=args))
+    workspace = workspace_find_by_workspace_uuid(
+        workspace_uuid=data["workspace_uuid"], who=request.user
+    )
+    if workspace is None:
+        raise serializers.ValidationError(
+            {
+                "workspace_uuid": _(
+                    "No workspace could be found for given workspace_uuid"
+                ),
+            }
+        )
+    label = label_create(
+        workspace=workspace,
+        name=data["name"],
+        color=data["color"],
+        who=request.user,
+    )
+    return LabelBaseSerializer(instance=label).data
+
+
+def _label_update(request: Request, args: dict[str, Any]) -> Any:
+    """Update a label, see LabelUpdateDelete."""
+    label_uuid = _validate(LabelUuidSerializer(data=args))["label_uuid"]
+    data = _validate(LabelUpdateDelete.LabelUpdateSerializer(data=args))
+    label = label_update(
+        who=request.user,
+        label=_find_label(request, label_uuid),
+        name=data["name"],
+        color=data["color"],
+    )
+    return LabelBaseSerializer(instance=label).data
+
+
+def _label_delete(request: Request, args: dict[str, Any]) -> None:
+    """Delete a label, see LabelUpdateDelete."""
+    label_uuid = _validate(LabelUuidSerializer(data=args))["label_uuid"]
+    label_delete(who=request.user, label=_find_label(request, label_uuid))
+
+
+# Task
+def _task_create(request: Request, args: dict[str, Any]) -> Any:
+    """Create a task, see TaskCreate."""
+    data = _validate(
+        TaskCreateSerializer(data=args, context={"request": request})
+    )
+    task = task_create_nested(
+        who=request.user,
+        section=data["section"],
+        title=data["title"],
+        description=data.get("description"),
+        assignee=data.get("assignee"),
+        due_date=data.get("due_date"),
+        labels=data["labels"],
+        sub_tasks=data.get("sub_tasks", EMPTY_SUB_TASKS),
+    )
+    return TaskBaseSerializer(instance=task).data
+
+
+def _task_update(request: Request, args: dict[str, Any]) -> Any:
+    """Update a task, see TaskRetrieveUpdateDelete."""
+    task_uuid = _validate(TaskUuidSerializer(data=args))["task_uuid"]
+    task = _find_task(request, task_uuid, "task_uuid")
+    data = _validate(
+        TaskUpdateSerializer(task, data=args, context={"request": request})
+    )
+    task = task_update_nested(
+        who=request.user,
+        task=task,
+        title=data["title"],
+        description=data.get("description"),
+        assignee=data.get("assignee"),
+        due_date=data.get("due_date"),
+        labels=data["labels"],
+        sub_tasks=data.get("sub_tasks", EMPTY_SUB_TASKS),
+    )
+    return TaskBaseSerializer(instance=task).data
+
+
+def _task_delete(request: Request, args: dict[str, Any]) -> None:
+    """Delete a task, see TaskRetrieveUpdateDelete."""
+    task_uuid = _validate(TaskUuidSerializer(data=args))["task_uuid"]
+    task_delete(
+        who=request.user, task=_find_task(request, task_uuid, "task_uuid")
+    )
+
+
+def _task_move_to_section(request: Request, args: dict[str, Any]) -> None:
+    """Move a task to the top of a section, see TaskMoveToSection."""
+    data = _validate(TaskMoveToSectionSerializer(data=args))
+    task = _find_task(request, data["task_uuid"], "task_uuid")
+    section = section_find_for_user_and_uuid(
+        section_uuid=data["section_uuid"], user=request.user
+    )
+    if section is None:
+        raise serializers.ValidationError(
+            {"section_uuid": _("No section was found for the given uuid")}
+        )
+    task_move_after(who=request.user, task=task, after=section)
+
+
+def _task_move_after_task(request: Request, args: dict[str, Any]) -> None:
+    """Move a task behind another task, see TaskMoveAfterTask."""
+    data = _validate(TaskMoveAfterTaskSerializer(data=args))
+    task = _find_task(request, data["task_uuid"], "task_uuid")
+    after = _find_task(request, data["after_task_uuid"], "after_task_uuid")
+    task_move_after(who=request.user, task=task, after=after)
+
+
+OPERATIONS: dict[str, Operation] = {
+    "label.create": _label_create,
+    "label.update": _label_update,
+    "label.delete": _label_delete,
+    "task.create": _task_create,
+    "task.update": _task_update,
+    "task.delete": _task_delete,
+    "task.move-to-section": _task_move_to_section,
+    "task.move-after-task": _task_move_after_task,
+}
+
+
+def _resolve(value: Any, results: list[Any]) -> Any:
+    """Replace {"$ref": index} with the uuid of an earlier result."""
+    match value:
+        case {"$ref": index} if len(value) == 1:
+            # bool is an int, too
+            if (
+                not isinstance(index, int)
+                or isinstance(index, bool)
+                or not 0 <= index < len(results)
+            ):
+                raise serializers.ValidationError(
+                    {"args": [_("Only earlier operations can be referred to")]}
+                )
+            result: Optional[dict[str, Any]] = results[index]
+            if result is None or "uuid" not in result:
+                raise serializers.ValidationError(
+                    {"args": [_("The operation referred to has no uuid")]}
+                )
+            return result["uuid"]
+        case dict():
+            return {
+                key: _resolve(item, results) for key, item in value.items()
+            }
+        case list():
+            return [_resolve(item, results) for item in value]
+        case _:
+            return value
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    """Accept an operation and its arguments."""
+
+    op = serializers.ChoiceField(choices=list(OPERATIONS))
+    args = serializers.DictField(default=dict)
+
+
+class BatchSerializer(serializers.Serializer):
+    """Accept operations, to be run in the order given."""
+
+    operations = BatchOperationSerializer(
+        many=True, min_length=1, max_length=100
+    )
+
+
+class BatchResultSerializer(serializers.Serializer):
+    """Return what each operation returned, in order."""
+
+    results = serializers.ListField(
+        child=serializers.JSONField(allow_null=True)
+    )
+
+
+class Batch(APIView):
+    """Run several operations at once."""
+
+    @extend_schema(
+        request=BatchSerializer,
+        responses={200: BatchResultSerializer, 400: DeriveSchema},
+    )
+    def post(self, request: Request) -> Response:
+        """
+        Process the request.
+
+        Operations run in one transaction. If one fails, none of them take
+        effect, and the error is returned at the failed operation's index.
+        Permission checks share one lookup of the user's role per
+        workspace, and clients are told about each changed object once,
+        when all operations are done. Operations that create or update
+        return the label or task, all others return null.
+        """
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        operations: list[dict[str, Any]] = serializer.validated_data[
+            "operations"
+        ]
+        results: list[Any] = []
+        with (
+            coalesce_change_signals(),
+            team_member_cache(),
+            transaction.atomic(),
+        ):
+            for index, operation in enumerate(operations):
+                try:
+                    args = _resolve(operation["args"], results)
+                    results.append(OPERATIONS[operation["op"]](request, args))
+                except serializers.ValidationError as e:
+                    raise serializers.ValidationError(
+                        {
+                            "operations": [
+                                e.detail if n == index else {}
+                                for n in range(len(operations))
+                            ]
+                        }
+                    )
+        output_serializer = BatchResultSerializer({"results": results})
+        return Response(output_serializer.data, status=status.HTTP_200_OK)
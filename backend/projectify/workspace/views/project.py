@@ -3,10 +3,12 @@
 # SPDX-FileCopyrightText: 2023-2024 JWP Consulting GK
 """Project views."""
 
+from typing import Optional
 from uuid import UUID
 
 from django.http import Http404, HttpResponse
 from django.shortcuts import render
+from django.utils.cache import get_conditional_response
 from django.utils.translation import gettext_lazy as _
 
 from rest_framework import serializers, status
@@ -15,22 +17,36 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from projectify.lib.error_schema import DeriveSchema
+from projectify.lib.cache import response_cache_get, response_cache_set
+from projectify.lib.db import read_database_for, weak_etag
+from projectify.lib.error_schema import (
+    DeriveSchema,
+    derive_bad_request_serializer,
+)
 from projectify.lib.schema import extend_schema
+from projectify.lib.serializers import FieldSelection, FieldSelectionSerializer
+from projectify.lib.settings import get_settings
 from projectify.lib.types import AuthenticatedHttpRequest
 from projectify.lib.views import platform_view
-from projectify.workspace.models import Project
+from projectify.workspace.models import Project, Workspace
 from projectify.workspace.selectors.project import (
     ProjectDetailQuerySet,
+    ProjectDetailWorkspaceQuerySet,
+    project_detail_query_set,
     project_find_by_project_uuid,
     project_find_by_workspace_uuid,
+    project_find_version,
 )
 from projectify.workspace.selectors.quota import workspace_get_all_quotas
 from projectify.workspace.selectors.workspace import (
     workspace_find_by_workspace_uuid,
 )
 from projectify.workspace.serializers.base import ProjectBaseSerializer
-from projectify.workspace.serializers.project import ProjectDetailSerializer
+from projectify.workspace.serializers.project import (
+    ProjectDetailAggregateSerializer,
+    ProjectDetailSerializer,
+)
+from projectify.workspace.serializers.workspace import WorkspaceQuotaSerializer
 from projectify.workspace.services.project import (
     project_archive,
     project_create,
@@ -107,20 +123,124 @@ class ProjectCreate(APIView):
 class ProjectReadUpdateDelete(APIView):
     """Project retrieve view."""
 
+    class ProjectDetailQuerySerializer(FieldSelectionSerializer):
+        """Accept the fields and relations to show."""
+
+        selected_serializer = ProjectDetailSerializer
+
     @extend_schema(
-        responses={200: ProjectDetailSerializer},
+        parameters=[ProjectDetailQuerySerializer],
+        responses={
+            200: ProjectDetailSerializer,
+            400: derive_bad_request_serializer(ProjectDetailQuerySerializer),
+        },
     )
-    def get(self, request: Request, project_uuid: UUID) -> Response:
-        """Handle GET."""
+    def get(self, request: Request, project_uuid: UUID) -> HttpResponse:
+        """
+        Handle GET.
+
+        Project details are the same for every team member, except for the
+        workspace quota. They are cached with the project's version, and
+        only the quota is calculated for each request. The version is also
+        the ETag, so that an unchanged project is Not Modified.
+
+        With ?fields= or ?include=, only the fields and relations picked are
+        fetched and shown, and nothing is cached. For example,
+        ?fields=uuid,title&include=sections returns sections and their
+        tasks, but not the workspace.
+        """
+        query = self.ProjectDetailQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        selection: Optional[FieldSelection] = query.validated_data["selection"]
+        using = read_database_for(request.user)
+        # Read the version before the project, so that project details are
+        # never cached under a version newer than their own
+        version = project_find_version(
+            who=request.user, project_uuid=project_uuid, using=using
+        )
+        if version is None:
+            raise NotFound(_("No project found for this uuid"))
+        etag = weak_etag(version)
+        response: HttpResponse
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            response = not_modified
+        elif selection is not None:
+            response = self.get_selected(request, project_uuid, selection)
+        else:
+            response = self.get_cached(request, project_uuid, version)
+        response.headers.setdefault("ETag", etag)
+        return response
+
+    def get_selected(
+        self, request: Request, project_uuid: UUID, selection: FieldSelection
+    ) -> Response:
+        """Return the fields and relations in selection."""
+        project = project_find_by_project_uuid(
+            who=request.user,
+            project_uuid=project_uuid,
+            qs=project_detail_query_set(selection),
+            using=read_database_for(request.user),
+        )
+        if project is None:
+            raise NotFound(_("No project found for this uuid"))
+        if selection.selects("workspace.quota"):
+            project.workspace.quota = workspace_get_all_quotas(
+                project.workspace
+            )
+        return Response(
+            ProjectDetailSerializer(instance=project, selection=selection).data
+        )
+
+    def get_cached(
+        self, request: Request, project_uuid: UUID, version: str
+    ) -> Response:
+        """Return all project details, cached for version."""
+        using = read_database_for(request.user)
+        key = str(project_uuid)
+        data = response_cache_get(
+            name="project_detail", key=key, version=version
+        )
+        if data is not None:
+            workspace = workspace_find_by_workspace_uuid(
+                who=request.user,
+                workspace_uuid=UUID(data["workspace"]["uuid"]),
+                qs=Workspace.objects.select_related("customer"),
+                using=using,
+            )
+            if workspace is None:
+                raise NotFound(_("No project found for this uuid"))
+            data["workspace"]["quota"] = WorkspaceQuotaSerializer(
+                instance=workspace_get_all_quotas(workspace)
+            ).data
+            return Response(data)
+
+        settings = get_settings()
+        aggregate = settings.ENABLE_PROJECT_DETAIL_AGGREGATION
         project = project_find_by_project_uuid(
             who=request.user,
             project_uuid=project_uuid,
-            qs=ProjectDetailQuerySet,
+            qs=(
+                ProjectDetailWorkspaceQuerySet
+                if aggregate
+                else ProjectDetailQuerySet
+            ),
+            using=using,
         )
         if project is None:
             raise NotFound(_("No project found for this uuid"))
         project.workspace.quota = workspace_get_all_quotas(project.workspace)
-        serializer = ProjectDetailSerializer(instance=project)
+        serializer: ProjectBaseSerializer
+        if aggregate:
+            serializer = ProjectDetailAggregateSerializer(instance=project)
+        else:
+            serializer = ProjectDetailSerializer(instance=project)
+        response_cache_set(
+            name="project_detail",
+            key=key,
+            version=version,
+            data=serializer.data,
+        )
         return Response(serializer.data)
 
     class ProjectUpdateSerializer(serializers.ModelSerializer[Project]):
@@ -205,8 +325,9 @@ class ProjectArchivedList(APIView):
     )
     def get(self, request: Request, workspace_uuid: UUID) -> Response:
         """Get queryset."""
+        using = read_database_for(request.user)
         workspace = workspace_find_by_workspace_uuid(
-            workspace_uuid=workspace_uuid, who=request.user
+            workspace_uuid=workspace_uuid, who=request.user, using=using
         )
         if workspace is None:
             raise NotFound(_("No workspace found for this UUID"))
@@ -214,6 +335,7 @@ class ProjectArchivedList(APIView):
             who=request.user,
             workspace_uuid=workspace_uuid,
             archived=True,
+            using=using,
         )
         serializer = self.ArchivedProjectSerializer(
             instance=projects,
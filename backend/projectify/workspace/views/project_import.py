@@ -0,0 +1,86 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# SPDX-FileCopyrightText: 2024 JWP Consulting GK
+"""Project import views."""
+
+from uuid import UUID
+
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import parsers, serializers, status
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from projectify.lib.error_schema import DeriveSchema
+from projectify.lib.schema import extend_schema
+
+from ..models.const import ProjectImportFormat
+from ..selectors.project import project_find_by_project_uuid
+from ..selectors.project_import import (
+    project_import_find_by_project_import_uuid,
+)
+from ..serializers.project_import import ProjectImportSerializer
+from ..services.project_import import project_import_create
+
+
+# Create
+class ProjectImportCreate(APIView):
+    """Upload a file of tasks to be imported into a project."""
+
+    parser_classes = (parsers.MultiPartParser,)
+
+    class ProjectImportCreateSerializer(serializers.Serializer):
+        """Accept a CSV or JSON Lines file."""
+
+        file = serializers.FileField()
+        format = serializers.ChoiceField(choices=[*ProjectImportFormat.values])
+
+    @extend_schema(
+        request=ProjectImportCreateSerializer,
+        responses={202: ProjectImportSerializer, 400: DeriveSchema},
+    )
+    def post(self, request: Request, project_uuid: UUID) -> Response:
+        """
+        Handle POST.
+
+        The file is imported in the background. Its progress can be followed
+        through the project import it returns.
+        """
+        project = project_find_by_project_uuid(
+            who=request.user, project_uuid=project_uuid
+        )
+        if project is None:
+            raise NotFound(_("No project found for this uuid"))
+        serializer = self.ProjectImportCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        project_import = project_import_create(
+            who=request.user,
+            project=project,
+            file=serializer.validated_data["file"],
+            format=ProjectImportFormat(serializer.validated_data["format"]),
+        )
+        return Response(
+            data=ProjectImportSerializer(instance=project_import).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+# Read
+class ProjectImportRead(APIView):
+    """Show how far a project import has come."""
+
+    @extend_schema(
+        responses={200: ProjectImportSerializer},
+    )
+    def get(self, request: Request, project_import_uuid: UUID) -> Response:
+        """Handle GET."""
+        project_import = project_import_find_by_project_import_uuid(
+            who=request.user, project_import_uuid=project_import_uuid
+        )
+        if project_import is None:
+            raise NotFound(_("No project import found for this uuid"))
+        return Response(
+            data=ProjectImportSerializer(instance=project_import).data
+        )
@@ -13,6 +13,7 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from projectify.lib.db import read_database_for
 from projectify.lib.error_schema import DeriveSchema
 from projectify.lib.schema import extend_schema
 from projectify.workspace.models import Section
@@ -89,6 +90,7 @@ class SectionReadUpdateDelete(APIView):
             user=request.user,
             section_uuid=section_uuid,
             qs=SectionDetailQuerySet,
+            using=read_database_for(request.user),
         )
         if section is None:
             raise NotFound(_("Section not found for this UUID"))
@@ -3,7 +3,7 @@
 # SPDX-FileCopyrightText: 2023-2024 JWP Consulting GK
 """Task CRUD views."""
 
-from typing import Any, Literal, Union
+from typing import Any, Literal, Optional, Union
 from uuid import UUID
 
 from django import forms
@@ -11,8 +11,14 @@ from django.http import HttpResponse
 from django.http.response import Http404
 from django.shortcuts import redirect, render
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.utils.translation import gettext_lazy as _
-from django.views.decorators.http import require_http_methods, require_POST
+from django.views.decorators.http import (
+    condition,
+    require_http_methods,
+    require_POST,
+)
 
 from rest_framework import serializers, status
 from rest_framework.exceptions import NotFound
@@ -20,7 +26,11 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from projectify.lib.error_schema import DeriveSchema
+from projectify.lib.db import read_database_for
+from projectify.lib.error_schema import (
+    DeriveSchema,
+    derive_bad_request_serializer,
+)
 from projectify.lib.schema import extend_schema
 from projectify.lib.types import AuthenticatedHttpRequest
 from projectify.lib.views import platform_view
@@ -34,9 +44,24 @@ from projectify.workspace.selectors.section import (
 )
 from projectify.workspace.selectors.task import (
     TaskDetailQuerySet,
+    task_filter_for_workspace,
+    task_find_assigned_to_user,
     task_find_by_task_uuid,
+    task_find_by_task_uuids,
+    task_find_etag,
+    task_search,
+)
+from projectify.workspace.selectors.workspace import (
+    workspace_find_by_workspace_uuid,
+)
+from projectify.workspace.serializers.base import TaskBaseSerializer
+from projectify.workspace.serializers.task import (
+    TaskListPageSerializer,
+    TaskSearchPageSerializer,
+    UserTasksPageSerializer,
 )
 from projectify.workspace.serializers.task_detail import (
+    TaskCreateManySerializer,
     TaskCreateSerializer,
     TaskDetailSerializer,
     TaskUpdateSerializer,
@@ -47,21 +72,26 @@ from projectify.workspace.services.sub_task import (
     ValidatedDatumWithUuid,
 )
 from projectify.workspace.services.task import (
+    task_assign_labels_many,
+    task_create_many,
     task_create_nested,
     task_delete,
     task_move_after,
     task_move_in_direction,
+    task_move_many,
     task_update_nested,
 )
 
 
 def get_object(
-    request: Union[Request, AuthenticatedHttpRequest], task_uuid: UUID
+    request: Union[Request, AuthenticatedHttpRequest],
+    task_uuid: UUID,
+    using: Optional[str] = None,
 ) -> Task:
     """Get object for user and uuid."""
     user = request.user
     obj = task_find_by_task_uuid(
-        who=user, task_uuid=task_uuid, qs=TaskDetailQuerySet
+        who=user, task_uuid=task_uuid, qs=TaskDetailQuerySet, using=using
     )
     if obj is None:
         raise NotFound(
@@ -208,6 +238,37 @@ def task_detail(
     return render(request, "workspace/task_detail.html", context)
 
 
+class TaskSearchForm(forms.Form):
+    """Form for searching tasks."""
+
+    q = forms.CharField(max_length=200, required=False)
+
+
+@platform_view
+def task_search_view(
+    request: AuthenticatedHttpRequest, workspace_uuid: UUID
+) -> HttpResponse:
+    """Search tasks in a workspace."""
+    workspace = workspace_find_by_workspace_uuid(
+        who=request.user, workspace_uuid=workspace_uuid
+    )
+    if workspace is None:
+        raise Http404(_("Workspace not found"))
+    form = TaskSearchForm(request.GET)
+    tasks: list[Task] = []
+    if form.is_valid() and form.cleaned_data["q"]:
+        tasks = list(
+            task_search(
+                who=request.user,
+                workspace=workspace,
+                query=form.cleaned_data["q"],
+                using=read_database_for(request.user),
+            )[: TaskSearch.PAGE_SIZE]
+        )
+    context = {"workspace": workspace, "form": form, "tasks": tasks}
+    return render(request, "workspace/task_search.html", context)
+
+
 class TaskUpdateForm(forms.Form):
     """Form for task creation."""
 
@@ -394,16 +455,250 @@ class TaskCreate(APIView):
         )
 
 
+class TaskCreateMany(APIView):
+    """Create many tasks in a section at once."""
+
+    @extend_schema(
+        request=TaskCreateManySerializer,
+        responses={201: TaskBaseSerializer(many=True), 400: DeriveSchema},
+    )
+    def post(self, request: Request) -> Response:
+        """Handle POST."""
+        serializer = TaskCreateManySerializer(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        validated_data = serializer.validated_data
+        tasks = task_create_many(
+            who=request.user,
+            section=validated_data["section"],
+            tasks=validated_data["tasks"],
+        )
+        output_serializer = TaskBaseSerializer(instance=tasks, many=True)
+        return Response(
+            data=output_serializer.data, status=status.HTTP_201_CREATED
+        )
+
+
+# Read
+class TaskList(APIView):
+    """List tasks in a workspace, optionally filtered."""
+
+    PAGE_SIZE = 100
+
+    class TaskListQuerySerializer(serializers.Serializer):
+        """
+        Accept filters and a cursor.
+
+        label may be given several times. cursor is next_cursor of the
+        previous page.
+        """
+
+        assignee = serializers.UUIDField(required=False)
+        label = serializers.ListField(
+            child=serializers.UUIDField(), required=False
+        )
+        due_before = serializers.DateTimeField(required=False)
+        section = serializers.UUIDField(required=False)
+        cursor = serializers.IntegerField(min_value=0, required=False)
+
+    @extend_schema(
+        parameters=[TaskListQuerySerializer],
+        responses={
+            200: TaskListPageSerializer,
+            400: derive_bad_request_serializer(TaskListQuerySerializer),
+        },
+    )
+    def get(self, request: Request, workspace_uuid: UUID) -> Response:
+        """Handle GET."""
+        serializer = self.TaskListQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        using = read_database_for(request.user)
+        workspace = workspace_find_by_workspace_uuid(
+            workspace_uuid=workspace_uuid, who=request.user, using=using
+        )
+        if workspace is None:
+            raise NotFound(_("No workspace found for this UUID"))
+        tasks = list(
+            task_filter_for_workspace(
+                who=request.user,
+                workspace=workspace,
+                assignee_uuid=data.get("assignee"),
+                label_uuids=data.get("label"),
+                due_before=data.get("due_before"),
+                section_uuid=data.get("section"),
+                after_number=data.get("cursor"),
+                using=using,
+            )[: self.PAGE_SIZE + 1]
+        )
+        has_next = len(tasks) > self.PAGE_SIZE
+        tasks = tasks[: self.PAGE_SIZE]
+        output_serializer = TaskListPageSerializer(
+            instance={
+                "tasks": tasks,
+                "next_cursor": tasks[-1].number if has_next else None,
+            }
+        )
+        return Response(output_serializer.data)
+
+
+def group_by_workspace_and_project(
+    tasks: list[Task],
+) -> list[dict[str, Any]]:
+    """Group tasks by workspace and project, keeping their order."""
+    workspaces: dict[int, dict[str, Any]] = {}
+    projects: dict[int, dict[str, Any]] = {}
+    for task in tasks:
+        project = task.section.project
+        if task.workspace.pk not in workspaces:
+            workspaces[task.workspace.pk] = {
+                "title": task.workspace.title,
+                "uuid": task.workspace.uuid,
+                "projects": [],
+            }
+        if project.pk not in projects:
+            projects[project.pk] = {
+                "title": project.title,
+                "uuid": project.uuid,
+                "tasks": [],
+            }
+            workspaces[task.workspace.pk]["projects"].append(
+                projects[project.pk]
+            )
+        projects[project.pk]["tasks"].append(task)
+    return list(workspaces.values())
+
+
+class UserTasks(APIView):
+    """List tasks assigned to the user in all workspaces."""
+
+    PAGE_SIZE = 100
+
+    class UserTasksQuerySerializer(serializers.Serializer):
+        """
+        Accept an overdue filter and a cursor.
+
+        cursor is next_cursor of the previous page. A workspace or project
+        may appear on several pages.
+        """
+
+        overdue = serializers.BooleanField(default=False)
+        cursor = serializers.UUIDField(required=False)
+
+    @extend_schema(
+        parameters=[UserTasksQuerySerializer],
+        responses={
+            200: UserTasksPageSerializer,
+            400: derive_bad_request_serializer(UserTasksQuerySerializer),
+        },
+    )
+    def get(self, request: Request) -> Response:
+        """Handle GET."""
+        serializer = self.UserTasksQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        using = read_database_for(request.user)
+        after: Optional[Task] = None
+        if "cursor" in data:
+            after = task_find_by_task_uuid(
+                who=request.user, task_uuid=data["cursor"], using=using
+            )
+            if after is None:
+                raise serializers.ValidationError(
+                    {"cursor": _("No task was found for the given uuid")}
+                )
+        tasks = list(
+            task_find_assigned_to_user(
+                who=request.user,
+                due_before=timezone.now() if data["overdue"] else None,
+                after=after,
+                using=using,
+            )[: self.PAGE_SIZE + 1]
+        )
+        has_next = len(tasks) > self.PAGE_SIZE
+        tasks = tasks[: self.PAGE_SIZE]
+        output_serializer = UserTasksPageSerializer(
+            instance={
+                "workspaces": group_by_workspace_and_project(tasks),
+                "next_cursor": tasks[-1].uuid if has_next else None,
+            }
+        )
+        return Response(output_serializer.data)
+
+
+class TaskSearch(APIView):
+    """Search tasks in a workspace, best matches first."""
+
+    PAGE_SIZE = 50
+
+    class TaskSearchQuerySerializer(serializers.Serializer):
+        """Accept a search query and a page number, starting at 1."""
+
+        q = serializers.CharField(max_length=200)
+        page = serializers.IntegerField(min_value=1, default=1)
+
+    @extend_schema(
+        parameters=[TaskSearchQuerySerializer],
+        responses={
+            200: TaskSearchPageSerializer,
+            400: derive_bad_request_serializer(TaskSearchQuerySerializer),
+        },
+    )
+    def get(self, request: Request, workspace_uuid: UUID) -> Response:
+        """Handle GET."""
+        serializer = self.TaskSearchQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        using = read_database_for(request.user)
+        workspace = workspace_find_by_workspace_uuid(
+            workspace_uuid=workspace_uuid, who=request.user, using=using
+        )
+        if workspace is None:
+            raise NotFound(_("No workspace found for this UUID"))
+        start = (data["page"] - 1) * self.PAGE_SIZE
+        # Fetch one more task to know whether there is a next page, without
+        # counting all matches
+        tasks = list(
+            task_search(
+                who=request.user,
+                workspace=workspace,
+                query=data["q"],
+                using=using,
+            )[start : start + self.PAGE_SIZE + 1]
+        )
+        has_next = len(tasks) > self.PAGE_SIZE
+        output_serializer = TaskSearchPageSerializer(
+            instance={
+                "tasks": tasks[: self.PAGE_SIZE],
+                "next_page": data["page"] + 1 if has_next else None,
+            }
+        )
+        return Response(output_serializer.data)
+
+
 # Read + Update + Delete
+def task_detail_etag(request: Request, task_uuid: UUID) -> Optional[str]:
+    """Return an ETag for a task's details."""
+    return task_find_etag(
+        who=request.user,
+        task_uuid=task_uuid,
+        using=read_database_for(request.user),
+    )
+
+
 class TaskRetrieveUpdateDelete(APIView):
     """Retrieve a task."""
 
     @extend_schema(
         responses={200: TaskDetailSerializer},
     )
+    @method_decorator(condition(etag_func=task_detail_etag))
     def get(self, request: Request, task_uuid: UUID) -> Response:
         """Handle GET."""
-        instance = get_object(request, task_uuid)
+        instance = get_object(
+            request, task_uuid, using=read_database_for(request.user)
+        )
         serializer = TaskDetailSerializer(instance=instance)
         return Response(data=serializer.data)
 
@@ -539,3 +834,139 @@ class TaskMoveAfterTask(APIView):
         )
         output_serializer = TaskDetailSerializer(instance=task)
         return Response(output_serializer.data, status=status.HTTP_200_OK)
+
+
+class TaskMoveMany(APIView):
+    """Move many tasks to a section at once."""
+
+    class TaskMoveManySerializer(serializers.Serializer):
+        """
+        Accept tasks to move and where to move them.
+
+        Tasks are moved after the given task, or to the top of the section.
+        """
+
+        task_uuids = serializers.ListField(
+            child=serializers.UUIDField(), min_length=1, max_length=500
+        )
+        section_uuid = serializers.UUIDField()
+        after_task_uuid = serializers.UUIDField(
+            required=False, allow_null=True
+        )
+
+    @extend_schema(
+        request=TaskMoveManySerializer,
+        responses={204: None, 400: DeriveSchema},
+    )
+    def post(self, request: Request) -> Response:
+        """Process the request."""
+        user = request.user
+        serializer = self.TaskMoveManySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        # Keep the order given, without duplicates
+        task_uuids: list[UUID] = list(dict.fromkeys(data["task_uuids"]))
+        tasks_by_uuid = {
+            task.uuid: task
+            for task in task_find_by_task_uuids(
+                task_uuids=task_uuids, who=user
+            )
+        }
+        if len(tasks_by_uuid) != len(task_uuids):
+            raise serializers.ValidationError(
+                {"task_uuids": _("No task was found for some of the uuids")}
+            )
+        section = section_find_for_user_and_uuid(
+            section_uuid=data["section_uuid"],
+            user=user,
+        )
+        if section is None:
+            raise serializers.ValidationError(
+                {"section_uuid": _("No section was found for the given uuid")}
+            )
+        after: Optional[Task] = None
+        if data.get("after_task_uuid") is not None:
+            after = task_find_by_task_uuid(
+                task_uuid=data["after_task_uuid"], who=user
+            )
+            if after is None:
+                raise serializers.ValidationError(
+                    {
+                        "after_task_uuid": _(
+                            "No task was found for the given uuid"
+                        )
+                    }
+                )
+        task_move_many(
+            who=user,
+            tasks=[tasks_by_uuid[task_uuid] for task_uuid in task_uuids],
+            section=section,
+            after=after,
+        )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class TaskAssignLabelsMany(APIView):
+    """Add labels to and remove labels from many tasks at once."""
+
+    class TaskAssignLabelsManySerializer(serializers.Serializer):
+        """Accept tasks, and the labels to add to and remove from them."""
+
+        task_uuids = serializers.ListField(
+            child=serializers.UUIDField(), min_length=1, max_length=500
+        )
+        add_label_uuids = serializers.ListField(
+            child=serializers.UUIDField(), default=list
+        )
+        remove_label_uuids = serializers.ListField(
+            child=serializers.UUIDField(), default=list
+        )
+
+    @extend_schema(
+        request=TaskAssignLabelsManySerializer,
+        responses={204: None, 400: DeriveSchema},
+    )
+    def post(self, request: Request) -> Response:
+        """Process the request."""
+        user = request.user
+        serializer = self.TaskAssignLabelsManySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        task_uuids: set[UUID] = set(data["task_uuids"])
+        tasks = list(
+            task_find_by_task_uuids(
+                task_uuids=list(task_uuids), who=user
+            ).select_related("workspace")
+        )
+        if len(tasks) != len(task_uuids):
+            raise serializers.ValidationError(
+                {"task_uuids": _("No task was found for some of the uuids")}
+            )
+        # Labels are looked up in the workspace of the first task. If the
+        # tasks are spread over workspaces, task_assign_labels_many fails.
+        workspace = tasks[0].workspace
+        add_label_uuids: set[UUID] = set(data["add_label_uuids"])
+        remove_label_uuids: set[UUID] = set(data["remove_label_uuids"])
+        labels = {
+            label.uuid: label
+            for label in workspace.label_set.filter(
+                uuid__in=add_label_uuids | remove_label_uuids
+            )
+        }
+        errors = {
+            field: _("No label was found for some of the uuids")
+            for field, uuids in (
+                ("add_label_uuids", add_label_uuids),
+                ("remove_label_uuids", remove_label_uuids),
+            )
+            if not uuids <= labels.keys()
+        }
+        if errors:
+            raise serializers.ValidationError(errors)
+        task_assign_labels_many(
+            who=user,
+            tasks=tasks,
+            add=[labels[uuid] for uuid in add_label_uuids],
+            remove=[labels[uuid] for uuid in remove_label_uuids],
+        )
+        return Response(status=status.HTTP_204_NO_CONTENT)
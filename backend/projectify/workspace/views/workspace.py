@@ -3,13 +3,22 @@
 # SPDX-FileCopyrightText: 2023, 2024 JWP Consulting GK
 """Workspace CRUD views."""
 
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Iterable, Iterator
+from typing import Optional
 from uuid import UUID
 
-from django.http import Http404, HttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.utils.cache import get_conditional_response
 from django.utils.decorators import method_decorator
 from django.utils.translation import gettext_lazy as _
 
+from asgiref.sync import sync_to_async
 from django_ratelimit.decorators import ratelimit
 from rest_framework import parsers, serializers, views
 from rest_framework.exceptions import NotFound
@@ -21,8 +30,13 @@ from rest_framework.status import (
     HTTP_204_NO_CONTENT,
 )
 
-from projectify.lib.error_schema import DeriveSchema
-from projectify.lib.schema import extend_schema
+from projectify.lib.db import read_database_for
+from projectify.lib.error_schema import (
+    DeriveSchema,
+    derive_bad_request_serializer,
+)
+from projectify.lib.schema import OpenApiResponse, extend_schema
+from projectify.lib.serializers import FieldSelection, FieldSelectionSerializer
 from projectify.lib.types import AuthenticatedHttpRequest
 from projectify.workspace.selectors.project import (
     project_find_by_workspace_uuid,
@@ -33,9 +47,17 @@ from ..exceptions import UserAlreadyAdded, UserAlreadyInvited
 from ..models import Workspace
 from ..selectors.workspace import (
     WorkspaceDetailQuerySet,
+    workspace_detail_query_set,
     workspace_find_by_workspace_uuid,
+    workspace_find_etag,
     workspace_find_for_user,
 )
+from ..selectors.workspace_export import (
+    WORKSPACE_EXPORT_TASK_COLUMNS,
+    Record,
+    workspace_export_records,
+    workspace_export_task_rows,
+)
 from ..serializers.base import WorkspaceBaseSerializer
 from ..serializers.workspace import WorkspaceDetailSerializer
 from ..services.team_member_invite import (
@@ -118,7 +140,9 @@ class UserWorkspaces(views.APIView):
     @extend_schema(responses={200: UserWorkspaceSerializer(many=True)})
     def get(self, request: Request) -> Response:
         """Handle GET."""
-        workspaces = workspace_find_for_user(who=request.user)
+        workspaces = workspace_find_for_user(
+            who=request.user, using=read_database_for(request.user)
+        )
         serializer = self.UserWorkspaceSerializer(
             instance=workspaces, many=True
         )
@@ -129,21 +153,53 @@ class UserWorkspaces(views.APIView):
 class WorkspaceReadUpdate(views.APIView):
     """Workspace read and update view."""
 
+    class WorkspaceDetailQuerySerializer(FieldSelectionSerializer):
+        """Accept the fields and relations to show."""
+
+        selected_serializer = WorkspaceDetailSerializer
+
     @extend_schema(
-        responses={200: WorkspaceDetailSerializer},
+        parameters=[WorkspaceDetailQuerySerializer],
+        responses={
+            200: WorkspaceDetailSerializer,
+            400: derive_bad_request_serializer(WorkspaceDetailQuerySerializer),
+        },
     )
-    def get(self, request: Request, workspace_uuid: UUID) -> Response:
-        """Handle GET."""
-        workspace = workspace_find_by_workspace_uuid(
-            who=request.user,
-            workspace_uuid=workspace_uuid,
-            qs=WorkspaceDetailQuerySet,
+    def get(self, request: Request, workspace_uuid: UUID) -> HttpResponse:
+        """
+        Handle GET.
+
+        With ?fields= or ?include=, only the fields and relations picked are
+        fetched and shown. The query is validated before the ETag is
+        compared, so that an invalid query is never Not Modified.
+        """
+        query = self.WorkspaceDetailQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        selection: Optional[FieldSelection] = query.validated_data["selection"]
+        using = read_database_for(request.user)
+        etag = workspace_find_etag(
+            who=request.user, workspace_uuid=workspace_uuid, using=using
         )
-        if workspace is None:
+        if etag is None:
             raise NotFound(_("Could not find workspace with this UUID"))
-        workspace.quota = workspace_get_all_quotas(workspace)
-        serializer = WorkspaceDetailSerializer(instance=workspace)
-        return Response(status=HTTP_200_OK, data=serializer.data)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            workspace = workspace_find_by_workspace_uuid(
+                who=request.user,
+                workspace_uuid=workspace_uuid,
+                qs=workspace_detail_query_set(selection),
+                using=using,
+            )
+            if workspace is None:
+                raise NotFound(_("Could not find workspace with this UUID"))
+            if selection is None or selection.selects("quota"):
+                workspace.quota = workspace_get_all_quotas(workspace)
+            serializer = WorkspaceDetailSerializer(
+                instance=workspace, selection=selection
+            )
+            response = Response(status=HTTP_200_OK, data=serializer.data)
+        response.headers.setdefault("ETag", etag)
+        return response
 
     class WorkspaceUpdateSerializer(serializers.ModelSerializer[Workspace]):
         """Accept title, description."""
@@ -296,3 +352,110 @@ class UninviteUserFromWorkspace(views.APIView):
             email=serializer.validated_data["email"],
         )
         return Response(data=serializer.data, status=HTTP_204_NO_CONTENT)
+
+
+def _export_json_lines(batches: Iterable[list[Record]]) -> Iterator[bytes]:
+    """Encode batches of records as JSON Lines."""
+    for batch in batches:
+        yield "".join(
+            json.dumps(record, cls=DjangoJSONEncoder) + "\n"
+            for record in batch
+        ).encode()
+
+
+def _export_csv(batches: Iterable[list[Record]]) -> Iterator[bytes]:
+    """Encode batches of task rows as CSV, with a header row."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=WORKSPACE_EXPORT_TASK_COLUMNS)
+    writer.writeheader()
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+async def _export_async(content: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Yield content as an async iterator.
+
+    Each chunk, which is one batch of rows, is read and encoded in
+    sync_to_async, so that the event loop keeps running. Given a synchronous
+    iterator, Django would read all of content before sending any of it.
+    """
+
+    def read() -> Optional[bytes]:
+        return next(content, None)
+
+    while (chunk := await sync_to_async(read)()) is not None:
+        yield chunk
+
+
+class WorkspaceExport(views.APIView):
+    """Export a workspace as JSON Lines, or its tasks as CSV."""
+
+    class WorkspaceExportQuerySerializer(serializers.Serializer):
+        """Accept the file format to export to."""
+
+        # Not format, which DRF reserves for picking a renderer
+        file_format = serializers.ChoiceField(
+            choices=["jsonl", "csv"], default="jsonl"
+        )
+
+    @extend_schema(
+        parameters=[WorkspaceExportQuerySerializer],
+        responses={
+            200: OpenApiResponse(description=_("JSON Lines or CSV file")),
+            400: derive_bad_request_serializer(WorkspaceExportQuerySerializer),
+        },
+    )
+    def get(
+        self, request: Request, workspace_uuid: UUID
+    ) -> StreamingHttpResponse:
+        """
+        Handle GET.
+
+        The file is streamed, and rows are read from the database while it is
+        being sent. It is still a snapshot of the workspace, as all rows are
+        read in one transaction. Served by ASGI, rows are read without
+        blocking the event loop.
+        """
+        serializer = self.WorkspaceExportQuerySerializer(
+            data=request.query_params
+        )
+        serializer.is_valid(raise_exception=True)
+        using = read_database_for(request.user)
+        workspace = workspace_find_by_workspace_uuid(
+            workspace_uuid=workspace_uuid, who=request.user, using=using
+        )
+        if workspace is None:
+            raise NotFound(_("No workspace found for this UUID"))
+        file_format: str = serializer.validated_data["file_format"]
+        match file_format:
+            case "csv":
+                content = _export_csv(
+                    workspace_export_task_rows(
+                        who=request.user, workspace=workspace, using=using
+                    )
+                )
+                content_type = "text/csv"
+            case _:
+                content = _export_json_lines(
+                    workspace_export_records(
+                        who=request.user, workspace=workspace, using=using
+                    )
+                )
+                content_type = "application/jsonl"
+        return StreamingHttpResponse(
+            (
+                _export_async(content)
+                if isinstance(request._request, ASGIRequest)
+                else content
+            ),
+            content_type=content_type,
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="{workspace.uuid}.{file_format}"'
+                )
+            },
+        )
@@ -14,3 +14,7 @@ DjangoAssertNumQueries = Callable[
     [int], contextlib.AbstractContextManager[None]
 ]
 Mailbox = Sequence[EmailMessage]
+DjangoCaptureOnCommitCallbacks = Callable[
+    [], contextlib.AbstractContextManager[list[Callable[[], Any]]]
+]
+RunConcurrently = Callable[[Callable[[], Any], Callable[[], Any]], None]